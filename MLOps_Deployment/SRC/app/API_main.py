@@ -4,9 +4,12 @@ FastAPI server exposing API endpoints for text, audio, and video.
 """
 
 # Standard library
+import asyncio
+import hashlib
 import os
 import time
 import urllib.parse
+import uuid
 from os.path import basename
 from pathlib import Path
 from typing import Dict, List, Optional
@@ -15,14 +18,64 @@ import pandas as pd
 
 # Third-party packages
 from dotenv import load_dotenv
-from fastapi import FastAPI, File, HTTPException, Query, Request, UploadFile
+from fastapi import FastAPI, File, Header, HTTPException, Query, Request, UploadFile
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import FileResponse, JSONResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel, HttpUrl, constr
+from starlette.background import BackgroundTask
 from starlette.status import HTTP_422_UNPROCESSABLE_ENTITY
 
+from app.bulk import (
+    BULK_MAX_LINE_BYTES,
+    BULK_OUTPUT_FORMATS,
+    BulkInputError,
+    LineTooLongError,
+    check_line_lengths,
+    classify_stream,
+    input_kind,
+    parse_texts,
+    write_stream,
+)
+from app.jobs import JobQueue, JobStore, QueueFullError
+from app.metrics import (
+    CONTENT_TYPE,
+    HTTP_IN_PROGRESS,
+    HTTP_REQUEST_SECONDS,
+    azure_client_collector,
+    job_queue_collector,
+    metrics,
+    micro_batcher_collector,
+    router_collector,
+    stage_timer,
+)
+from app.prediction_cache import cache_stats
+from app.results import (
+    CLEANUP_INTERVAL_SECONDS,
+    file_response,
+    new_result_id,
+    result_store,
+    sweep_temp_uploads,
+)
+from app.router import InferenceRouter
+from app.scheduler import MicroBatcher
+from app.streaming import (
+    STREAM_FORMATS,
+    STREAM_HEADERS,
+    format_event,
+    heartbeats_until,
+)
+from app.transcript_cache import content_cache_key, hash_chunks, transcript_cache
+from app.uploads import (
+    MAX_UPLOAD_BYTES,
+    UploadTooLargeError,
+    check_content_length,
+    iter_upload,
+    save_upload,
+    spool_request_body,
+)
+from models.registry import registry
 from src.utils.logger import get_logger, setup_logging
+from transcription.assemblyai_client import WEBHOOK_SECRET_HEADER, get_client
 
 # Load environment variables
 load_dotenv()
@@ -37,13 +90,25 @@ logger = get_logger(__name__)
 # Conditional imports
 if not MOCK_MODE:
     import subprocess
-    import uuid
 
-    import requests
-    import yt_dlp
-
-    from app.azure_client import azure_predict
-    from app.predict import get_output_paths, run_full_pipeline
+    from app.azure_client import get_azure_client
+    from app.inference import classify_emotions_batch
+    from app.media import (
+        VIDEO_EXTRACTION_MODE,
+        extract_audio,
+        file_cache_key,
+        resolve_media_url,
+        upload_to_assemblyai,
+        upload_unless_cached,
+        upload_video_audio,
+    )
+    from app.predict import (
+        iter_sentence_predictions,
+        run_full_pipeline,
+        run_full_pipeline_async,
+        save_results,
+        transcribe_async,
+    )
 
     ASSEMBLYAI_API_KEY = os.getenv("ASSEMBLYAI_API_KEY")
     SAVE_TO = os.getenv("SAVE_TO", "output").lower()
@@ -56,6 +121,36 @@ else:
 ALLOWED_AUDIO_EXTENSIONS = {".mp3", ".wav"}
 ALLOWED_VIDEO_EXTENSIONS = {".mp4"}
 
+# Micro-batching window for /predict: flush after this many ms or items
+PREDICT_BATCH_WINDOW_MS = float(os.getenv("PREDICT_BATCH_WINDOW_MS", "5"))
+PREDICT_MAX_BATCH_SIZE = int(os.getenv("PREDICT_MAX_BATCH_SIZE", "32"))
+
+# Background jobs: uploads and the SQLite queue live under temp_uploads/jobs
+JOBS_DIR = Path("temp_uploads") / "jobs"
+JOBS_DB_PATH = os.getenv("JOBS_DB_PATH", str(JOBS_DIR / "jobs.sqlite3"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_QUEUE_LIMIT = int(os.getenv("JOB_QUEUE_LIMIT", "100"))
+JOB_HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", "10"))
+
+# Model components loaded in the background at startup; /ready waits for them.
+# Others (e.g. "translator") load on first use.
+MODEL_WARMUP = [
+    name.strip()
+    for name in os.getenv("MODEL_WARMUP", "classifier").split(",")
+    if name.strip()
+]
+
+# Model components loaded at import time. Under ``gunicorn --preload`` that is
+# the master process, so forked workers share the loaded (memory-mapped)
+# weights copy-on-write instead of loading their own copy. Nothing that must
+# not cross fork() is created here: SQLite connections and ONNX Runtime
+# sessions are opened per process on first use (utils/process_local.py).
+PRELOAD_MODELS = [
+    name.strip() for name in os.getenv("PRELOAD_MODELS", "").split(",") if name.strip()
+]
+if not MOCK_MODE and PRELOAD_MODELS:
+    registry.warmup(PRELOAD_MODELS)
+
 # FastAPI app setup
 app = FastAPI(
     title="Text & Audio Emotion Classifier API",
@@ -64,7 +159,24 @@ app = FastAPI(
 )
 logger.debug("FastAPI app initialized")
 
-print("FastAPI app initialized")
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Record the duration of each request by route template and status."""
+    start = time.perf_counter()
+    status = 500
+    HTTP_IN_PROGRESS.inc()
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        HTTP_IN_PROGRESS.dec()
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - start, request.method, route, status
+        )
+
 
 # Constrained string for text input
 TextStr = constr(strip_whitespace=True, min_length=1, max_length=512)
@@ -91,6 +203,8 @@ class TextPredictionResponse(BaseModel):
     predicted_label: str
     confidence: float
     csv_paths: List[str]
+    result_id: Optional[str] = None
+    source: Optional[str] = None  # "remote" (Azure endpoint) or "local" model
 
 
 class ErrorResponse(BaseModel):
@@ -107,6 +221,32 @@ class MediaPredictionResponse(BaseModel):
     message: str
     csv_paths: List[str]
     results: List[Dict]
+    result_id: Optional[str] = None
+
+
+class AssemblyAIWebhook(BaseModel):
+    """Body AssemblyAI posts to the webhook when a transcript finishes."""
+
+    transcript_id: str
+    status: str
+
+
+class JobSubmitResponse(BaseModel):
+    """Response model for a newly submitted background job."""
+
+    job_id: str
+    status: str
+
+
+class JobStatusResponse(BaseModel):
+    """Response model for the status of a background job."""
+
+    job_id: str
+    kind: str
+    status: str
+    error: Optional[str] = None
+    created_at: float
+    updated_at: float
 
 
 # Error handler for validation errors
@@ -128,6 +268,31 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     )
 
 
+# Error handler for uploads over MAX_UPLOAD_MB
+@app.exception_handler(UploadTooLargeError)
+async def upload_too_large_handler(request: Request, exc: UploadTooLargeError):
+    """Reject uploads that exceed the configured maximum size."""
+    logger.warning(f"Upload rejected: {exc}")
+    return JSONResponse(
+        status_code=413,
+        content={
+            "message": str(exc),
+            "type": "upload_too_large",
+            "detail": {"max_bytes": exc.max_bytes},
+        },
+    )
+
+
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    """Reject oversized bodies from their Content-Length before parsing them."""
+    try:
+        check_content_length(request.headers.get("content-length"), MAX_UPLOAD_BYTES)
+    except UploadTooLargeError as exc:
+        return await upload_too_large_handler(request, exc)
+    return await call_next(request)
+
+
 # Error handler for unexpected errors
 @app.exception_handler(Exception)
 async def unhandled_exception_handler(request: Request, exc: Exception):
@@ -143,29 +308,281 @@ async def unhandled_exception_handler(request: Request, exc: Exception):
     )
 
 
-# Utility: Cleanup old temp files
-def clean_temp_uploads(older_than_seconds=1800):
-    """Delete temporary files in the 'temp_uploads' directory.
+async def _predict_remote(texts: List[str]) -> List[dict]:
+    """Classify texts with the Azure ML endpoint.
+
+    The whole micro-batch goes out as one batched scoring request. If that
+    fails (e.g. an endpoint deployed before the batched contract), texts are
+    sent one per request, so a failure only affects the text it belongs to.
+
+    Raises:
+        Exception: If the endpoint failed for every text.
+    """
+    client = get_azure_client()
+    try:
+        return await client.predict_batch(texts)
+    except Exception as e:
+        logger.warning(f"Batched Azure scoring failed ({e}); scoring one by one")
+    results = await asyncio.gather(
+        *(client.predict(text) for text in texts), return_exceptions=True
+    )
+    if all(isinstance(result, Exception) for result in results):
+        raise results[0]
+    return [
+        {"error": str(result)} if isinstance(result, Exception) else result
+        for result in results
+    ]
+
+
+def _predict_local(texts: List[str]) -> List[dict]:
+    """Classify texts with the local model, with confidence as a 0-1 fraction."""
+    return [
+        {"predicted_label": label, "confidence": round(confidence / 100, 4)}
+        for label, confidence in classify_emotions_batch(texts)
+    ]
+
+
+if not MOCK_MODE:
+    inference_router = InferenceRouter(
+        remote=lambda texts: get_azure_client().submit(_predict_remote(texts)),
+        local=_predict_local,
+    )
+
+
+def _predict_batch(texts: List[str]) -> List:
+    """Classify a micro-batch of texts collected from concurrent /predict calls.
 
     Args:
-        older_than_seconds (int): Older files will be deleted.
-            Defaults to 1800 seconds (30 minutes).
+        texts (List[str]): Input texts, one per waiting request.
 
     Returns:
-        None
+        List: One result dict per text, or the exception raised for that text.
     """
-    logger.debug("Starting cleanup of temp_uploads directory")
-    temp_path = Path("temp_uploads")
-    if not temp_path.exists():
-        logger.debug("No temp_uploads directory to clean")
-        return
-    for file in temp_path.iterdir():
-        if file.is_file() and time.time() - file.stat().st_mtime > older_than_seconds:
+    return [
+        RuntimeError(result["error"]) if "error" in result else result
+        for result in inference_router.classify(texts)
+    ]
+
+
+predict_batcher = MicroBatcher(
+    _predict_batch,
+    max_batch_size=PREDICT_MAX_BATCH_SIZE,
+    max_wait_ms=PREDICT_BATCH_WINDOW_MS,
+    name="predict",
+)
+metrics.register_collector(micro_batcher_collector(predict_batcher))
+if not MOCK_MODE:
+    metrics.register_collector(azure_client_collector(get_azure_client))
+    metrics.register_collector(router_collector(inference_router))
+
+
+@app.on_event("shutdown")
+async def stop_batchers() -> None:
+    """Stop background micro-batching workers on shutdown."""
+    await predict_batcher.stop()
+
+
+def _media_result(
+    final_df: pd.DataFrame, csv_paths: List[str], message: str, result_id: str
+) -> dict:
+    """Build a MediaPredictionResponse payload from pipeline output."""
+    results = final_df[
+        ["Start Time", "Translation", "Emotion", "Confidence (%)"]
+    ].to_dict(orient="records")
+    return {
+        "message": message,
+        "result_id": result_id,
+        "csv_paths": [Path(p).name for p in csv_paths],
+        "results": results,
+    }
+
+
+def _mock_job_result(kind: str) -> dict:
+    """Return the mock response of the synchronous endpoint for a job kind."""
+    return {
+        "message": f"Mocked {kind} response",
+        "csv_paths": [f"/mock/{kind}.csv"],
+        "results": [],
+    }
+
+
+def _run_file_job(payload: dict, on_stage, job_id: str) -> dict:
+    """Job handler: upload a saved audio file and run the pipeline."""
+    if MOCK_MODE:
+        return _mock_job_result("audio")
+    # The upload is kept until the job ends so an interrupted job can be resumed
+    file_path = Path(payload["path"])
+    try:
+        audio_url, cache_key = upload_unless_cached(file_path)
+        on_stage("uploaded")
+        final_df, csv_paths = run_full_pipeline(
+            audio_url,
+            save_to=SAVE_TO,
+            on_stage=on_stage,
+            cache_key=cache_key,
+            result_id=job_id,
+        )
+    finally:
+        file_path.unlink(missing_ok=True)
+    return _media_result(final_df, csv_paths, "File processed", job_id)
+
+
+def _run_video_job(payload: dict, on_stage, job_id: str) -> dict:
+    """Job handler: extract audio from a saved video, upload it and run the pipeline."""
+    if MOCK_MODE:
+        return _mock_job_result("video")
+    input_path = Path(payload["path"])
+    try:
+        cache_key = file_cache_key(input_path)
+        audio_url = None
+        if cache_key not in transcript_cache:
+            audio_path = extract_audio(input_path)
             try:
-                file.unlink()
-                logger.info(f"Deleted old file: {file}")
-            except Exception as e:
-                logger.warning(f"Could not delete {file}: {e}")
+                audio_url = upload_to_assemblyai(audio_path)
+            finally:
+                audio_path.unlink(missing_ok=True)
+        on_stage("uploaded")
+        final_df, csv_paths = run_full_pipeline(
+            audio_url,
+            save_to=SAVE_TO,
+            on_stage=on_stage,
+            cache_key=cache_key,
+            result_id=job_id,
+        )
+    finally:
+        input_path.unlink(missing_ok=True)
+    return _media_result(final_df, csv_paths, "Video file processed", job_id)
+
+
+def _run_url_job(payload: dict, on_stage, job_id: str) -> dict:
+    """Job handler: download/upload a media URL and run the pipeline."""
+    if MOCK_MODE:
+        return _mock_job_result("url")
+    media_url, cache_key = resolve_media_url(payload["url"], payload["language"])
+    on_stage("uploaded")
+    final_df, csv_paths = run_full_pipeline(
+        media_url,
+        save_to=SAVE_TO,
+        language=payload["language"],
+        on_stage=on_stage,
+        cache_key=cache_key,
+        result_id=job_id,
+    )
+    return _media_result(final_df, csv_paths, "Media processed successfully", job_id)
+
+
+job_queue = JobQueue(
+    JobStore(JOBS_DB_PATH),
+    {"file": _run_file_job, "video": _run_video_job, "url": _run_url_job},
+    max_workers=JOB_WORKERS,
+    max_pending=JOB_QUEUE_LIMIT,
+    heartbeat_seconds=JOB_HEARTBEAT_SECONDS,
+)
+metrics.register_collector(job_queue_collector(job_queue))
+
+
+@app.on_event("startup")
+def resume_jobs() -> None:
+    """Re-schedule jobs whose process stopped while running them.
+
+    With several workers, only the first one to start resumes jobs, and only
+    those whose heartbeat is stale, never those of a live sibling worker.
+    """
+    job_queue.resume(lock_path=f"{JOBS_DB_PATH}.resume.lock")
+
+
+@app.on_event("shutdown")
+def stop_jobs() -> None:
+    """Stop the job workers; unfinished jobs are resumed on the next start."""
+    job_queue.shutdown()
+
+
+@app.on_event("shutdown")
+def close_assemblyai_client() -> None:
+    """Close the pooled AssemblyAI connections."""
+    get_client().close()
+
+
+@app.on_event("shutdown")
+def close_azure_client() -> None:
+    """Close the pooled Azure ML endpoint connections."""
+    if not MOCK_MODE:
+        get_azure_client().close()
+        inference_router.close()
+
+
+def _submit_job(kind: str, payload: dict) -> dict:
+    """Submit a job, mapping a full queue to HTTP 503."""
+    try:
+        job_id = job_queue.submit(kind, payload)
+    except QueueFullError as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=503, detail=str(e))
+    return {"job_id": job_id, "status": "queued"}
+
+
+async def _save_job_upload(file: UploadFile, suffix: str) -> Path:
+    """Save an uploaded file under the jobs directory so it survives a restart."""
+    path = JOBS_DIR / f"{uuid.uuid4()}{suffix}"
+    await save_upload(file, path)
+    return path
+
+
+async def _upload_video_file(input_path: Path, start: float) -> str:
+    """Extract the audio of a saved video to an MP3 file and upload it."""
+    audio_path = await asyncio.to_thread(extract_audio, input_path)
+    logger.debug(f"Audio extracted to {audio_path}, uploading to AssemblyAI")
+    try:
+        with stage_timer("upload"):
+            audio_url = await get_client().upload(audio_path)
+        logger.info(
+            f"Video audio uploaded via files: "
+            f"{input_path.stat().st_size} bytes in, "
+            f"{audio_path.stat().st_size} bytes uploaded, "
+            f"{time.perf_counter() - start:.3f} s"
+        )
+    finally:
+        os.remove(audio_path)
+    return audio_url
+
+
+# Periodic cleanup of expired results and stale temporary uploads
+async def _cleanup_loop() -> None:
+    """Sweep expired files every ``CLEANUP_INTERVAL_SECONDS``."""
+    while True:
+        try:
+            await asyncio.to_thread(result_store.sweep)
+            await asyncio.to_thread(sweep_temp_uploads)
+        except Exception as e:
+            logger.warning(f"Cleanup failed: {e}")
+        await asyncio.sleep(CLEANUP_INTERVAL_SECONDS)
+
+
+@app.on_event("startup")
+async def start_cleanup() -> None:
+    """Start the background sweep of expired result files and uploads."""
+    app.state.cleanup_task = asyncio.create_task(_cleanup_loop())
+
+
+@app.on_event("shutdown")
+async def stop_cleanup() -> None:
+    """Stop the background sweep."""
+    app.state.cleanup_task.cancel()
+
+
+@app.on_event("startup")
+async def start_model_warmup() -> None:
+    """Load the ``MODEL_WARMUP`` components in the background.
+
+    The server accepts requests immediately; a request that needs a model
+    before the warmup finished waits for it to load.
+    """
+    if MOCK_MODE or not MODEL_WARMUP:
+        return
+    logger.info(f"Warming up model components: {', '.join(MODEL_WARMUP)}")
+    app.state.warmup_task = asyncio.create_task(
+        asyncio.to_thread(registry.warmup, MODEL_WARMUP)
+    )
 
 
 # Root endpoint
@@ -191,7 +608,7 @@ def root() -> dict:
         500: {"model": ErrorResponse},
     },
 )
-def predict(input: TextInput) -> TextPredictionResponse:
+async def predict(input: TextInput) -> TextPredictionResponse:
     """Predict the emotion of a given text string using a transformer model.
 
     Args:
@@ -200,7 +617,8 @@ def predict(input: TextInput) -> TextPredictionResponse:
     Returns:
         TextPredictionResponse: Predicted emotion label, confidence, and path output.
     """
-    logger.info(f"Received /predict request with text: {input.text}")
+    logger.info(f"Received /predict request ({len(input.text)} chars)")
+    logger.debug(f"/predict text: {input.text}")
     if MOCK_MODE:
         logger.debug("MOCK_MODE active - returning dummy prediction")
         return {
@@ -211,15 +629,10 @@ def predict(input: TextInput) -> TextPredictionResponse:
         }
 
     try:
-        logger.info("Calling azure_predict for text classification")
-        result = azure_predict(input.text)
-        # If azure_predict somehow still returns an error dict:
-        if isinstance(result, dict) and "error" in result:
-            raise RuntimeError(result["error"])
-
-        output_dir = Path("output")
-        output_dir.mkdir(exist_ok=True)
+        logger.info("Queueing text for micro-batched classification")
+        result = await predict_batcher.submit(input.text)
 
+        result_id = new_result_id()
         df = pd.DataFrame(
             [
                 {
@@ -229,26 +642,208 @@ def predict(input: TextInput) -> TextPredictionResponse:
                 }
             ]
         )
-        df.to_csv(output_dir / "text_prediction.csv", index=False)
-        logger.info(f"[DEBUG] Text received by API: '{input.text}'")
+        with stage_timer("csv_write"):
+            result_store.save_csv(df, result_id, "text_prediction")
 
         return {
             "input": input.text,
             "predicted_label": result["predicted_label"],
             "confidence": result["confidence"],
-            "csv_paths": ["/download_text_csv"],
+            "csv_paths": [f"/download_text_csv?result_id={result_id}"],
+            "result_id": result_id,
+            "source": result.get("source"),
         }
     except Exception as e:
         logger.error(f"Prediction failed: {e}")
         raise HTTPException(status_code=500, detail="Prediction failed")
 
 
+@app.get("/ready", summary="Readiness of the model components")
+def ready() -> JSONResponse:
+    """Report whether the ``MODEL_WARMUP`` components are loaded.
+
+    Returns:
+        JSONResponse: 200 with ``status: ready`` once they are loaded, else 503
+        (``loading`` or ``failed``); ``models`` lists the state of every
+        registered component.
+    """
+    if MOCK_MODE or registry.ready(MODEL_WARMUP):
+        return JSONResponse({"status": "ready", "models": registry.status()})
+    models = registry.status()
+    failed = any(models.get(name, {}).get("state") == "failed" for name in MODEL_WARMUP)
+    return JSONResponse(
+        {"status": "failed" if failed else "loading", "models": models},
+        status_code=503,
+    )
+
+
+@app.get("/predict/stats", summary="Micro-batching statistics for /predict")
+def predict_stats() -> dict:
+    """Report queue depth and batch-size histograms of the /predict scheduler.
+
+    Returns:
+        dict: Scheduler configuration, current queue depth and histograms.
+    """
+    return predict_batcher.stats()
+
+
+@app.get("/predict/azure/stats", summary="Azure ML endpoint client statistics")
+def azure_client_stats() -> dict:
+    """Report pool settings, requests in flight and latency percentiles.
+
+    Returns:
+        dict: Connection and concurrency limits, request/error/retry counts,
+        recent p50/p90/p99 latency in ms and a latency histogram.
+    """
+    if MOCK_MODE:
+        return {}
+    return get_azure_client().stats()
+
+
+@app.get("/predict/router/stats", summary="Remote/local routing statistics")
+def router_stats() -> dict:
+    """Report the inference route, circuit breaker state and hedging counters.
+
+    Returns:
+        dict: Route, current hedging deadline, breaker state, per-route
+        counters and recent endpoint latency percentiles.
+    """
+    if MOCK_MODE:
+        return {}
+    return inference_router.stats()
+
+
+@app.on_event("startup")
+def start_metrics() -> None:
+    """Share this worker's metrics with the others (``METRICS_MULTIPROC_DIR``)."""
+    metrics.start()
+
+
+@app.on_event("shutdown")
+def flush_metrics() -> None:
+    """Write this worker's final metrics for the other workers to serve."""
+    metrics.flush()
+
+
+@app.get("/metrics", summary="Prometheus metrics", include_in_schema=False)
+def prometheus_metrics() -> Response:
+    """Serve the metrics in the Prometheus text format.
+
+    They cover pipeline stage timings, batch sizes, cache hit rates, queue
+    depths, model load times and HTTP request durations.
+
+    Returns:
+        Response: The metrics as ``text/plain; version=0.0.4``.
+    """
+    return Response(metrics.render(), media_type=CONTENT_TYPE)
+
+
+@app.get("/predict/cache/stats", summary="Sentence prediction cache statistics")
+def prediction_cache_stats() -> dict:
+    """Report hit/miss counters of the classification, translation and Azure caches.
+
+    Returns:
+        dict: Per-cache model version, size, hits, misses and hit rate.
+    """
+    return cache_stats()
+
+
+@app.get("/transcripts/cache/stats", summary="Transcript cache statistics")
+def transcript_cache_stats() -> dict:
+    """Report size, entry count and hit/miss counters of the transcript cache.
+
+    Returns:
+        dict: Cache configuration, size and counters.
+    """
+    return transcript_cache.stats()
+
+
+# Bulk text classification endpoint
+@app.post(
+    "/predict_batch",
+    summary="Classify many texts from a JSON array, NDJSON or CSV upload",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "content": {media: {} for media in BULK_OUTPUT_FORMATS.values()},
+            "description": "One result row per input text, in input order.",
+        },
+        413: {"model": ErrorResponse},
+        415: {"model": ErrorResponse},
+    },
+)
+async def predict_batch(
+    request: Request,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    column: str = Query("text", description="CSV column holding the texts"),
+) -> StreamingResponse:
+    """Classify a stream of texts and stream the results back.
+
+    The body is either a raw JSON array (``application/json``), NDJSON
+    (``application/x-ndjson``) or CSV (``text/csv``), or a multipart upload with
+    a ``file`` field whose type is taken from its name or content type. Items
+    are strings or objects with a ``text`` field. The body is spooled to a
+    temporary file (on disk past 1 MB), then parsed incrementally and classified
+    in batches of ``BULK_BATCH_SIZE`` while results stream back, so memory stays
+    bounded regardless of the input size. NDJSON and CSV bodies larger than
+    ``BULK_MAX_LINE_BYTES`` are first checked for over-long lines (HTTP 413).
+
+    Args:
+        request (Request): The incoming request.
+        format (str): Output format, "ndjson" or "csv".
+        column (str): Name of the text column of a CSV input.
+
+    Returns:
+        StreamingResponse: One row per text with ``index``, ``text``,
+        ``predicted_label`` and ``confidence`` (or ``error``).
+    """
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        file = form.get("file")
+        if file is None or isinstance(file, str):
+            raise HTTPException(status_code=422, detail="Missing 'file' field.")
+        content_type = file.content_type or ""
+    else:
+        file = await spool_request_body(request)
+    try:
+        kind = input_kind(content_type, file.filename)
+    except BulkInputError as e:
+        await file.close()
+        raise HTTPException(status_code=415, detail=str(e))
+    if kind != "json" and (file.size is None or file.size > BULK_MAX_LINE_BYTES):
+        # Rejected before streaming; later parse errors become an error row
+        try:
+            await check_line_lengths(iter_upload(file))
+        except LineTooLongError as e:
+            await file.close()
+            logger.warning(f"/predict_batch rejected: {e}")
+            raise HTTPException(status_code=413, detail=str(e))
+        await file.seek(0)
+    logger.info(f"Received /predict_batch request ({kind} -> {format})")
+
+    if MOCK_MODE:
+        classify_fn = lambda texts: [("neutral", 0.0)] * len(texts)  # noqa: E731
+    else:
+        classify_fn = classify_emotions_batch
+    rows = classify_stream(parse_texts(kind, iter_upload(file), column), classify_fn)
+    return StreamingResponse(
+        write_stream(rows, format),
+        media_type=BULK_OUTPUT_FORMATS[format],
+        background=BackgroundTask(file.close),
+    )
+
+
 # Audio file upload endpoint
 @app.post(
     "/predict_from_file",
     summary="Upload audio file for emotion prediction",
     response_model=MediaPredictionResponse,
-    responses={422: {"model": ErrorResponse}, 500: {"model": ErrorResponse}},
+    responses={
+        413: {"model": ErrorResponse},
+        422: {"model": ErrorResponse},
+        500: {"model": ErrorResponse},
+    },
 )
 async def predict_from_file(file: UploadFile = File(...)) -> MediaPredictionResponse:
     """Upload an audio file for transcription and emotion classification.
@@ -269,25 +864,23 @@ async def predict_from_file(file: UploadFile = File(...)) -> MediaPredictionResp
         }
 
     try:
-        contents = await file.read()
-        file_path = Path("temp_uploads") / basename(file.filename)
-        os.makedirs("temp_uploads", exist_ok=True)
-        logger.debug(f"Saving uploaded file to: {file_path}")
-        with open(file_path, "wb") as f:
-            f.write(contents)
-
-        logger.debug("Uploading file to AssemblyAI...")
-        with open(file_path, "rb") as audio_file:
-            upload_response = requests.post(
-                "https://api.assemblyai.com/v2/upload",
-                headers={"authorization": ASSEMBLYAI_API_KEY},
-                files={"file": audio_file},
+        # Stream the upload straight into AssemblyAI without buffering it,
+        # hashing it on the way to look up a cached transcript
+        logger.debug("Streaming uploaded file to AssemblyAI...")
+        sha = hashlib.sha256()
+        with stage_timer("upload"):
+            audio_url = await get_client().upload_stream(
+                hash_chunks(iter_upload(file), sha)
             )
-        os.remove(file_path)
-        audio_url = upload_response.json()["upload_url"]
         logger.info("File uploaded to AssemblyAI successfully")
 
-        final_df, csv_paths = run_full_pipeline(audio_url, save_to=SAVE_TO)
+        result_id = new_result_id()
+        final_df, csv_paths = await run_full_pipeline_async(
+            audio_url,
+            save_to=SAVE_TO,
+            cache_key=content_cache_key(sha.hexdigest()),
+            result_id=result_id,
+        )
         logger.info("Pipeline completed for audio file")
         results = final_df[
             ["Start Time", "Translation", "Emotion", "Confidence (%)"]
@@ -295,9 +888,12 @@ async def predict_from_file(file: UploadFile = File(...)) -> MediaPredictionResp
 
         return {
             "message": "File processed",
+            "result_id": result_id,
             "csv_paths": [Path(p).name for p in csv_paths],
             "results": results,
         }
+    except UploadTooLargeError:
+        raise
     except Exception as e:
         logger.error(f"Audio file processing failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -308,7 +904,11 @@ async def predict_from_file(file: UploadFile = File(...)) -> MediaPredictionResp
     "/predict_from_video",
     summary="Upload video file for emotion prediction",
     response_model=MediaPredictionResponse,
-    responses={422: {"model": ErrorResponse}, 500: {"model": ErrorResponse}},
+    responses={
+        413: {"model": ErrorResponse},
+        422: {"model": ErrorResponse},
+        500: {"model": ErrorResponse},
+    },
 )
 async def predict_from_video(file: UploadFile = File(...)) -> MediaPredictionResponse:
     """Upload a video file to extract audio, transcribe, and classify emotions.
@@ -329,44 +929,47 @@ async def predict_from_video(file: UploadFile = File(...)) -> MediaPredictionRes
         }
 
     try:
-        video_id = str(uuid.uuid4())
-        input_path = f"temp_uploads/{video_id}.mp4"
-        audio_path = f"temp_uploads/{video_id}.mp3"
-
-        os.makedirs("temp_uploads", exist_ok=True)
-        with open(input_path, "wb") as f:
-            f.write(await file.read())
-
-        logger.debug(f"Saved uploaded video to {input_path}, extracting audio...")
-        subprocess.run(
-            ["ffmpeg", "-i", input_path, "-vn", "-acodec", "libmp3lame", audio_path],
-            check=True,
-        )
-        logger.debug(f"Audio extracted to {audio_path}, uploading to AssemblyAI")
-
-        with open(audio_path, "rb") as f:
-            response = requests.post(
-                "https://api.assemblyai.com/v2/upload",
-                headers={"authorization": ASSEMBLYAI_API_KEY},
-                files={"file": f},
-            )
-        audio_url = response.json()["upload_url"]
-
-        os.remove(input_path)
-        os.remove(audio_path)
+        if VIDEO_EXTRACTION_MODE == "pipe":
+            # upload -> ffmpeg stdin -> ffmpeg stdout -> AssemblyAI, no temp files
+            sha = hashlib.sha256()
+            audio_url, _ = await upload_video_audio(hash_chunks(iter_upload(file), sha))
+            cache_key = content_cache_key(sha.hexdigest())
+        else:
+            start = time.perf_counter()
+            video_id = str(uuid.uuid4())
+            input_path = Path("temp_uploads") / f"{video_id}.mp4"
+
+            await save_upload(file, input_path)
+
+            logger.debug(f"Saved uploaded video to {input_path}, extracting audio...")
+            try:
+                cache_key = await asyncio.to_thread(file_cache_key, input_path)
+                audio_url = None
+                if cache_key in transcript_cache:
+                    logger.info("Video transcript is cached, skipping extraction")
+                else:
+                    audio_url = await _upload_video_file(input_path, start)
+            finally:
+                os.remove(input_path)
         logger.info("Video file converted and uploaded")
 
-        final_df, csv_paths = run_full_pipeline(audio_url, save_to=SAVE_TO)
+        result_id = new_result_id()
+        final_df, csv_paths = await run_full_pipeline_async(
+            audio_url, save_to=SAVE_TO, cache_key=cache_key, result_id=result_id
+        )
         results = final_df[
             ["Start Time", "Translation", "Emotion", "Confidence (%)"]
         ].to_dict(orient="records")
 
         return {
             "message": "Video file processed",
+            "result_id": result_id,
             "csv_paths": [Path(p).name for p in csv_paths],
             "results": results,
         }
 
+    except UploadTooLargeError:
+        raise
     except subprocess.CalledProcessError:
         logger.error("ffmpeg failed to convert video to audio")
         raise HTTPException(
@@ -384,7 +987,7 @@ async def predict_from_video(file: UploadFile = File(...)) -> MediaPredictionRes
     response_model=MediaPredictionResponse,
     responses={422: {"model": ErrorResponse}, 500: {"model": ErrorResponse}},
 )
-def predict_from_url(input: MediaURLInput) -> MediaPredictionResponse:
+async def predict_from_url(input: MediaURLInput) -> MediaPredictionResponse:
     """Predict emotion from a media URL (YouTube, MP3, MP4)."""
 
     logger.debug(
@@ -399,7 +1002,6 @@ def predict_from_url(input: MediaURLInput) -> MediaPredictionResponse:
         }
 
     try:
-        clean_temp_uploads()
         media_url = str(input.url)
 
         # Strip query strings like &t=778s for YouTube links
@@ -407,82 +1009,18 @@ def predict_from_url(input: MediaURLInput) -> MediaPredictionResponse:
         media_url = urllib.parse.urlunparse(parsed)
 
         logger.info(f"Downloading and processing media from URL: {media_url}")
-
-        if "youtube.com" in media_url or "youtu.be" in media_url:
-            output_dir = "temp_uploads"
-            os.makedirs(output_dir, exist_ok=True)
-            yt_id = str(uuid.uuid4())  # Unique filename prefix
-            outtmpl = f"{output_dir}/{yt_id}.%(ext)s"
-
-            ydl_opts = {
-                "format": "bestaudio/best",
-                "outtmpl": outtmpl,
-                "postprocessors": [
-                    {
-                        "key": "FFmpegExtractAudio",
-                        "preferredcodec": "mp3",
-                        "preferredquality": "192",
-                    }
-                ],
-                "quiet": False,
-                "noplaylist": True,
-            }
-
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                logger.debug("Starting YouTube download via yt_dlp")
-                info = ydl.extract_info(media_url, download=True)
-                logger.info(f"Downloaded title: {info.get('title')}")
-                downloaded_filename = Path(ydl.prepare_filename(info)).with_suffix(
-                    ".mp3"
-                )
-
-            if not downloaded_filename.exists():
-                logger.error(f"Expected MP3 not found: {downloaded_filename}")
-                raise HTTPException(
-                    status_code=500, detail="Audio file was not extracted."
-                )
-
-            with open(downloaded_filename, "rb") as f:
-                logger.debug(
-                    f"Uploading extracted MP3 to AssemblyAI: {downloaded_filename}"
-                )
-                upload_response = requests.post(
-                    "https://api.assemblyai.com/v2/upload",
-                    headers={"authorization": ASSEMBLYAI_API_KEY},
-                    files={"file": f},
-                )
-            media_url = upload_response.json()["upload_url"]
-            os.remove(downloaded_filename)
-
-        elif media_url.endswith(".mp3") or media_url.endswith(".mp4"):
-            try:
-                logger.info(f"Handling direct media file: {media_url}")
-                response = requests.get(media_url, stream=True, timeout=10)
-                response.raise_for_status()
-                ext = media_url.split(".")[-1].split("?")[0]
-                local_file = Path("temp_uploads") / f"temp_{uuid.uuid4()}.{ext}"
-                with open(local_file, "wb") as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        f.write(chunk)
-                logger.debug(f"Saved direct media file locally: {local_file}")
-
-                with open(local_file, "rb") as f:
-                    upload_response = requests.post(
-                        "https://api.assemblyai.com/v2/upload",
-                        headers={"authorization": ASSEMBLYAI_API_KEY},
-                        files={"file": f},
-                    )
-                media_url = upload_response.json()["upload_url"]
-                os.remove(local_file)
-            except Exception as e:
-                logger.error(f"Direct media download failed: {e}")
-                raise HTTPException(
-                    status_code=400, detail="Failed to handle direct media URL."
-                )
+        media_url, cache_key = await asyncio.to_thread(
+            resolve_media_url, media_url, input.language
+        )
 
         logger.debug("Running full prediction pipeline...")
-        final_df, csv_paths = run_full_pipeline(
-            media_url, save_to=SAVE_TO, language=input.language
+        result_id = new_result_id()
+        final_df, csv_paths = await run_full_pipeline_async(
+            media_url,
+            save_to=SAVE_TO,
+            language=input.language,
+            cache_key=cache_key,
+            result_id=result_id,
         )
 
         required_columns = {"Start Time", "Translation", "Emotion", "Confidence (%)"}
@@ -500,6 +1038,7 @@ def predict_from_url(input: MediaURLInput) -> MediaPredictionResponse:
 
         return {
             "message": "Media processed successfully",
+            "result_id": result_id,
             "csv_paths": [Path(p).name for p in csv_paths],
             "results": results,
         }
@@ -511,79 +1050,345 @@ def predict_from_url(input: MediaURLInput) -> MediaPredictionResponse:
         )
 
 
-logger.debug("Mounting '/output' static file directory for CSV access")
-# Mount the output directory to serve CSVs directly
-app.mount("/output", StaticFiles(directory="output"), name="output")
+async def _stream_url_prediction(input: MediaURLInput, fmt: str):
+    """Yield status, per-sentence and final events for a media URL."""
+    if MOCK_MODE:
+        mock_row = {"index": 0, "Start Time": "00:00:00,000", "Emotion": "neutral"}
+        yield format_event("sentence", mock_row, fmt)
+        yield format_event("done", {"count": 1, "csv_paths": ["/mock/url.csv"]}, fmt)
+        return
+
+    rows = None
+    try:
+        yield format_event("status", {"stage": "downloading"}, fmt)
+        task = asyncio.ensure_future(
+            asyncio.to_thread(resolve_media_url, str(input.url), input.language)
+        )
+        async for beat in heartbeats_until(task, fmt):
+            yield beat
+        media_url, cache_key = task.result()
+
+        yield format_event("status", {"stage": "transcribing"}, fmt)
+        task = asyncio.ensure_future(
+            transcribe_async(media_url, input.language, cache_key)
+        )
+        async for beat in heartbeats_until(task, fmt):
+            yield beat
+        lang_code, sentences = task.result()
+        yield format_event(
+            "status",
+            {
+                "stage": "classifying",
+                "sentences": len(sentences),
+                "language": lang_code,
+            },
+            fmt,
+        )
+
+        # Rows come from the translate/classify pipeline as soon as each is done
+        rows = iter_sentence_predictions(sentences, lang_code)
+        results = []
+        while (row := await asyncio.to_thread(next, rows, None)) is not None:
+            yield format_event("sentence", {"index": len(results), **row}, fmt)
+            results.append(row)
+
+        saved = await asyncio.to_thread(save_results, results, SAVE_TO, new_result_id())
+        yield format_event(
+            "done",
+            {
+                "count": len(results),
+                "result_id": saved["result_id"],
+                "csv_paths": [Path(p).name for p in saved["csv_paths"]],
+            },
+            fmt,
+        )
+    except asyncio.CancelledError:
+        logger.info("Client disconnected from prediction stream")
+        raise
+    except Exception as e:
+        logger.exception("Streaming media URL processing failed.")
+        yield format_event("error", {"detail": str(e)}, fmt)
+    finally:
+        if rows is not None:
+            try:
+                rows.close()  # stops the pipeline workers
+            except ValueError:
+                pass  # still running in a worker thread; it stops when collected
+
+
+@app.post(
+    "/predict_from_url/stream",
+    summary="Stream per-sentence emotion predictions for a media URL",
+    responses={422: {"model": ErrorResponse}},
+)
+async def predict_from_url_stream(
+    input: MediaURLInput,
+    format: str = Query("sse", pattern="^(sse|ndjson)$"),
+) -> StreamingResponse:
+    """Stream predictions for a media URL as Server-Sent Events or NDJSON.
+
+    Emits ``status`` events while the media is downloaded and transcribed
+    (with heartbeats in between), then one ``sentence`` event per sentence as
+    soon as it is classified, and finally a ``done`` event with the CSV file
+    name, or an ``error`` event.
+
+    Args:
+        input (MediaURLInput): Media URL and transcription language.
+        format (str): "sse" (text/event-stream) or "ndjson".
+
+    Returns:
+        StreamingResponse: The event stream.
+    """
+    logger.debug(f"/predict_from_url/stream called with URL: {input.url}")
+    return StreamingResponse(
+        _stream_url_prediction(input, format),
+        media_type=STREAM_FORMATS[format],
+        headers=STREAM_HEADERS,
+    )
+
+
+@app.post(
+    "/webhooks/assemblyai",
+    summary="AssemblyAI transcript completion webhook",
+    responses={401: {"model": ErrorResponse}},
+)
+def assemblyai_webhook(
+    body: AssemblyAIWebhook,
+    secret: Optional[str] = Header(None, alias=WEBHOOK_SECRET_HEADER),
+) -> dict:
+    """Wake up the request waiting for a finished transcript.
+
+    AssemblyAI calls this endpoint when ``ASSEMBLYAI_WEBHOOK_URL`` points to it.
+    Polling continues as a fallback, so missed webhooks only cost latency.
+
+    Args:
+        body (AssemblyAIWebhook): Transcript ID and final status.
+        secret (str, optional): Shared secret sent by AssemblyAI.
+
+    Returns:
+        dict: Whether a waiting request was notified.
+    """
+    client = get_client()
+    if client.webhook_secret and secret != client.webhook_secret:
+        logger.warning("Rejected AssemblyAI webhook with invalid secret")
+        raise HTTPException(status_code=401, detail="Invalid webhook secret.")
+    logger.info(f"AssemblyAI webhook: {body.transcript_id} is {body.status}")
+    return {"notified": client.notify(body.transcript_id)}
+
+
+# Background job endpoints
+@app.post(
+    "/jobs/predict_from_file",
+    summary="Submit an audio file as a background prediction job",
+    response_model=JobSubmitResponse,
+    status_code=202,
+    responses={413: {"model": ErrorResponse}, 503: {"model": ErrorResponse}},
+)
+async def submit_file_job(file: UploadFile = File(...)) -> JobSubmitResponse:
+    """Queue an audio file for transcription and emotion classification.
+
+    Args:
+        file (UploadFile): The uploaded .mp3 or .wav file.
+
+    Returns:
+        JobSubmitResponse: Job ID to poll with ``/jobs/{job_id}``.
+    """
+    logger.debug(f"/jobs/predict_from_file: Received file '{file.filename}'")
+    path = await _save_job_upload(file, Path(basename(file.filename)).suffix)
+    return _submit_job("file", {"path": str(path)})
+
+
+@app.post(
+    "/jobs/predict_from_video",
+    summary="Submit a video file as a background prediction job",
+    response_model=JobSubmitResponse,
+    status_code=202,
+    responses={413: {"model": ErrorResponse}, 503: {"model": ErrorResponse}},
+)
+async def submit_video_job(file: UploadFile = File(...)) -> JobSubmitResponse:
+    """Queue a video file for audio extraction, transcription and classification.
+
+    Args:
+        file (UploadFile): The uploaded .mp4 video file.
+
+    Returns:
+        JobSubmitResponse: Job ID to poll with ``/jobs/{job_id}``.
+    """
+    logger.debug(f"/jobs/predict_from_video: Received file '{file.filename}'")
+    path = await _save_job_upload(file, ".mp4")
+    return _submit_job("video", {"path": str(path)})
+
+
+@app.post(
+    "/jobs/predict_from_url",
+    summary="Submit a media URL as a background prediction job",
+    response_model=JobSubmitResponse,
+    status_code=202,
+    responses={422: {"model": ErrorResponse}, 503: {"model": ErrorResponse}},
+)
+def submit_url_job(input: MediaURLInput) -> JobSubmitResponse:
+    """Queue a media URL (YouTube, MP3, MP4) for emotion classification.
+
+    Args:
+        input (MediaURLInput): Media URL and language.
+
+    Returns:
+        JobSubmitResponse: Job ID to poll with ``/jobs/{job_id}``.
+    """
+    logger.debug(f"/jobs/predict_from_url called with URL: {input.url}")
+    return _submit_job("url", {"url": str(input.url), "language": input.language})
 
 
-# CSV download endpoints
 @app.get(
-    "/download_csv",
-    summary="Download CSV of last audio/video prediction (output/ only)",
+    "/jobs/{job_id}",
+    summary="Status of a background prediction job",
+    response_model=JobStatusResponse,
+    responses={404: {"model": ErrorResponse}},
 )
-def download_csv():
-    """Download the most recent CSV file with audio or video."""
-    logger.debug("/download_csv endpoint called")
+def job_status(job_id: str) -> JobStatusResponse:
+    """Report the current stage of a job.
+
+    Stages: queued, uploaded, transcribing, translating, classifying, done
+    and failed.
+
+    Args:
+        job_id (str): ID returned on submission.
 
+    Returns:
+        JobStatusResponse: Kind, stage, error (if failed) and timestamps.
+    """
+    job = job_queue.store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found.")
+    return {
+        "job_id": job["id"],
+        "kind": job["kind"],
+        "status": job["status"],
+        "error": job["error"],
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"],
+    }
+
+
+@app.get(
+    "/jobs/{job_id}/result",
+    summary="Result of a finished background prediction job",
+    response_model=MediaPredictionResponse,
+    responses={
+        404: {"model": ErrorResponse},
+        409: {"model": ErrorResponse},
+        500: {"model": ErrorResponse},
+    },
+)
+def job_result(job_id: str) -> MediaPredictionResponse:
+    """Return the predictions of a finished job.
+
+    Args:
+        job_id (str): ID returned on submission.
+
+    Returns:
+        MediaPredictionResponse: Same payload as the synchronous endpoints.
+    """
+    job = job_queue.store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found.")
+    if job["status"] == "failed":
+        raise HTTPException(status_code=500, detail=job["error"])
+    if job["status"] != "done":
+        raise HTTPException(
+            status_code=409, detail=f"Job is not finished (status: {job['status']})."
+        )
+    return job["result"]
+
+
+# CSV download endpoints
+def _serve_result(request: Request, path: Optional[Path], result_id: str):
+    """Serve a stored result CSV, or 404 if it is unknown or expired."""
     if MOCK_MODE:
         logger.warning("MOCK_MODE active - no CSV to download")
         raise HTTPException(status_code=404, detail="MOCK_MODE: CSV not available.")
+    if path is None:
+        logger.warning(f"Result not found or expired: {result_id}")
+        raise HTTPException(status_code=404, detail="CSV not found or expired.")
+    logger.info(f"Serving result CSV: {path}")
+    return file_response(request, path, path.name)
 
-    path = get_output_paths("final_predictions.csv", "output")[0]
-    if path.exists():
-        return FileResponse(
-            str(path), media_type="text/csv", filename="final_predictions.csv"
-        )
-    raise HTTPException(status_code=404, detail="CSV not found.")
 
+@app.get(
+    "/download_csv",
+    summary="Download the CSV of an audio/video/URL prediction",
+)
+def download_csv(
+    request: Request,
+    result_id: str = Query(..., description="result_id of the prediction or job"),
+    format: str = Query(
+        "csv",
+        pattern="^(csv|parquet|arrow)$",
+        description="parquet/arrow are available when listed in RESULT_FORMATS",
+    ),
+):
+    """Download the result file of one audio, video or URL prediction.
 
-@app.get("/download_text_csv", summary="Download CSV of last text prediction")
-def download_text_csv():
-    """Download the most recent CSV file with text emotion prediction results."""
-    logger.debug("/download_text_csv endpoint called")
-    """Download the most recent CSV file with text-based emotion prediction results.
+    Supports ``ETag``/``If-None-Match`` and ``Range`` requests.
+
+    Args:
+        request (Request): The incoming request.
+        result_id (str): ``result_id`` returned by the prediction, or the job ID.
+        format (str): "csv", "parquet" or "arrow".
 
     Returns:
-        FileResponse: CSV file containing classification output.
+        Response: The file (or the requested byte range).
     """
-    path = Path("output/text_prediction.csv")
-    if MOCK_MODE:
-        logger.warning("MOCK_MODE active - no text CSV to download")
-        raise HTTPException(status_code=404, detail="MOCK_MODE: CSV not available.")
+    logger.debug(f"/download_csv endpoint called for {result_id} ({format})")
+    path = result_store.find(result_id, fmt=format)
+    return _serve_result(request, path, result_id)
 
-    if path.exists():
-        logger.info(f"Serving audio/video prediction CSV: {path}")
-        return FileResponse(
-            str(path), media_type="text/csv", filename="text_prediction.csv"
-        )
-    logger.warning("CSV 'final_predictions.csv' not found in output directory")
-    raise HTTPException(status_code=404, detail="CSV not found.")
+
+@app.get("/download_text_csv", summary="Download the CSV of a text prediction")
+def download_text_csv(
+    request: Request,
+    result_id: str = Query(..., description="result_id of the text prediction"),
+):
+    """Download the CSV of one text prediction.
+
+    Args:
+        request (Request): The incoming request.
+        result_id (str): ``result_id`` returned by ``/predict``.
+
+    Returns:
+        Response: The CSV file (or the requested byte range).
+    """
+    logger.debug(f"/download_text_csv endpoint called for {result_id}")
+    path = result_store.find(result_id, "text_prediction")
+    return _serve_result(request, path, result_id)
 
 
 @app.get("/download_csv_file")
 def download_csv_file(
-    filename: str = Query(..., description="CSV filename to download")
+    request: Request,
+    filename: str = Query(..., description="CSV filename from csv_paths"),
 ):
-    """Download a specific CSV file from the output directory."""
+    """Download a result CSV by the file name listed in ``csv_paths``.
+
+    Args:
+        request (Request): The incoming request.
+        filename (str): File name, e.g. ``predictions_<result_id>.csv``.
+
+    Returns:
+        Response: The CSV file (or the requested byte range).
+    """
     logger.debug(f"/download_csv_file endpoint called with filename: {filename}")
 
     if not filename or "/" in filename or "\\" in filename:
         logger.warning(f"Invalid filename requested: {filename}")
         raise HTTPException(status_code=400, detail="Invalid filename")
 
-    file_path = Path("output") / filename
-
-    if file_path.exists() and file_path.is_file():
-        logger.info(f"Serving requested CSV file: {file_path}")
-        return FileResponse(
-            file_path,
-            media_type="text/csv",
-            filename=filename,
-            headers={"Content-Disposition": f"attachment; filename={filename}"},
-        )
-
-    logger.warning(f"Requested CSV file not found: {filename}")
-    raise HTTPException(status_code=404, detail=f"CSV file '{filename}' not found.")
+    path = result_store.find_file(filename)
+    if path is None:
+        logger.warning(f"Requested CSV file not found: {filename}")
+        raise HTTPException(status_code=404, detail=f"CSV file '{filename}' not found.")
+    logger.info(f"Serving requested CSV file: {path}")
+    return file_response(request, path, filename)
 
 
 logger.info("API server initialized and ready to receive requests.")
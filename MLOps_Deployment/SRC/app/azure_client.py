@@ -1,7 +1,48 @@
+"""
+azure_client.py
+---------------
+Pooled client for the Azure ML online endpoint that classifies texts.
+
+All requests go through one keep-alive ``httpx.AsyncClient`` on a dedicated
+background event loop, like the AssemblyAI client: FastAPI handlers await
+:meth:`AzureMLClient.predict` / :meth:`AzureMLClient.predict_batch`, and
+synchronous callers use :func:`azure_predict` / :func:`azure_predict_batch`.
+Both share the connection pool and a semaphore that caps the requests in
+flight, which should match the endpoint's capacity
+(``max_concurrent_requests_per_instance`` x instances). Responses with HTTP
+429 or 503 are retried with jittered exponential backoff, honouring
+``Retry-After``. Per-request latency percentiles are kept for ``stats()``.
+
+Configuration (environment variables):
+
+- ``AZURE_ENDPOINT_URL`` / ``AZURE_API_KEY``: scoring URL and key (required).
+- ``AZURE_MAX_CONNECTIONS``: size of the connection pool (default 10).
+- ``AZURE_MAX_CONCURRENCY``: requests in flight (default 1, as deployed).
+- ``AZURE_MAX_RETRIES``: retries on 429/503 (default 3).
+- ``AZURE_RETRY_BACKOFF`` / ``AZURE_RETRY_MAX_DELAY``: base and cap of the
+  retry delay in seconds (default 0.5 and 10).
+- ``AZURE_TIMEOUT`` / ``AZURE_BATCH_TIMEOUT``: timeout of a single-text and
+  of a batched request in seconds (default 15 and 60, as before pooling).
+"""
+
+import asyncio
 import os
-import requests
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Awaitable, Optional
+
+import httpx
 from dotenv import load_dotenv
 
+from app.prediction_cache import azure_cache
+from app.scheduler import Histogram
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
 # Load .env so AZURE_ENDPOINT_URL and AZURE_API_KEY are populated
 load_dotenv()
 
@@ -11,53 +52,367 @@ AZURE_API_KEY = os.getenv("AZURE_API_KEY")
 if not AZURE_ENDPOINT_URL or not AZURE_API_KEY:
     raise RuntimeError("AZURE_ENDPOINT_URL and AZURE_API_KEY must be set in your .env")
 
+# Bump AZURE_MODEL_VERSION after redeploying the endpoint to drop cached results
+AZURE_MODEL_VERSION = os.getenv("AZURE_MODEL_VERSION", "")
+azure_cache.set_version(f"{AZURE_ENDPOINT_URL}#{AZURE_MODEL_VERSION}")
 
-def azure_predict(text: str) -> dict:
-    """Send a prediction request to a Kubernetes-deployed Azure ML endpoint.
+# Texts per request to the batched scoring contract ({"texts": [...]})
+AZURE_BATCH_SIZE = int(os.getenv("AZURE_BATCH_SIZE", "64"))
 
-    Args:
-        text (str): The input sentence to classify.
+RETRY_STATUSES = {429, 503}
 
-    Returns:
-        dict: { "predicted_label": "...", "confidence": 99.12 }
+# Request latency buckets in seconds
+LATENCY_BUCKETS = [0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30]
 
-    Raises:
-        RuntimeError: On any HTTP error, timeout, or model-side error.
-    """
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {AZURE_API_KEY}",
-    }
 
-    payload = {"text": text}
+class LatencyTracker:
+    """Latency histogram plus percentiles over the most recent requests."""
 
-    print("[DEBUG] Sending payload to Azure:", payload)
+    def __init__(self, window: int = 1024):
+        """Create an empty tracker.
 
-    try:
-        resp = requests.post(
-            AZURE_ENDPOINT_URL, headers=headers, json=payload, timeout=15
-        )
-        resp.raise_for_status()
-        result = resp.json()
+        Args:
+            window (int, optional): Number of recent latencies kept for the
+                percentiles.
+        """
+        self.histogram = Histogram(LATENCY_BUCKETS)
+        self.recent: deque[float] = deque(maxlen=window)
+        self.errors = 0
+        self.retries = 0
+        self._lock = threading.Lock()
 
-        # If scoring script bails with {"error":"..."} on bad input,
-        # surface it so FastAPI can catch & log it properly
-        if "error" in result:
-            raise RuntimeError(f"Model error: {result['error']}")
+    def observe(self, seconds: float, ok: bool = True) -> None:
+        """Record the latency of one request."""
+        self.histogram.observe(seconds)
+        with self._lock:
+            self.recent.append(seconds)
+            if not ok:
+                self.errors += 1
 
+    def percentile(self, pct: float) -> Optional[float]:
+        """Return the ``pct`` percentile of recent latencies in seconds."""
+        with self._lock:
+            values = sorted(self.recent)
+        if not values:
+            return None
+        rank = max(0, min(len(values) - 1, round(pct / 100 * len(values)) - 1))
+        return values[rank]
+
+    def snapshot(self) -> dict:
+        """Return counts, recent p50/p90/p99 in ms and the histogram."""
+        percentiles = {
+            f"p{pct}_ms": (
+                round(value * 1000, 2)
+                if (value := self.percentile(pct)) is not None
+                else None
+            )
+            for pct in (50, 90, 99)
+        }
         return {
+            "requests": self.histogram.count,
+            "errors": self.errors,
+            "retries": self.retries,
+            **percentiles,
+            "latency_seconds": self.histogram.snapshot(),
+        }
+
+
+class AzureMLClient:
+    """Pooled, concurrency-limited client for the Azure ML scoring endpoint."""
+
+    def __init__(
+        self,
+        endpoint_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        max_connections: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        retry_backoff: Optional[float] = None,
+        retry_max_delay: Optional[float] = None,
+        timeout: Optional[float] = None,
+        batch_timeout: Optional[float] = None,
+    ):
+        """Create a client; unset arguments fall back to environment variables.
+
+        Args:
+            endpoint_url: Scoring URL.
+            api_key: Endpoint key, sent as a bearer token.
+            max_connections: Maximum pooled connections.
+            max_concurrency: Maximum requests in flight.
+            max_retries: Retries of a request answered with 429 or 503.
+            retry_backoff: Base delay between retries, in seconds.
+            retry_max_delay: Upper bound of a retry delay, in seconds.
+            timeout: Timeout of a single-text request, in seconds.
+            batch_timeout: Timeout of a batched request, in seconds.
+        """
+        env = os.getenv
+        self.endpoint_url = endpoint_url or AZURE_ENDPOINT_URL
+        self.api_key = api_key or AZURE_API_KEY
+        self.max_connections = max_connections or int(
+            env("AZURE_MAX_CONNECTIONS", "10")
+        )
+        self.max_concurrency = max_concurrency or int(env("AZURE_MAX_CONCURRENCY", "1"))
+        self.max_retries = (
+            max_retries
+            if max_retries is not None
+            else int(env("AZURE_MAX_RETRIES", "3"))
+        )
+        self.retry_backoff = retry_backoff or float(env("AZURE_RETRY_BACKOFF", "0.5"))
+        self.retry_max_delay = retry_max_delay or float(
+            env("AZURE_RETRY_MAX_DELAY", "10")
+        )
+        self.timeout = timeout or float(env("AZURE_TIMEOUT", "15"))
+        self.batch_timeout = batch_timeout or float(env("AZURE_BATCH_TIMEOUT", "60"))
+        self.latency = LatencyTracker()
+        self.in_flight = 0
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._http: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the background event loop on first use."""
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever, name="azure-client", daemon=True
+                ).start()
+                self._loop = loop
+                self._http = self._semaphore = None
+            return self._loop
+
+    async def _client(self) -> httpx.AsyncClient:
+        """Return the pooled HTTP client (runs on the background loop)."""
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._http
+
+    async def _on_loop(self, coro: Awaitable) -> Any:
+        """Run ``coro`` on the background loop and await it from any loop."""
+        loop = self._ensure_loop()
+        if asyncio.get_running_loop() is loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+    def run_sync(self, coro: Awaitable) -> Any:
+        """Run a client coroutine from synchronous code and return its result.
+
+        Example:
+            ``prediction = client.run_sync(client.predict(text))``
+        """
+        return self.submit(coro).result()
+
+    def submit(self, coro: Awaitable) -> Future:
+        """Start a client coroutine from synchronous code and return its future."""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    def close(self) -> None:
+        """Close pooled connections and stop the background loop."""
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None or loop.is_closed():
+            return
+        if self._http is not None:
+            asyncio.run_coroutine_threadsafe(self._http.aclose(), loop).result()
+            self._http = None
+        loop.call_soon_threadsafe(loop.stop)
+
+    def _retry_delay(self, attempt: int, retry_after: Optional[str]) -> float:
+        """Full-jitter exponential backoff, at least ``Retry-After`` seconds.
+
+        Only the backoff is capped at ``retry_max_delay``; a longer
+        ``Retry-After`` from the server is honoured as is.
+        """
+        backoff = min(
+            random.uniform(0, self.retry_backoff * 2**attempt), self.retry_max_delay
+        )
+        if retry_after:
+            try:
+                return max(float(retry_after), backoff)
+            except ValueError:
+                pass  # an HTTP date; the jittered delay is used instead
+        return backoff
+
+    async def _score(self, payload: dict, timeout: float) -> dict:
+        """POST a payload, retrying on 429/503 (runs on the background loop).
+
+        Raises:
+            RuntimeError: On a timeout, a connection error, an HTTP error
+                status (after the retries), or a request-level model error.
+        """
+        client = await self._client()
+        for attempt in range(self.max_retries + 1):
+            async with self._semaphore:
+                self.in_flight += 1
+                start = time.perf_counter()
+                try:
+                    response = await client.post(
+                        self.endpoint_url, json=payload, timeout=timeout
+                    )
+                except httpx.TimeoutException as e:
+                    self.latency.observe(time.perf_counter() - start, ok=False)
+                    raise RuntimeError(f"Azure prediction timed out: {e}") from e
+                except httpx.HTTPError as e:
+                    self.latency.observe(time.perf_counter() - start, ok=False)
+                    raise RuntimeError(f"Azure prediction failed: {e}") from e
+                finally:
+                    self.in_flight -= 1
+                self.latency.observe(
+                    time.perf_counter() - start, ok=not response.is_error
+                )
+
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                delay = self._retry_delay(attempt, response.headers.get("retry-after"))
+                self.latency.retries += 1
+                logger.warning(
+                    f"Azure returned HTTP {response.status_code}; "
+                    f"retry {attempt + 1}/{self.max_retries} in {delay:.2f} s"
+                )
+                await asyncio.sleep(delay)
+                continue
+            if response.is_error:
+                logger.warning(f"Azure HTTP error {response.status_code}")
+                raise RuntimeError(
+                    f"Azure returned HTTP {response.status_code}: {response.text}"
+                )
+            result = response.json()
+            # If scoring script bails with {"error":"..."} on bad input,
+            # surface it so FastAPI can catch & log it properly
+            if "error" in result:
+                raise RuntimeError(f"Model error: {result['error']}")
+            return result
+
+    async def predict(self, text: str) -> dict:
+        """Classify one text (cached per text and endpoint version).
+
+        Args:
+            text (str): The input sentence to classify.
+
+        Returns:
+            dict: ``{"predicted_label": "...", "confidence": 0.99}``
+
+        Raises:
+            RuntimeError: On any HTTP error, timeout, or model-side error.
+        """
+        cached = azure_cache.get(text)
+        if cached is not None:
+            return dict(cached)
+
+        result = await self._on_loop(self._score({"text": text}, self.timeout))
+        prediction = {
             "predicted_label": result["predicted_label"],
             "confidence": result["confidence"],
         }
+        azure_cache.put(text, prediction)
+        return dict(prediction)
+
+    async def _score_batch(self, texts: list[str]) -> list[dict]:
+        """Score one request's worth of texts with ``{"texts": [...]}``."""
+        result = await self._on_loop(self._score({"texts": texts}, self.batch_timeout))
+        results = result.get("results")
+        if not isinstance(results, list) or len(results) != len(texts):
+            raise RuntimeError("Azure endpoint did not return one result per text")
+        return results
+
+    async def predict_batch(
+        self, texts: list[str], batch_size: int = AZURE_BATCH_SIZE
+    ) -> list[dict]:
+        """Classify many texts with a few batched requests.
+
+        Cached texts are answered locally and duplicates are sent once; the
+        rest go out in requests of up to ``batch_size`` texts, concurrently up
+        to the client's concurrency cap.
+
+        Args:
+            texts (list[str]): Input sentences.
+            batch_size (int, optional): Texts per request. Defaults to
+                ``AZURE_BATCH_SIZE``.
+
+        Returns:
+            list[dict]: For each text, in order, ``{"predicted_label",
+            "confidence"}`` or ``{"error": "..."}`` if the model rejected that
+            text (e.g. empty).
 
-    except requests.Timeout as e:
-        raise RuntimeError(f"Azure prediction timed out: {e}") from e
+        Raises:
+            RuntimeError: If a request fails; no partial results are returned.
+        """
+        results: list[dict] = [None] * len(texts)
+        pending: dict[str, list[int]] = {}
+        for i, text in enumerate(texts):
+            cached = azure_cache.get(text)
+            if cached is not None:
+                results[i] = dict(cached)
+            else:
+                pending.setdefault(text, []).append(i)
 
-    except requests.HTTPError as e:
-        status = e.response.status_code if e.response else "?"
-        body = e.response.text if e.response else ""
-        print("[DEBUG] Azure HTTP Error", status, body)
-        raise RuntimeError(f"Azure returned HTTP {status}: {body}") from e
+        unique = list(pending)
+        chunks = []
+        for start in range(0, len(unique), batch_size):
+            end = start + batch_size
+            chunks.append(unique[start:end])
+        scored = await asyncio.gather(*(self._score_batch(c) for c in chunks))
 
-    except requests.RequestException as e:
-        raise RuntimeError(f"Azure prediction failed: {e}") from e
+        predictions = []
+        for chunk, items in zip(chunks, scored):
+            for text, item in zip(chunk, items):
+                if "error" in item:
+                    prediction = {"error": item["error"]}
+                else:
+                    prediction = {
+                        "predicted_label": item["predicted_label"],
+                        "confidence": item["confidence"],
+                    }
+                    predictions.append((text, prediction))
+                for i in pending[text]:
+                    results[i] = dict(prediction)
+        azure_cache.put_many(predictions)
+        return results
+
+    def stats(self) -> dict:
+        """Return pool settings, requests in flight and latency statistics."""
+        return {
+            "max_connections": self.max_connections,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            **self.latency.snapshot(),
+        }
+
+
+_default_client: Optional[AzureMLClient] = None
+_default_lock = threading.Lock()
+
+
+def get_azure_client() -> AzureMLClient:
+    """Return the process-wide client configured from the environment."""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = AzureMLClient()
+        return _default_client
+
+
+def azure_predict(text: str) -> dict:
+    """Classify one text from synchronous code; see :meth:`AzureMLClient.predict`."""
+    client = get_azure_client()
+    return client.run_sync(client.predict(text))
+
+
+def azure_predict_batch(
+    texts: list[str], batch_size: int = AZURE_BATCH_SIZE
+) -> list[dict]:
+    """Classify many texts from synchronous code.
+
+    See :meth:`AzureMLClient.predict_batch`.
+    """
+    client = get_azure_client()
+    return client.run_sync(client.predict_batch(texts, batch_size))
@@ -0,0 +1,357 @@
+"""
+bulk.py
+-------
+Streaming parsers and writers for bulk text classification (``/predict_batch``).
+
+Inputs (a JSON array, NDJSON, or CSV) are parsed incrementally from the
+uploaded body, classified in fixed-size batches, and written back as NDJSON or
+CSV while the rest of the input is still being read. At most two batches are
+held in memory at a time, regardless of the input size. A single line (or
+CSV record, or JSON array item) may be at most ``BULK_MAX_LINE_BYTES`` long,
+so one huge line cannot grow the parse buffer without bound either.
+"""
+
+import asyncio
+import codecs
+import csv
+import io
+import json
+import os
+from typing import AsyncIterable, AsyncIterator, Callable, Optional
+
+BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", "256"))
+BULK_MAX_LINE_BYTES = int(os.getenv("BULK_MAX_LINE_BYTES", str(1024 * 1024)))
+
+BULK_OUTPUT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+CSV_FIELDS = ["index", "text", "predicted_label", "confidence", "error"]
+
+_JSON_WHITESPACE = " \t\n\r"
+
+
+class BulkInputError(ValueError):
+    """Raised when the bulk input cannot be parsed."""
+
+
+class LineTooLongError(BulkInputError):
+    """Raised when a line or item of the bulk input exceeds the length limit."""
+
+    def __init__(self, max_bytes: int):
+        """Create the error for a given limit in bytes."""
+        super().__init__(f"An input line or item exceeds the {max_bytes} byte limit.")
+        self.max_bytes = max_bytes
+
+
+def input_kind(content_type: str, filename: Optional[str] = None) -> str:
+    """Map a content type or file name to "json", "ndjson" or "csv".
+
+    Raises:
+        BulkInputError: If the format is not supported.
+    """
+    suffix = os.path.splitext(filename or "")[1].lower()
+    if suffix in (".ndjson", ".jsonl") or "ndjson" in content_type:
+        return "ndjson"
+    if suffix == ".csv" or "csv" in content_type:
+        return "csv"
+    if suffix == ".json" or "json" in content_type:
+        return "json"
+    raise BulkInputError("Unsupported input; send a JSON array, NDJSON, or a CSV file.")
+
+
+async def check_line_lengths(
+    chunks: AsyncIterable[bytes], max_bytes: int = BULK_MAX_LINE_BYTES
+) -> None:
+    """Read an input through and check that no line is over ``max_bytes``.
+
+    Lets an endpoint reject the input before it starts streaming results.
+
+    Raises:
+        LineTooLongError: At the first line longer than ``max_bytes``.
+    """
+    length = 0  # of the line that continues into the next chunk
+    async for chunk in chunks:
+        lengths = [len(part) for part in chunk.split(b"\n")]
+        lengths[0] += length
+        if max(lengths) > max_bytes:
+            raise LineTooLongError(max_bytes)
+        length = lengths[-1]
+
+
+async def iter_lines(
+    chunks: AsyncIterable[bytes], max_bytes: int = BULK_MAX_LINE_BYTES
+) -> AsyncIterator[str]:
+    """Decode UTF-8 byte chunks into lines, keeping the line endings.
+
+    Raises:
+        LineTooLongError: If a line, without its ending, is over ``max_bytes``.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = b""
+    async for chunk in chunks:
+        *lines, buffer = (buffer + chunk).split(b"\n")
+        for line in lines:
+            if len(line) > max_bytes:
+                raise LineTooLongError(max_bytes)
+            yield decoder.decode(line + b"\n")
+        if len(buffer) > max_bytes:
+            raise LineTooLongError(max_bytes)
+    text = decoder.decode(buffer, final=True)
+    if text:
+        yield text
+
+
+def _item_text(item, position: str) -> str:
+    """Return the text of an input item: a string or an object with "text"."""
+    if isinstance(item, dict):
+        item = item.get("text")
+    if not isinstance(item, str):
+        raise BulkInputError(f"{position}: expected a string or an object with 'text'")
+    return item
+
+
+async def iter_json_array(
+    chunks: AsyncIterable[bytes], max_bytes: int = BULK_MAX_LINE_BYTES
+) -> AsyncIterator[str]:
+    """Yield the texts of a JSON array one element at a time.
+
+    Elements are decoded as soon as they are complete, so the array is never
+    held in memory as a whole. The buffer is walked with an index and only
+    trimmed when the next chunk is appended, so each chunk is copied a
+    constant number of times however many elements it holds.
+
+    Raises:
+        BulkInputError: If the body is not a JSON array of texts.
+        LineTooLongError: If an element is over ``max_bytes`` characters.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    chunk_iter = chunks.__aiter__()
+    buffer, pos, started, eof, count = "", 0, False, False, 0
+    while True:
+        while pos < len(buffer) and buffer[pos] in _JSON_WHITESPACE:
+            pos += 1
+        if pos < len(buffer) and not started:
+            if buffer[pos] != "[":
+                raise BulkInputError("Expected a JSON array")
+            pos, started = pos + 1, True
+            continue
+        if buffer.startswith("]", pos):
+            return
+        if buffer.startswith(",", pos):
+            pos += 1
+            continue
+        if pos < len(buffer):
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                if eof:
+                    raise BulkInputError(f"Invalid JSON array: {e.msg}") from e
+            else:
+                if end - pos > max_bytes:
+                    raise LineTooLongError(max_bytes)
+                pos = end
+                yield _item_text(item, f"Item {count}")
+                count += 1
+                continue
+
+        # The next element is incomplete: read more of the body
+        if eof:
+            raise BulkInputError("Unterminated JSON array")
+        if len(buffer) - pos > max_bytes:
+            raise LineTooLongError(max_bytes)
+        buffer, pos = buffer[pos:], 0
+        try:
+            buffer += text_decoder.decode(await chunk_iter.__anext__())
+        except StopAsyncIteration:
+            buffer += text_decoder.decode(b"", final=True)
+            eof = True
+
+
+async def iter_ndjson(chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+    """Yield the text of each NDJSON line (a JSON string or {"text": ...}).
+
+    Raises:
+        BulkInputError: On a line that is not valid JSON.
+    """
+    number = 0
+    async for line in iter_lines(chunks):
+        number += 1
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise BulkInputError(f"Line {number}: {e.msg}") from e
+        yield _item_text(item, f"Line {number}")
+
+
+async def iter_csv(
+    chunks: AsyncIterable[bytes],
+    column: str = "text",
+    max_bytes: int = BULK_MAX_LINE_BYTES,
+) -> AsyncIterator[str]:
+    """Yield one column of a CSV file with a header row.
+
+    The column named ``column`` is used, or the first column if there is no
+    such header. Quoted fields may span several lines, up to ``max_bytes``
+    characters per record.
+
+    Raises:
+        LineTooLongError: If a record is too long.
+    """
+    record, index = "", None
+    async for line in iter_lines(chunks, max_bytes):
+        record += line
+        if record.count('"') % 2:
+            # Inside a quoted field that continues on the next line
+            if len(record) > max_bytes:
+                raise LineTooLongError(max_bytes)
+            continue
+        fields = next(csv.reader([record]), [])
+        record = ""
+        if index is None:
+            index = fields.index(column) if column in fields else 0
+            continue
+        if fields:
+            yield fields[index] if index < len(fields) else ""
+    if record:
+        raise BulkInputError("CSV ends inside a quoted field")
+
+
+def parse_texts(
+    kind: str, chunks: AsyncIterable[bytes], column: str = "text"
+) -> AsyncIterator[str]:
+    """Return a streaming parser for an input of the given kind."""
+    if kind == "csv":
+        return iter_csv(chunks, column)
+    if kind == "ndjson":
+        return iter_ndjson(chunks)
+    return iter_json_array(chunks)
+
+
+async def _batches(
+    texts: AsyncIterable[str], size: int
+) -> AsyncIterator[list[tuple[int, str]]]:
+    """Group texts into ``(index, text)`` batches of up to ``size`` items.
+
+    On a parse error the texts read so far are yielded before the error is
+    raised, so they are still classified.
+    """
+    batch, index = [], 0
+    try:
+        async for text in texts:
+            batch.append((index, text))
+            index += 1
+            if len(batch) >= size:
+                yield batch
+                batch = []
+    except BulkInputError:
+        if batch:
+            yield batch
+        raise
+    if batch:
+        yield batch
+
+
+def _classify(
+    classify_fn: Callable[[list[str]], list[tuple[str, float]]],
+    batch: list[tuple[int, str]],
+) -> list[dict]:
+    """Classify one batch, reporting empty texts as per-row errors."""
+    valid = [(i, text) for i, text in batch if text.strip()]
+    predictions = dict(
+        zip((i for i, _ in valid), classify_fn([text for _, text in valid]))
+    )
+    rows = []
+    for i, text in batch:
+        if i in predictions:
+            label, confidence = predictions[i]
+            rows.append(
+                {
+                    "index": i,
+                    "text": text,
+                    "predicted_label": label,
+                    "confidence": confidence,
+                }
+            )
+        else:
+            rows.append({"index": i, "text": text, "error": "Text is empty."})
+    return rows
+
+
+async def classify_stream(
+    texts: AsyncIterable[str],
+    classify_fn: Callable[[list[str]], list[tuple[str, float]]],
+    batch_size: int = BULK_BATCH_SIZE,
+) -> AsyncIterator[dict]:
+    """Classify a stream of texts batch by batch, yielding rows in input order.
+
+    While one batch is classified in a worker thread, the next one is read and
+    parsed from the input.
+
+    Args:
+        texts (AsyncIterable[str]): Input texts.
+        classify_fn (Callable): ``texts -> [(label, confidence), ...]``.
+        batch_size (int, optional): Texts per classifier call.
+
+    Yields:
+        dict: ``index``, ``text`` and ``predicted_label``/``confidence``, or
+        ``error`` for rows that could not be classified.
+    """
+    batches = _batches(texts, batch_size)
+    pending, error = None, None
+    try:
+        while True:
+            try:
+                batch = await batches.__anext__()
+            except StopAsyncIteration:
+                batch = None
+            except BulkInputError as e:
+                batch, error = None, e
+            task = None
+            if batch:
+                task = asyncio.ensure_future(
+                    asyncio.to_thread(_classify, classify_fn, batch)
+                )
+            if pending is not None:
+                for row in await pending:
+                    yield row
+            pending = task
+            if pending is None:
+                break
+        if error is not None:
+            raise error
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+
+def format_rows(rows: list[dict], fmt: str, header: bool = False) -> str:
+    """Serialize result rows as NDJSON lines or CSV records."""
+    if fmt == "ndjson":
+        return "".join(json.dumps(row) + "\n" for row in rows)
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=CSV_FIELDS)
+    if header:
+        writer.writeheader()
+    writer.writerows(rows)
+    return out.getvalue()
+
+
+async def write_stream(rows: AsyncIterable[dict], fmt: str) -> AsyncIterator[str]:
+    """Serialize a row stream, flushing once per batch-sized group of rows.
+
+    A parse error or failure part-way through is reported as a final row with
+    only an ``error`` field, since the response status has already been sent.
+    """
+    buffered: list[dict] = []
+    header = fmt == "csv"
+    try:
+        async for row in rows:
+            buffered.append(row)
+            if len(buffered) >= BULK_BATCH_SIZE:
+                yield format_rows(buffered, fmt, header)
+                buffered, header = [], False
+    except Exception as e:
+        buffered.append({"error": str(e)})
+    if buffered or header:
+        yield format_rows(buffered, fmt, header)
@@ -2,19 +2,51 @@
 inference.py
 ------------
 Contains core inference logic for emotion classification and optional translation.
+
+The classifier and the translation engine are registered in
+:mod:`models.registry` and loaded on first use, so importing this module is
+cheap; the translator is only loaded once a Polish transcript needs it.
 """
 
 import os
+from typing import NamedTuple
 
 import torch
 
+from app.prediction_cache import (
+    checkpoint_version,
+    emotion_cache,
+    translation_cache,
+)
+from models.registry import registry
+from utils.batching import batch_features, length_bucketed_batches
+
 # Set MOCK_MODE for Sphinx or testing environments to skip heavy model loading
 MOCK_MODE = os.getenv("SPHINX_MOCK_MODE") == "1"
 
-if not MOCK_MODE:
-    from transformers import pipeline
+# Maximum sequence length accepted by the RoBERTa checkpoint
+MAX_LENGTH = 512
+
+# Upper bound on padded tokens (batch size x longest sentence) per forward pass
+MAX_BATCH_TOKENS = int(os.getenv("MAX_BATCH_TOKENS", "8192"))
+
+# Upper bound on sentences per forward pass
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "32"))
+
+
+class Classifier(NamedTuple):
+    """Loaded emotion classifier components."""
+
+    tokenizer: object
+    label_encoder: object
+    backend: object
+    device: torch.device
+
 
-    from app.model_loader import get_model_components
+def load_classifier() -> Classifier:
+    """Load the fine-tuned classifier and its inference backend."""
+    from app.model_loader import LABEL_ENCODER_PATH, MODEL_DIR, get_model_components
+    from models.backends import load_backend
 
     model, tokenizer, label_encoder = get_model_components()
     model.eval()
@@ -23,16 +55,27 @@ if not MOCK_MODE:
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
     model.to(device)
 
-    # Translation pipeline for Polish → English
-    translator = pipeline(
-        "translation",
-        model="Helsinki-NLP/opus-mt-pl-en",
-        tokenizer="Helsinki-NLP/opus-mt-pl-en",
-        device=0 if torch.cuda.is_available() else -1,
+    # Eager PyTorch or ONNX Runtime, selected by INFERENCE_BACKEND
+    backend = load_backend(MODEL_DIR, model, device)
+
+    # Cached predictions are only valid for the checkpoint that produced them
+    emotion_cache.set_version(
+        f"{checkpoint_version(MODEL_DIR, LABEL_ENCODER_PATH)}-{backend.name}"
     )
+    return Classifier(tokenizer, label_encoder, backend, device)
+
 
-else:
-    model = tokenizer = label_encoder = translator = device = None
+def load_translator():
+    """Load the shared batched MarianMT engine for Polish → English."""
+    from models.translation import get_translation_engine
+
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    return get_translation_engine(device=device, cache=translation_cache)
+
+
+# Loaded on first use (or by the API's startup warmup), not at import
+registry.register("classifier", load_classifier)
+registry.register("translator", load_translator)
 
 
 def classify_emotion(text: str) -> tuple[str, float]:
@@ -47,23 +90,76 @@ def classify_emotion(text: str) -> tuple[str, float]:
     if MOCK_MODE:
         return "neutral", 0.0  # stub output for docs
 
-    inputs = tokenizer(
-        text,
-        return_tensors="pt",
-        truncation=True,
-        padding=True,
-        max_length=512,
-    ).to(device)
+    return classify_emotions_batch([text])[0]
 
-    with torch.no_grad():
-        logits = model(**inputs).logits
-        probs = torch.softmax(logits, dim=1)[0]
-        pred = torch.argmax(probs).item()
 
-        label = label_encoder.inverse_transform([pred])[0]
-        confidence = round(probs[pred].item() * 100, 2)
+def classify_emotions_batch(
+    texts: list[str], max_tokens: int = MAX_BATCH_TOKENS
+) -> list[tuple[str, float]]:
+    """Classify the emotion of many sentences with batched forward passes.
 
-        return label, confidence
+    Sentences are sorted by token length and grouped into buckets of similar
+    length, so each batch is padded only to its own longest sentence with
+    little waste. Batches are capped so that ``batch size x longest sentence``
+    stays within ``max_tokens``, and results are returned in input order.
+    Results are cached per sentence (see :mod:`app.prediction_cache`), so only
+    sentences not seen before with the loaded checkpoint reach the model.
+
+    Args:
+        texts (list[str]): Input sentences in English.
+        max_tokens (int, optional): Padded-token budget per forward pass.
+            Defaults to ``MAX_BATCH_TOKENS``.
+
+    Returns:
+        list[tuple[str, float]]: Predicted label and confidence (percentage)
+        for each input sentence, in the same order as ``texts``.
+    """
+    if MOCK_MODE:
+        return [("neutral", 0.0)] * len(texts)  # stub output for docs
+    if not texts:
+        return []
+
+    # Loading the classifier also sets the cache version for its checkpoint
+    registry.get("classifier")
+    results: list[tuple[str, float]] = [None] * len(texts)
+    pending: dict[str, list[int]] = {}
+    for i, text in enumerate(texts):
+        cached = emotion_cache.get(text)
+        if cached is not None:
+            results[i] = tuple(cached)
+        else:
+            pending.setdefault(text, []).append(i)
+    if pending:
+        unique = list(pending)
+        predictions = _classify_uncached(unique, max_tokens)
+        emotion_cache.put_many(zip(unique, predictions))
+        for text, prediction in zip(unique, predictions):
+            for i in pending[text]:
+                results[i] = prediction
+
+    return results
+
+
+def _classify_uncached(texts: list[str], max_tokens: int) -> list[tuple[str, float]]:
+    """Run the classifier on ``texts`` in length-bucketed batches."""
+    tokenizer, label_encoder, backend, _ = registry.get("classifier")
+    encodings = tokenizer(list(texts), truncation=True, max_length=MAX_LENGTH)
+    lengths = [len(ids) for ids in encodings["input_ids"]]
+
+    results: list[tuple[str, float]] = [None] * len(texts)
+    for batch in length_bucketed_batches(lengths, max_tokens, MAX_BATCH_SIZE):
+        inputs = tokenizer.pad(
+            batch_features(encodings, batch), padding="longest", return_tensors="pt"
+        )
+
+        probs = torch.softmax(backend.logits(inputs), dim=1)
+        confidences, preds = probs.max(dim=1)
+
+        labels = label_encoder.inverse_transform(preds.cpu().numpy())
+        for idx, label, conf in zip(batch, labels, confidences.tolist()):
+            results[idx] = (str(label), round(conf * 100, 2))
+
+    return results
 
 
 def translate_if_needed(text: str, lang_code: str) -> str:
@@ -78,4 +174,19 @@ def translate_if_needed(text: str, lang_code: str) -> str:
     """
     if MOCK_MODE or lang_code != "pl":
         return text
-    return translator(text)[0]["translation_text"]
+    return registry.get("translator").translate_one(text)
+
+
+def translate_batch_if_needed(texts: list[str], lang_code: str) -> list[str]:
+    """Translate many Polish sentences to English with batched generation.
+
+    Args:
+        texts (list[str]): Input sentences.
+        lang_code (str): The detected language code (e.g., 'pl', 'en').
+
+    Returns:
+        list[str]: English sentences in input order; unchanged if not Polish.
+    """
+    if MOCK_MODE or lang_code != "pl":
+        return list(texts)
+    return registry.get("translator").translate(texts)
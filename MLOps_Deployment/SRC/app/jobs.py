@@ -0,0 +1,414 @@
+"""
+jobs.py
+-------
+Background job queue for long-running audio, video and URL predictions.
+
+Jobs are persisted in a local SQLite file so that submitted work survives a
+restart, and are executed by a bounded thread pool. Each job moves through
+the stages in ``JOB_STAGES`` and stores its result (or error) when finished.
+
+Every unfinished job records the pid of the process that runs it and a
+heartbeat that process refreshes. Only jobs whose heartbeat went stale (their
+process crashed, was killed or restarted) are resumed, so a worker restarted
+next to live siblings never runs their jobs a second time.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Optional
+
+from utils.logger import get_logger
+from utils.process_local import ProcessLocal
+
+logger = get_logger(__name__)
+
+JOB_STAGES = (
+    "queued",
+    "uploaded",
+    "transcribing",
+    "translating",
+    "classifying",
+    "done",
+    "failed",
+)
+
+# A handler receives the job payload, a stage callback and the job ID (under
+# which it stores its result files), and returns the result
+JobHandler = Callable[[dict, Callable[[str], None], str], dict]
+
+
+class QueueFullError(RuntimeError):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+
+class JobStore:
+    """SQLite-backed storage for job status, payload and result."""
+
+    def __init__(self, db_path: str | Path):
+        """Open (and create if needed) the job database.
+
+        Args:
+            db_path (str | Path): Path to the SQLite file.
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Opened on first use in each process: the store is created at import,
+        # which under ``gunicorn --preload`` is the master
+        self._connection = ProcessLocal(self._connect)
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        """SQLite connection of the current process."""
+        return self._connection.get()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection and create the jobs table if needed."""
+        conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    owner_pid INTEGER,
+                    heartbeat REAL
+                )
+                """)
+            # Databases created before jobs had an owner
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for column, kind in (("owner_pid", "INTEGER"), ("heartbeat", "REAL")):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+        return conn
+
+    def create(self, kind: str, payload: dict, owner_pid: Optional[int] = None) -> str:
+        """Insert a new queued job.
+
+        Args:
+            kind (str): Handler name.
+            payload (dict): JSON-serialisable handler arguments.
+            owner_pid (int, optional): Process that runs the job; defaults to
+                the current one.
+
+        Returns:
+            str: The new job ID.
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, status, payload, created_at, updated_at,"
+                " owner_pid, heartbeat) VALUES (?, ?, 'queued', ?, ?, ?, ?, ?)",
+                (
+                    job_id,
+                    kind,
+                    json.dumps(payload),
+                    now,
+                    now,
+                    owner_pid or os.getpid(),
+                    now,
+                ),
+            )
+        return job_id
+
+    def update(
+        self,
+        job_id: str,
+        status: str,
+        result: Optional[dict] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        """Set the status of a job and optionally its result or error.
+
+        Args:
+            job_id (str): Job ID.
+            status (str): One of ``JOB_STAGES``.
+            result (dict, optional): Result to store.
+            error (str, optional): Error message to store.
+        """
+        if status not in JOB_STAGES:
+            raise ValueError(f"Unknown job status: {status}")
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = COALESCE(?, result),"
+                " error = ?, updated_at = ? WHERE id = ?",
+                (
+                    status,
+                    json.dumps(result) if result is not None else None,
+                    error,
+                    time.time(),
+                    job_id,
+                ),
+            )
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """Return a job as a dict, or None if it does not exist."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def unfinished(self) -> list[str]:
+        """Return the IDs of jobs that are not done or failed, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id FROM jobs WHERE status NOT IN ('done', 'failed')"
+                " ORDER BY created_at"
+            ).fetchall()
+        return [row["id"] for row in rows]
+
+    def heartbeat(self, job_ids: list[str], owner_pid: int) -> None:
+        """Mark jobs as still being run by ``owner_pid``.
+
+        Args:
+            job_ids (list[str]): Jobs queued or running in that process.
+            owner_pid (int): The process running them.
+        """
+        if not job_ids:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE jobs SET heartbeat = ? WHERE id = ? AND owner_pid = ?",
+                [(time.time(), job_id, owner_pid) for job_id in job_ids],
+            )
+
+    def claim_stale(self, owner_pid: int, stale_before: float) -> list[str]:
+        """Take over unfinished jobs whose owner stopped sending heartbeats.
+
+        Each job is claimed with a conditional update, so two processes
+        claiming at the same time never both get it.
+
+        Args:
+            owner_pid (int): The process taking the jobs over.
+            stale_before (float): Jobs with an older heartbeat (or none) are
+                claimed.
+
+        Returns:
+            list[str]: IDs of the claimed jobs, oldest first. They are reset
+            to ``queued``.
+        """
+        claimed = []
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                "SELECT id, heartbeat FROM jobs WHERE status NOT IN ('done', 'failed')"
+                " AND (heartbeat IS NULL OR heartbeat < ?) ORDER BY created_at",
+                (stale_before,),
+            ).fetchall()
+            now = time.time()
+            for row in rows:
+                cursor = self._conn.execute(
+                    "UPDATE jobs SET status = 'queued', owner_pid = ?, heartbeat = ?,"
+                    " updated_at = ? WHERE id = ? AND heartbeat IS ?",
+                    (owner_pid, now, now, row["id"], row["heartbeat"]),
+                )
+                if cursor.rowcount:
+                    claimed.append(row["id"])
+        return claimed
+
+
+class JobQueue:
+    """Execute persisted jobs on a bounded worker pool."""
+
+    def __init__(
+        self,
+        store: JobStore,
+        handlers: dict[str, JobHandler],
+        max_workers: int = 2,
+        max_pending: int = 100,
+        heartbeat_seconds: float = 10.0,
+        stale_seconds: Optional[float] = None,
+    ):
+        """Create the queue.
+
+        Args:
+            store (JobStore): Where jobs are persisted.
+            handlers (dict[str, JobHandler]): Handler per job kind.
+            max_workers (int, optional): Jobs running at the same time.
+            max_pending (int, optional): Queued plus running jobs accepted
+                before :meth:`submit` raises :class:`QueueFullError`.
+            heartbeat_seconds (float, optional): How often this process
+                refreshes the heartbeat of its jobs.
+            stale_seconds (float, optional): Age of a heartbeat after which
+                the job's process is considered gone (default three
+                heartbeats).
+        """
+        self.store = store
+        self.handlers = handlers
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max_pending
+        self.heartbeat_seconds = heartbeat_seconds
+        self.stale_seconds = stale_seconds or 3 * heartbeat_seconds
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="job"
+        )
+        self._pending = 0
+        self._owned: set[str] = set()
+        self._resumer = False
+        self._monitor: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        """Number of queued or running jobs in this process."""
+        return self._pending
+
+    def submit(self, kind: str, payload: dict) -> str:
+        """Persist a job and schedule it.
+
+        Args:
+            kind (str): Handler name.
+            payload (dict): JSON-serialisable handler arguments.
+
+        Returns:
+            str: The job ID.
+
+        Raises:
+            KeyError: If no handler is registered for ``kind``.
+            QueueFullError: If ``max_pending`` jobs are already waiting.
+        """
+        if kind not in self.handlers:
+            raise KeyError(f"No handler for job kind: {kind}")
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise QueueFullError(f"Job queue is full ({self.max_pending})")
+            self._pending += 1
+        self._ensure_monitor()
+        job_id = self.store.create(kind, payload, owner_pid=os.getpid())
+        self._schedule(job_id)
+        logger.info(f"Queued {kind} job {job_id}")
+        return job_id
+
+    def _schedule(self, job_id: str) -> None:
+        """Run a job owned by this process on the pool."""
+        with self._lock:
+            self._owned.add(job_id)
+        self._executor.submit(self._execute, job_id)
+
+    def resume(self, lock_path: Optional[str | Path] = None) -> int:
+        """Re-schedule jobs whose process stopped, now and from then on.
+
+        Only jobs with a heartbeat older than ``stale_seconds`` are taken
+        over; jobs of live processes are left alone. Jobs of a process that
+        died just before this call are picked up by the periodic check once
+        their heartbeat goes stale. Interrupted jobs restart from the
+        beginning.
+
+        Args:
+            lock_path (str | Path, optional): File locked for the lifetime of
+                this process. When several server workers share the job
+                database, only the worker holding the lock resumes jobs.
+
+        Returns:
+            int: Number of jobs re-scheduled now.
+        """
+        self._ensure_monitor()
+        if lock_path is not None and not self._lock_resume(Path(lock_path)):
+            logger.info("Another worker resumes unfinished jobs")
+            return 0
+        self._resumer = True
+        return self._resume_stale()
+
+    def _resume_stale(self) -> int:
+        """Claim and schedule the jobs of processes that stopped."""
+        job_ids = self.store.claim_stale(
+            os.getpid(), stale_before=time.time() - self.stale_seconds
+        )
+        for job_id in job_ids:
+            with self._lock:
+                self._pending += 1
+            self._schedule(job_id)
+        if job_ids:
+            logger.info(f"Resumed {len(job_ids)} unfinished job(s)")
+        return len(job_ids)
+
+    def _ensure_monitor(self) -> None:
+        """Start the heartbeat thread of this process if it is not running.
+
+        Started on first use rather than in ``__init__``: the queue is created
+        at import, and a thread started in a ``gunicorn --preload`` master
+        does not exist in the forked workers.
+        """
+        with self._lock:
+            if self._monitor is not None and self._monitor.is_alive():
+                return
+            self._monitor = threading.Thread(
+                target=self._monitor_loop, name="job-heartbeat", daemon=True
+            )
+            self._monitor.start()
+
+    def _monitor_loop(self) -> None:
+        """Refresh the heartbeat of owned jobs; the resumer also claims stale ones."""
+        while not self._stop.wait(self.heartbeat_seconds):
+            try:
+                with self._lock:
+                    owned = list(self._owned)
+                self.store.heartbeat(owned, os.getpid())
+                if self._resumer:
+                    self._resume_stale()
+            except Exception:
+                logger.exception("Job heartbeat failed")
+
+    def _lock_resume(self, lock_path: Path) -> bool:
+        """Take an exclusive, non-blocking lock on ``lock_path``."""
+        try:
+            import fcntl
+        except ImportError:  # Windows: a single worker is assumed
+            return True
+        lock_path.parent.mkdir(parents=True, exist_ok=True)
+        lock_file = open(lock_path, "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._resume_lock = lock_file  # released when the process exits
+        return True
+
+    def _execute(self, job_id: str) -> None:
+        """Run one job and record its outcome."""
+        try:
+            job = self.store.get(job_id)
+            if job is None:
+                return
+            handler = self.handlers[job["kind"]]
+
+            def on_stage(stage: str) -> None:
+                logger.debug(f"Job {job_id}: {stage}")
+                self.store.update(job_id, stage)
+
+            start = time.perf_counter()
+            result = handler(job["payload"], on_stage, job_id)
+            self.store.update(job_id, "done", result=result)
+            logger.info(f"Job {job_id} done in {time.perf_counter() - start:.1f} s")
+        except Exception as e:
+            logger.exception(f"Job {job_id} failed")
+            self.store.update(job_id, "failed", error=str(e))
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._owned.discard(job_id)
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Stop accepting work; running jobs resume on the next start."""
+        self._stop.set()
+        self._executor.shutdown(wait=wait, cancel_futures=True)
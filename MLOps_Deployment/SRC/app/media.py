@@ -0,0 +1,319 @@
+"""
+media.py
+--------
+Media handling shared by the synchronous endpoints and background jobs.
+
+Uploads local audio to AssemblyAI, extracts audio from video with ffmpeg, and
+turns a media URL (YouTube, direct MP3/MP4) into an AssemblyAI audio URL.
+
+Video audio can be extracted in two ways, selected with
+``VIDEO_EXTRACTION_MODE``:
+
+- ``file`` (default): save the video, convert it to an MP3 file, upload it.
+- ``pipe``: feed the upload into ffmpeg's stdin and stream its stdout straight
+  into the AssemblyAI upload, using a low-bitrate mono speech preset. No
+  intermediate files are written. ffmpeg can only demux MP4s with the
+  ``moov`` atom at the start ("fast start") from a pipe.
+"""
+
+import asyncio
+import logging
+import os
+import subprocess
+import time
+import uuid
+from pathlib import Path
+from typing import AsyncIterable, AsyncIterator, Optional
+
+import requests
+import yt_dlp
+from dotenv import load_dotenv
+
+from app.metrics import stage_timer
+from app.transcript_cache import (
+    content_cache_key,
+    hash_file,
+    transcript_cache,
+    url_cache_key,
+)
+from transcription.assemblyai_client import get_client
+
+load_dotenv()
+
+TEMP_DIR = Path("temp_uploads")
+
+VIDEO_EXTRACTION_MODE = os.getenv("VIDEO_EXTRACTION_MODE", "file").lower()
+SPEECH_AUDIO_BITRATE = os.getenv("SPEECH_AUDIO_BITRATE", "32k")
+PIPE_CHUNK_SIZE = 64 * 1024
+
+# Mono 16 kHz low-bitrate MP3: plenty for speech recognition
+SPEECH_PRESET = [
+    "-vn",
+    "-ac",
+    "1",
+    "-ar",
+    "16000",
+    "-acodec",
+    "libmp3lame",
+    "-b:a",
+    SPEECH_AUDIO_BITRATE,
+]
+
+logger = logging.getLogger(__name__)
+
+
+def upload_to_assemblyai(file_path: str | Path) -> str:
+    """Upload a local audio file to AssemblyAI.
+
+    Blocks the calling thread; async code should await
+    ``get_client().upload(file_path)`` instead.
+
+    Args:
+        file_path (str | Path): Path to the audio file.
+
+    Returns:
+        str: The ``upload_url`` to pass to the transcription request.
+    """
+    client = get_client()
+    with stage_timer("upload"):
+        return client.run_sync(client.upload(file_path))
+
+
+def extract_audio(video_path: str | Path) -> Path:
+    """Extract the audio track of a video to an MP3 file next to it.
+
+    Args:
+        video_path (str | Path): Path to the video file.
+
+    Returns:
+        Path: Path to the extracted MP3 file.
+
+    Raises:
+        subprocess.CalledProcessError: If ffmpeg fails.
+    """
+    audio_path = Path(video_path).with_suffix(".mp3")
+    subprocess.run(
+        [
+            "ffmpeg",
+            "-i",
+            str(video_path),
+            "-vn",
+            "-acodec",
+            "libmp3lame",
+            str(audio_path),
+        ],
+        check=True,
+    )
+    return audio_path
+
+
+async def _count_bytes(
+    chunks: AsyncIterable[bytes], stats: dict, key: str
+) -> AsyncIterator[bytes]:
+    """Pass chunks through while adding their size to ``stats[key]``."""
+    stats.setdefault(key, 0)
+    async for chunk in chunks:
+        stats[key] += len(chunk)
+        yield chunk
+
+
+async def stream_extract_audio(
+    video_chunks: AsyncIterable[bytes], stats: dict | None = None
+) -> AsyncIterator[bytes]:
+    """Extract speech audio from a streamed video through ffmpeg pipes.
+
+    The video is written to ffmpeg's stdin while the encoded MP3 is read from
+    its stdout, so neither the video nor the audio touches the disk.
+
+    Args:
+        video_chunks (AsyncIterable[bytes]): The video bytes.
+        stats (dict, optional): Filled with ``input_bytes`` and ``output_bytes``.
+
+    Yields:
+        bytes: Chunks of the MP3 produced by ffmpeg.
+
+    Raises:
+        subprocess.CalledProcessError: If ffmpeg fails.
+    """
+    stats = stats if stats is not None else {}
+    cmd = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-xerror", "-i", "pipe:0"]
+    cmd += SPEECH_PRESET + ["-f", "mp3", "pipe:1"]
+    process = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+
+    async def feed() -> None:
+        try:
+            async for chunk in _count_bytes(video_chunks, stats, "input_bytes"):
+                process.stdin.write(chunk)
+                await process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # ffmpeg exited early; its return code tells why
+        finally:
+            process.stdin.close()
+
+    feeder = asyncio.ensure_future(feed())
+    stderr = asyncio.ensure_future(process.stderr.read())
+    try:
+        stats.setdefault("output_bytes", 0)
+        while chunk := await process.stdout.read(PIPE_CHUNK_SIZE):
+            stats["output_bytes"] += len(chunk)
+            yield chunk
+        await feeder
+        if await process.wait() != 0:
+            raise subprocess.CalledProcessError(
+                process.returncode, cmd, stderr=(await stderr).decode(errors="replace")
+            )
+    finally:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        feeder.cancel()
+        stderr.cancel()
+
+
+async def upload_video_audio(video_chunks: AsyncIterable[bytes]) -> tuple[str, dict]:
+    """Extract audio from a streamed video and upload it without temp files.
+
+    Args:
+        video_chunks (AsyncIterable[bytes]): The video bytes.
+
+    Returns:
+        tuple[str, dict]: AssemblyAI upload URL and transfer statistics
+        (``input_bytes``, ``output_bytes``, ``seconds``).
+    """
+    stats = {}
+    start = time.perf_counter()
+    with stage_timer("upload"):  # extraction and upload overlap
+        audio_url = await get_client().upload_stream(
+            stream_extract_audio(video_chunks, stats)
+        )
+    stats["seconds"] = round(time.perf_counter() - start, 3)
+    logger.info(
+        f"Video audio piped to AssemblyAI: {stats['input_bytes']} bytes in, "
+        f"{stats['output_bytes']} bytes uploaded, {stats['seconds']} s"
+    )
+    return audio_url, stats
+
+
+def _download_youtube_audio(media_url: str) -> Path:
+    """Download the audio of a YouTube video as MP3 into the temp directory."""
+    TEMP_DIR.mkdir(parents=True, exist_ok=True)
+    outtmpl = f"{TEMP_DIR}/{uuid.uuid4()}.%(ext)s"  # Unique filename prefix
+
+    ydl_opts = {
+        "format": "bestaudio/best",
+        "outtmpl": outtmpl,
+        "postprocessors": [
+            {
+                "key": "FFmpegExtractAudio",
+                "preferredcodec": "mp3",
+                "preferredquality": "192",
+            }
+        ],
+        "quiet": False,
+        "noplaylist": True,
+    }
+
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        logger.debug("Starting YouTube download via yt_dlp")
+        info = ydl.extract_info(media_url, download=True)
+        logger.info(f"Downloaded title: {info.get('title')}")
+        downloaded_filename = Path(ydl.prepare_filename(info)).with_suffix(".mp3")
+
+    if not downloaded_filename.exists():
+        logger.error(f"Expected MP3 not found: {downloaded_filename}")
+        raise RuntimeError("Audio file was not extracted.")
+    return downloaded_filename
+
+
+def _download_direct_media(media_url: str) -> Path:
+    """Download a direct MP3/MP4 link into the temp directory."""
+    try:
+        logger.info(f"Handling direct media file: {media_url}")
+        response = requests.get(media_url, stream=True, timeout=10)
+        response.raise_for_status()
+        ext = media_url.split(".")[-1].split("?")[0]
+        TEMP_DIR.mkdir(parents=True, exist_ok=True)
+        local_file = TEMP_DIR / f"temp_{uuid.uuid4()}.{ext}"
+        with open(local_file, "wb") as f:
+            for chunk in response.iter_content(chunk_size=8192):
+                f.write(chunk)
+        logger.debug(f"Saved direct media file locally: {local_file}")
+        return local_file
+    except Exception as e:
+        logger.error(f"Direct media download failed: {e}")
+        raise RuntimeError("Failed to handle direct media URL.") from e
+
+
+def is_youtube_url(media_url: str) -> bool:
+    """Return True if the URL points to YouTube."""
+    return "youtube.com" in media_url or "youtu.be" in media_url
+
+
+def file_cache_key(file_path: str | Path, language: str = "auto") -> str:
+    """Transcript cache key of a local media file (SHA-256 of its bytes)."""
+    return content_cache_key(hash_file(file_path), language)
+
+
+def upload_unless_cached(
+    file_path: str | Path, language: str = "auto"
+) -> tuple[Optional[str], str]:
+    """Upload a local media file unless its transcript is already cached.
+
+    Args:
+        file_path (str | Path): Local audio file.
+        language (str, optional): Requested transcription language.
+
+    Returns:
+        tuple[str | None, str]: The AssemblyAI upload URL (None on a cache hit)
+        and the transcript cache key.
+    """
+    cache_key = file_cache_key(file_path, language)
+    if cache_key in transcript_cache:
+        logger.info(f"Transcript of {file_path} is cached, skipping upload")
+        return None, cache_key
+    return upload_to_assemblyai(file_path), cache_key
+
+
+def resolve_media_url(
+    media_url: str, language: str = "auto"
+) -> tuple[Optional[str], str]:
+    """Turn a media URL into an audio URL AssemblyAI can transcribe.
+
+    YouTube links and direct MP3/MP4 links are downloaded and re-uploaded to
+    AssemblyAI. Any other URL is passed to AssemblyAI as-is. Work is skipped
+    as soon as the transcript is known to be cached: YouTube links are looked
+    up by video ID before downloading, direct links by the hash of the
+    downloaded file before uploading.
+
+    Args:
+        media_url (str): YouTube, MP3, MP4 or other audio URL.
+        language (str, optional): Requested transcription language.
+
+    Returns:
+        tuple[str | None, str]: URL to pass to the transcription request (None
+        when the transcript is cached) and the transcript cache key.
+    """
+    if is_youtube_url(media_url):
+        cache_key = url_cache_key(media_url, language)
+        if cache_key in transcript_cache:
+            logger.info(f"Transcript of {media_url} is cached, skipping download")
+            return None, cache_key
+        local_file = _download_youtube_audio(media_url)
+        try:
+            return upload_to_assemblyai(local_file), cache_key
+        finally:
+            os.remove(local_file)
+
+    if media_url.endswith(".mp3") or media_url.endswith(".mp4"):
+        local_file = _download_direct_media(media_url)
+        try:
+            return upload_unless_cached(local_file, language)
+        finally:
+            os.remove(local_file)
+
+    return media_url, url_cache_key(media_url, language)
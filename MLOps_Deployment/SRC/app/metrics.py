@@ -0,0 +1,632 @@
+"""
+metrics.py
+----------
+Prometheus-style metrics for the ``GET /metrics`` endpoint, rendered in the
+text exposition format without external dependencies.
+
+Two kinds of metrics are served:
+
+- Metrics updated on the request path: histograms of the media pipeline
+  stages (:data:`STAGE_SECONDS`, timed with :func:`stage_timer` or wrapped with
+  :func:`timed_stage`), sentences per pipeline call (:data:`STAGE_BATCH_SIZE`),
+  and HTTP request durations and in-flight requests.
+- Collectors registered with :meth:`MetricsRegistry.register_collector`. They
+  read existing statistics at scrape time: the micro-batcher, caches, job
+  queue, model registry, Azure client and inference router.
+
+All of these live in the memory of one process. When the server runs several
+worker processes (``WEB_CONCURRENCY``), set ``METRICS_MULTIPROC_DIR`` to an
+empty directory shared by them: every worker writes its metrics to
+``<pid>.json`` there every ``METRICS_FLUSH_SECONDS`` (and when it answers a
+scrape or exits), and ``/metrics`` aggregates all files. Counters and
+histograms are summed over all workers, including ones that exited, so they
+never go backwards between scrapes. Gauges are reported per live worker with a
+``pid`` label.
+"""
+
+import atexit
+import json
+import math
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, NamedTuple, Optional
+
+from app.scheduler import Histogram
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR", "")
+METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "5"))
+
+# Stage durations range from milliseconds (CSV writes) to minutes (transcription)
+STAGE_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300]
+HTTP_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60]
+BATCH_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128, 256]
+
+
+class Family(NamedTuple):
+    """One metric family: name, type, help and its ``(suffix, labels, value)``."""
+
+    name: str
+    type: str
+    help: str
+    samples: list[tuple[str, dict, float]]
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the exposition format."""
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_sample(name: str, labels: dict, value: float) -> str:
+    """Format one sample line."""
+    label_text = ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items())
+    if math.isnan(value):
+        text = "NaN"
+    elif math.isinf(value):
+        text = "+Inf" if value > 0 else "-Inf"
+    elif isinstance(value, bool) or float(value).is_integer():
+        text = str(int(value))
+    else:
+        text = repr(float(value))
+    return f"{name}{{{label_text}}} {text}" if label_text else f"{name} {text}"
+
+
+def histogram_samples(histogram: Histogram, labels: Optional[dict] = None) -> list:
+    """Return the bucket, count and sum samples of a :class:`Histogram`."""
+    labels = labels or {}
+    snapshot = histogram.snapshot()
+    samples = [
+        ("_bucket", {**labels, "le": le}, count)
+        for le, count in snapshot["buckets"].items()
+    ]
+    samples.append(("_count", labels, snapshot["count"]))
+    samples.append(("_sum", labels, snapshot["sum"]))
+    return samples
+
+
+class _Metric(ABC):
+    """Base of labelled metrics updated in-process."""
+
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labelvalues: tuple) -> tuple:
+        if len(labelvalues) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        return tuple(str(v) for v in labelvalues)
+
+    def _labels(self, key: tuple) -> dict:
+        return dict(zip(self.labelnames, key))
+
+    @abstractmethod
+    def reset(self) -> None:
+        """Drop all values, e.g. those a forked process inherited."""
+
+    @abstractmethod
+    def collect(self) -> Family:
+        """Return the current samples of the metric."""
+
+
+class Counter(_Metric):
+    """Monotonic counter per label set."""
+
+    type = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: dict[tuple, float] = {}
+
+    def reset(self) -> None:
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, *labelvalues: Any, amount: float = 1.0) -> None:
+        """Add ``amount`` to the counter of ``labelvalues``."""
+        key = self._key(labelvalues)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def collect(self) -> Family:
+        with self._lock:
+            samples = [("", self._labels(k), v) for k, v in self._values.items()]
+        return Family(self.name, self.type, self.help, samples)
+
+
+class Gauge(Counter):
+    """Value per label set that can go up and down."""
+
+    type = "gauge"
+
+    def dec(self, *labelvalues: Any, amount: float = 1.0) -> None:
+        """Subtract ``amount`` from the gauge of ``labelvalues``."""
+        self.inc(*labelvalues, amount=-amount)
+
+    def set(self, value: float, *labelvalues: Any) -> None:
+        """Set the gauge of ``labelvalues`` to ``value``."""
+        key = self._key(labelvalues)
+        with self._lock:
+            self._values[key] = value
+
+
+class LabelledHistogram(_Metric):
+    """A :class:`app.scheduler.Histogram` per label set."""
+
+    type = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=STAGE_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = list(buckets)
+        self._histograms: dict[tuple, Histogram] = {}
+
+    def reset(self) -> None:
+        self._lock = threading.Lock()
+        self._histograms = {}
+
+    def labels(self, *labelvalues: Any) -> Histogram:
+        """Return the histogram of ``labelvalues``, creating it if needed."""
+        key = self._key(labelvalues)
+        with self._lock:
+            if key not in self._histograms:
+                self._histograms[key] = Histogram(self.buckets)
+            return self._histograms[key]
+
+    def observe(self, value: float, *labelvalues: Any) -> None:
+        """Record one observation for ``labelvalues``."""
+        self.labels(*labelvalues).observe(value)
+
+    @contextmanager
+    def time(self, *labelvalues: Any) -> Iterator[None]:
+        """Observe the wall time of the ``with`` block, also if it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labelvalues)
+
+    def collect(self) -> Family:
+        with self._lock:
+            histograms = list(self._histograms.items())
+        samples = []
+        for key, histogram in histograms:
+            samples.extend(histogram_samples(histogram, self._labels(key)))
+        return Family(self.name, self.type, self.help, samples)
+
+
+def _pid_alive(pid: int) -> bool:
+    """Whether a process with this pid exists."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def merge_families(snapshots: Iterable[tuple[Optional[int], list]]) -> list[Family]:
+    """Aggregate the metric families of several processes.
+
+    Counter and histogram samples with the same name and labels are summed.
+    Gauges cannot be summed meaningfully in general (e.g. a hit ratio), so
+    each process's gauges get a ``pid`` label; snapshots without a pid (the
+    totals of exited processes) contribute no gauges.
+
+    Args:
+        snapshots: ``(pid, families)`` per process.
+
+    Returns:
+        list[Family]: One family per metric name.
+    """
+    merged: dict[str, tuple[str, str, dict]] = {}
+    for pid, families in snapshots:
+        for name, type_, help_, samples in families:
+            values = merged.setdefault(name, (type_, help_, {}))[2]
+            for suffix, labels, value in samples:
+                if type_ == "gauge":
+                    if pid is None:
+                        continue
+                    labels = {**labels, "pid": pid}
+                key = (suffix, tuple(labels.items()))
+                values[key] = values.get(key, 0) + value
+    return [
+        Family(
+            name,
+            type_,
+            help_,
+            [(suffix, dict(labels), v) for (suffix, labels), v in values.items()],
+        )
+        for name, (type_, help_, values) in merged.items()
+    ]
+
+
+class MultiProcessFiles:
+    """Exchange metrics between worker processes through a shared directory."""
+
+    EXITED = "exited.json"
+
+    def __init__(self, directory: str | Path, flush_seconds: float = 5.0):
+        """Use ``directory`` for the per-process files.
+
+        Args:
+            directory: Directory shared by all workers of the server.
+            flush_seconds: How often each process writes its metrics.
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.flush_seconds = flush_seconds
+        self._flusher: Optional[threading.Thread] = None
+        self._flusher_lock = threading.Lock()
+
+    def _write_json(self, path: Path, data: Any) -> None:
+        """Replace ``path`` atomically, so readers never see a partial file."""
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(data))
+        os.replace(tmp, path)
+
+    def _read_json(self, path: Path) -> list:
+        try:
+            return json.loads(path.read_text())
+        except (OSError, ValueError):
+            return []
+
+    def write(self, families: list[Family]) -> None:
+        """Write the metrics of the current process."""
+        self._write_json(self.directory / f"{os.getpid()}.json", families)
+
+    def start(self, collect: Callable[[], list[Family]]) -> None:
+        """Write ``collect()`` periodically from a thread of this process.
+
+        The last write happens at exit. Idempotent per process; call it in
+        each worker (after the fork), e.g. from a startup hook.
+        """
+        with self._flusher_lock:
+            if self._flusher is not None and self._flusher.is_alive():
+                return
+
+            def flush() -> None:
+                while True:
+                    time.sleep(self.flush_seconds)
+                    try:
+                        self.write(collect())
+                    except Exception:
+                        pass
+
+            self._flusher = threading.Thread(
+                target=flush, name="metrics-flush", daemon=True
+            )
+            self._flusher.start()
+            atexit.register(lambda: self.write(collect()))
+
+    def _fold_exited(self) -> None:
+        """Add the counters and histograms of exited processes to one file.
+
+        Keeps the directory from growing with every restarted worker. Guarded
+        by a file lock, so concurrent scrapes do not count a process twice.
+        """
+        try:
+            import fcntl
+        except ImportError:  # Windows: files of exited processes are kept
+            return
+        with open(self.directory / ".lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            exited = [
+                path
+                for path in self.directory.glob("[0-9]*.json")
+                if int(path.stem) != os.getpid() and not _pid_alive(int(path.stem))
+            ]
+            if not exited:
+                return
+            snapshots = [(None, self._read_json(self.directory / self.EXITED))]
+            snapshots += [(None, self._read_json(path)) for path in exited]
+            totals = [
+                family
+                for family in merge_families(snapshots)
+                if family.type in ("counter", "histogram")
+            ]
+            self._write_json(self.directory / self.EXITED, totals)
+            for path in exited:
+                path.unlink(missing_ok=True)
+
+    def collect(self, own: list[Family]) -> list[Family]:
+        """Return the metrics of all processes, writing ours first.
+
+        Args:
+            own: The current process's families.
+        """
+        self.write(own)
+        self._fold_exited()
+        snapshots = [(None, self._read_json(self.directory / self.EXITED))]
+        for path in sorted(self.directory.glob("[0-9]*.json")):
+            families = own if int(path.stem) == os.getpid() else None
+            snapshots.append((int(path.stem), families or self._read_json(path)))
+        return merge_families(snapshots)
+
+
+class MetricsRegistry:
+    """Metrics and collectors rendered together at ``/metrics``."""
+
+    def __init__(self, multiprocess_dir: str | Path | None = None):
+        """Create an empty registry.
+
+        Args:
+            multiprocess_dir: Shared directory for aggregating the metrics of
+                several worker processes; None serves this process only.
+        """
+        self._metrics: list[_Metric] = []
+        self._collectors: list[Callable[[], Iterable[Family]]] = []
+        self.multiprocess = (
+            MultiProcessFiles(multiprocess_dir, METRICS_FLUSH_SECONDS)
+            if multiprocess_dir
+            else None
+        )
+        if self.multiprocess is not None and hasattr(os, "register_at_fork"):
+            # Values recorded before the fork are the parent's; in every child
+            # they would be counted once more
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self) -> None:
+        for metric in self._metrics:
+            metric.reset()
+
+    def _add(self, metric: _Metric) -> Any:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str, labelnames=()) -> Counter:
+        """Create and register a counter."""
+        return self._add(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames=()) -> Gauge:
+        """Create and register a gauge."""
+        return self._add(Gauge(name, help, labelnames))
+
+    def histogram(
+        self, name: str, help: str, labelnames=(), buckets=STAGE_BUCKETS
+    ) -> LabelledHistogram:
+        """Create and register a labelled histogram."""
+        return self._add(LabelledHistogram(name, help, labelnames, buckets))
+
+    def register_collector(self, collector: Callable[[], Iterable[Family]]) -> None:
+        """Add a callable returning metric families, called on every scrape."""
+        self._collectors.append(collector)
+
+    def collect(self) -> list[Family]:
+        """Return all families; a failing collector is skipped."""
+        families = [metric.collect() for metric in self._metrics]
+        for collector in self._collectors:
+            try:
+                families.extend(collector())
+            except Exception:
+                continue
+        return families
+
+    def start(self) -> None:
+        """Start sharing this process's metrics, in multiprocess mode."""
+        if self.multiprocess is not None:
+            self.multiprocess.start(self.collect)
+
+    def flush(self) -> None:
+        """Write this process's metrics now, in multiprocess mode."""
+        if self.multiprocess is not None:
+            self.multiprocess.write(self.collect())
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format.
+
+        In multiprocess mode these are the metrics of all workers.
+        """
+        families = self.collect()
+        if self.multiprocess is not None:
+            families = self.multiprocess.collect(families)
+        lines = []
+        for family in families:
+            lines.append(f"# HELP {family.name} {family.help}")
+            lines.append(f"# TYPE {family.name} {family.type}")
+            for suffix, labels, value in family.samples:
+                lines.append(_format_sample(family.name + suffix, labels, value))
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry(METRICS_MULTIPROC_DIR or None)
+
+STAGE_SECONDS = metrics.histogram(
+    "emotion_pipeline_stage_seconds",
+    "Duration of media pipeline stages (upload, transcription_wait, "
+    "translation, classification, csv_write).",
+    ["stage"],
+)
+STAGE_BATCH_SIZE = metrics.histogram(
+    "emotion_pipeline_batch_size",
+    "Sentences per translation or classification call of the media pipeline.",
+    ["stage"],
+    buckets=BATCH_BUCKETS,
+)
+HTTP_REQUEST_SECONDS = metrics.histogram(
+    "http_request_duration_seconds",
+    "Time until the response starts, per route template and status.",
+    ["method", "route", "status"],
+    buckets=HTTP_BUCKETS,
+)
+HTTP_IN_PROGRESS = metrics.gauge(
+    "http_requests_in_progress", "Requests currently being handled."
+)
+
+
+def stage_timer(stage: str):
+    """Time a pipeline stage: ``with stage_timer("upload"): ...``."""
+    return STAGE_SECONDS.time(stage)
+
+
+def timed_stage(stage: str, fn: Callable[[list], list]) -> Callable[[list], list]:
+    """Wrap a batched pipeline function to record its duration and batch size."""
+
+    def timed(batch: list, *args, **kwargs) -> list:
+        STAGE_BATCH_SIZE.observe(len(batch), stage)
+        with stage_timer(stage):
+            return fn(batch, *args, **kwargs)
+
+    return timed
+
+
+def collect_caches() -> list[Family]:
+    """Hit/miss counters, hit ratio and size of the prediction/transcript caches."""
+    from app.prediction_cache import cache_stats
+    from app.transcript_cache import transcript_cache
+
+    stats = {**cache_stats(), "transcript": transcript_cache.stats()}
+    hits, misses, ratio, entries = [], [], [], []
+    for name, cache in stats.items():
+        labels = {"cache": name}
+        lookups = cache["hits"] + cache["misses"]
+        hits.append(("", labels, cache["hits"]))
+        misses.append(("", labels, cache["misses"]))
+        ratio.append(("", labels, cache["hits"] / lookups if lookups else 0.0))
+        entries.append(("", labels, cache["entries"]))
+    return [
+        Family("cache_hits_total", "counter", "Cache hits.", hits),
+        Family("cache_misses_total", "counter", "Cache misses.", misses),
+        Family("cache_hit_ratio", "gauge", "Hits per lookup since start.", ratio),
+        Family("cache_entries", "gauge", "Entries currently cached.", entries),
+    ]
+
+
+def collect_models() -> list[Family]:
+    """Load time and readiness of each registered model component."""
+    from models.registry import registry
+
+    load_seconds, loaded = [], []
+    for name, status in registry.status().items():
+        labels = {"component": name}
+        loaded.append(("", labels, status["state"] == "ready"))
+        if status["load_seconds"] is not None:
+            load_seconds.append(("", labels, status["load_seconds"]))
+    return [
+        Family("model_load_seconds", "gauge", "Model load time.", load_seconds),
+        Family("model_loaded", "gauge", "1 if the component is loaded.", loaded),
+    ]
+
+
+def micro_batcher_collector(batcher) -> Callable[[], list[Family]]:
+    """Return a collector for the queue depth and batch sizes of a MicroBatcher."""
+    labels = {"batcher": batcher.name}
+
+    def collect() -> list[Family]:
+        return [
+            Family(
+                "microbatch_queue_depth",
+                "gauge",
+                "Requests waiting to be batched.",
+                [("", labels, batcher.queue_depth)],
+            ),
+            Family(
+                "microbatch_batch_size",
+                "histogram",
+                "Items per dispatched micro-batch.",
+                histogram_samples(batcher.batch_sizes, labels),
+            ),
+            Family(
+                "microbatch_queue_depth_at_dispatch",
+                "histogram",
+                "Queue depth when a micro-batch was dispatched.",
+                histogram_samples(batcher.queue_depths, labels),
+            ),
+        ]
+
+    return collect
+
+
+def job_queue_collector(job_queue) -> Callable[[], list[Family]]:
+    """Return a collector for the number of queued and running background jobs."""
+
+    def collect() -> list[Family]:
+        return [
+            Family(
+                "job_queue_pending",
+                "gauge",
+                "Background jobs queued or running.",
+                [("", {}, job_queue.pending)],
+            )
+        ]
+
+    return collect
+
+
+def azure_client_collector(get_client: Callable[[], Any]) -> Callable:
+    """Return a collector for the Azure endpoint client's latency and counters."""
+
+    def collect() -> list[Family]:
+        client = get_client()
+        latency = client.latency
+        return [
+            Family(
+                "azure_request_duration_seconds",
+                "histogram",
+                "Latency of requests to the Azure ML endpoint.",
+                histogram_samples(latency.histogram),
+            ),
+            Family(
+                "azure_request_errors_total",
+                "counter",
+                "Failed requests to the Azure ML endpoint.",
+                [("", {}, latency.errors)],
+            ),
+            Family(
+                "azure_request_retries_total",
+                "counter",
+                "Requests retried after HTTP 429/503.",
+                [("", {}, latency.retries)],
+            ),
+            Family(
+                "azure_requests_in_flight",
+                "gauge",
+                "Requests to the Azure ML endpoint in flight.",
+                [("", {}, client.in_flight)],
+            ),
+        ]
+
+    return collect
+
+
+def router_collector(router) -> Callable[[], list[Family]]:
+    """Return a collector for the inference router's counters and breaker."""
+    states = ("closed", "half_open", "open")
+
+    def collect() -> list[Family]:
+        stats = router.stats()
+        breaker = stats["breaker"]["state"]
+        return [
+            Family(
+                "inference_router_batches_total",
+                "counter",
+                "Micro-batches per routing outcome.",
+                [("", {"outcome": k}, v) for k, v in stats["counts"].items()],
+            ),
+            Family(
+                "inference_router_breaker_state",
+                "gauge",
+                "1 for the current circuit breaker state.",
+                [("", {"state": s}, s == breaker) for s in states],
+            ),
+            Family(
+                "inference_router_hedge_deadline_seconds",
+                "gauge",
+                "Current hedging deadline.",
+                [("", {}, stats["hedge_deadline_ms"] / 1000)],
+            ),
+        ]
+
+    return collect
+
+
+metrics.register_collector(collect_caches)
+metrics.register_collector(collect_models)
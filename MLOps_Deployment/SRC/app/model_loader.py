@@ -3,15 +3,17 @@ model_loader.py
 ---------------
 Loads the fine-tuned transformer model, tokenizer, and label encoder
 used for emotion classification.
+
+Nothing is loaded at import time: :func:`get_model_components` loads the
+checkpoint on its first call and returns the same objects afterwards.
 """
 
 import logging
 import os
 import pickle
+import threading
 from pathlib import Path
 
-from transformers import RobertaForSequenceClassification, RobertaTokenizer
-
 # Enable mock mode when building documentation (e.g., with Sphinx)
 MOCK_MODE = os.getenv("SPHINX_MOCK_MODE") == "1"
 
@@ -19,13 +21,29 @@ MOCK_MODE = os.getenv("SPHINX_MOCK_MODE") == "1"
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-if not MOCK_MODE:
-    # Resolve base directory of the project (fallback to ../../ if BASE_DIR not set)
-    BASE_DIR = Path(os.getenv("BASE_DIR", Path(__file__).resolve().parents[2]))
+# Resolve base directory of the project (fallback to ../../ if BASE_DIR not set)
+BASE_DIR = Path(os.getenv("BASE_DIR", Path(__file__).resolve().parents[2]))
+
+# Define paths using pathlib
+MODEL_DIR = BASE_DIR / "src" / "checkpoint-3906"
+LABEL_ENCODER_PATH = BASE_DIR / "src" / "models" / "label_encoder.pkl"
+
+_components = None
+_components_lock = threading.Lock()
 
-    # Define paths using pathlib
-    MODEL_DIR = BASE_DIR / "src" / "checkpoint-3906"
-    LABEL_ENCODER_PATH = BASE_DIR / "src" / "models" / "label_encoder.pkl"
+
+def load_model_components() -> tuple:
+    """Load the fine-tuned model, tokenizer, and label encoder from disk.
+
+    Returns:
+        tuple: ``(model, tokenizer, label_encoder)``.
+
+    Raises:
+        FileNotFoundError: If the checkpoint or the label encoder is missing.
+    """
+    from transformers import RobertaForSequenceClassification, RobertaTokenizer
+
+    from models.weights import load_pretrained
 
     # Validate paths
     if not MODEL_DIR.exists():
@@ -36,26 +54,31 @@ if not MOCK_MODE:
     logger.info(f"Loading model from: {MODEL_DIR}")
     logger.info(f"Loading label encoder from: {LABEL_ENCODER_PATH}")
 
-    # Load model and tokenizer
-    model = RobertaForSequenceClassification.from_pretrained(MODEL_DIR)
+    # Load model (memory-mapped from model.safetensors) and tokenizer
+    model = load_pretrained(MODEL_DIR, RobertaForSequenceClassification)
     tokenizer = RobertaTokenizer.from_pretrained(MODEL_DIR)
 
     # Load label encoder
     with open(LABEL_ENCODER_PATH, "rb") as f:
         label_encoder = pickle.load(f)
-else:
-    model = tokenizer = label_encoder = None
+    return model, tokenizer, label_encoder
 
 
-def get_model_components() -> (
-    tuple[RobertaForSequenceClassification, RobertaTokenizer, object]
-):
+def get_model_components() -> tuple:
     """Return the fine-tuned model, tokenizer, and label encoder.
 
+    They are loaded on the first call (None in mock mode).
+
     Returns:
         tuple: A tuple containing:
             - model (RobertaForSequenceClassification): The fine-tuned transformer model.
             - tokenizer (RobertaTokenizer): Tokenizer for the model.
             - label_encoder (object): Fitted label encoder for decoding prediction indices.
     """
-    return model, tokenizer, label_encoder
+    global _components
+    if MOCK_MODE:
+        return None, None, None
+    with _components_lock:
+        if _components is None:
+            _components = load_model_components()
+        return _components
@@ -0,0 +1,327 @@
+"""
+pipeline.py
+-----------
+Streaming translation → classification pipeline for transcript sentences.
+
+Instead of translating every sentence and only then classifying all of them,
+sentences flow through two concurrent stages connected by bounded queues:
+
+    sentences ──▶ [translate, batches of N] ──▶ [classify, batches of M] ──▶ results
+
+Each stage starts as soon as the first item arrives, so classification starts
+while later sentences are still being translated. Whenever a stage has room
+for more model calls, it takes everything queued (up to ``PIPELINE_BUCKET_WINDOW``
+items), sorts it by length and cuts the sorted list into batches, as the
+whole-transcript length bucketing does (``utils/batching.py``), so batches need
+little padding. Up to one batch per pool thread is in flight per stage.
+Results are yielded in input order as they complete. The bounded queues apply
+backpressure to a fast producer.
+
+Model calls run on one thread pool per stage, shared by all requests, so the
+translator and the classifier (which release the GIL inside PyTorch) keep
+separate cores busy and each model sees a bounded number of concurrent calls.
+"""
+
+import os
+import queue
+import sys
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Iterable, Iterator, Optional
+
+from utils.batching import length_bucketed_batches
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+PIPELINE_TRANSLATE_BATCH = int(os.getenv("PIPELINE_TRANSLATE_BATCH", "16"))
+PIPELINE_CLASSIFY_BATCH = int(os.getenv("PIPELINE_CLASSIFY_BATCH", "32"))
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "256"))
+PIPELINE_TRANSLATE_WORKERS = int(os.getenv("PIPELINE_TRANSLATE_WORKERS", "1"))
+PIPELINE_CLASSIFY_WORKERS = int(os.getenv("PIPELINE_CLASSIFY_WORKERS", "1"))
+PIPELINE_BUCKET_WINDOW = int(os.getenv("PIPELINE_BUCKET_WINDOW", "128"))
+
+_DONE = object()
+
+
+class _Failed:
+    """Marks a stage failure travelling down the queues."""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class SentencePipeline:
+    """Overlapping translate and classify stages over a stream of sentences."""
+
+    def __init__(
+        self,
+        translate_fn: Callable[[list[str], str], list[str]],
+        classify_fn: Callable[[list[str]], list[tuple[str, float]]],
+        translate_batch: int = PIPELINE_TRANSLATE_BATCH,
+        classify_batch: int = PIPELINE_CLASSIFY_BATCH,
+        queue_size: int = PIPELINE_QUEUE_SIZE,
+        translate_workers: int = PIPELINE_TRANSLATE_WORKERS,
+        classify_workers: int = PIPELINE_CLASSIFY_WORKERS,
+        bucket_window: int = PIPELINE_BUCKET_WINDOW,
+    ):
+        """Create the pipeline and its per-stage thread pools.
+
+        Args:
+            translate_fn (Callable): ``(texts, lang_code) -> translations``.
+            classify_fn (Callable): ``texts -> [(label, confidence), ...]``.
+            translate_batch (int, optional): Maximum sentences per translation call.
+            classify_batch (int, optional): Maximum sentences per classifier call.
+            queue_size (int, optional): Capacity of each inter-stage queue.
+            translate_workers (int, optional): Threads for translation calls.
+            classify_workers (int, optional): Threads for classifier calls.
+            bucket_window (int, optional): Most queued items a stage sorts by
+                length at once; at least one batch. Larger windows pad less
+                but may delay the first results.
+        """
+        self.translate_fn = translate_fn
+        self.classify_fn = classify_fn
+        self.translate_batch = translate_batch
+        self.classify_batch = classify_batch
+        self.queue_size = queue_size
+        self.translate_workers = max(1, translate_workers)
+        self.classify_workers = max(1, classify_workers)
+        self.bucket_window = bucket_window
+        self._translate_pool = ThreadPoolExecutor(
+            self.translate_workers, thread_name_prefix="pipeline-translate"
+        )
+        self._classify_pool = ThreadPoolExecutor(
+            self.classify_workers, thread_name_prefix="pipeline-classify"
+        )
+
+    def run(
+        self,
+        texts: Iterable[str],
+        lang_code: str,
+        on_stage: Optional[Callable[[str], None]] = None,
+    ) -> Iterator[tuple[str, str, tuple[str, float]]]:
+        """Translate and classify sentences, yielding results in input order.
+
+        Args:
+            texts (Iterable[str]): Sentences; may be a lazy iterator.
+            lang_code (str): Language of the sentences, passed to ``translate_fn``.
+            on_stage (Callable[[str], None], optional): Called with "translating"
+                and "classifying" when each stage processes its first batch.
+
+        Yields:
+            tuple: ``(text, translation, (label, confidence))`` per sentence.
+
+        Raises:
+            Exception: The first error raised by a stage; remaining work is
+            abandoned.
+        """
+        on_stage = on_stage or (lambda stage: None)
+        to_translate = queue.Queue(self.queue_size)
+        to_classify = queue.Queue(self.queue_size)
+        results = queue.Queue(self.queue_size)
+        abort = threading.Event()
+
+        def translate(batch: list[str]) -> list[tuple[str, str]]:
+            return list(zip(batch, self.translate_fn(batch, lang_code)))
+
+        def classify(batch: list[tuple[str, str]]) -> list:
+            predictions = self.classify_fn([translated for _, translated in batch])
+            return [(text, tr, pred) for (text, tr), pred in zip(batch, predictions)]
+
+        threads = [
+            threading.Thread(
+                target=self._feed,
+                args=(texts, to_translate, abort),
+                name="pipeline-feed",
+                daemon=True,
+            ),
+            threading.Thread(
+                target=self._stage,
+                args=(
+                    translate,
+                    self._translate_pool,
+                    self.translate_workers,
+                    self.translate_batch,
+                    len,
+                    to_translate,
+                    to_classify,
+                    abort,
+                    lambda: on_stage("translating"),
+                ),
+                name="pipeline-translate-driver",
+                daemon=True,
+            ),
+            threading.Thread(
+                target=self._stage,
+                args=(
+                    classify,
+                    self._classify_pool,
+                    self.classify_workers,
+                    self.classify_batch,
+                    lambda item: len(item[1]),  # length of the translation
+                    to_classify,
+                    results,
+                    abort,
+                    lambda: on_stage("classifying"),
+                ),
+                name="pipeline-classify-driver",
+                daemon=True,
+            ),
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            # Items travel as (input index, value); restore the input order
+            waiting: dict[int, tuple] = {}
+            next_index = 0
+            while True:
+                item = results.get()
+                if item is _DONE:
+                    return
+                if isinstance(item, _Failed):
+                    raise item.error
+                index, value = item
+                waiting[index] = value
+                while next_index in waiting:
+                    yield waiting.pop(next_index)
+                    next_index += 1
+        finally:
+            # Also reached when the consumer stops early (e.g. a client hangs up)
+            abort.set()
+
+    @staticmethod
+    def _put(q: queue.Queue, item, abort: threading.Event) -> bool:
+        """Put with backpressure; give up once the run is aborted."""
+        while not abort.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _feed(
+        self, texts: Iterable[str], out: queue.Queue, abort: threading.Event
+    ) -> None:
+        """Push the input sentences, tagged with their index, into the first queue."""
+        try:
+            for item in enumerate(texts):
+                if not self._put(out, item, abort):
+                    return
+        except Exception as e:
+            self._put(out, _Failed(e), abort)
+            return
+        self._put(out, _DONE, abort)
+
+    def _stage(
+        self,
+        fn: Callable[[list], list],
+        pool: ThreadPoolExecutor,
+        workers: int,
+        batch_size: int,
+        length: Callable[[object], int],
+        inbox: queue.Queue,
+        outbox: queue.Queue,
+        abort: threading.Event,
+        on_first_batch: Callable[[], None],
+    ) -> None:
+        """Drive one stage: bucket items from ``inbox``, run ``fn`` on ``pool``.
+
+        Keeps up to ``workers`` batches in flight. Whenever there is room for
+        another batch and none is waiting, everything queued is bucketed
+        (:meth:`_bucket`); while all slots are busy, items keep queueing, so
+        the next window is larger and sorts better.
+        """
+        batches: deque[list] = deque()
+        running: dict[Future, list] = {}
+        end = None
+        started = False
+        window = max(batch_size, self.bucket_window)
+        while not abort.is_set():
+            if end is None and not batches and len(running) < workers:
+                # Block for input only when there is nothing else to wait for
+                items, end = self._take_window(inbox, window, abort, not running)
+                batches.extend(self._bucket(items, batch_size, length))
+            while batches and len(running) < workers:
+                if not started:
+                    started = True
+                    on_first_batch()
+                batch = batches.popleft()
+                running[pool.submit(fn, [value for _, value in batch])] = batch
+            if isinstance(end, _Failed) or (end is _DONE and not running):
+                self._put(outbox, end, abort)
+                return
+            if not running:
+                continue
+            can_take_more = end is None and len(running) < workers
+            done, _ = wait(
+                running,
+                timeout=0.01 if can_take_more else 0.1,
+                return_when=FIRST_COMPLETED,
+            )
+            for future in done:
+                batch = running.pop(future)
+                try:
+                    outputs = future.result()
+                except Exception as e:
+                    logger.error(f"Pipeline stage failed: {e}")
+                    self._put(outbox, _Failed(e), abort)
+                    return
+                for (index, _), output in zip(batch, outputs):
+                    if not self._put(outbox, (index, output), abort):
+                        return
+
+    @staticmethod
+    def _take_window(
+        inbox: queue.Queue, window: int, abort: threading.Event, block: bool
+    ) -> tuple[list, Optional[object]]:
+        """Take up to ``window`` queued items, optionally waiting for the first.
+
+        Returns:
+            tuple: The items and the end marker (``_DONE`` or ``_Failed``) if
+            one was reached, else None.
+        """
+        items: list = []
+        while block and not abort.is_set():
+            try:
+                item = inbox.get(timeout=0.1)
+                break
+            except queue.Empty:
+                continue
+        else:
+            try:
+                item = inbox.get_nowait()
+            except queue.Empty:
+                return items, None
+        while True:
+            if item is _DONE or isinstance(item, _Failed):
+                return items, item
+            items.append(item)
+            if len(items) >= window:
+                return items, None
+            try:
+                item = inbox.get_nowait()
+            except queue.Empty:
+                return items, None
+
+    @staticmethod
+    def _bucket(
+        items: list, batch_size: int, length: Callable[[object], int]
+    ) -> list[list]:
+        """Sort ``(index, value)`` items by length and cut them into batches.
+
+        Length is measured in characters, a cheap proxy for tokens. Batches
+        are returned in order of their earliest input index, so the results
+        the consumer is waiting for come first.
+        """
+        lengths = [length(value) for _, value in items]
+        groups = length_bucketed_batches(lengths, sys.maxsize, batch_size)
+        batches = [[items[i] for i in group] for group in groups]
+        return sorted(batches, key=lambda batch: min(index for index, _ in batch))
+
+    def shutdown(self) -> None:
+        """Stop the per-stage thread pools."""
+        self._translate_pool.shutdown(wait=False, cancel_futures=True)
+        self._classify_pool.shutdown(wait=False, cancel_futures=True)
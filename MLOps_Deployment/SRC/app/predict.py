@@ -5,27 +5,39 @@ Handles audio transcription, emotion inference, and CSV generation.
 
 This module connects to the AssemblyAI API to transcribe audio, translates
 Polish sentences if necessary, performs emotion classification using a
-preloaded model, and exports the results to CSV files.
+lazily loaded model (see :mod:`models.registry`), and exports the results to
+CSV files.
 """
 
+import asyncio
 import logging
 import os
-import time
 from pathlib import Path
+from typing import Callable, Iterator, Optional
 
 import pandas as pd
-import requests
 from dotenv import load_dotenv
 
-from app.inference import classify_emotion, translate_if_needed
+from app.inference import (
+    classify_emotion,
+    classify_emotions_batch,
+    translate_batch_if_needed,
+)
+from app.metrics import stage_timer, timed_stage
+from app.pipeline import SentencePipeline
+from app.results import new_result_id, result_store
+from app.transcript_cache import transcript_cache
+from transcription.assemblyai_client import get_client
 
 # MOCK_MODE disables model and API execution for documentation builds (e.g., Sphinx)
 MOCK_MODE = os.getenv("SPHINX_MOCK_MODE") == "1"
 
 if not MOCK_MODE:
-    from app.model_loader import get_model_components
-
-    model, tokenizer, label_encoder = get_model_components()
+    # Translation and classification run as overlapping, batched stages
+    sentence_pipeline = SentencePipeline(
+        timed_stage("translation", translate_batch_if_needed),
+        timed_stage("classification", classify_emotions_batch),
+    )
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -33,9 +45,16 @@ logging.basicConfig(level=logging.INFO)
 # Load environment variables from .env
 load_dotenv()
 
-# AssemblyAI setup
-ASSEMBLYAI_API_KEY = os.getenv("ASSEMBLYAI_API_KEY")
-HEADERS = {"authorization": ASSEMBLYAI_API_KEY}
+MOCK_RESULT = [
+    {
+        "Start Time": "00:00:00,000",
+        "End Time": "00:00:02,000",
+        "Sentence": "This is a mock sentence.",
+        "Translation": "This is a mock sentence.",
+        "Emotion": "neutral",
+        "Confidence (%)": 0.0,
+    }
+]
 
 
 def get_output_paths(
@@ -60,9 +79,8 @@ def get_output_paths(
         elif loc == "downloads":
             paths.append(Path.home() / "Downloads" / filename)
         elif loc == "output":
-            output_dir = Path("output")
-            output_dir.mkdir(exist_ok=True)
-            paths.append(output_dir / filename)
+            result_store.root.mkdir(parents=True, exist_ok=True)
+            paths.append(result_store.root / filename)
 
     return paths
 
@@ -85,6 +103,9 @@ def format_time(ms: int) -> str:
 def upload_audio(audio_url: str, language: str = "auto") -> tuple[str, str]:
     """Uploads audio to AssemblyAI for transcription.
 
+    Blocks the calling thread until the transcript is ready; async code should
+    await :meth:`AssemblyAIClient.transcribe` instead.
+
     Args:
         audio_url (str): The URL of the audio file to transcribe.
         language (str, optional): Language code ('pl', 'en', or 'auto').
@@ -96,28 +117,9 @@ def upload_audio(audio_url: str, language: str = "auto") -> tuple[str, str]:
     if MOCK_MODE:
         return "en", "mock_id"
 
-    response = requests.post(
-        "https://api.assemblyai.com/v2/transcript",
-        headers=HEADERS,
-        json={
-            "audio_url": audio_url,
-            "language_code": language if language in ["pl", "en"] else None,
-            "language_detection": language == "auto",
-            "punctuate": True,
-            "format_text": True,
-        },
-    )
-    response.raise_for_status()
-    transcript_id = response.json()["id"]
-
-    poll_url = f"https://api.assemblyai.com/v2/transcript/{transcript_id}"
-    while True:
-        result = requests.get(poll_url, headers=HEADERS).json()
-        if result["status"] == "completed":
-            return result["language_code"], transcript_id
-        if result["status"] == "error":
-            raise RuntimeError(result["error"])
-        time.sleep(5)
+    client = get_client()
+    transcript = client.run_sync(client.transcribe(audio_url, language))
+    return transcript["language_code"], transcript["id"]
 
 
 def get_sentences(transcript_id: str) -> list[dict]:
@@ -131,72 +133,246 @@ def get_sentences(transcript_id: str) -> list[dict]:
     """
     if MOCK_MODE:
         return [{"start": 0, "end": 2000, "text": "This is a mock sentence."}]
-    url = f"https://api.assemblyai.com/v2/transcript/{transcript_id}/sentences"
-    response = requests.get(url, headers=HEADERS)
-    response.raise_for_status()
-    return response.json()["sentences"]
+    client = get_client()
+    return client.run_sync(client.sentences(transcript_id))
+
+
+def iter_sentence_predictions(
+    sentences: list[dict],
+    lang_code: str,
+    on_stage: Optional[Callable[[str], None]] = None,
+) -> Iterator[dict]:
+    """Translate and classify transcript sentences, yielding rows as they finish.
+
+    Sentences flow through the overlapping translation and classification
+    stages of :class:`app.pipeline.SentencePipeline`, so the first rows are
+    available long before the whole transcript has been processed.
+
+    Args:
+        sentences (list[dict]): AssemblyAI sentences (text, start, end).
+        lang_code (str): Detected transcript language.
+        on_stage (Callable[[str], None], optional): Progress callback.
+
+    Yields:
+        dict: One result row per sentence, in transcript order.
+    """
+    outputs = sentence_pipeline.run(
+        (s["text"] for s in sentences), lang_code, on_stage=on_stage
+    )
+    for s, (original, translated, (emotion, confidence)) in zip(sentences, outputs):
+        logging.debug(f"Original sentence: {original}")
+        if translated != original:
+            logging.debug(f"Translated to English: {translated}")
+        logging.debug(f"Predicted Emotion: {emotion} ({confidence}%)")
+
+        yield {
+            "Start Time": format_time(s["start"]),
+            "End Time": format_time(s["end"]),
+            "Sentence": original,
+            "Translation": translated,
+            "Emotion": emotion,
+            "Confidence (%)": confidence,
+        }
+
+
+def _predict_sentences(
+    sentences: list[dict], lang_code: str, on_stage: Callable[[str], None]
+) -> list[dict]:
+    """Translate and classify transcript sentences.
+
+    Args:
+        sentences (list[dict]): AssemblyAI sentences (text, start, end).
+        lang_code (str): Detected transcript language.
+        on_stage (Callable[[str], None]): Progress callback.
+
+    Returns:
+        list[dict]: One result row per sentence.
+    """
+    return list(iter_sentence_predictions(sentences, lang_code, on_stage))
+
+
+def save_results(
+    results: list[dict], save_to: str = None, result_id: Optional[str] = None
+) -> dict:
+    """Write prediction rows to CSV and return them with the CSV paths.
+
+    The CSV (plus any extra ``RESULT_FORMATS``) is always stored in the
+    result store under ``result_id``, so it can be downloaded until it
+    expires; ``save_to`` adds CSV copies on the Desktop or in Downloads.
+
+    Args:
+        results (list[dict]): Prediction rows.
+        save_to (str, optional): CSV save location(s), see :func:`get_output_paths`.
+        result_id (str, optional): Request or job ID; a new one if omitted.
+
+    Returns:
+        dict: Results, result ID and CSV paths (the stored result first).
+    """
+    result_id = result_id or new_result_id()
+    df = pd.DataFrame(results)
+    with stage_timer("csv_write"):
+        stored = result_store.save(df, result_id)[0]
+        csv_paths = [stored]
+        for path in get_output_paths(stored.name, save_to=save_to):
+            if path != stored:
+                df.to_csv(path, index=False)
+                csv_paths.append(path)
+    logging.info(f"CSV saved to: {', '.join(map(str, csv_paths))}")
+
+    return {
+        "results": results,
+        "result_id": result_id,
+        "csv_paths": [str(p) for p in csv_paths],
+    }
+
+
+def _cached_transcript(cache_key: Optional[str]) -> Optional[tuple[str, list]]:
+    """Return ``(language_code, sentences)`` from the transcript cache, if any."""
+    entry = transcript_cache.get(cache_key) if cache_key else None
+    if entry is None:
+        return None
+    return entry["language_code"], entry["sentences"]
+
+
+def _check_audio_url(audio_url: Optional[str], cache_key: Optional[str]) -> None:
+    """Fail clearly when a cache hit was expected but the entry is gone."""
+    if audio_url is None:
+        raise RuntimeError(
+            f"Cached transcript {cache_key} is no longer available; "
+            "please submit the media again."
+        )
 
 
 def process_audio_prediction(
-    audio_url: str, save_to: str = None, language: str = "auto"
+    audio_url: Optional[str],
+    save_to: str = None,
+    language: str = "auto",
+    on_stage: Optional[Callable[[str], None]] = None,
+    cache_key: Optional[str] = None,
+    result_id: Optional[str] = None,
 ) -> dict:
     """Transcribes audio, classifies emotions, and saves results to CSV.
 
     Args:
-        audio_url (str): Audio file URL.
+        audio_url (str | None): Audio file URL. May be None when the
+            transcript for ``cache_key`` is already cached.
         save_to (str, optional): CSV save location(s).
         language (str, optional): Language code.
+        on_stage (Callable[[str], None], optional): Called with "transcribing",
+            "translating" and "classifying" as the pipeline progresses.
+        cache_key (str, optional): Transcript cache key (see
+            :mod:`app.transcript_cache`). A cached transcript is reused instead
+            of calling AssemblyAI, and new transcripts are stored under it.
+        result_id (str, optional): Request or job ID the CSV is stored under;
+            a new one if omitted.
 
     Returns:
-        dict: Results and CSV paths.
+        dict: Results, result ID and CSV paths.
     """
     if MOCK_MODE:
-        mock_result = [
-            {
-                "Start Time": "00:00:00,000",
-                "End Time": "00:00:02,000",
-                "Sentence": "This is a mock sentence.",
-                "Translation": "This is a mock sentence.",
-                "Emotion": "neutral",
-                "Confidence (%)": 0.0,
-            }
-        ]
-        return {"results": mock_result, "csv_paths": ["/mock/path"]}
-
-    lang_code, transcript_id = upload_audio(audio_url, language)
-    sentences = get_sentences(transcript_id)
-
-    results = []
-    for s in sentences:
-        original = s["text"]
-        logging.info(f"Original sentence: {original}")
-
-        translated = translate_if_needed(original, lang_code)
-        if translated != original:
-            logging.info(f"Translated to English: {translated}")
-
-        emotion, confidence = classify_emotion(translated)
-        logging.info(f"Predicted Emotion: {emotion} ({confidence}%)")
-
-        results.append(
-            {
-                "Start Time": format_time(s["start"]),
-                "End Time": format_time(s["end"]),
-                "Sentence": original,
-                "Translation": translated,
-                "Emotion": emotion,
-                "Confidence (%)": confidence,
-            }
+        return {
+            "results": MOCK_RESULT,
+            "result_id": result_id,
+            "csv_paths": ["/mock/path"],
+        }
+
+    on_stage = on_stage or (lambda stage: None)
+
+    on_stage("transcribing")
+    cached = _cached_transcript(cache_key)
+    if cached:
+        lang_code, sentences = cached
+    else:
+        _check_audio_url(audio_url, cache_key)
+        with stage_timer("transcription_wait"):
+            lang_code, transcript_id = upload_audio(audio_url, language)
+            sentences = get_sentences(transcript_id)
+        if cache_key:
+            transcript_cache.put(
+                cache_key, lang_code, sentences, transcript_id=transcript_id
+            )
+
+    results = _predict_sentences(sentences, lang_code, on_stage)
+    return save_results(results, save_to, result_id)
+
+
+async def transcribe_async(
+    audio_url: Optional[str], language: str = "auto", cache_key: Optional[str] = None
+) -> tuple[str, list[dict]]:
+    """Return the detected language and sentences of an audio URL.
+
+    A cached transcript is reused when available; otherwise the audio is
+    transcribed on the shared AssemblyAI client and stored under ``cache_key``.
+
+    Args:
+        audio_url (str | None): Audio file URL; may be None on a cache hit.
+        language (str, optional): Language code.
+        cache_key (str, optional): Transcript cache key.
+
+    Returns:
+        tuple[str, list[dict]]: Language code and sentences (text, start, end).
+    """
+    cached = await asyncio.to_thread(_cached_transcript, cache_key)
+    if cached:
+        return cached
+
+    _check_audio_url(audio_url, cache_key)
+    client = get_client()
+    with stage_timer("transcription_wait"):
+        transcript = await client.transcribe(audio_url, language)
+        sentences = await client.sentences(transcript["id"])
+    lang_code = transcript["language_code"]
+    if cache_key:
+        await asyncio.to_thread(
+            transcript_cache.put,
+            cache_key,
+            lang_code,
+            sentences,
+            transcript_id=transcript["id"],
         )
+    return lang_code, sentences
 
-    df = pd.DataFrame(results)
-    csv_path = get_output_paths("final_predictions.csv", save_to=save_to)
 
-    for path in csv_path:
-        df.to_csv(path, index=False)
-        logging.info(f"CSV saved to: {path}")
+async def process_audio_prediction_async(
+    audio_url: Optional[str],
+    save_to: str = None,
+    language: str = "auto",
+    on_stage: Optional[Callable[[str], None]] = None,
+    cache_key: Optional[str] = None,
+    result_id: Optional[str] = None,
+) -> dict:
+    """Async variant of :func:`process_audio_prediction`.
+
+    Transcription is awaited on the shared AssemblyAI client, so no thread is
+    held while polling; translation and classification run in a worker thread.
+
+    Args:
+        audio_url (str): Audio file URL.
+        save_to (str, optional): CSV save location(s).
+        language (str, optional): Language code.
+        on_stage (Callable[[str], None], optional): Progress callback.
+        cache_key (str, optional): Transcript cache key.
+        result_id (str, optional): Request or job ID the CSV is stored under.
+
+    Returns:
+        dict: Results, result ID and CSV paths.
+    """
+    if MOCK_MODE:
+        return {
+            "results": MOCK_RESULT,
+            "result_id": result_id,
+            "csv_paths": ["/mock/path"],
+        }
 
-    return {"results": results, "csv_paths": [str(p) for p in csv_path]}
+    on_stage = on_stage or (lambda stage: None)
+
+    on_stage("transcribing")
+    lang_code, sentences = await transcribe_async(audio_url, language, cache_key)
+
+    results = await asyncio.to_thread(
+        _predict_sentences, sentences, lang_code, on_stage
+    )
+    return await asyncio.to_thread(save_results, results, save_to, result_id)
 
 
 def predict_label(text: str) -> dict:
@@ -218,16 +394,67 @@ def predict_label(text: str) -> dict:
     return {"predicted_label": label, "confidence": confidence}
 
 
-def run_full_pipeline(audio_url: str, save_to: str = None, language: str = "auto"):
+def run_full_pipeline(
+    audio_url: Optional[str],
+    save_to: str = None,
+    language: str = "auto",
+    on_stage: Optional[Callable[[str], None]] = None,
+    cache_key: Optional[str] = None,
+    result_id: Optional[str] = None,
+):
     """Runs the pipeline and saves results to CSV.
 
     Args:
         audio_url (str): URL of the audio file to process.
         save_to (str, optional): Location(s) to save the CSV file.
         language (str, optional): Language code for transcription.
+        on_stage (Callable[[str], None], optional): Progress callback, see
+            :func:`process_audio_prediction`.
+        cache_key (str, optional): Transcript cache key, see
+            :func:`process_audio_prediction`.
+        result_id (str, optional): Request or job ID the CSV is stored under.
 
     Returns:
         tuple: DataFrame of results and list of CSV file paths.
     """
-    result = process_audio_prediction(audio_url, save_to=save_to, language=language)
+    result = process_audio_prediction(
+        audio_url,
+        save_to=save_to,
+        language=language,
+        on_stage=on_stage,
+        cache_key=cache_key,
+        result_id=result_id,
+    )
+    return pd.DataFrame(result["results"]), result["csv_paths"]
+
+
+async def run_full_pipeline_async(
+    audio_url: Optional[str],
+    save_to: str = None,
+    language: str = "auto",
+    on_stage: Optional[Callable[[str], None]] = None,
+    cache_key: Optional[str] = None,
+    result_id: Optional[str] = None,
+):
+    """Async variant of :func:`run_full_pipeline` for FastAPI endpoints.
+
+    Args:
+        audio_url (str): URL of the audio file to process.
+        save_to (str, optional): Location(s) to save the CSV file.
+        language (str, optional): Language code for transcription.
+        on_stage (Callable[[str], None], optional): Progress callback.
+        cache_key (str, optional): Transcript cache key.
+        result_id (str, optional): Request or job ID the CSV is stored under.
+
+    Returns:
+        tuple: DataFrame of results and list of CSV file paths.
+    """
+    result = await process_audio_prediction_async(
+        audio_url,
+        save_to=save_to,
+        language=language,
+        on_stage=on_stage,
+        cache_key=cache_key,
+        result_id=result_id,
+    )
     return pd.DataFrame(result["results"]), result["csv_paths"]
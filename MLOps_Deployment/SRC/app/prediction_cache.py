@@ -0,0 +1,231 @@
+"""
+prediction_cache.py
+-------------------
+Sentence-level caches for emotion classification, translation and Azure
+predictions.
+
+Transcripts and the Gradio UI send the same short texts over and over
+("Yeah.", "Okay.", "What?"). Each cache keeps recent results in an in-memory
+LRU and, if ``PREDICTION_CACHE_DB`` is set, also in a SQLite file that
+survives restarts. Keys are the normalized text plus a model version; when the
+version of the loaded model changes, entries of the previous version are
+dropped from memory and from disk.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from utils.logger import get_logger
+from utils.process_local import ProcessLocal
+
+logger = get_logger(__name__)
+
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "10000"))
+PREDICTION_CACHE_DB = os.getenv("PREDICTION_CACHE_DB", "")
+
+_MISSING = object()
+
+
+def normalize_text(text: str) -> str:
+    """Normalize a sentence for use as a cache key.
+
+    Applies Unicode NFC normalization and collapses runs of whitespace. Case
+    and punctuation are kept because the classifier is sensitive to both.
+    """
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def checkpoint_version(*paths: str | Path) -> str:
+    """Fingerprint model files by name, size and modification time.
+
+    Directories are expanded to the files they contain, so retraining or
+    replacing a checkpoint yields a new version without hashing the weights.
+
+    Args:
+        *paths (str | Path): Checkpoint directories or files.
+
+    Returns:
+        str: Short hex digest identifying the checkpoint.
+    """
+    sha = hashlib.sha256()
+    for path in map(Path, paths):
+        files = sorted(path.rglob("*")) if path.is_dir() else [path]
+        for file in files:
+            if file.is_file():
+                stat = file.stat()
+                sha.update(f"{file.name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return sha.hexdigest()[:16]
+
+
+class PredictionCache:
+    """LRU cache of per-text results with an optional SQLite backing store."""
+
+    def __init__(
+        self,
+        namespace: str,
+        max_entries: int = PREDICTION_CACHE_SIZE,
+        db_path: Optional[str] = PREDICTION_CACHE_DB,
+    ):
+        """Create the cache.
+
+        Args:
+            namespace (str): Name of the cached function; separates caches that
+                share a database file.
+            max_entries (int, optional): Entries kept in memory; 0 disables
+                the cache.
+            db_path (str, optional): SQLite file for persistent entries. Empty
+                or None keeps the cache in memory only.
+        """
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.version = ""
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self.db_path = db_path if db_path and self.enabled else None
+        # One connection per process, opened on first use (see ProcessLocal)
+        self._connection = ProcessLocal(self._connect) if self.db_path else None
+
+    @property
+    def _db(self) -> Optional[sqlite3.Connection]:
+        """SQLite connection of the current process, or None without a file."""
+        return self._connection.get() if self._connection is not None else None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database file and create the table if needed."""
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS predictions ("
+            "namespace TEXT, version TEXT, text TEXT, value TEXT, "
+            "PRIMARY KEY (namespace, version, text))"
+        )
+        conn.commit()
+        return conn
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the cache stores and returns entries."""
+        return self.max_entries > 0
+
+    def set_version(self, version: str) -> None:
+        """Set the model version; entries of any other version are dropped.
+
+        Args:
+            version (str): Identifier of the loaded model, e.g. from
+                :func:`checkpoint_version`.
+        """
+        with self._lock:
+            if version == self.version:
+                return
+            if self.version:
+                logger.info(
+                    f"{self.namespace} model changed ({self.version} -> {version}), "
+                    "invalidating cached predictions"
+                )
+            self.version = version
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute(
+                    "DELETE FROM predictions WHERE namespace = ? AND version != ?",
+                    (self.namespace, version),
+                )
+                self._db.commit()
+
+    def get(self, text: str, default: Any = None) -> Any:
+        """Return the cached result for ``text``, or ``default`` on a miss."""
+        if not self.enabled:
+            return default
+        key = normalize_text(text)
+        with self._lock:
+            value = self._entries.get(key, _MISSING)
+            if value is _MISSING and self._db is not None:
+                row = self._db.execute(
+                    "SELECT value FROM predictions "
+                    "WHERE namespace = ? AND version = ? AND text = ?",
+                    (self.namespace, self.version, key),
+                ).fetchone()
+                if row is not None:
+                    value = json.loads(row[0])
+                    self._remember(key, value)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, text: str, value: Any) -> None:
+        """Store the result for ``text``; ``value`` must be JSON-serializable."""
+        self.put_many([(text, value)])
+
+    def put_many(self, items: Iterable[tuple[str, Any]]) -> None:
+        """Store several ``(text, value)`` results in one transaction."""
+        if not self.enabled:
+            return
+        items = [(normalize_text(text), value) for text, value in items]
+        with self._lock:
+            for key, value in items:
+                self._remember(key, value)
+            if self._db is not None and items:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?)",
+                    [
+                        (self.namespace, self.version, key, json.dumps(value))
+                        for key, value in items
+                    ],
+                )
+                self._db.commit()
+
+    def _remember(self, key: str, value: Any) -> None:
+        """Insert into the in-memory LRU, evicting the oldest entry if full."""
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all entries of this cache from memory and disk."""
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute(
+                    "DELETE FROM predictions WHERE namespace = ?", (self.namespace,)
+                )
+                self._db.commit()
+
+    def stats(self) -> dict:
+        """Return hit/miss counters, hit rate and size of the cache."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "version": self.version,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "persistent": self._connection is not None,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+emotion_cache = PredictionCache("emotion")
+translation_cache = PredictionCache("translation")
+azure_cache = PredictionCache("azure")
+
+
+def cache_stats() -> dict:
+    """Return the statistics of all prediction caches, keyed by namespace."""
+    return {
+        cache.namespace: cache.stats()
+        for cache in (emotion_cache, translation_cache, azure_cache)
+    }
@@ -0,0 +1,290 @@
+"""
+results.py
+----------
+Per-request result files with TTL-based cleanup, and file downloads with
+ETag and Range support.
+
+Every prediction request (or background job) writes its CSV under its own ID,
+e.g. ``output/predictions_<result_id>.csv``, so concurrent requests never
+overwrite each other and a download link always serves the result it was
+issued for. ``RESULT_FORMATS`` adds Parquet and/or Arrow copies of each
+result next to the CSV (see :mod:`utils.result_io`). Result files older than
+``RESULT_TTL_SECONDS`` are deleted by a periodic sweep, which also clears
+stale files from ``temp_uploads/``.
+"""
+
+import os
+import re
+import time
+import uuid
+from email.utils import formatdate
+from pathlib import Path
+from typing import Iterator, Optional
+
+import pandas as pd
+from fastapi import Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+from utils.logger import get_logger
+from utils.result_io import FORMATS, format_for_path, write_table
+
+logger = get_logger(__name__)
+
+RESULTS_DIR = os.getenv("RESULTS_DIR", "output")
+RESULT_TTL_SECONDS = float(os.getenv("RESULT_TTL_SECONDS", str(24 * 3600)))
+TEMP_UPLOAD_TTL_SECONDS = float(os.getenv("TEMP_UPLOAD_TTL_SECONDS", "1800"))
+CLEANUP_INTERVAL_SECONDS = float(os.getenv("CLEANUP_INTERVAL_SECONDS", "300"))
+
+# Formats written for every result; CSV is always included
+RESULT_FORMATS = ["csv"] + [
+    fmt.strip()
+    for fmt in os.getenv("RESULT_FORMATS", "csv").lower().split(",")
+    if fmt.strip() and fmt.strip() != "csv"
+]
+
+RESULT_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+_RESULT_FILE_RE = re.compile(r"^[a-z_]+_([0-9a-f]{32})\.[a-z]+$")
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+_READ_CHUNK_SIZE = 64 * 1024
+
+
+def new_result_id() -> str:
+    """Return a new random result ID (same format as job IDs)."""
+    return uuid.uuid4().hex
+
+
+class ResultStore:
+    """CSV result files keyed by request or job ID, expired after a TTL."""
+
+    def __init__(self, root: str | Path = RESULTS_DIR, ttl: float = RESULT_TTL_SECONDS):
+        """Create the store.
+
+        Args:
+            root (str | Path, optional): Directory holding the result files.
+            ttl (float, optional): Seconds a result is kept after it was written.
+        """
+        self.root = Path(root)
+        self.ttl = ttl
+
+    def path(self, result_id: str, stem: str = "predictions", fmt: str = "csv") -> Path:
+        """Return the file path of a result.
+
+        Raises:
+            ValueError: If ``result_id`` or ``fmt`` is not valid.
+        """
+        if not RESULT_ID_RE.match(result_id):
+            raise ValueError(f"Invalid result ID: {result_id!r}")
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown result format: {fmt!r}")
+        return self.root / f"{stem}_{result_id}{FORMATS[fmt].suffix}"
+
+    def save(
+        self,
+        df: pd.DataFrame,
+        result_id: str,
+        stem: str = "predictions",
+        formats: list[str] = RESULT_FORMATS,
+    ) -> list[Path]:
+        """Write a result atomically, so a download never sees a partial file.
+
+        Args:
+            df (pd.DataFrame): Result rows.
+            result_id (str): Request or job ID.
+            stem (str, optional): File name prefix, e.g. "text_prediction".
+            formats (list[str], optional): Formats to write, CSV first.
+
+        Returns:
+            list[Path]: The written files, in the order of ``formats``.
+        """
+        paths = []
+        for fmt in formats:
+            path = self.path(result_id, stem, fmt)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f".{path.name}.tmp")
+            write_table(df, tmp, fmt)
+            os.replace(tmp, path)
+            paths.append(path)
+        return paths
+
+    def save_csv(
+        self, df: pd.DataFrame, result_id: str, stem: str = "predictions"
+    ) -> Path:
+        """Write a result as CSV only and return its path."""
+        return self.save(df, result_id, stem, ["csv"])[0]
+
+    def find(
+        self, result_id: str, stem: str = "predictions", fmt: str = "csv"
+    ) -> Optional[Path]:
+        """Return the file of an unexpired result, or None."""
+        try:
+            path = self.path(result_id, stem, fmt)
+        except ValueError:
+            return None
+        return path if self._is_live(path) else None
+
+    def find_file(self, filename: str) -> Optional[Path]:
+        """Return an unexpired result by file name (as listed in ``csv_paths``)."""
+        if not _RESULT_FILE_RE.match(filename):
+            return None
+        try:
+            format_for_path(filename)
+        except ValueError:
+            return None
+        path = self.root / filename
+        return path if self._is_live(path) else None
+
+    def _is_live(self, path: Path) -> bool:
+        """Whether ``path`` exists and is younger than the TTL."""
+        try:
+            return time.time() - path.stat().st_mtime <= self.ttl
+        except FileNotFoundError:
+            return False
+
+    def sweep(self) -> int:
+        """Delete expired result files.
+
+        Returns:
+            int: Number of files deleted.
+        """
+        if not self.root.is_dir():
+            return 0
+        removed = sum(
+            _remove_if_older(path, self.ttl)
+            for path in self.root.iterdir()
+            if _RESULT_FILE_RE.match(path.name)
+        )
+        if removed:
+            logger.info(f"Deleted {removed} expired result file(s)")
+        return removed
+
+
+def _remove_if_older(path: Path, ttl: float) -> bool:
+    """Delete a file whose modification time is more than ``ttl`` seconds ago."""
+    try:
+        if path.is_file() and time.time() - path.stat().st_mtime > ttl:
+            path.unlink()
+            return True
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"Could not delete {path}: {e}")
+    return False
+
+
+def sweep_temp_uploads(
+    directory: str | Path = "temp_uploads", ttl: float = TEMP_UPLOAD_TTL_SECONDS
+) -> int:
+    """Delete stale top-level files of ``temp_uploads/``.
+
+    Subdirectories are left alone: files of background jobs under
+    ``temp_uploads/jobs/`` are removed when their job ends.
+
+    Returns:
+        int: Number of files deleted.
+    """
+    directory = Path(directory)
+    if not directory.is_dir():
+        return 0
+    removed = sum(_remove_if_older(path, ttl) for path in directory.iterdir())
+    if removed:
+        logger.info(f"Deleted {removed} stale temporary upload(s)")
+    return removed
+
+
+def _etag(stat: os.stat_result) -> str:
+    """Strong ETag of a result file; results are never modified in place."""
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def _parse_range(header: str, size: int) -> Optional[tuple[int, int]]:
+    """Parse a single-range ``Range`` header into inclusive byte offsets.
+
+    Returns:
+        tuple | None: ``(start, end)``, or None if the range is not satisfiable.
+    """
+    match = _RANGE_RE.match(header.replace(" ", ""))
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if not first:  # suffix range: the last N bytes
+        start, end = max(0, size - int(last)), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start > end or start >= size:
+        return None
+    return start, end
+
+
+def _iter_file(path: Path, start: int, end: int) -> Iterator[bytes]:
+    """Read bytes ``start``..``end`` (inclusive) of a file in chunks."""
+    remaining = end - start + 1
+    with open(path, "rb") as f:
+        f.seek(start)
+        while remaining > 0:
+            chunk = f.read(min(_READ_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def file_response(
+    request: Request, path: Path, filename: str, media_type: Optional[str] = None
+) -> Response:
+    """Serve a file as an attachment with ETag, conditional GET and byte ranges.
+
+    - ``If-None-Match`` matching the ETag returns 304 Not Modified.
+    - A single ``Range: bytes=...`` returns 206 Partial Content (honouring
+      ``If-Range``); an unsatisfiable range returns 416. Multi-range requests
+      get the whole file.
+
+    Args:
+        request (Request): The incoming request.
+        path (Path): File to serve.
+        filename (str): Download file name.
+        media_type (str, optional): Content type; defaults to the one of the
+            result format matching the file suffix.
+
+    Returns:
+        Response: The full file, a partial body, or an empty 304/416 response.
+    """
+    media_type = media_type or FORMATS[format_for_path(path)].media_type
+    stat = path.stat()
+    etag = _etag(stat)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "private, no-cache",
+        "Content-Disposition": f'attachment; filename="{filename}"',
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (
+        if_none_match.strip() == "*"
+        or etag in (tag.strip() for tag in if_none_match.split(","))
+    ):
+        return Response(status_code=304, headers=headers)
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and "," not in range_header and if_range in (None, etag):
+        byte_range = _parse_range(range_header, stat.st_size)
+        if byte_range is None:
+            headers["Content-Range"] = f"bytes */{stat.st_size}"
+            return Response(status_code=416, headers=headers)
+        start, end = byte_range
+        headers["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+        headers["Content-Length"] = str(end - start + 1)
+        return StreamingResponse(
+            _iter_file(path, start, end),
+            status_code=206,
+            media_type=media_type,
+            headers=headers,
+        )
+
+    return FileResponse(path, media_type=media_type, headers=headers, stat_result=stat)
+
+
+result_store = ResultStore()
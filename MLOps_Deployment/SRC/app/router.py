@@ -0,0 +1,316 @@
+"""
+router.py
+---------
+Routes text classification between the remote Azure ML endpoint and the
+local model.
+
+In the default ``hedged`` mode a batch goes to the remote endpoint first. If
+it has not answered within a deadline derived from the endpoint's recent p95
+latency, the local model starts on the same batch and whichever finishes
+first wins; if the endpoint fails, the local model answers instead. A circuit
+breaker stops sending requests to the endpoint after repeated failures or slow
+answers and routes everything locally until a probe request succeeds again.
+Tail latency is thus bounded by the deadline plus local inference time rather
+than by the endpoint's timeout.
+
+Configuration (environment variables):
+
+- ``INFERENCE_ROUTE``: ``hedged`` (default), ``remote`` (endpoint only) or
+  ``local`` (local model only).
+- ``ROUTER_HEDGE_PERCENTILE``: percentile of recent endpoint latency used as
+  the hedging deadline (default 95).
+- ``ROUTER_HEDGE_MIN_MS`` / ``ROUTER_HEDGE_MAX_MS``: bounds of the deadline
+  (default 100 and 2000; the maximum is used until latencies are known).
+- ``ROUTER_SLOW_SECONDS``: endpoint answers slower than this count as
+  failures for the breaker (default 5).
+- ``ROUTER_BREAKER_FAILURES``: consecutive failures that open the breaker
+  (default 5).
+- ``ROUTER_BREAKER_RESET_SECONDS``: how long the breaker stays open before a
+  probe request is sent to the endpoint (default 30).
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Optional
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+ROUTES = ("hedged", "remote", "local")
+
+
+def _percentile(values: list[float], pct: float) -> Optional[float]:
+    """Return the nearest-rank ``pct`` percentile of ``values``."""
+    if not values:
+        return None
+    values = sorted(values)
+    rank = max(0, min(len(values) - 1, round(pct / 100 * len(values)) - 1))
+    return values[rank]
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open probe.
+
+    ``closed``: requests go to the endpoint. ``open``: they do not, until
+    ``reset_seconds`` have passed. ``half_open``: one probe request is let
+    through; its success closes the breaker and its failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        """Create a closed breaker.
+
+        Args:
+            failure_threshold (int, optional): Consecutive failures that open
+                the breaker.
+            reset_seconds (float, optional): Time the breaker stays open.
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.failures = 0
+        self.opened = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether the next request may go to the endpoint."""
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open":
+                if time.monotonic() - self._opened_at < self.reset_seconds:
+                    return False
+                self.state = "half_open"
+                self._probing = False
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        """Record an endpoint success, closing the breaker."""
+        with self._lock:
+            if self.state != "closed":
+                logger.info("Circuit breaker closed; routing to the endpoint again")
+            self.state = "closed"
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        """Record an endpoint failure, opening the breaker at the threshold."""
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == "half_open" or (
+                self.state == "closed" and self.failures >= self.failure_threshold
+            ):
+                if self.state == "closed":
+                    logger.warning(
+                        f"Circuit breaker opened after {self.failures} failures; "
+                        f"routing locally for {self.reset_seconds:g} s"
+                    )
+                self.state = "open"
+                self.opened += 1
+                self._opened_at = time.monotonic()
+
+    def snapshot(self) -> dict:
+        """Return the state, consecutive failures and number of openings."""
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "opened": self.opened,
+            }
+
+
+class InferenceRouter:
+    """Classify texts remotely, hedged by and falling back to the local model.
+
+    Both backends take a list of texts and produce one result per text in
+    order: ``{"predicted_label", "confidence"}`` or ``{"error": ...}`` for a
+    text the model rejected. ``remote`` returns a future (so the call can be
+    raced and keeps running after losing); ``local`` returns the list. The
+    router adds ``"source": "remote" | "local"`` to each result.
+    """
+
+    def __init__(
+        self,
+        remote: Callable[[list[str]], Future],
+        local: Callable[[list[str]], list[dict]],
+        route: Optional[str] = None,
+        hedge_percentile: Optional[float] = None,
+        hedge_min_ms: Optional[float] = None,
+        hedge_max_ms: Optional[float] = None,
+        slow_seconds: Optional[float] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        window: int = 200,
+    ):
+        """Create a router; unset arguments fall back to environment variables.
+
+        Args:
+            remote: Starts a remote classification and returns its future.
+            local: Classifies with the local model.
+            route: "hedged", "remote" or "local".
+            hedge_percentile: Percentile of recent remote latency used as the
+                hedging deadline.
+            hedge_min_ms: Lower bound of the deadline in ms.
+            hedge_max_ms: Upper bound of the deadline in ms.
+            slow_seconds: Remote latency counted as a breaker failure.
+            breaker: Circuit breaker guarding the endpoint.
+            window: Number of recent remote latencies kept.
+
+        Raises:
+            ValueError: If ``route`` is not one of :data:`ROUTES`.
+        """
+        env = os.getenv
+        self.remote = remote
+        self.local = local
+        self.route = (route or env("INFERENCE_ROUTE", "hedged")).lower()
+        if self.route not in ROUTES:
+            raise ValueError(f"Unknown INFERENCE_ROUTE {self.route!r}")
+        self.hedge_percentile = hedge_percentile or float(
+            env("ROUTER_HEDGE_PERCENTILE", "95")
+        )
+        self.hedge_min = (
+            hedge_min_ms or float(env("ROUTER_HEDGE_MIN_MS", "100"))
+        ) / 1000
+        self.hedge_max = (
+            hedge_max_ms or float(env("ROUTER_HEDGE_MAX_MS", "2000"))
+        ) / 1000
+        self.slow_seconds = slow_seconds or float(env("ROUTER_SLOW_SECONDS", "5"))
+        self.breaker = breaker or CircuitBreaker(
+            int(env("ROUTER_BREAKER_FAILURES", "5")),
+            float(env("ROUTER_BREAKER_RESET_SECONDS", "30")),
+        )
+        self.counts = {
+            "remote": 0,
+            "local": 0,
+            "hedged": 0,
+            "hedge_won_by_local": 0,
+            "fallback": 0,
+            "breaker_open": 0,
+        }
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._local_pool = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="local-inference"
+        )
+
+    def hedge_deadline(self) -> float:
+        """Seconds to wait for the endpoint before starting the local model."""
+        with self._lock:
+            latency = _percentile(list(self._latencies), self.hedge_percentile)
+        if latency is None:
+            return self.hedge_max
+        return min(self.hedge_max, max(self.hedge_min, latency))
+
+    def _count(self, key: str) -> None:
+        """Increment one routing counter."""
+        with self._lock:
+            self.counts[key] += 1
+
+    def _record_remote(self, future: Future, start: float) -> None:
+        """Feed the outcome of a remote call to the latency window and breaker."""
+        elapsed = time.perf_counter() - start
+        if future.cancelled() or future.exception() is not None:
+            self.breaker.record_failure()
+            return
+        with self._lock:
+            self._latencies.append(elapsed)
+        if elapsed > self.slow_seconds:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+    def _run_local(self, texts: list[str]) -> list[dict]:
+        """Classify with the local model and tag the results."""
+        return _tagged(self.local(texts), "local")
+
+    def classify(self, texts: list[str]) -> list[dict]:
+        """Classify texts on the route chosen by the mode and the breaker.
+
+        Args:
+            texts (list[str]): Input sentences.
+
+        Returns:
+            list[dict]: One result per text, in order, with a ``source`` key.
+
+        Raises:
+            Exception: The endpoint's error if the local model failed too, or
+                whichever backend failed when only one is used.
+        """
+        if self.route == "local":
+            self._count("local")
+            return self._run_local(texts)
+        if self.route == "hedged" and not self.breaker.allow():
+            self._count("breaker_open")
+            return self._run_local(texts)
+
+        self._count("remote")
+        start = time.perf_counter()
+        remote = self.remote(texts)
+        remote.add_done_callback(lambda f: self._record_remote(f, start))
+        if self.route == "remote":
+            return _tagged(remote.result(), "remote")
+
+        done, _ = wait([remote], timeout=self.hedge_deadline())
+        if done and remote.exception() is None:
+            return _tagged(remote.result(), "remote")
+        if done:
+            self._count("fallback")
+            logger.warning(f"Endpoint failed ({remote.exception()}); using local model")
+            return self._run_local(texts)
+
+        # The endpoint is slower than usual: race it against the local model.
+        # The remote call is not cancelled, so its outcome still reaches the
+        # breaker and its results the prediction cache.
+        self._count("hedged")
+        local = self._local_pool.submit(self._run_local, texts)
+        pending = {remote, local}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is local:
+                        self._count("hedge_won_by_local")
+                        return future.result()
+                    return _tagged(future.result(), "remote")
+        raise remote.exception()
+
+    def stats(self) -> dict:
+        """Return the route, breaker state, hedging deadline and counters."""
+        with self._lock:
+            latencies = list(self._latencies)
+            counts = dict(self.counts)
+        remote_ms = {
+            f"p{pct}_ms": (
+                round(value * 1000, 2)
+                if (value := _percentile(latencies, pct)) is not None
+                else None
+            )
+            for pct in (50, 95, 99)
+        }
+        return {
+            "route": self.route,
+            "hedge_deadline_ms": round(self.hedge_deadline() * 1000, 2),
+            "breaker": self.breaker.snapshot(),
+            "counts": counts,
+            "remote_latency": remote_ms,
+        }
+
+    def close(self) -> None:
+        """Stop the local inference thread."""
+        self._local_pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _tagged(results: list[dict], source: str) -> list[dict]:
+    """Copy results, marking successful ones with the backend that produced them."""
+    return [
+        result if "error" in result else {**result, "source": source}
+        for result in results
+    ]
@@ -0,0 +1,230 @@
+"""
+scheduler.py
+------------
+Dynamic micro-batching scheduler for request handlers.
+
+Concurrent requests submitted within a short window (or until a maximum batch
+size is reached) are collected into a single batch, passed to one batched
+inference call, and the results are fanned back out to the waiting callers.
+"""
+
+import asyncio
+import threading
+from typing import Any, Callable, Optional
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class Histogram:
+    """Cumulative histogram with fixed upper bounds (Prometheus-style buckets)."""
+
+    def __init__(self, buckets: list[float]):
+        """Create an empty histogram.
+
+        Args:
+            buckets (list[float]): Sorted upper bounds of the buckets. An
+                implicit ``+Inf`` bucket is always added.
+        """
+        self.buckets = sorted(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        """Record a single observation."""
+        with self._lock:
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[i] += 1
+                    break
+            else:
+                self.counts[-1] += 1
+            self.count += 1
+            self.sum += value
+
+    def snapshot(self) -> dict:
+        """Return cumulative bucket counts, total count and sum.
+
+        Returns:
+            dict: ``{"buckets": {"1": n, ..., "+Inf": n}, "count": n, "sum": x}``.
+        """
+        with self._lock:
+            cumulative, running = {}, 0
+            for bound, n in zip(self.buckets + [float("inf")], self.counts):
+                running += n
+                label = "+Inf" if bound == float("inf") else f"{bound:g}"
+                cumulative[label] = running
+            return {"buckets": cumulative, "count": self.count, "sum": self.sum}
+
+
+def _power_of_two_buckets(limit: int) -> list[float]:
+    """Return 1, 2, 4, ... up to and including ``limit``."""
+    buckets, bound = [], 1
+    while bound < limit:
+        buckets.append(float(bound))
+        bound *= 2
+    buckets.append(float(limit))
+    return buckets
+
+
+class MicroBatcher:
+    """Collect concurrent requests into batches for a single inference call.
+
+    ``batch_fn`` receives a list of items and must return a list of results in
+    the same order. A result that is an ``Exception`` instance is raised in the
+    matching caller only; an exception raised by ``batch_fn`` itself fails the
+    whole batch. ``batch_fn`` runs in the default thread pool so the event
+    loop stays responsive while a batch is in flight. One batch is processed
+    at a time; requests arriving meanwhile queue up and form the next batch.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[list], list],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+        name: str = "batcher",
+    ):
+        """Create a micro-batcher.
+
+        Args:
+            batch_fn (Callable[[list], list]): Batched inference function.
+            max_batch_size (int, optional): Maximum items per batch. Defaults to 32.
+            max_wait_ms (float, optional): How long to keep collecting after the
+                first item of a batch arrives. Defaults to 5 ms.
+            name (str, optional): Name used in logs and stats.
+        """
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.name = name
+
+        self.batch_sizes = Histogram(_power_of_two_buckets(self.max_batch_size))
+        self.queue_depths = Histogram([0, 1, 2, 4, 8, 16, 32, 64, 128, 256])
+        self.max_queue_depth = 0
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of requests currently waiting to be batched."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def _ensure_started(self) -> None:
+        """Start the background worker on the running event loop if needed."""
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+            logger.info(
+                "Started micro-batcher '%s' (max_batch_size=%d, max_wait=%.1f ms)",
+                self.name,
+                self.max_batch_size,
+                self.max_wait * 1000,
+            )
+
+    async def submit(self, item: Any) -> Any:
+        """Queue an item and wait for its result.
+
+        Args:
+            item (Any): A single request payload for ``batch_fn``.
+
+        Returns:
+            Any: The result produced for this item.
+
+        Raises:
+            Exception: Whatever ``batch_fn`` raised or returned for this item.
+        """
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        depth = self._queue.qsize()
+        self.max_queue_depth = max(self.max_queue_depth, depth)
+        return await future
+
+    async def stop(self) -> None:
+        """Cancel the background worker (e.g. on application shutdown)."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def _collect(self) -> list[tuple[Any, asyncio.Future]]:
+        """Wait for the first item, then gather more until full or timed out."""
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                # Window is over; still drain anything that is already waiting
+                if self._queue.empty():
+                    break
+                batch.append(self._queue.get_nowait())
+                continue
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        """Worker loop: collect a batch, run it, and resolve the futures."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            self.batch_sizes.observe(len(batch))
+            self.queue_depths.observe(self._queue.qsize())
+
+            pending = [(item, fut) for item, fut in batch if not fut.cancelled()]
+            if not pending:
+                continue
+
+            try:
+                results = await loop.run_in_executor(
+                    None, self.batch_fn, [item for item, _ in pending]
+                )
+                if len(results) != len(pending):
+                    raise RuntimeError(
+                        f"{self.name}: batch_fn returned {len(results)} results "
+                        f"for {len(pending)} items"
+                    )
+            except Exception as e:
+                logger.error("Micro-batch '%s' failed: %s", self.name, e)
+                for _, fut in pending:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+
+            for (_, fut), result in zip(pending, results):
+                if fut.done():
+                    continue
+                if isinstance(result, Exception):
+                    fut.set_exception(result)
+                else:
+                    fut.set_result(result)
+
+    def stats(self) -> dict:
+        """Return queue-depth and batch-size statistics for tuning the window.
+
+        Returns:
+            dict: Current configuration, queue depth and both histograms.
+        """
+        return {
+            "name": self.name,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "batch_size": self.batch_sizes.snapshot(),
+            "queue_depth_at_dispatch": self.queue_depths.snapshot(),
+        }
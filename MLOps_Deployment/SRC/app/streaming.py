@@ -0,0 +1,72 @@
+"""
+streaming.py
+------------
+Event framing for streaming endpoints (Server-Sent Events or NDJSON).
+
+Streaming endpoints emit a sequence of named events (``status``, ``sentence``,
+``done``, ``error``). With ``format=sse`` each event is written as an SSE
+message (``event:`` / ``data:`` lines); with ``format=ndjson`` each event is
+one JSON object per line with an ``"event"`` field. While a long step such as
+transcription is running, heartbeats keep proxies from closing the connection.
+"""
+
+import asyncio
+import json
+import os
+from typing import AsyncIterator
+
+STREAM_FORMATS = {"sse": "text/event-stream", "ndjson": "application/x-ndjson"}
+STREAM_HEARTBEAT_SECONDS = float(os.getenv("STREAM_HEARTBEAT_SECONDS", "15"))
+
+# Ask nginx-style proxies not to buffer the stream
+STREAM_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def format_event(event: str, data: dict, fmt: str = "sse") -> str:
+    """Serialize one event.
+
+    Args:
+        event (str): Event name, e.g. "sentence".
+        data (dict): JSON-serializable payload.
+        fmt (str, optional): "sse" or "ndjson".
+
+    Returns:
+        str: The framed event, including its terminating newline(s).
+    """
+    if fmt == "ndjson":
+        return json.dumps({"event": event, **data}) + "\n"
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def heartbeat(fmt: str = "sse") -> str:
+    """Return a keep-alive message that clients ignore."""
+    if fmt == "ndjson":
+        return json.dumps({"event": "heartbeat"}) + "\n"
+    return ": keep-alive\n\n"
+
+
+async def heartbeats_until(
+    task: asyncio.Future, fmt: str = "sse", interval: float = STREAM_HEARTBEAT_SECONDS
+) -> AsyncIterator[str]:
+    """Yield heartbeats every ``interval`` seconds until ``task`` is done.
+
+    The caller reads ``task.result()`` afterwards. If the stream is closed
+    early (client disconnected), the task is cancelled.
+
+    Args:
+        task (asyncio.Future): The running step.
+        fmt (str, optional): "sse" or "ndjson".
+        interval (float, optional): Seconds between heartbeats.
+
+    Yields:
+        str: Heartbeat messages.
+    """
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=interval)
+            if done:
+                return
+            yield heartbeat(fmt)
+    finally:
+        if not task.done():
+            task.cancel()
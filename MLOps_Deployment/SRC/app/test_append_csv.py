@@ -0,0 +1,81 @@
+"""Tests for the append-only CSV store in ``utils/append_csv.py``."""
+
+import pandas as pd
+import pytest
+
+from utils.append_csv import (
+    append_csv,
+    compact,
+    iter_newest_first,
+    read_newest_first,
+)
+
+
+def save(n: int, start: int = 0) -> pd.DataFrame:
+    """Rows of one save, with a quoted multi-line field in each."""
+    return pd.DataFrame(
+        {
+            "Sentence": [f"line {i}\nsecond line, quoted" for i in range(start, n)],
+            "Emotion": ["joy"] * (n - start),
+        }
+    )
+
+
+def test_index_records_the_offset_of_every_save(tmp_path):
+    """Each offset points at the first byte of its save's rows."""
+    path = str(tmp_path / "out.csv")
+    append_csv(save(2), path)
+    append_csv(save(5, 2), path)
+    offsets = [int(line) for line in (tmp_path / "out.csv.idx").read_text().split()]
+    data = (tmp_path / "out.csv").read_bytes()
+    assert len(offsets) == 2
+    assert offsets[0] == data.index(b"\n") + 1  # right after the header
+    assert data.startswith(b'"line 2', offsets[1])
+
+
+def test_newest_save_is_read_first(tmp_path):
+    """Saves come back newest first; rows keep their order within a save."""
+    path = str(tmp_path / "out.csv")
+    append_csv(save(2), path)
+    append_csv(save(5, 2), path)
+    frames = list(iter_newest_first(path))
+    assert [len(frame) for frame in frames] == [3, 2]
+    newest = read_newest_first(path)
+    assert newest["Sentence"].str.split("\n").str[0].tolist() == [
+        "line 2",
+        "line 3",
+        "line 4",
+        "line 0",
+        "line 1",
+    ]
+
+
+def test_columns_are_matched_by_name(tmp_path):
+    """Reordered columns are aligned; different columns are rejected."""
+    path = str(tmp_path / "out.csv")
+    append_csv(save(1), path)
+    append_csv(save(2, 1)[["Emotion", "Sentence"]], path)
+    assert read_newest_first(path).columns.tolist() == ["Sentence", "Emotion"]
+    with pytest.raises(ValueError):
+        append_csv(pd.DataFrame({"Other": [1]}), path)
+
+
+def test_a_legacy_file_without_an_index_counts_as_one_save(tmp_path):
+    """A CSV written before the index existed is read and appended to."""
+    path = str(tmp_path / "out.csv")
+    save(2).to_csv(path, index=False)
+    assert len(read_newest_first(path)) == 2
+    append_csv(save(3, 2), path)
+    assert [len(frame) for frame in iter_newest_first(path)] == [1, 2]
+
+
+def test_compact_rewrites_newest_first(tmp_path):
+    """After compaction the file itself is sorted and has one save."""
+    path = str(tmp_path / "out.csv")
+    for start in range(0, 6, 2):
+        append_csv(save(start + 2, start), path)
+    expected = read_newest_first(path)
+    assert compact(path) == 6
+    assert len((tmp_path / "out.csv.idx").read_text().split()) == 1
+    pd.testing.assert_frame_equal(pd.read_csv(path), expected)
+    pd.testing.assert_frame_equal(read_newest_first(path), expected)
@@ -0,0 +1,98 @@
+"""Tests for retries and timeouts of the pooled client in ``app/azure_client.py``."""
+
+import asyncio
+import os
+
+import httpx
+
+# The module refuses to import without endpoint settings
+os.environ.setdefault("AZURE_ENDPOINT_URL", "http://azure.test/score")
+os.environ.setdefault("AZURE_API_KEY", "key")
+
+from app import azure_client  # noqa: E402
+from app.azure_client import AzureMLClient  # noqa: E402
+
+
+def make_client(**kwargs) -> AzureMLClient:
+    """A client for a fake endpoint; no environment variables needed."""
+    kwargs.setdefault("retry_backoff", 0.5)
+    kwargs.setdefault("retry_max_delay", 10)
+    return AzureMLClient(
+        endpoint_url="http://azure.test/score", api_key="key", **kwargs
+    )
+
+
+def test_retry_after_longer_than_the_cap_is_honoured():
+    """The server's ``Retry-After`` is never cut down to ``retry_max_delay``."""
+    client = make_client()
+    assert client._retry_delay(0, "30") == 30
+    assert client._retry_delay(10, "30") == 30  # the capped backoff is shorter
+
+
+def test_backoff_is_capped_and_short_retry_after_is_a_minimum():
+    """Only the jittered backoff is capped; ``Retry-After`` is a lower bound."""
+    client = make_client(retry_max_delay=2)
+    delays = [client._retry_delay(10, None) for _ in range(200)]
+    assert max(delays) <= 2 and min(delays) >= 0
+    assert all(client._retry_delay(10, "1") >= 1 for _ in range(200))
+    assert client._retry_delay(0, "Wed, 21 Oct 2026 07:28:00 GMT") <= 0.5
+
+
+def run_score(client: AzureMLClient, handler, payload: dict, timeout: float) -> dict:
+    """Run ``_score`` against ``handler`` on a private event loop."""
+
+    async def score():
+        client._http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        client._semaphore = asyncio.Semaphore(1)
+        try:
+            return await client._score(payload, timeout)
+        finally:
+            await client._http.aclose()
+
+    return asyncio.run(score())
+
+
+def test_score_sleeps_for_retry_after_then_succeeds(monkeypatch):
+    """A 429 with ``Retry-After: 20`` waits 20 s before the retry."""
+    sleeps = []
+
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+
+    monkeypatch.setattr(azure_client.asyncio, "sleep", fake_sleep)
+    responses = iter(
+        [
+            httpx.Response(429, headers={"Retry-After": "20"}),
+            httpx.Response(200, json={"predicted_label": "joy", "confidence": 0.9}),
+        ]
+    )
+    result = run_score(make_client(), lambda request: next(responses), {}, 15)
+    assert result["predicted_label"] == "joy"
+    assert sleeps == [20]
+
+
+def test_single_and_batched_requests_use_their_own_timeouts(monkeypatch):
+    """One text times out after ``timeout``, a batch after ``batch_timeout``."""
+    client = make_client(timeout=15, batch_timeout=60)
+    assert (client.timeout, client.batch_timeout) == (15, 60)
+    seen = []
+
+    async def fake_score(payload, timeout):
+        seen.append(timeout)
+        if "texts" in payload:
+            return {"results": [{"predicted_label": "joy", "confidence": 0.9}]}
+        return {"predicted_label": "joy", "confidence": 0.9}
+
+    monkeypatch.setattr(client, "_score", fake_score)
+    asyncio.run(client.predict("uncached single text"))
+    asyncio.run(client.predict_batch(["uncached batched text"]))
+    client.close()
+    assert seen == [15, 60]
+
+
+def test_default_timeouts(monkeypatch):
+    """Timeouts default to 15 s per text and 60 s per batch, as before pooling."""
+    monkeypatch.delenv("AZURE_TIMEOUT", raising=False)
+    monkeypatch.delenv("AZURE_BATCH_TIMEOUT", raising=False)
+    client = make_client()
+    assert (client.timeout, client.batch_timeout) == (15, 60)
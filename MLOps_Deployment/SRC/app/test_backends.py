@@ -0,0 +1,89 @@
+"""Tests for ONNX export and backend selection in ``models/backends.py``."""
+
+import pytest
+
+torch = pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+pytest.importorskip("onnxruntime")
+
+from models import backends  # noqa: E402
+from models.backends import OnnxBackend, load_backend, onnx_paths  # noqa: E402
+
+INPUTS = {
+    "input_ids": torch.tensor([[0, 5, 6, 7, 2], [0, 8, 2, 1, 1]]),
+    "attention_mask": torch.tensor([[1, 1, 1, 1, 1], [1, 1, 1, 0, 0]]),
+}
+
+
+@pytest.fixture
+def tiny_model(tmp_path, monkeypatch):
+    """A small RoBERTa classifier saved in ``tmp_path``."""
+    monkeypatch.delenv("ONNX_MODEL_DIR", raising=False)
+    config = transformers.RobertaConfig(
+        vocab_size=32,
+        hidden_size=16,
+        num_hidden_layers=1,
+        num_attention_heads=2,
+        intermediate_size=32,
+        num_labels=7,
+    )
+    model = transformers.RobertaForSequenceClassification(config).eval()
+    model.save_pretrained(tmp_path)
+    return model
+
+
+def leftovers(tmp_path) -> list:
+    """Temporary files left next to the exported graphs."""
+    return list((tmp_path / "onnx").glob(".*.tmp"))
+
+
+def test_onnx_backend_matches_the_torch_model(tmp_path, tiny_model):
+    """The exported FP32 graph computes the model's logits."""
+    backend = load_backend(tmp_path, model=tiny_model, kind="onnx")
+    fp32_path, int8_path = onnx_paths(tmp_path)
+    assert isinstance(backend, OnnxBackend) and backend.onnx_path == str(fp32_path)
+    assert fp32_path.exists() and not int8_path.exists()
+    assert not leftovers(tmp_path)
+    with torch.no_grad():
+        expected = tiny_model(**INPUTS).logits
+    assert torch.allclose(backend.logits(INPUTS), expected, atol=1e-5)
+
+
+def test_onnx_int8_backend_quantizes_the_exported_graph(tmp_path, tiny_model):
+    """The INT8 backend exports, quantizes, and runs the quantized graph."""
+    backend = load_backend(tmp_path, model=tiny_model, kind="onnx-int8")
+    fp32_path, int8_path = onnx_paths(tmp_path)
+    assert backend.name == "onnx-int8" and backend.onnx_path == str(int8_path)
+    assert fp32_path.exists() and int8_path.exists()
+    assert not leftovers(tmp_path)
+    assert backend.logits(INPUTS).shape == (2, 7)
+
+
+def test_failed_export_leaves_no_graph_behind(tmp_path, tiny_model, monkeypatch):
+    """A crash mid-export is retried by the next call instead of reused."""
+    real_export = torch.onnx.export
+
+    def crashing_export(model, args, path, **kwargs):
+        with open(path, "wb") as f:
+            f.write(b"truncated")
+        raise RuntimeError("killed")
+
+    monkeypatch.setattr(torch.onnx, "export", crashing_export)
+    with pytest.raises(RuntimeError):
+        load_backend(tmp_path, model=tiny_model, kind="onnx")
+    assert not onnx_paths(tmp_path)[0].exists() and not leftovers(tmp_path)
+
+    monkeypatch.setattr(torch.onnx, "export", real_export)
+    backend = load_backend(tmp_path, model=tiny_model, kind="onnx")
+    assert backend.logits(INPUTS).shape == (2, 7)
+
+
+def test_existing_graphs_are_reused(tmp_path, tiny_model, monkeypatch):
+    """A second load does not export again."""
+    backends.export_onnx(tmp_path, quantize=True, model=tiny_model)
+
+    def no_export(*args, **kwargs):
+        raise AssertionError("exported again")
+
+    monkeypatch.setattr(torch.onnx, "export", no_export)
+    assert backends.export_onnx(tmp_path, quantize=True) == onnx_paths(tmp_path)[1]
@@ -0,0 +1,55 @@
+"""Tests for the length-bucketed batching helpers in ``utils/batching.py``."""
+
+import random
+
+from utils.batching import (
+    batch_features,
+    length_bucketed_batches,
+    padded_tokens,
+    token_budget_batches,
+)
+
+
+def test_token_budget_batches_respect_the_padded_budget():
+    """Each batch costs at most ``max_tokens`` once padded to its longest item."""
+    lengths = [3, 5, 2, 8, 4, 4]
+    batches = token_budget_batches(lengths, max_tokens=12)
+    assert [i for batch in batches for i in batch] == list(range(len(lengths)))
+    assert all(len(b) * max(lengths[i] for i in b) <= 12 for b in batches)
+
+
+def test_a_sentence_over_the_budget_gets_its_own_batch():
+    """A sentence longer than the budget is not dropped."""
+    assert token_budget_batches([2, 50, 2], max_tokens=10) == [[0], [1], [2]]
+
+
+def test_max_batch_size_caps_the_items_per_batch():
+    """The item cap applies even when the token budget has room."""
+    batches = token_budget_batches([1] * 7, max_tokens=100, max_batch_size=3)
+    assert batches == [[0, 1, 2], [3, 4, 5], [6]]
+
+
+def test_length_bucketing_pads_less_than_input_order():
+    """Sorting by length keeps every index once and cuts padding."""
+    rng = random.Random(0)
+    lengths = [rng.choice([4, 60]) for _ in range(200)]
+    bucketed = length_bucketed_batches(lengths, max_tokens=10**9, max_batch_size=16)
+    in_order = token_budget_batches(lengths, max_tokens=10**9, max_batch_size=16)
+    assert sorted(i for batch in bucketed for i in batch) == list(range(200))
+    assert padded_tokens(lengths, bucketed) < 0.6 * padded_tokens(lengths, in_order)
+    firsts = [lengths[batch[0]] for batch in bucketed]
+    assert firsts == sorted(firsts)  # shortest sentences first
+
+
+def test_batch_features_selects_unpadded_rows():
+    """Only the requested sentences are returned, in the requested order."""
+    encodings = {"input_ids": [[1], [2, 3], [4]], "attention_mask": [[1], [1, 1], [1]]}
+    assert batch_features(encodings, [2, 1]) == [
+        {"input_ids": [4], "attention_mask": [1]},
+        {"input_ids": [2, 3], "attention_mask": [1, 1]},
+    ]
+
+
+def test_padded_tokens_counts_padding():
+    """A batch costs its size times its longest sentence."""
+    assert padded_tokens([1, 5, 2], [[0, 1], [2]]) == 2 * 5 + 2
@@ -0,0 +1,94 @@
+"""Tests for the streaming bulk input parsers in ``app/bulk.py``."""
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from app.bulk import (
+    LineTooLongError,
+    check_line_lengths,
+    iter_csv,
+    iter_json_array,
+    iter_lines,
+    iter_ndjson,
+)
+
+
+async def chunked(data: bytes, size: int = 7):
+    """Yield ``data`` in small chunks, splitting lines and characters."""
+    for start in range(0, len(data), size):
+        end = start + size
+        yield data[start:end]
+
+
+def collect(parser) -> list:
+    """Run an async parser to completion and return what it yielded."""
+
+    async def run():
+        return [item async for item in parser]
+
+    return asyncio.run(run())
+
+
+def test_iter_lines_splits_chunks_and_decodes_utf8():
+    """Lines keep their endings; multi-byte characters may span chunks."""
+    data = "﻿zażółć\ngęślą\njaźń".encode("utf-8")
+    assert collect(iter_lines(chunked(data, 3))) == ["zażółć\n", "gęślą\n", "jaźń"]
+
+
+def test_iter_lines_rejects_a_line_over_the_limit():
+    """A line longer than the limit raises instead of growing the buffer."""
+    data = b"short\n" + b"x" * 100 + b"\nnever read\n"
+    with pytest.raises(LineTooLongError):
+        collect(iter_lines(chunked(data), max_bytes=50))
+    assert collect(iter_lines(chunked(b"x" * 50 + b"\n"), max_bytes=50))
+
+
+def test_iter_lines_rejects_an_unterminated_line_before_the_end():
+    """The limit applies to a last line without a newline, too."""
+    with pytest.raises(LineTooLongError):
+        collect(iter_lines(chunked(b"y" * 100), max_bytes=50))
+
+
+def test_parsers_yield_texts():
+    """JSON arrays, NDJSON and CSV yield the same texts."""
+    json_array = b'["a", {"text": "b"}, "c"]'
+    ndjson = b'"a"\n{"text": "b"}\n\n"c"\n'
+    csv_data = b'id,text\n1,a\n2,"b"\n3,c\n'
+    assert collect(iter_json_array(chunked(json_array))) == ["a", "b", "c"]
+    assert collect(iter_ndjson(chunked(ndjson))) == ["a", "b", "c"]
+    assert collect(iter_csv(chunked(csv_data))) == ["a", "b", "c"]
+
+
+def test_large_json_array_is_parsed_in_linear_time():
+    """Many small items in 1 MB chunks parse as fast as the same NDJSON."""
+    texts = [f"sentence {i}" for i in range(200_000)]
+    data = json.dumps(texts).encode("utf-8")
+    start = time.perf_counter()
+    assert collect(iter_json_array(chunked(data, 1024 * 1024))) == texts
+    elapsed = time.perf_counter() - start
+    ndjson = "\n".join(json.dumps(text) for text in texts).encode("utf-8")
+    start = time.perf_counter()
+    collect(iter_ndjson(chunked(ndjson, 1024 * 1024)))
+    assert elapsed < 5 * (time.perf_counter() - start) + 0.5
+
+
+def test_json_item_and_csv_record_over_the_limit_are_rejected():
+    """Items and multi-line records are bounded like lines."""
+    long_item = b'["ok", "' + b"z" * 100 + b'"]'
+    with pytest.raises(LineTooLongError):
+        collect(iter_json_array(chunked(long_item), max_bytes=50))
+    with pytest.raises(LineTooLongError):  # complete within one chunk
+        collect(iter_json_array(chunked(long_item, 1000), max_bytes=50))
+    record = b'text\n"' + b"line\n" * 30 + b'"\n'
+    with pytest.raises(LineTooLongError):
+        collect(iter_csv(chunked(record), max_bytes=50))
+
+
+def test_check_line_lengths_counts_lines_across_chunks():
+    """A line split over many chunks is measured as a whole."""
+    asyncio.run(check_line_lengths(chunked(b"a" * 40 + b"\n" + b"b" * 40), 40))
+    with pytest.raises(LineTooLongError):
+        asyncio.run(check_line_lengths(chunked(b"a\n" + b"b" * 41 + b"\n"), 40))
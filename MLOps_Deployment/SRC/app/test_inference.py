@@ -0,0 +1,107 @@
+"""Tests for batched, cached classification in ``app/inference.py``."""
+
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from app import inference  # noqa: E402
+from app.prediction_cache import PredictionCache  # noqa: E402
+from models.registry import ModelRegistry  # noqa: E402
+
+LABELS = ["anger", "joy", "sadness"]
+
+
+def expected_label(text: str) -> str:
+    """The label the stub classifier gives ``text``."""
+    return LABELS[len(text) % len(LABELS)]
+
+
+class StubTokenizer:
+    """One token per word, each holding the length of the whole text."""
+
+    def __call__(self, texts, truncation=True, max_length=None):
+        input_ids = [[len(text)] * len(text.split()) for text in texts]
+        return {
+            "input_ids": input_ids,
+            "attention_mask": [[1] * len(ids) for ids in input_ids],
+        }
+
+    def pad(self, features, padding="longest", return_tensors="pt"):
+        width = max(len(f["input_ids"]) for f in features)
+        return {
+            key: torch.tensor([f[key] + [0] * (width - len(f[key])) for f in features])
+            for key in ("input_ids", "attention_mask")
+        }
+
+
+class StubBackend:
+    """Scores the label chosen by ``expected_label`` and counts sentences."""
+
+    name = "stub"
+
+    def __init__(self):
+        self.sentences = 0
+
+    def logits(self, inputs: dict) -> torch.Tensor:
+        classes = inputs["input_ids"][:, 0] % len(LABELS)
+        self.sentences += len(classes)
+        return torch.nn.functional.one_hot(classes, len(LABELS)).float() * 10
+
+
+class StubEncoder:
+    """Maps class indices to ``LABELS``."""
+
+    def inverse_transform(self, indices):
+        return [LABELS[i] for i in indices]
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    """Classify with stubs, a fresh registry and an in-memory cache."""
+    backend = StubBackend()
+    registry = ModelRegistry()
+    registry.register(
+        "classifier",
+        lambda: inference.Classifier(
+            StubTokenizer(), StubEncoder(), backend, torch.device("cpu")
+        ),
+    )
+    monkeypatch.setattr(inference, "MOCK_MODE", False)
+    monkeypatch.setattr(inference, "registry", registry)
+    monkeypatch.setattr(
+        inference, "emotion_cache", PredictionCache("emotion", db_path=None)
+    )
+    return backend
+
+
+def test_results_follow_input_order_across_length_buckets(backend):
+    """Sentences sorted into buckets come back in the order they were given."""
+    texts = [("word " * n).strip() for n in (9, 1, 5, 2, 8, 3)]
+    results = inference.classify_emotions_batch(texts, max_tokens=10)
+    assert [label for label, _ in results] == [expected_label(t) for t in texts]
+    assert all(90 < confidence <= 100 for _, confidence in results)
+    assert backend.sentences == len(texts)
+
+
+def test_duplicate_sentences_are_classified_once(backend):
+    """Repeated sentences in one call reach the model once."""
+    texts = ["I am fine.", "Why?", "I am fine.", "Why?", "I am fine."]
+    results = inference.classify_emotions_batch(texts)
+    assert backend.sentences == 2
+    assert results[0] == results[2] == results[4] and results[1] == results[3]
+
+
+def test_cached_sentences_skip_the_model(backend):
+    """A later call only classifies sentences it has not seen yet."""
+    first = inference.classify_emotions_batch(["Hello there.", "Oh no."])
+    assert backend.sentences == 2
+    again = inference.classify_emotions_batch(["Oh no.", "New one!", "Hello there."])
+    assert backend.sentences == 3
+    assert again[0] == first[1] and again[2] == first[0]
+    assert inference.emotion_cache.stats()["hits"] == 2
+
+
+def test_no_texts_do_not_load_the_model(backend):
+    """An empty list returns at once."""
+    assert inference.classify_emotions_batch([]) == []
+    assert not inference.registry.is_loaded("classifier")
@@ -0,0 +1,169 @@
+"""Tests for job ownership and resumption in ``app/jobs.py``."""
+
+import os
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from app.jobs import JobQueue, JobStore
+
+
+def wait_for(condition, timeout: float = 5.0) -> bool:
+    """Poll ``condition`` until it is true or ``timeout`` seconds passed."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.fixture
+def store(tmp_path):
+    """A job store in a temporary directory."""
+    return JobStore(tmp_path / "jobs.sqlite3")
+
+
+def make_queue(store, runs: list, **kwargs) -> JobQueue:
+    """A queue whose ``text`` handler records the jobs it runs."""
+
+    def handler(payload, on_stage, job_id):
+        runs.append(job_id)
+        return {"ok": True}
+
+    kwargs.setdefault("heartbeat_seconds", 0.05)
+    return JobQueue(store, {"text": handler}, **kwargs)
+
+
+def set_heartbeat(store: JobStore, job_id: str, heartbeat) -> None:
+    """Overwrite the heartbeat of a job."""
+    with store._conn:
+        store._conn.execute(
+            "UPDATE jobs SET heartbeat = ? WHERE id = ?", (heartbeat, job_id)
+        )
+
+
+def test_resume_skips_jobs_with_a_fresh_heartbeat(store):
+    """A job a live process is running is not taken over."""
+    job_id = store.create("text", {}, owner_pid=os.getpid() + 1)
+    runs: list = []
+    queue = make_queue(store, runs, heartbeat_seconds=10)
+    assert queue.resume() == 0
+    assert runs == [] and store.get(job_id)["status"] == "queued"
+    queue.shutdown()
+
+
+def test_resume_runs_jobs_with_a_stale_heartbeat(store):
+    """Jobs of a stopped process (or of an old schema) are resumed."""
+    stale = store.create("text", {}, owner_pid=1)
+    set_heartbeat(store, stale, time.time() - 3600)
+    legacy = store.create("text", {})
+    set_heartbeat(store, legacy, None)
+
+    runs: list = []
+    queue = make_queue(store, runs, heartbeat_seconds=10)
+    assert queue.resume() == 2
+    assert wait_for(lambda: len(runs) == 2)
+    assert wait_for(lambda: store.get(legacy)["status"] == "done")
+    assert store.get(stale)["owner_pid"] == os.getpid()
+    queue.shutdown()
+
+
+def test_claim_stale_claims_each_job_once(store):
+    """A second claimer does not get jobs the first one took over."""
+    job_id = store.create("text", {})
+    set_heartbeat(store, job_id, 0)
+    cutoff = time.time()
+    assert store.claim_stale(111, stale_before=cutoff) == [job_id]
+    assert store.claim_stale(222, stale_before=cutoff) == []
+    assert store.get(job_id)["owner_pid"] == 111
+
+
+def test_heartbeat_keeps_running_jobs_owned(store):
+    """A long job's heartbeat is refreshed, so a resumer leaves it alone."""
+    release = threading.Event()
+    started = threading.Event()
+
+    def slow_handler(payload, on_stage, job_id):
+        started.set()
+        release.wait(5)
+        return {}
+
+    owner = JobQueue(store, {"text": slow_handler}, heartbeat_seconds=0.05)
+    job_id = owner.submit("text", {})
+    assert started.wait(5)
+    time.sleep(0.3)  # several stale intervals of the resumer below
+
+    runs: list = []
+    resumer = make_queue(store, runs, stale_seconds=0.15)
+    resumer._schedule = lambda job: runs.append(job)  # do not run, record
+    assert resumer._resume_stale() == 0 and runs == []
+
+    release.set()
+    assert wait_for(lambda: store.get(job_id)["status"] == "done")
+    owner.shutdown()
+    resumer.shutdown()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork()")
+def test_crashed_worker_jobs_are_resumed_once(store, tmp_path):
+    """A job of a worker that died is resumed by the lock holder, once."""
+    runs: list = []
+    resumer = make_queue(store, runs)
+    assert resumer.resume(lock_path=tmp_path / "resume.lock") == 0
+
+    pid = os.fork()
+    if pid == 0:  # a worker that dies while running its job
+        try:
+            crashed = JobQueue(
+                store,
+                {"text": lambda *_: time.sleep(60)},
+                heartbeat_seconds=0.05,
+            )
+            crashed.submit("text", {"n": 1})
+            time.sleep(0.2)
+        finally:
+            os._exit(0)
+    os.waitpid(pid, 0)
+
+    # Another worker started now neither gets the lock nor runs the job
+    pid = os.fork()
+    if pid == 0:
+        status = 1
+        try:
+            sibling = make_queue(store, [])
+            resumed = sibling.resume(lock_path=tmp_path / "resume.lock")
+            status = 0 if resumed == 0 else 1
+        finally:
+            os._exit(status)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+
+    assert wait_for(lambda: len(runs) == 1)
+    (job_id,) = runs
+    assert wait_for(lambda: store.get(job_id)["status"] == "done")
+    time.sleep(0.3)
+    assert len(runs) == 1
+    resumer.shutdown()
+
+
+def test_store_adds_owner_columns_to_an_old_database(tmp_path):
+    """Databases created before jobs had owners are migrated."""
+    db_path = tmp_path / "jobs.sqlite3"
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE jobs (id TEXT PRIMARY KEY, kind TEXT NOT NULL, status TEXT"
+        " NOT NULL, payload TEXT NOT NULL, result TEXT, error TEXT, created_at"
+        " REAL NOT NULL, updated_at REAL NOT NULL)"
+    )
+    conn.execute(
+        "INSERT INTO jobs VALUES ('old', 'text', 'running', '{}', NULL, NULL, 0, 0)"
+    )
+    conn.commit()
+    conn.close()
+
+    store = JobStore(db_path)
+    assert store.get("old")["heartbeat"] is None
+    assert store.claim_stale(os.getpid(), stale_before=time.time()) == ["old"]
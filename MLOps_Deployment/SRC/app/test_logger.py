@@ -0,0 +1,132 @@
+"""Tests for the queue-based logging setup in ``utils/logger.py``."""
+
+import json
+import logging
+import os
+import sys
+
+import pytest
+
+from utils import logger as app_logger
+from utils.logger import DebugSampler, JsonFormatter, setup_logging, stop_logging
+
+
+@pytest.fixture
+def restore_logging():
+    """Restore the root logger after a test reconfigured it."""
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    yield
+    stop_logging()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+
+def make_record(level: int, lineno: int = 1, msg: str = "message"):
+    """Build a log record of ``level`` from line ``lineno``."""
+    return logging.LogRecord("test", level, __file__, lineno, msg, None, None)
+
+
+def test_debug_sampler_keeps_one_in_n_per_call_site():
+    """Every 4th DEBUG record of a call site is kept, starting with the first."""
+    sampler = DebugSampler(rate=0.25)
+    kept = [sampler.filter(make_record(logging.DEBUG)) for _ in range(8)]
+    assert kept == [True, False, False, False, True, False, False, False]
+    # Another call site is counted separately
+    assert sampler.filter(make_record(logging.DEBUG, lineno=2))
+
+
+def test_debug_sampler_passes_info_and_can_drop_all_debug():
+    """INFO+ always passes; a rate of 0 drops every DEBUG record."""
+    sampler = DebugSampler(rate=0)
+    assert not sampler.filter(make_record(logging.DEBUG))
+    assert sampler.filter(make_record(logging.INFO))
+    assert all(DebugSampler(rate=1).filter(make_record(logging.DEBUG)) for _ in "ab")
+
+
+def test_json_formatter_writes_one_object_per_record():
+    """Records become single-line JSON with the message and exception."""
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = logging.LogRecord(
+            "test", logging.ERROR, __file__, 7, "failed %s", ("x",), True
+        )
+        record.exc_info = sys.exc_info()
+    line = JsonFormatter().format(record)
+    entry = json.loads(line)
+    assert "\n" not in line
+    assert entry["message"] == "failed x"
+    assert entry["level"] == "ERROR"
+    assert "ValueError: boom" in entry["exception"]
+
+
+@pytest.mark.parametrize("mode", ["sync", "queue"])
+def test_records_reach_file(tmp_path, monkeypatch, restore_logging, mode):
+    """DEBUG and INFO records are written in both modes once logging stops."""
+    monkeypatch.delenv("LOG_FORMAT", raising=False)
+    setup_logging(str(tmp_path), "app.log", mode=mode)
+    logging.getLogger("test").debug("debug line")
+    logging.getLogger("test").info("info line")
+    stop_logging()
+    text = (tmp_path / "app.log").read_text()
+    assert "debug line" in text and "info line" in text
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork()")
+def test_forked_child_logs_reach_file(tmp_path, restore_logging):
+    """A child forked after setup runs its own writer thread."""
+    setup_logging(str(tmp_path), "app.log", mode="queue")
+    logging.getLogger("test").info("from parent before fork")
+
+    pid = os.fork()
+    if pid == 0:  # child: exit status 0 only if the listener runs
+        status = 1
+        try:
+            alive = app_logger._listener._thread.is_alive()
+            logging.getLogger("test").info(f"from child {os.getpid()}")
+            stop_logging()
+            status = 0 if alive else 2
+        finally:
+            os._exit(status)
+
+    _, status = os.waitpid(pid, 0)
+    logging.getLogger("test").info("from parent after fork")
+    stop_logging()
+
+    assert os.waitstatus_to_exitcode(status) == 0
+    text = (tmp_path / "app.log").read_text()
+    assert "from parent after fork" in text
+    assert text.count("from parent before fork") == 1
+    assert "from child" not in text
+    assert f"from child {pid}" in (tmp_path / f"app.{pid}.log").read_text()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork()")
+def test_forked_child_rotates_its_own_file_in_sync_mode(
+    tmp_path, monkeypatch, restore_logging
+):
+    """A child never renames the file the parent writes to."""
+    monkeypatch.setenv("LOG_FILE_MAX_MB", "0.0001")  # about 100 bytes
+    setup_logging(str(tmp_path), "app.log", mode="sync")
+
+    pid = os.fork()
+    if pid == 0:
+        status = 1
+        try:
+            for i in range(5):
+                logging.getLogger("test").info(f"child line {i} " + "x" * 50)
+            status = 0
+        finally:
+            os._exit(status)
+
+    _, status = os.waitpid(pid, 0)
+    logging.getLogger("test").info("parent line")
+    assert os.waitstatus_to_exitcode(status) == 0
+    assert "parent line" in (tmp_path / "app.log").read_text()
+    assert not (tmp_path / "app.log.1").exists()
+    assert (tmp_path / f"app.{pid}.log.1").exists()
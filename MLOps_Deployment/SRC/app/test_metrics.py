@@ -0,0 +1,131 @@
+"""Tests for the metrics registry and multiprocess aggregation in ``app/metrics.py``."""
+
+import os
+import time
+
+import pytest
+
+from app.metrics import Family, MetricsRegistry, _Metric, merge_families
+
+
+def parse(text: str) -> dict[str, float]:
+    """Map each sample line of an exposition to its value."""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, _, value = line.rpartition(" ")
+            samples[name] = float(value)
+    return samples
+
+
+def make_registry(directory=None):
+    """A registry with one metric of each type."""
+    registry = MetricsRegistry(directory)
+    requests = registry.counter("requests_total", "Requests.", ["route"])
+    in_progress = registry.gauge("in_progress", "In progress.")
+    seconds = registry.histogram("seconds", "Durations.", buckets=[0.1, 1])
+    return registry, requests, in_progress, seconds
+
+
+def test_render_formats_counters_gauges_and_histograms():
+    """Samples are rendered with labels, cumulative buckets, count and sum."""
+    registry, requests, in_progress, seconds = make_registry()
+    requests.inc("/predict")
+    requests.inc("/predict", amount=2)
+    in_progress.set(3)
+    seconds.observe(0.05)
+    seconds.observe(0.5)
+    text = registry.render()
+    assert "# TYPE requests_total counter" in text
+    samples = parse(text)
+    assert samples['requests_total{route="/predict"}'] == 3
+    assert samples["in_progress"] == 3
+    assert samples['seconds_bucket{le="0.1"}'] == 1
+    assert samples['seconds_bucket{le="+Inf"}'] == 2
+    assert samples["seconds_count"] == 2
+    assert samples["seconds_sum"] == pytest.approx(0.55)
+
+
+def test_special_values_use_the_exposition_spelling():
+    """NaN and infinities render as NaN, +Inf and -Inf."""
+    registry, _, in_progress, _ = make_registry()
+    gauge = registry.gauge("ratio", "Ratio.", ["kind"])
+    gauge.set(float("nan"), "nan")
+    gauge.set(float("inf"), "pos")
+    gauge.set(float("-inf"), "neg")
+    in_progress.set(0.25)
+    lines = registry.render().splitlines()
+    assert 'ratio{kind="nan"} NaN' in lines
+    assert 'ratio{kind="pos"} +Inf' in lines
+    assert 'ratio{kind="neg"} -Inf' in lines
+    assert "in_progress 0.25" in lines
+
+
+def test_metric_base_class_is_abstract():
+    """Metric types must implement ``reset`` and ``collect``."""
+    with pytest.raises(TypeError):
+        _Metric("base", "Base.")
+
+
+def test_merge_sums_counters_and_labels_gauges_by_pid():
+    """Counters add up across processes; gauges are kept per pid."""
+    counter = [("", {"route": "/a"}, 2)]
+    gauge = [("", {}, 1)]
+    snapshots = [
+        (None, [Family("c", "counter", "", counter), Family("g", "gauge", "", gauge)]),
+        (11, [Family("c", "counter", "", counter), Family("g", "gauge", "", gauge)]),
+        (12, [Family("c", "counter", "", counter)]),
+    ]
+    merged = {family.name: family for family in merge_families(snapshots)}
+    assert merged["c"].samples == [("", {"route": "/a"}, 6)]
+    assert merged["g"].samples == [("", {"pid": 11}, 1)]
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork()")
+def test_multiprocess_scrape_includes_every_worker(tmp_path):
+    """Any worker serves the totals of all workers, exited ones included."""
+    registry, requests, in_progress, seconds = make_registry(tmp_path)
+    requests.inc("/predict")
+    in_progress.set(1)
+
+    # Two workers that handle requests and exit
+    for n in (2, 3):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                requests.inc("/predict", amount=n)
+                seconds.observe(0.5)
+                registry.flush()
+            finally:
+                os._exit(0)
+        os.waitpid(pid, 0)
+
+    # A live worker that is busy
+    read_fd, write_fd = os.pipe()
+    live = os.fork()
+    if live == 0:
+        try:
+            os.close(write_fd)
+            in_progress.set(5)
+            registry.flush()
+            os.read(read_fd, 1)  # until the parent is done
+        finally:
+            os._exit(0)
+    os.close(read_fd)
+    try:
+        while not (tmp_path / f"{live}.json").exists():
+            time.sleep(0.01)
+        first = parse(registry.render())
+        second = parse(registry.render())
+    finally:
+        os.close(write_fd)
+        os.waitpid(live, 0)
+
+    # 1 (this process) + 2 + 3 (exited workers); forked workers start at 0
+    assert first['requests_total{route="/predict"}'] == 6
+    assert first["seconds_count"] == 2
+    assert first[f'in_progress{{pid="{os.getpid()}"}}'] == 1
+    assert first[f'in_progress{{pid="{live}"}}'] == 5
+    assert second == first  # exited workers are folded in, not dropped
+    files = sorted(path.name for path in tmp_path.glob("*.json"))
+    assert files == sorted(["exited.json", f"{os.getpid()}.json", f"{live}.json"])
@@ -0,0 +1,116 @@
+"""Tests for the streaming translate → classify pipeline in ``app/pipeline.py``."""
+
+import random
+import threading
+import time
+
+import pytest
+
+from app.pipeline import SentencePipeline
+from utils.batching import padded_tokens
+
+
+def make_pipeline(translate=None, classify=None, **kwargs) -> SentencePipeline:
+    """A pipeline with identity translation and length-based labels."""
+
+    def default_translate(batch, lang_code):
+        return [f"{text}!" for text in batch]
+
+    def default_classify(batch):
+        return [("long" if len(text) > 20 else "short", 0.5) for text in batch]
+
+    return SentencePipeline(
+        translate or default_translate, classify or default_classify, **kwargs
+    )
+
+
+def test_results_keep_input_order_with_parallel_bucketed_batches():
+    """Bucketing and parallel calls reorder work, never the results."""
+    rng = random.Random(0)
+    texts = ["x" * rng.randint(1, 60) + str(i) for i in range(300)]
+
+    def slow_classify(batch):
+        time.sleep(rng.random() * 0.005)
+        return [("label", float(len(text))) for text in batch]
+
+    pipeline = make_pipeline(
+        classify=slow_classify,
+        translate_batch=8,
+        classify_batch=8,
+        translate_workers=3,
+        classify_workers=3,
+    )
+    results = list(pipeline.run(iter(texts), "en"))
+    pipeline.shutdown()
+    assert [text for text, _, _ in results] == texts
+    assert all(tr == f"{text}!" for text, tr, _ in results)
+    assert all(conf == len(text) + 1 for text, _, (_, conf) in results)
+
+
+def test_stage_keeps_one_batch_per_worker_in_flight():
+    """With N workers, N classifier calls run at the same time."""
+    active, peak = 0, 0
+    lock = threading.Lock()
+
+    def classify(batch):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.05)
+        with lock:
+            active -= 1
+        return [("label", 1.0)] * len(batch)
+
+    pipeline = make_pipeline(classify=classify, classify_batch=4, classify_workers=3)
+    assert len(list(pipeline.run([f"s{i}" for i in range(48)], "en"))) == 48
+    pipeline.shutdown()
+    assert peak == 3
+
+
+def test_queued_items_are_length_bucketed():
+    """Items that queue up behind a busy stage are batched by length."""
+    texts = [("a" * 4 if i % 2 else "b" * 80) for i in range(96)]
+    batches = []
+
+    def classify(batch):
+        batches.append([len(text) for text in batch])
+        time.sleep(0.02)  # let the translated sentences queue up
+        return [("label", 1.0)] * len(batch)
+
+    pipeline = make_pipeline(classify=classify, translate_batch=96, classify_batch=16)
+    assert len(list(pipeline.run(texts, "en"))) == len(texts)
+    pipeline.shutdown()
+
+    lengths = [n for batch in batches for n in batch]
+    bucketed = sum(len(b) * max(b) for b in batches)
+    arrival = padded_tokens(
+        [len(t) + 1 for t in texts],
+        [list(range(i, min(i + 16, len(texts)))) for i in range(0, len(texts), 16)],
+    )
+    assert sorted(lengths) == sorted(len(t) + 1 for t in texts)
+    assert bucketed < 0.75 * arrival
+
+
+def test_bucket_sorts_by_length_and_orders_batches_by_first_index():
+    """Each batch holds similar lengths; the batch with index 0 comes first."""
+    items = list(enumerate(["ccc", "a", "bbbbbb", "dd", "e", "ffff"]))
+    batches = SentencePipeline._bucket(items, 2, len)
+    # Sorted by length: 1, 4 (1 char), 3 (2), 0 (3), 5 (4), 2 (6)
+    assert [[index for index, _ in batch] for batch in batches] == [
+        [3, 0],
+        [1, 4],
+        [5, 2],
+    ]
+
+
+def test_stage_error_is_raised_to_the_consumer():
+    """A failing model call surfaces as the original exception."""
+
+    def classify(batch):
+        raise RuntimeError("model down")
+
+    pipeline = make_pipeline(classify=classify)
+    with pytest.raises(RuntimeError, match="model down"):
+        list(pipeline.run(["a", "b"], "en"))
+    pipeline.shutdown()
@@ -0,0 +1,71 @@
+"""Tests for the sentence-level prediction caches in ``app/prediction_cache.py``."""
+
+import os
+
+from app.prediction_cache import PredictionCache, checkpoint_version, normalize_text
+
+
+def test_keys_are_normalized_but_keep_case_and_punctuation():
+    """Whitespace and Unicode forms collapse; case and punctuation do not."""
+    assert normalize_text("  Yeah.\n ") == "Yeah."
+    assert normalize_text("Cafe\u0301") == normalize_text("Caf\u00e9")
+    assert normalize_text("Yeah.") != normalize_text("yeah")
+
+
+def test_lru_evicts_the_least_recently_used_entry():
+    """A read refreshes an entry, so the untouched one is evicted."""
+    cache = PredictionCache("test", max_entries=2, db_path=None)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats()["hits"] == 3 and cache.stats()["misses"] == 1
+
+
+def test_a_disabled_cache_stores_nothing():
+    """``max_entries=0`` turns the cache off."""
+    cache = PredictionCache("test", max_entries=0, db_path=None)
+    cache.put("a", 1)
+    assert cache.get("a", "miss") == "miss" and not cache.stats()["enabled"]
+
+
+def test_persistent_entries_survive_a_restart(tmp_path):
+    """A new cache on the same file reads what the previous one wrote."""
+    db_path = str(tmp_path / "cache.sqlite3")
+    first = PredictionCache("emotion", db_path=db_path)
+    first.set_version("v1")
+    first.put_many([("Okay.", ["neutral", 80.0]), ("What?", ["surprise", 70.0])])
+
+    second = PredictionCache("emotion", db_path=db_path)
+    second.set_version("v1")
+    assert second.get("Okay.") == ["neutral", 80.0]
+    other = PredictionCache("translation", db_path=db_path)
+    other.set_version("v1")
+    assert other.get("Okay.") is None  # namespaces do not share entries
+
+
+def test_a_new_model_version_invalidates_entries(tmp_path):
+    """Entries of the previous version are dropped in memory and on disk."""
+    db_path = str(tmp_path / "cache.sqlite3")
+    cache = PredictionCache("emotion", db_path=db_path)
+    cache.set_version("v1")
+    cache.put("Okay.", ["neutral", 80.0])
+    cache.set_version("v2")
+    assert cache.get("Okay.") is None
+
+    reopened = PredictionCache("emotion", db_path=db_path)
+    reopened.set_version("v1")
+    assert reopened.get("Okay.") is None
+
+
+def test_checkpoint_version_changes_when_a_file_changes(tmp_path):
+    """Replacing a checkpoint file yields a new version."""
+    weights = tmp_path / "model.safetensors"
+    weights.write_bytes(b"v1")
+    before = checkpoint_version(tmp_path)
+    assert checkpoint_version(tmp_path) == before
+    weights.write_bytes(b"v2 weights")
+    os.utime(weights, ns=(1, 1))
+    assert checkpoint_version(tmp_path) != before
@@ -0,0 +1,128 @@
+"""Tests for per-process SQLite connections and ONNX Runtime sessions.
+
+Under ``gunicorn --preload`` these objects are created in the master and
+then forked; each test forks and checks that the child uses its own.
+"""
+
+import os
+
+import pytest
+
+from app.jobs import JobStore
+from app.prediction_cache import PredictionCache
+from utils.process_local import ProcessLocal
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork()")
+
+
+def run_in_child(check) -> int:
+    """Fork, run ``check()`` in the child and return its exit code.
+
+    The child exits with 0 if ``check`` returned True, 1 if it returned False
+    and 2 if it raised.
+    """
+    pid = os.fork()
+    if pid == 0:
+        status = 2
+        try:
+            status = 0 if check() else 1
+        finally:
+            os._exit(status)
+    _, status = os.waitpid(pid, 0)
+    return os.waitstatus_to_exitcode(status)
+
+
+def test_process_local_creates_one_object_per_process():
+    """The child gets a new object; the parent keeps its own."""
+    local = ProcessLocal(object)
+    assert not local.created
+    parent_object = local.get()
+    assert local.get() is parent_object and local.created
+
+    def child_check():
+        return not local.created and local.get() is not parent_object
+
+    assert run_in_child(child_check) == 0
+    assert local.get() is parent_object
+
+
+def test_job_store_opens_a_connection_per_process(tmp_path):
+    """A forked child writes through its own connection to the same file."""
+    store = JobStore(tmp_path / "jobs.sqlite3")
+    parent_job = store.create("text", {"n": 1})
+    parent_conn = store._conn
+
+    def child_check():
+        child_job = store.create("text", {"n": 2})
+        store.update(child_job, "done", result={"ok": True})
+        return store._conn is not parent_conn and store.get(parent_job) is not None
+
+    assert run_in_child(child_check) == 0
+    assert store._conn is parent_conn
+    assert len(store.unfinished()) == 1  # the parent's job; the child's is done
+
+
+def test_job_store_does_not_connect_until_used(tmp_path):
+    """Creating a store (e.g. at import in the master) opens no connection."""
+    store = JobStore(tmp_path / "jobs.sqlite3")
+    assert not store._connection.created
+    assert store.unfinished() == []
+    assert store._connection.created
+
+
+def test_prediction_cache_opens_a_connection_per_process(tmp_path):
+    """Entries written by a forked child are read back by the parent."""
+    cache = PredictionCache("test", db_path=str(tmp_path / "cache.sqlite3"))
+    cache.set_version("v1")
+    parent_conn = cache._db
+
+    def child_check():
+        cache.put("hello", ["happiness", 90.0])
+        return cache._db is not parent_conn
+
+    assert run_in_child(child_check) == 0
+    assert cache._db is parent_conn
+    assert cache.get("hello") == ["happiness", 90.0]
+
+
+def test_onnx_session_is_created_per_process(tmp_path):
+    """The ONNX Runtime session is created lazily, and anew after fork."""
+    pytest.importorskip("onnxruntime")
+    torch = pytest.importorskip("torch")
+    from models.backends import OnnxBackend
+
+    class TinyClassifier(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.embed = torch.nn.Embedding(16, 3)
+
+        def forward(self, input_ids, attention_mask):
+            mask = attention_mask.unsqueeze(-1).float()
+            return (self.embed(input_ids) * mask).sum(dim=1)
+
+    onnx_path = tmp_path / "model.onnx"
+    dummy = torch.ones((1, 4), dtype=torch.long)
+    torch.onnx.export(
+        TinyClassifier(),
+        (dummy, dummy),
+        str(onnx_path),
+        input_names=["input_ids", "attention_mask"],
+        output_names=["logits"],
+        dynamic_axes={"input_ids": {0: "batch", 1: "sequence"}},
+        dynamo=False,
+    )
+
+    backend = OnnxBackend(onnx_path)
+    assert not backend._session.created
+    inputs = {"input_ids": dummy, "attention_mask": dummy}
+    expected = backend.logits(inputs)
+    parent_session = backend.session
+
+    def child_check():
+        return (
+            not backend._session.created
+            and backend.logits(inputs).equal(expected)
+            and backend.session is not parent_session
+        )
+
+    assert run_in_child(child_check) == 0
@@ -0,0 +1,126 @@
+"""Tests for the lazy model registry in ``models/registry.py``."""
+
+import threading
+import time
+
+import pytest
+
+from models.registry import ModelRegistry
+
+
+def counting_loader(value="component", delay: float = 0.0):
+    """A loader that returns ``value`` and counts its calls."""
+
+    def load():
+        load.calls += 1
+        time.sleep(delay)
+        return value
+
+    load.calls = 0
+    return load
+
+
+def test_components_load_on_first_use_only():
+    """Registering is free; the first ``get`` loads, later ones reuse it."""
+    registry = ModelRegistry()
+    loader = counting_loader()
+    registry.register("classifier", loader)
+    assert loader.calls == 0 and not registry.is_loaded("classifier")
+    assert registry.status()["classifier"]["state"] == "not_loaded"
+
+    assert registry.get("classifier") == "component"
+    assert registry.get("classifier") == "component"
+    assert loader.calls == 1
+    status = registry.status()["classifier"]
+    assert status["state"] == "ready" and status["load_seconds"] is not None
+
+
+def test_concurrent_callers_share_one_load():
+    """Threads asking at the same time wait for the same load."""
+    registry = ModelRegistry()
+    loader = counting_loader(object(), delay=0.05)
+    registry.register("classifier", loader)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(registry.get("classifier")))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert loader.calls == 1 and len({id(result) for result in results}) == 1
+
+
+def test_status_reports_a_load_in_progress():
+    """While the loader runs, the component is "loading" and not ready."""
+    registry = ModelRegistry()
+    started, release = threading.Event(), threading.Event()
+
+    def slow_load():
+        started.set()
+        release.wait(5)
+        return "component"
+
+    registry.register("classifier", slow_load)
+    loader = threading.Thread(target=registry.get, args=("classifier",))
+    loader.start()
+    try:
+        assert started.wait(5)
+        assert registry.status()["classifier"]["state"] == "loading"
+        assert not registry.ready(["classifier"])
+    finally:
+        release.set()
+        loader.join()
+    assert registry.ready(["classifier"])
+
+
+def test_a_failed_load_is_recorded_and_retried(caplog):
+    """The error is raised and reported; the next call tries again."""
+    registry = ModelRegistry()
+    attempts = []
+
+    def flaky_load():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise OSError("checkpoint missing")
+        return "component"
+
+    registry.register("classifier", flaky_load)
+    with pytest.raises(OSError):
+        registry.get("classifier")
+    assert registry.status()["classifier"] == {
+        "state": "failed",
+        "load_seconds": None,
+        "error": "checkpoint missing",
+    }
+    assert "Failed to load model component classifier" in caplog.text
+
+    assert registry.get("classifier") == "component"
+    assert registry.status()["classifier"]["error"] is None
+
+
+def test_warmup_loads_what_it_can():
+    """Failures are recorded, not raised; the result says if all loaded."""
+    registry = ModelRegistry()
+    registry.register("classifier", counting_loader())
+    registry.register("translator", counting_loader())
+    registry.register("broken", lambda: 1 / 0)
+
+    assert registry.warmup(["classifier"])
+    assert not registry.is_loaded("translator")
+    assert not registry.warmup()
+    states = {name: entry["state"] for name, entry in registry.status().items()}
+    assert states == {"classifier": "ready", "translator": "ready", "broken": "failed"}
+
+
+def test_unknown_and_re_registered_components():
+    """Unknown names raise KeyError; re-registering drops the loaded component."""
+    registry = ModelRegistry()
+    with pytest.raises(KeyError):
+        registry.get("missing")
+    registry.register("classifier", counting_loader("old"))
+    assert registry.get("classifier") == "old"
+    registry.register("classifier", counting_loader("new"))
+    assert not registry.is_loaded("classifier")
+    assert registry.get("classifier") == "new"
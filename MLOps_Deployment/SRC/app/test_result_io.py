@@ -0,0 +1,103 @@
+"""Tests for the result table formats in ``utils/result_io.py``."""
+
+import io
+import os
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from utils.helpers import save_to_csv  # noqa: E402
+from utils.result_io import (  # noqa: E402
+    FORMATS,
+    find_latest_table,
+    format_for_path,
+    read_table,
+    to_bytes,
+    write_table,
+)
+
+ROWS = pd.DataFrame(
+    {
+        "Sentence": [f"sentence {i}" for i in range(6)],
+        "Emotion": ["joy", "anger", "joy", "fear", "joy", "anger"],
+        "Confidence": [0.9, 0.8, 0.7, 0.6, 0.5, 0.4],
+    }
+)
+
+
+@pytest.mark.parametrize("fmt", sorted(FORMATS))
+def test_write_then_read_round_trips(tmp_path, fmt):
+    """Every format returns the rows it was given."""
+    path = tmp_path / f"results{FORMATS[fmt].suffix}"
+    write_table(ROWS, path)
+    assert format_for_path(path) == fmt
+    table = read_table(path)
+    assert table.to_dict("list") == ROWS.to_dict("list")
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_label_columns_come_back_as_categoricals(tmp_path, fmt):
+    """Columnar files dictionary-encode labels; values compare as strings."""
+    path = tmp_path / f"results{FORMATS[fmt].suffix}"
+    write_table(ROWS, path)
+    emotion = read_table(path)["Emotion"]
+    assert isinstance(emotion.dtype, pd.CategoricalDtype)
+    assert set(emotion.cat.categories) == {"joy", "anger", "fear"}
+    assert (emotion == "joy").sum() == 3
+    assert emotion.value_counts()["anger"] == 2
+
+
+@pytest.mark.parametrize("fmt", sorted(FORMATS))
+def test_columns_are_projected(tmp_path, fmt):
+    """Only the requested columns are returned."""
+    path = tmp_path / f"results{FORMATS[fmt].suffix}"
+    write_table(ROWS, path)
+    table = read_table(path, columns=("Sentence", "Confidence"))
+    assert table.columns.tolist() == ["Sentence", "Confidence"]
+    assert table["Confidence"].tolist() == ROWS["Confidence"].tolist()
+
+
+def test_to_bytes_matches_the_file_format():
+    """In-memory serialization reads back with the same reader."""
+    data = to_bytes(ROWS, "parquet")
+    table = FORMATS["parquet"].read(io.BytesIO(data), None)
+    assert table["Sentence"].tolist() == ROWS["Sentence"].tolist()
+
+
+def test_format_for_path_uses_the_suffix():
+    """Suffixes match case-insensitively; unknown ones are rejected."""
+    assert format_for_path("out/RESULTS.PARQUET") == "parquet"
+    assert format_for_path("results.arrow") == "arrow"
+    for path in ("results.xlsx", "results"):
+        with pytest.raises(ValueError):
+            format_for_path(path)
+    with pytest.raises(ValueError):
+        write_table(ROWS, "results.txt")
+
+
+def test_find_latest_table_looks_at_every_format(tmp_path):
+    """The newest file of any registered format is returned."""
+    with pytest.raises(FileNotFoundError):
+        find_latest_table(str(tmp_path))
+    (tmp_path / "notes.txt").write_text("not a result")
+    for age, name in enumerate(["new.arrow", "old.csv", "older.parquet"]):
+        path = tmp_path / name
+        write_table(ROWS, path)
+        os.utime(path, (1000 - age, 1000 - age))
+    assert find_latest_table(str(tmp_path)) == str(tmp_path / "new.arrow")
+
+
+def test_save_to_csv_prepends_to_a_parquet_file(tmp_path):
+    """New rows go on top, including labels the file has not seen yet."""
+    save_to_csv(ROWS, "results.parquet", output_dir=str(tmp_path))
+    new_rows = pd.DataFrame(
+        {"Sentence": ["newest"], "Emotion": ["surprise"], "Confidence": [1.0]}
+    )
+    save_to_csv(new_rows, "results.parquet", output_dir=str(tmp_path))
+    table = read_table(tmp_path / "results.parquet")
+    assert len(table) == 7
+    assert table["Sentence"].tolist()[:2] == ["newest", "sentence 0"]
+    assert table["Emotion"].tolist()[0] == "surprise"
+    assert not (tmp_path / "results.parquet.idx").exists()
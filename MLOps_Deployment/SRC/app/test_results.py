@@ -0,0 +1,114 @@
+"""Tests for result files and their ETag/Range downloads in ``app/results.py``."""
+
+import os
+import time
+
+import pandas as pd
+import pytest
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.testclient import TestClient
+
+from app.results import ResultStore, file_response, new_result_id
+
+ROWS = pd.DataFrame(
+    {"Sentence": [f"sentence {i}" for i in range(50)], "Emotion": ["joy"] * 50}
+)
+
+
+@pytest.fixture
+def store(tmp_path):
+    """A result store in a temporary directory."""
+    return ResultStore(tmp_path, ttl=60)
+
+
+@pytest.fixture
+def client(store):
+    """A client of an app that downloads results of ``store``."""
+    app = FastAPI()
+
+    @app.get("/download/{result_id}")
+    def download(request: Request, result_id: str):
+        path = store.find(result_id)
+        if path is None:
+            raise HTTPException(status_code=404)
+        return file_response(request, path, path.name)
+
+    return TestClient(app)
+
+
+def test_full_download_has_validators(store, client):
+    """A plain GET returns the file with ETag and Accept-Ranges."""
+    result_id = new_result_id()
+    path = store.save_csv(ROWS, result_id)
+    response = client.get(f"/download/{result_id}")
+    assert response.status_code == 200
+    assert response.content == path.read_bytes()
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["etag"].startswith('"')
+
+
+def test_matching_if_none_match_returns_304(store, client):
+    """A client holding the current version gets no body."""
+    result_id = new_result_id()
+    store.save_csv(ROWS, result_id)
+    etag = client.get(f"/download/{result_id}").headers["etag"]
+    response = client.get(f"/download/{result_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 304 and response.content == b""
+    stale = client.get(f"/download/{result_id}", headers={"If-None-Match": '"x"'})
+    assert stale.status_code == 200
+
+
+def test_byte_ranges(store, client):
+    """Open, closed and suffix ranges return exactly the requested bytes."""
+    result_id = new_result_id()
+    data = store.save_csv(ROWS, result_id).read_bytes()
+    size = len(data)
+    for header, expected, content_range in [
+        ("bytes=0-9", data[:10], f"bytes 0-9/{size}"),
+        ("bytes=10-", data[10:], f"bytes 10-{size - 1}/{size}"),
+        ("bytes=-5", data[-5:], f"bytes {size - 5}-{size - 1}/{size}"),
+        (f"bytes=5-{size + 100}", data[5:], f"bytes 5-{size - 1}/{size}"),
+    ]:
+        response = client.get(f"/download/{result_id}", headers={"Range": header})
+        assert response.status_code == 206, header
+        assert response.content == expected, header
+        assert response.headers["content-range"] == content_range
+
+
+def test_unsatisfiable_range_returns_416(store, client):
+    """A range past the end of the file is rejected with its size."""
+    result_id = new_result_id()
+    size = len(store.save_csv(ROWS, result_id).read_bytes())
+    response = client.get(f"/download/{result_id}", headers={"Range": f"bytes={size}-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{size}"
+
+
+def test_if_range_with_an_old_etag_returns_the_whole_file(store, client):
+    """A resumed download of a replaced file starts over."""
+    result_id = new_result_id()
+    data = store.save_csv(ROWS, result_id).read_bytes()
+    response = client.get(
+        f"/download/{result_id}",
+        headers={"Range": "bytes=0-9", "If-Range": '"old"'},
+    )
+    assert response.status_code == 200 and response.content == data
+
+
+def test_results_expire_after_the_ttl(store, client):
+    """Expired results are neither found nor kept by the sweep."""
+    result_id = new_result_id()
+    path = store.save_csv(ROWS, result_id)
+    old = time.time() - 120
+    os.utime(path, (old, old))
+    assert store.find(result_id) is None
+    assert client.get(f"/download/{result_id}").status_code == 404
+    assert store.sweep() == 1 and not path.exists()
+
+
+def test_invalid_ids_and_file_names_are_not_resolved(store):
+    """Only IDs and file names the store issued map to files."""
+    assert store.find("../../etc/passwd") is None
+    assert store.find_file("../predictions_" + "a" * 32 + ".csv") is None
+    with pytest.raises(ValueError):
+        store.path("not-an-id")
@@ -0,0 +1,138 @@
+"""Tests for the circuit breaker and hedged routing in ``app/router.py``."""
+
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+
+import pytest
+
+from app.router import CircuitBreaker, InferenceRouter
+
+REMOTE = {"predicted_label": "joy", "confidence": 0.9}
+LOCAL = {"predicted_label": "sadness", "confidence": 0.5}
+
+
+@pytest.fixture
+def pool():
+    """Threads that play the remote endpoint."""
+    pool = ThreadPoolExecutor(4)
+    yield pool
+    pool.shutdown(wait=True)
+
+
+def make_remote(pool, delay: float = 0.0, error: Optional[Exception] = None):
+    """A remote backend answering after ``delay`` seconds, or failing."""
+    calls = []
+
+    def call(texts):
+        calls.append(texts)
+        time.sleep(delay)
+        if error is not None:
+            raise error
+        return [dict(REMOTE) for _ in texts]
+
+    def remote(texts) -> Future:
+        return pool.submit(call, texts)
+
+    remote.calls = calls
+    return remote
+
+
+def local(texts):
+    """The local model."""
+    return [dict(LOCAL) for _ in texts]
+
+
+def make_router(remote, **kwargs) -> InferenceRouter:
+    """A hedged router with short deadlines."""
+    kwargs.setdefault("route", "hedged")
+    kwargs.setdefault("hedge_min_ms", 20)
+    kwargs.setdefault("hedge_max_ms", 50)
+    kwargs.setdefault("slow_seconds", 10)
+    return InferenceRouter(remote, local, **kwargs)
+
+
+def test_breaker_opens_after_consecutive_failures_and_probes_once():
+    """Open after the threshold; after the reset one probe decides."""
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=0.05)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()  # the half-open probe
+    assert not breaker.allow()  # only one probe at a time
+    breaker.record_failure()
+    assert breaker.state == "open" and breaker.opened == 2
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+
+
+def test_success_resets_the_failure_count():
+    """Failures must be consecutive to open the breaker."""
+    breaker = CircuitBreaker(failure_threshold=2)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+
+def test_fast_endpoint_answers(pool):
+    """Within the deadline the endpoint's results are used."""
+    router = make_router(make_remote(pool))
+    assert router.classify(["a"]) == [{**REMOTE, "source": "remote"}]
+    assert router.counts["hedged"] == 0
+    router.close()
+
+
+def test_failing_endpoint_falls_back_to_local(pool):
+    """An endpoint error is answered by the local model."""
+    router = make_router(make_remote(pool, error=RuntimeError("503")))
+    assert router.classify(["a"]) == [{**LOCAL, "source": "local"}]
+    assert router.counts["fallback"] == 1
+    router.close()
+
+
+def test_slow_endpoint_is_hedged_by_the_local_model(pool):
+    """Past the deadline the local model starts and wins the race."""
+    router = make_router(make_remote(pool, delay=0.5))
+    start = time.perf_counter()
+    assert router.classify(["a"]) == [{**LOCAL, "source": "local"}]
+    assert time.perf_counter() - start < 0.4
+    assert router.counts["hedged"] == router.counts["hedge_won_by_local"] == 1
+    router.close()
+
+
+def test_open_breaker_routes_locally_without_calling_the_endpoint(pool):
+    """Once open, requests skip the endpoint until the reset time."""
+    remote = make_remote(pool, error=RuntimeError("down"))
+    router = make_router(remote, breaker=CircuitBreaker(2, reset_seconds=60))
+    for _ in range(2):
+        router.classify(["a"])
+    time.sleep(0.05)  # let the failure callbacks reach the breaker
+    calls = len(remote.calls)
+    assert router.classify(["a"]) == [{**LOCAL, "source": "local"}]
+    assert len(remote.calls) == calls and router.counts["breaker_open"] == 1
+    router.close()
+
+
+def test_hedge_deadline_follows_recent_latency(pool):
+    """The deadline is the latency percentile, clamped to the bounds."""
+    router = make_router(make_remote(pool), hedge_min_ms=10, hedge_max_ms=1000)
+    assert router.hedge_deadline() == 1.0  # no latencies yet
+    router._latencies.extend([0.02] * 19 + [0.5])
+    assert router.hedge_deadline() == 0.02
+    router._latencies.clear()
+    router._latencies.extend([0.001] * 20)
+    assert router.hedge_deadline() == 0.01
+    router.close()
+
+
+def test_unknown_route_is_rejected(pool):
+    """A typo in ``INFERENCE_ROUTE`` fails loudly."""
+    with pytest.raises(ValueError):
+        make_router(make_remote(pool), route="fastest")
@@ -0,0 +1,102 @@
+"""Tests for the micro-batching scheduler in ``app/scheduler.py``."""
+
+import asyncio
+
+import pytest
+
+from app.scheduler import Histogram, MicroBatcher
+
+
+def test_histogram_snapshot_is_cumulative():
+    """Bucket counts include every smaller bucket; +Inf counts everything."""
+    histogram = Histogram([1, 4])
+    for value in (0.5, 1, 3, 10):
+        histogram.observe(value)
+    snapshot = histogram.snapshot()
+    assert snapshot["buckets"] == {"1": 2, "4": 3, "+Inf": 4}
+    assert snapshot["count"] == 4 and snapshot["sum"] == 14.5
+
+
+def test_concurrent_requests_share_one_batch():
+    """Requests submitted within the window reach ``batch_fn`` together."""
+    calls = []
+
+    def batch_fn(items):
+        calls.append(list(items))
+        return [item * 2 for item in items]
+
+    async def main():
+        batcher = MicroBatcher(batch_fn, max_batch_size=8, max_wait_ms=50)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+        await batcher.stop()
+        return results, batcher.stats()
+
+    results, stats = asyncio.run(main())
+    assert results == [0, 2, 4, 6, 8]
+    assert calls == [[0, 1, 2, 3, 4]]
+    assert stats["batch_size"]["count"] == 1
+
+
+def test_batches_are_cut_at_the_maximum_size():
+    """More requests than ``max_batch_size`` are split into several batches."""
+    calls = []
+
+    def batch_fn(items):
+        calls.append(len(items))
+        return list(items)
+
+    async def main():
+        batcher = MicroBatcher(batch_fn, max_batch_size=4, max_wait_ms=50)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(10)))
+        await batcher.stop()
+        return results
+
+    assert asyncio.run(main()) == list(range(10))
+    assert max(calls) <= 4 and sum(calls) == 10
+
+
+def test_exception_results_fail_only_their_caller():
+    """An ``Exception`` returned for one item is raised in that caller only."""
+
+    def batch_fn(items):
+        return [ValueError(item) if item == "bad" else item for item in items]
+
+    async def main():
+        batcher = MicroBatcher(batch_fn, max_wait_ms=20)
+        results = await asyncio.gather(
+            batcher.submit("ok"), batcher.submit("bad"), return_exceptions=True
+        )
+        await batcher.stop()
+        return results
+
+    ok, bad = asyncio.run(main())
+    assert ok == "ok" and isinstance(bad, ValueError)
+
+
+def test_batch_fn_error_fails_the_whole_batch():
+    """An exception raised by ``batch_fn`` reaches every waiting caller."""
+
+    def batch_fn(items):
+        raise RuntimeError("model down")
+
+    async def main():
+        batcher = MicroBatcher(batch_fn, max_wait_ms=20)
+        results = await asyncio.gather(
+            batcher.submit(1), batcher.submit(2), return_exceptions=True
+        )
+        await batcher.stop()
+        return results
+
+    assert all(isinstance(r, RuntimeError) for r in asyncio.run(main()))
+
+
+def test_wrong_number_of_results_is_an_error():
+    """A ``batch_fn`` that drops items fails the batch instead of misrouting."""
+
+    async def main():
+        batcher = MicroBatcher(lambda items: items[:1], max_wait_ms=20)
+        with pytest.raises(RuntimeError, match="returned 1 results for 2 items"):
+            await asyncio.gather(batcher.submit(1), batcher.submit(2))
+        await batcher.stop()
+
+    asyncio.run(main())
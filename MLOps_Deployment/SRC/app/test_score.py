@@ -0,0 +1,113 @@
+"""Tests for single and batched requests to ``deployment/score.py::run``."""
+
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "deployment"))
+import score  # noqa: E402
+
+LABELS = list("abcdefg")
+
+
+def expected_label(text: str) -> str:
+    """The label the stub model gives ``text``."""
+    return LABELS[len(text) % len(LABELS)]
+
+
+class StubTokenizer:
+    """One token per character, padded to the longest text of the call."""
+
+    def __call__(self, texts, return_tensors, truncation, max_length, padding):
+        width = max(len(text) for text in texts)
+        return {
+            "input_ids": torch.tensor(
+                [[ord(c) for c in text] + [0] * (width - len(text)) for text in texts]
+            ),
+            "attention_mask": torch.tensor(
+                [[1] * len(text) + [0] * (width - len(text)) for text in texts]
+            ),
+        }
+
+
+class StubModel:
+    """Scores the label of each text's length and records its batches."""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, input_ids, attention_mask):
+        lengths = attention_mask.sum(dim=1)
+        self.batches.append(lengths.tolist())
+        logits = torch.nn.functional.one_hot(lengths % len(LABELS), len(LABELS))
+        return SimpleNamespace(logits=logits.float() * 10)
+
+
+class StubEncoder:
+    """Maps class indices to ``LABELS``."""
+
+    def inverse_transform(self, indices):
+        return [LABELS[i] for i in indices]
+
+
+@pytest.fixture
+def model(monkeypatch):
+    """Serve ``run`` from stubs instead of a registered model."""
+    model = StubModel()
+    monkeypatch.setattr(score, "model", model, raising=False)
+    monkeypatch.setattr(score, "tokenizer", StubTokenizer(), raising=False)
+    monkeypatch.setattr(score, "label_encoder", StubEncoder(), raising=False)
+    monkeypatch.setattr(score, "onnx_session", None, raising=False)
+    monkeypatch.setattr(score, "MAX_BATCH_SIZE", 2)
+    return model
+
+
+def run(data: dict) -> dict:
+    """Call ``score.run`` with ``data`` as the raw JSON body."""
+    return score.run(json.dumps(data))
+
+
+def test_batch_results_keep_input_order(model):
+    """Texts are batched shortest first but answered in request order."""
+    texts = ["a much longer text", "hi", "medium text", "abc", "x"]
+    results = run({"texts": texts})["results"]
+    assert [r["text"] for r in results] == texts
+    assert [r["predicted_label"] for r in results] == [expected_label(t) for t in texts]
+    assert all(0.9 < r["confidence"] <= 1 for r in results)
+    assert model.batches == [[1, 2], [3, 11], [18]]
+
+
+def test_empty_items_get_an_error_and_skip_the_model(model):
+    """Blank texts are answered in place without being classified."""
+    results = run({"texts": ["hello", "  ", "there"]})["results"]
+    assert results[1] == {"text": "", "error": "Empty input"}
+    assert results[0]["predicted_label"] == expected_label("hello")
+    assert results[2]["predicted_label"] == expected_label("there")
+    assert sum(len(batch) for batch in model.batches) == 2
+
+
+def test_too_many_or_invalid_texts_are_rejected(model, monkeypatch):
+    """Oversized batches and non-string items fail before any inference."""
+    monkeypatch.setattr(score, "MAX_TEXTS_PER_REQUEST", 3)
+    assert run({"texts": ["a"] * 3})["results"]
+    assert run({"texts": ["a"] * 4}) == {"error": "At most 3 texts per request"}
+    assert "error" in run({"texts": "not a list"})
+    assert "error" in run({"texts": ["ok", 5]})
+    assert len(model.batches) == 2  # only the valid batch of three
+
+
+def test_single_text_form_is_unchanged(model):
+    """``{"text": ...}`` still returns one prediction dictionary."""
+    assert run({"text": "  hello  "}) == {
+        "text": "hello",
+        "predicted_label": expected_label("hello"),
+        "confidence": pytest.approx(1, abs=1e-3),
+    }
+    assert run({"text": "   "}) == {"error": "Empty input"}
+    assert run({}) == {"error": "Empty input"}
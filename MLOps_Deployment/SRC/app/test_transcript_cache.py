@@ -0,0 +1,113 @@
+"""Tests for the on-disk transcript cache in ``app/transcript_cache.py``."""
+
+import hashlib
+import logging
+import os
+import threading
+
+from app.transcript_cache import (
+    TranscriptCache,
+    content_cache_key,
+    hash_file,
+    url_cache_key,
+    youtube_video_id,
+)
+
+SENTENCES = [{"text": "Hello there.", "start": 0, "end": 900}]
+
+
+def test_youtube_links_share_one_key():
+    """Watch, short and embed links of one video map to the same key."""
+    links = [
+        "https://www.youtube.com/watch?v=abc123&t=778s",
+        "https://youtu.be/abc123",
+        "https://m.youtube.com/shorts/abc123",
+        "https://youtube.com/embed/abc123?autoplay=1",
+    ]
+    assert {youtube_video_id(link) for link in links} == {"abc123"}
+    assert url_cache_key(links[0], "en") == url_cache_key(links[1], "en")
+    assert url_cache_key(links[0], "en") != url_cache_key(links[0], "pl")
+
+
+def test_other_urls_are_canonicalized():
+    """Scheme and host case and the fragment do not change the key."""
+    assert youtube_video_id("https://example.com/a.mp3") is None
+    assert url_cache_key("HTTPS://Example.com/a.mp3#t=5") == url_cache_key(
+        "https://example.com/a.mp3"
+    )
+
+
+def test_content_key_uses_the_file_digest(tmp_path):
+    """Files are keyed by the SHA-256 of their bytes."""
+    media = tmp_path / "audio.wav"
+    media.write_bytes(b"RIFF" * 1000)
+    digest = hashlib.sha256(media.read_bytes()).hexdigest()
+    assert hash_file(media) == digest
+    assert content_cache_key(digest, "en") == f"sha256:{digest}|en"
+
+
+def test_put_and_get_round_trip(tmp_path):
+    """A stored transcript is returned with its metadata and counted as a hit."""
+    cache = TranscriptCache(tmp_path, max_bytes=10**6)
+    assert cache.get("k") is None
+    cache.put("k", "en", SENTENCES, transcript_id="t1")
+    entry = cache.get("k")
+    assert entry["sentences"] == SENTENCES and entry["transcript_id"] == "t1"
+    assert "k" in cache
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 1)
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    """Over the size limit, the entry read longest ago is deleted first."""
+    probe = TranscriptCache(tmp_path / "probe", max_bytes=10**6)
+    probe.put("x", "en", SENTENCES)
+    entry_size = probe.stats()["bytes"]
+
+    cache = TranscriptCache(tmp_path / "cache", max_bytes=int(entry_size * 2.5))
+    cache.put("old", "en", SENTENCES)
+    cache.put("recent", "en", SENTENCES)
+    os.utime(cache._path("old"), (1, 1))
+    os.utime(cache._path("recent"), (2, 2))
+    assert cache.get("old") is not None  # now the most recently used
+    cache.put("new", "en", SENTENCES)
+    assert "old" in cache and "new" in cache and "recent" not in cache
+
+
+def test_a_zero_size_cache_is_disabled(tmp_path):
+    """``max_bytes=0`` stores nothing."""
+    cache = TranscriptCache(tmp_path, max_bytes=0)
+    cache.put("k", "en", SENTENCES)
+    assert cache.get("k") is None and not list(tmp_path.iterdir())
+
+
+def test_concurrent_writers_of_one_key_do_not_collide(tmp_path):
+    """Caches with separate locks, like workers, can store the same entry."""
+    caches = [TranscriptCache(tmp_path, max_bytes=10**6) for _ in range(4)]
+    errors = []
+
+    def write(cache):
+        try:
+            for _ in range(50):
+                cache.put("k", "en", SENTENCES)
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    threads = [threading.Thread(target=write, args=(cache,)) for cache in caches]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert caches[0].get("k")["sentences"] == SENTENCES
+    assert [path.name for path in tmp_path.iterdir()] == [caches[0]._path("k").name]
+
+
+def test_a_failed_write_is_logged_not_raised(tmp_path, caplog):
+    """An unwritable cache directory does not fail the caller."""
+    blocker = tmp_path / "not-a-dir"
+    blocker.write_text("")
+    cache = TranscriptCache(blocker, max_bytes=10**6)
+    with caplog.at_level(logging.WARNING):
+        cache.put("k", "en", SENTENCES)
+    assert cache.get("k") is None
+    assert "Could not cache transcript k" in caplog.text
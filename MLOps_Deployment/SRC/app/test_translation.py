@@ -0,0 +1,121 @@
+"""Tests for batched, cached translation in ``models/translation.py``."""
+
+from types import SimpleNamespace
+
+import pytest
+
+torch = pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+
+from app.prediction_cache import PredictionCache  # noqa: E402
+from models import translation  # noqa: E402
+from models.translation import TranslationEngine, get_translation_engine  # noqa: E402
+
+
+class StubTokenizer:
+    """One token per character."""
+
+    def __call__(self, texts, truncation=True, max_length=None):
+        input_ids = [[ord(c) for c in text] for text in texts]
+        return {
+            "input_ids": input_ids,
+            "attention_mask": [[1] * len(ids) for ids in input_ids],
+        }
+
+    def pad(self, features, padding="longest", return_tensors="pt"):
+        width = max(len(f["input_ids"]) for f in features)
+        return transformers.BatchEncoding(
+            {
+                key: torch.tensor(
+                    [f[key] + [0] * (width - len(f[key])) for f in features]
+                )
+                for key in ("input_ids", "attention_mask")
+            }
+        )
+
+    def batch_decode(self, generated, skip_special_tokens=True):
+        return ["".join(chr(i) for i in row if i) for row in generated.tolist()]
+
+
+class StubModel:
+    """Upper-cases each text as its translation and records generate calls."""
+
+    def __init__(self):
+        self.calls = []
+
+    def to(self, device):
+        return self
+
+    def eval(self):
+        return self
+
+    def generate(self, input_ids, attention_mask, **kwargs):
+        self.calls.append((attention_mask.sum(dim=1).tolist(), kwargs))
+        upper = [[ord(chr(i).upper()) if i else 0 for i in row] for row in input_ids]
+        return torch.tensor(upper)
+
+
+@pytest.fixture
+def model(monkeypatch):
+    """Load stubs instead of a MarianMT checkpoint; start without engines."""
+    model = StubModel()
+    monkeypatch.setattr(
+        translation,
+        "AutoTokenizer",
+        SimpleNamespace(from_pretrained=lambda name: StubTokenizer()),
+    )
+    monkeypatch.setattr(
+        translation,
+        "AutoModelForSeq2SeqLM",
+        SimpleNamespace(from_pretrained=lambda name: model),
+    )
+    monkeypatch.setattr(translation, "TRANSLATION_NUM_BEAMS", None)
+    monkeypatch.setattr(translation, "_engines", {})
+    return model
+
+
+def test_batches_respect_the_token_budget_and_keep_order(model):
+    """Sentences are grouped by length under the budget, answered in order."""
+    engine = TranslationEngine("stub", max_batch_tokens=12, max_batch_size=8)
+    texts = ["dzień dobry", "tak", "co słychać?", "nie", "dobrze"]
+    assert engine.translate(texts) == [text.upper() for text in texts]
+    batches = [lengths for lengths, _ in model.calls]
+    assert sorted(n for batch in batches for n in batch) == sorted(map(len, texts))
+    assert all(len(batch) * max(batch) <= 12 for batch in batches)
+    assert all(kwargs == {} for _, kwargs in model.calls)
+
+
+def test_repeated_and_cached_sentences_are_generated_once(model):
+    """Duplicates share one translation; later calls hit the cache."""
+    cache = PredictionCache("translation", db_path=None)
+    engine = TranslationEngine("stub", cache=cache)
+    assert engine.translate(["tak", "nie", "tak"]) == ["TAK", "NIE", "TAK"]
+    assert sum(len(lengths) for lengths, _ in model.calls) == 2
+    assert engine.translate_one("nie") == "NIE"
+    assert len(model.calls) == 1
+
+
+def test_beam_size_is_passed_on_and_versions_the_cache(model):
+    """Each beam size gets its own cache version."""
+    cache = PredictionCache("translation", db_path=None)
+    TranslationEngine("stub", cache=cache)
+    assert cache.version == "stub|beams=default"
+    engine = TranslationEngine("stub", cache=cache, num_beams=1)
+    assert cache.version == "stub|beams=1"
+    engine.translate(["tak"])
+    assert model.calls[-1][1] == {"num_beams": 1}
+
+
+def test_engines_are_shared_per_settings(model, monkeypatch):
+    """Same settings share an engine; different ones are not ignored."""
+    cache = PredictionCache("translation", db_path=None)
+    plain = get_translation_engine("stub")
+    assert get_translation_engine("stub") is plain
+    cached = get_translation_engine("stub", cache=cache)
+    assert cached is not plain and cached.cache is cache and plain.cache is None
+    assert get_translation_engine("stub", cache=cache) is cached
+
+    monkeypatch.setattr(translation, "TRANSLATION_NUM_BEAMS", "2")
+    beams = get_translation_engine("stub")
+    assert beams is not plain and beams.num_beams == 2
+    assert get_translation_engine("stub", num_beams=2) is beams
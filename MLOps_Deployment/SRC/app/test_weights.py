@@ -0,0 +1,60 @@
+"""Tests for memory-mapped checkpoint loading in ``models/weights.py``."""
+
+import threading
+
+import pytest
+
+torch = pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+
+from models.weights import _parameters_on_meta, load_pretrained_mmap  # noqa: E402
+
+
+def tiny_checkpoint(model_dir) -> torch.nn.Module:
+    """Save a small RoBERTa classifier and return it."""
+    config = transformers.RobertaConfig(
+        vocab_size=32,
+        hidden_size=16,
+        num_hidden_layers=1,
+        num_attention_heads=2,
+        intermediate_size=32,
+        num_labels=7,
+    )
+    model = transformers.RobertaForSequenceClassification(config).eval()
+    model.save_pretrained(model_dir)
+    return model
+
+
+def test_mmap_model_matches_the_saved_model(tmp_path):
+    """The memory-mapped model computes the same logits as the original."""
+    original = tiny_checkpoint(tmp_path)
+    loaded = load_pretrained_mmap(
+        tmp_path, transformers.RobertaForSequenceClassification
+    )
+    ids = torch.tensor([[0, 5, 6, 7, 2]])
+    with torch.no_grad():
+        assert torch.allclose(original(ids).logits, loaded(ids).logits)
+    assert not any(param.is_meta for param in loaded.parameters())
+
+
+def test_meta_parameters_do_not_leak_into_other_threads():
+    """A model built in another thread during a mmap load gets real weights."""
+    entered, release = threading.Event(), threading.Event()
+    built_on_meta = []
+
+    def load():
+        with _parameters_on_meta():
+            entered.set()
+            release.wait(5)
+            built_on_meta.append(torch.nn.Linear(2, 2).weight.is_meta)
+
+    loader = threading.Thread(target=load)
+    loader.start()
+    try:
+        assert entered.wait(5)
+        assert not torch.nn.Linear(2, 2).weight.is_meta
+    finally:
+        release.set()
+        loader.join()
+    assert built_on_meta == [True]
+    assert not torch.nn.Linear(2, 2).weight.is_meta
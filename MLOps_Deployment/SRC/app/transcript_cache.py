@@ -0,0 +1,203 @@
+"""
+transcript_cache.py
+-------------------
+Content-addressed on-disk cache of AssemblyAI transcripts.
+
+Each entry stores the sentence list returned by ``get_sentences`` and the
+detected language. Entries are keyed by the SHA-256 of the audio/video bytes,
+by the video ID for YouTube links, or by the canonical URL for other links,
+always combined with the requested language. The cache directory is kept
+under a size limit by evicting the least recently used entries.
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import threading
+import time
+import urllib.parse
+from pathlib import Path
+from typing import Any, AsyncIterable, AsyncIterator, Optional
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+TRANSCRIPT_CACHE_DIR = os.getenv("TRANSCRIPT_CACHE_DIR", "cache/transcripts")
+TRANSCRIPT_CACHE_MB = float(os.getenv("TRANSCRIPT_CACHE_MB", "512"))
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def youtube_video_id(url: str) -> Optional[str]:
+    """Return the video ID of a YouTube link, or None for other URLs.
+
+    Handles ``youtube.com/watch?v=``, ``youtu.be/``, ``/shorts/`` and
+    ``/embed/`` links; extra parameters such as ``&t=778s`` are ignored.
+    """
+    parsed = urllib.parse.urlparse(url)
+    host = parsed.netloc.lower().split(":")[0]
+    if host.startswith("www.") or host.startswith("m."):
+        host = host.split(".", 1)[1]
+    parts = [p for p in parsed.path.split("/") if p]
+    if host == "youtu.be" and parts:
+        return parts[0]
+    if host.endswith("youtube.com"):
+        if parts[:1] == ["watch"]:
+            return urllib.parse.parse_qs(parsed.query).get("v", [None])[0]
+        if len(parts) >= 2 and parts[0] in ("shorts", "embed", "live", "v"):
+            return parts[1]
+    return None
+
+
+def url_cache_key(url: str, language: str = "auto") -> str:
+    """Cache key for a media URL: YouTube video ID or canonical URL."""
+    video_id = youtube_video_id(url)
+    if video_id:
+        return f"youtube:{video_id}|{language}"
+    parsed = urllib.parse.urlparse(url)
+    canonical = parsed._replace(
+        scheme=parsed.scheme.lower(), netloc=parsed.netloc.lower(), fragment=""
+    )
+    return f"url:{urllib.parse.urlunparse(canonical)}|{language}"
+
+
+def content_cache_key(digest: str, language: str = "auto") -> str:
+    """Cache key for media content identified by its SHA-256 hex digest."""
+    return f"sha256:{digest}|{language}"
+
+
+def hash_file(path: str | Path) -> str:
+    """Return the SHA-256 hex digest of a file."""
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+async def hash_chunks(chunks: AsyncIterable[bytes], sha: Any) -> AsyncIterator[bytes]:
+    """Pass a byte stream through while feeding it to a ``hashlib`` object."""
+    async for chunk in chunks:
+        sha.update(chunk)
+        yield chunk
+
+
+class TranscriptCache:
+    """On-disk JSON store of transcripts with size-based LRU eviction."""
+
+    def __init__(self, directory: str | Path, max_bytes: int):
+        """Create the cache.
+
+        Args:
+            directory (str | Path): Where entries are stored.
+            max_bytes (int): Total size the directory is trimmed to; 0
+                disables the cache.
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the cache stores and returns entries."""
+        return self.max_bytes > 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{hashlib.sha256(key.encode()).hexdigest()}.json"
+
+    def __contains__(self, key: str) -> bool:
+        return self.enabled and self._path(key).exists()
+
+    def get(self, key: str) -> Optional[dict]:
+        """Return the cached transcript for ``key`` and mark it recently used.
+
+        Returns:
+            dict | None: ``{"language_code", "sentences", ...}`` or None.
+        """
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        with self._lock:
+            try:
+                entry = json.loads(path.read_text(encoding="utf-8"))
+                os.utime(path)  # LRU order is the file modification time
+            except (OSError, ValueError):
+                self.misses += 1
+                return None
+            self.hits += 1
+        logger.info(f"Transcript cache hit for {key}")
+        return entry
+
+    def put(self, key: str, language_code: str, sentences: list[dict], **extra) -> None:
+        """Store a transcript and evict old entries if over the size limit.
+
+        The entry is written to a temporary file unique to this process and
+        thread and renamed into place, so concurrent writers never interleave.
+        A failed write is logged and otherwise ignored: the transcript has
+        already been obtained, so the request does not fail.
+
+        Args:
+            key (str): Cache key.
+            language_code (str): Detected language of the transcript.
+            sentences (list[dict]): Sentences with ``text``, ``start``, ``end``.
+            **extra: Additional metadata (e.g. ``transcript_id``).
+        """
+        if not self.enabled:
+            return
+        entry = {
+            "key": key,
+            "language_code": language_code,
+            "sentences": sentences,
+            "created_at": time.time(),
+            **extra,
+        }
+        path = self._path(key)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with self._lock:
+            try:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                tmp.write_text(json.dumps(entry), encoding="utf-8")
+                os.replace(tmp, path)
+                self._evict()
+            except OSError as e:
+                logger.warning(f"Could not cache transcript {key}: {e}")
+                with contextlib.suppress(OSError):
+                    tmp.unlink()
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until under ``max_bytes``."""
+        files = []
+        for path in self.directory.glob("*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            logger.debug(f"Evicted cached transcript {path.name}")
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and the current size of the cache."""
+        files = list(self.directory.glob("*.json")) if self.enabled else []
+        return {
+            "enabled": self.enabled,
+            "entries": len(files),
+            "bytes": sum(p.stat().st_size for p in files if p.exists()),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+transcript_cache = TranscriptCache(
+    TRANSCRIPT_CACHE_DIR, int(TRANSCRIPT_CACHE_MB * 1024 * 1024)
+)
@@ -0,0 +1,137 @@
+"""
+uploads.py
+----------
+Chunked streaming of uploaded media with a size limit.
+
+Uploaded files are read in fixed-size chunks instead of ``await file.read()``,
+so memory per request stays bounded regardless of the file size. Chunks can be
+written to disk or piped straight into the AssemblyAI upload.
+"""
+
+import os
+import tempfile
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+from fastapi import Request, UploadFile
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+MAX_UPLOAD_BYTES = int(float(os.getenv("MAX_UPLOAD_MB", "1024")) * 1024 * 1024)
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds the configured maximum size."""
+
+    def __init__(self, max_bytes: int):
+        """Create the error for a given limit in bytes."""
+        super().__init__(f"Upload exceeds the {max_bytes / (1024 * 1024):g} MB limit.")
+        self.max_bytes = max_bytes
+
+
+def check_content_length(
+    content_length: Optional[str], max_bytes: int = MAX_UPLOAD_BYTES
+) -> None:
+    """Reject a request up front if its declared body size is over the limit.
+
+    Multipart framing adds a little overhead, so the exact file size is
+    enforced again while streaming.
+
+    Args:
+        content_length (str, optional): Value of the Content-Length header.
+        max_bytes (int, optional): Maximum file size in bytes.
+
+    Raises:
+        UploadTooLargeError: If the declared size is clearly over the limit.
+    """
+    if content_length and content_length.isdigit():
+        if int(content_length) > max_bytes + UPLOAD_CHUNK_SIZE:
+            raise UploadTooLargeError(max_bytes)
+
+
+async def iter_upload(
+    file: UploadFile,
+    max_bytes: int = MAX_UPLOAD_BYTES,
+    chunk_size: int = UPLOAD_CHUNK_SIZE,
+) -> AsyncIterator[bytes]:
+    """Yield an uploaded file in chunks, enforcing the size limit.
+
+    Args:
+        file (UploadFile): The uploaded file.
+        max_bytes (int, optional): Maximum file size in bytes.
+        chunk_size (int, optional): Bytes per chunk.
+
+    Yields:
+        bytes: The next chunk of the file.
+
+    Raises:
+        UploadTooLargeError: As soon as more than ``max_bytes`` have been read.
+    """
+    total = 0
+    while chunk := await file.read(chunk_size):
+        total += len(chunk)
+        if total > max_bytes:
+            raise UploadTooLargeError(max_bytes)
+        yield chunk
+
+
+async def spool_request_body(
+    request: Request, max_bytes: int = MAX_UPLOAD_BYTES
+) -> UploadFile:
+    """Spool a raw (non-multipart) request body into a temporary file.
+
+    Like multipart uploads, the body is kept in memory only up to
+    ``UPLOAD_CHUNK_SIZE`` and spills to disk beyond that. Spooling lets a
+    streaming response read the body after the endpoint has returned.
+
+    Args:
+        request (Request): The incoming request.
+        max_bytes (int, optional): Maximum body size in bytes.
+
+    Returns:
+        UploadFile: The body, rewound to the start. The caller closes it.
+
+    Raises:
+        UploadTooLargeError: As soon as more than ``max_bytes`` have been read.
+    """
+    spooled = tempfile.SpooledTemporaryFile(max_size=UPLOAD_CHUNK_SIZE)
+    total = 0
+    try:
+        async for chunk in request.stream():
+            total += len(chunk)
+            if total > max_bytes:
+                raise UploadTooLargeError(max_bytes)
+            spooled.write(chunk)
+    except BaseException:
+        spooled.close()
+        raise
+    spooled.seek(0)
+    return UploadFile(spooled, size=total)
+
+
+async def save_upload(
+    file: UploadFile, destination: str | Path, max_bytes: int = MAX_UPLOAD_BYTES
+) -> int:
+    """Stream an uploaded file to disk in chunks.
+
+    A partially written file is removed if the upload is too large or fails.
+
+    Args:
+        file (UploadFile): The uploaded file.
+        destination (str | Path): Path to write to.
+        max_bytes (int, optional): Maximum file size in bytes.
+
+    Returns:
+        int: Number of bytes written.
+    """
+    destination = Path(destination)
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    written = 0
+    try:
+        with open(destination, "wb") as f:
+            async for chunk in iter_upload(file, max_bytes):
+                f.write(chunk)
+                written += len(chunk)
+    except BaseException:
+        destination.unlink(missing_ok=True)
+        raise
+    return written
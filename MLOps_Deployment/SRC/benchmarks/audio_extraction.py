@@ -0,0 +1,127 @@
+"""Compare the file-based and piped ffmpeg paths for video-to-audio extraction.
+
+For a local video the script runs both extraction modes of ``app.media``:
+
+- ``file``: copy the video to a temp file, convert it to an MP3 file with the
+  original ffmpeg command, then read (or upload) that MP3
+- ``pipe``: stream the video into ffmpeg's stdin and read the low-bitrate mono
+  MP3 from its stdout, with no intermediate files
+
+and reports the bytes that would be uploaded and the wall time of each mode.
+With ``--upload`` the audio is really sent to AssemblyAI (or to the stub
+server in ``ASSEMBLYAI_BASE_URL``), so upload time is included.
+
+Usage:
+    python -m benchmarks.audio_extraction --video data/video/sample.mp4
+"""
+
+import argparse
+import asyncio
+import json
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from app.media import extract_audio, stream_extract_audio
+from transcription.assemblyai_client import get_client
+
+CHUNK_SIZE = 1024 * 1024
+
+
+async def read_chunks(path: Path):
+    """Yield a file in chunks, as the upload endpoint receives it."""
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            yield chunk
+
+
+async def run_file_mode(video: Path, upload: bool) -> dict:
+    """Temp video file -> ffmpeg -> MP3 file -> upload."""
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = Path(tmp) / "input.mp4"
+        shutil.copyfile(video, input_path)
+        audio_path = await asyncio.to_thread(extract_audio, input_path)
+        if upload:
+            await get_client().upload(audio_path)
+        else:
+            audio_path.read_bytes()
+        output_bytes = audio_path.stat().st_size
+    return {"output_bytes": output_bytes, "seconds": time.perf_counter() - start}
+
+
+async def run_pipe_mode(video: Path, upload: bool) -> dict:
+    """Video chunks -> ffmpeg stdin/stdout -> upload, no temp files."""
+    stats = {}
+    start = time.perf_counter()
+    audio = stream_extract_audio(read_chunks(video), stats)
+    if upload:
+        await get_client().upload_stream(audio)
+    else:
+        async for _ in audio:
+            pass
+    return {
+        "output_bytes": stats["output_bytes"],
+        "seconds": time.perf_counter() - start,
+    }
+
+
+async def benchmark(video: Path, runs: int, upload: bool) -> dict:
+    """Run both modes ``runs`` times and summarise bytes and wall time."""
+    report = {
+        "video": str(video.resolve()),
+        "video_bytes": video.stat().st_size,
+        "runs": runs,
+        "upload": upload,
+        "results": [],
+    }
+    for name, fn in (("file", run_file_mode), ("pipe", run_pipe_mode)):
+        samples = [await fn(video, upload) for _ in range(runs)]
+        seconds = [s["seconds"] for s in samples]
+        report["results"].append(
+            {
+                "mode": name,
+                "upload_bytes": samples[-1]["output_bytes"],
+                "median_s": round(statistics.median(seconds), 3),
+                "min_s": round(min(seconds), 3),
+            }
+        )
+    return report
+
+
+def main() -> None:
+    """Parse arguments, run both extraction modes and print the comparison."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--video", required=True, help="Local MP4 file")
+    parser.add_argument("--runs", type=int, default=3, help="Repetitions per mode")
+    parser.add_argument(
+        "--upload", action="store_true", help="Upload the audio to AssemblyAI"
+    )
+    parser.add_argument("--json", action="store_true", help="Print JSON output")
+    args = parser.parse_args()
+
+    report = asyncio.run(benchmark(Path(args.video), args.runs, args.upload))
+    if args.upload:
+        get_client().close()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{report['video']} ({report['video_bytes']} bytes), {args.runs} run(s)")
+    print(f"{'mode':<8}{'upload bytes':>15}{'median s':>11}{'min s':>9}")
+    for row in report["results"]:
+        print(
+            f"{row['mode']:<8}{row['upload_bytes']:>15}"
+            f"{row['median_s']:>11}{row['min_s']:>9}"
+        )
+    file_row, pipe_row = report["results"]
+    if file_row["upload_bytes"]:
+        ratio = pipe_row["upload_bytes"] / file_row["upload_bytes"]
+        print(f"pipe mode uploads {100 * ratio:.1f}% of the file-mode bytes")
+
+
+if __name__ == "__main__":
+    main()
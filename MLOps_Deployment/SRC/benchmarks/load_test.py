@@ -0,0 +1,437 @@
+"""Load-test the FastAPI service and report throughput and latency percentiles.
+
+By default the script starts the scoring and AssemblyAI stubs from
+``benchmarks/stubs.py`` (with artificial delays standing in for the real
+services), boots ``app.API_main`` under uvicorn against them in a scratch
+directory, waits for ``/ready``, and then drives each scenario at each
+concurrency level for ``--duration`` seconds:
+
+- ``predict``: ``POST /predict`` with one sentence (micro-batched, scored by
+  the stub endpoint; hedged by the local model per ``INFERENCE_ROUTE``)
+- ``predict_batch``: ``POST /predict_batch`` with a JSON array of
+  ``--batch-texts`` sentences, reading the whole streamed response
+- ``predict_from_file``: ``POST /predict_from_file`` with ``--audio-kb`` of
+  random bytes (upload, stub transcription, classification, CSV write)
+
+``predict_batch`` and ``predict_from_file`` classify with the local model, so
+``BASE_DIR`` must point at a checkpoint (as for the API itself). Caches are
+disabled (``PREDICTION_CACHE_SIZE=0``, ``TRANSCRIPT_CACHE_MB=0``) so every
+request does the full work; ``--env KEY=VALUE`` overrides any app setting.
+With ``--url`` an already running server is tested instead, without stubs.
+
+The report is written as JSON and HTML. Pass an earlier JSON report as
+``--baseline`` to compare requests/sec and p99 per scenario and flag changes
+worse than ``--threshold`` percent (``--fail-on-regression`` exits with 1).
+
+Usage:
+    python -m benchmarks.load_test --concurrency 1,8,32 --duration 10
+    python -m benchmarks.load_test --baseline load_test_main.json \\
+        --output load_test_branch --fail-on-regression
+"""
+
+import argparse
+import asyncio
+import html
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+import httpx
+
+from benchmarks.stubs import SENTENCES, AssemblyAIStub, ScoringStub
+
+SRC_DIR = Path(__file__).absolute().parents[1]
+SCENARIOS = ("predict", "predict_batch", "predict_from_file")
+
+Request = Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]]
+
+
+def _sentence(i: int) -> str:
+    """A distinct sentence per request number."""
+    return f"{SENTENCES[i % len(SENTENCES)]} ({i})"
+
+
+def make_request(scenario: str, args: argparse.Namespace) -> Request:
+    """Return the coroutine function that sends request ``i`` of a scenario."""
+    if scenario == "predict":
+
+        async def request(client, i):
+            return await client.post("/predict", json={"text": _sentence(i)})
+
+    elif scenario == "predict_batch":
+
+        async def request(client, i):
+            start = i * args.batch_texts
+            texts = [_sentence(start + j) for j in range(args.batch_texts)]
+            return await client.post("/predict_batch", json=texts)
+
+    elif scenario == "predict_from_file":
+
+        async def request(client, i):
+            audio = os.urandom(args.audio_kb * 1024)
+            files = {"file": (f"speech_{i}.mp3", audio, "audio/mpeg")}
+            return await client.post("/predict_from_file", files=files)
+
+    else:
+        raise ValueError(f"Unknown scenario {scenario!r}")
+    return request
+
+
+def percentile(values: list[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile, or None for no values."""
+    if not values:
+        return None
+    values = sorted(values)
+    return values[max(0, min(len(values) - 1, round(pct / 100 * len(values)) - 1))]
+
+
+def summarize(latencies: list[float], statuses: Counter, seconds: float) -> dict:
+    """Throughput and latency figures of one run."""
+    ok = sum(n for status, n in statuses.items() if str(status).startswith("2"))
+    summary = {
+        "requests": sum(statuses.values()),
+        "ok": ok,
+        "errors": sum(statuses.values()) - ok,
+        "seconds": round(seconds, 3),
+        "rps": round(ok / seconds, 2) if seconds else 0.0,
+        "statuses": {str(status): n for status, n in statuses.items()},
+    }
+    for name, pct in (("p50", 50), ("p90", 90), ("p99", 99), ("max", 100)):
+        value = percentile(latencies, pct)
+        summary[f"{name}_ms"] = round(value * 1000, 1) if value is not None else None
+    summary["mean_ms"] = (
+        round(1000 * sum(latencies) / len(latencies), 1) if latencies else None
+    )
+    return summary
+
+
+async def run_level(
+    base_url: str,
+    request: Request,
+    concurrency: int,
+    duration: float,
+    max_requests: int,
+    warmup: int,
+    timeout: float,
+) -> dict:
+    """Drive one scenario with ``concurrency`` closed-loop clients.
+
+    Each client sends its next request as soon as the previous one finished,
+    until ``duration`` seconds have passed or ``max_requests`` were sent.
+    ``warmup`` requests are sent first and not recorded.
+    """
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=None)
+    async with httpx.AsyncClient(
+        base_url=base_url, timeout=timeout, limits=limits
+    ) as client:
+        numbers = itertools.count()
+        for _ in range(warmup):
+            await request(client, next(numbers))
+
+        latencies: list[float] = []
+        statuses: Counter = Counter()
+        deadline = time.perf_counter() + duration
+
+        async def user() -> None:
+            while time.perf_counter() < deadline:
+                if max_requests and sum(statuses.values()) >= max_requests:
+                    return
+                start = time.perf_counter()
+                try:
+                    response = await request(client, next(numbers))
+                    await response.aread()
+                    statuses[response.status_code] += 1
+                except httpx.HTTPError as e:
+                    statuses[type(e).__name__] += 1
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+        return summarize(latencies, statuses, time.perf_counter() - start)
+
+
+def wait_ready(base_url: str, process: subprocess.Popen, timeout: float) -> dict:
+    """Poll ``/ready`` until the app is ready, its models failed, or it exited.
+
+    Raises:
+        RuntimeError: If the app exited or did not answer within ``timeout``.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"App exited with code {process.returncode}")
+        try:
+            response = httpx.get(f"{base_url}/ready", timeout=2)
+            body = response.json()
+            if response.status_code == 200 or body.get("status") == "failed":
+                return body
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"App not ready after {timeout:.0f} s")
+
+
+def start_app(args: argparse.Namespace, env: dict, workdir: str) -> subprocess.Popen:
+    """Start uvicorn serving ``args.app`` in ``workdir``; logs go to app.log."""
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join([str(SRC_DIR), str(SRC_DIR.parent)]),
+        **env,
+    }
+    command = [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        args.app,
+        "--host",
+        "127.0.0.1",
+        "--port",
+        str(args.port),
+        "--workers",
+        str(args.workers),
+        "--log-level",
+        "warning",
+    ]
+    with open(Path(workdir) / "app.log", "wb") as log:
+        return subprocess.Popen(
+            command, cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT
+        )
+
+
+def git_revision() -> dict:
+    """Commit and dirty flag of the working tree, if it is a git checkout."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=SRC_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=SRC_DIR,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+        return {"commit": commit, "dirty": bool(dirty)}
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+
+
+def compare(report: dict, baseline: dict, threshold: float) -> list[dict]:
+    """Compare rps and p99 per scenario and concurrency with a baseline report.
+
+    Returns:
+        list[dict]: One row per run present in both reports, with the
+        percentage changes and ``regression`` set when rps fell or p99 rose
+        by more than ``threshold`` percent.
+    """
+    previous = {(r["scenario"], r["concurrency"]): r for r in baseline["results"]}
+    rows = []
+    for run in report["results"]:
+        old = previous.get((run["scenario"], run["concurrency"]))
+        if old is None:
+            continue
+
+        def change(key):
+            if not old.get(key) or run.get(key) is None:
+                return None
+            return round(100 * (run[key] - old[key]) / old[key], 1)
+
+        rps_change, p99_change = change("rps"), change("p99_ms")
+        rows.append(
+            {
+                "scenario": run["scenario"],
+                "concurrency": run["concurrency"],
+                "rps_change_pct": rps_change,
+                "p99_change_pct": p99_change,
+                "regression": bool(
+                    (rps_change is not None and rps_change < -threshold)
+                    or (p99_change is not None and p99_change > threshold)
+                ),
+            }
+        )
+    return rows
+
+
+def render_html(report: dict) -> str:
+    """Render the report as a standalone HTML page."""
+    comparison = {
+        (row["scenario"], row["concurrency"]): row
+        for row in report.get("comparison", [])
+    }
+    columns = ["rps", "p50_ms", "p90_ms", "p99_ms", "max_ms", "requests", "errors"]
+    header = "".join(
+        f"<th>{name}</th>"
+        for name in ["scenario", "concurrency", *columns, "rps Δ%", "p99 Δ%"]
+    )
+    rows = []
+    for run in report["results"]:
+        delta = comparison.get((run["scenario"], run["concurrency"]), {})
+        style = ' class="regression"' if delta.get("regression") else ""
+        cells = [run["scenario"], run["concurrency"], *(run[c] for c in columns)]
+        cells += [delta.get("rps_change_pct", ""), delta.get("p99_change_pct", "")]
+        rows.append(
+            f"<tr{style}>"
+            + "".join(f"<td>{html.escape(str(cell))}</td>" for cell in cells)
+            + "</tr>"
+        )
+    meta = json.dumps(
+        {key: report[key] for key in ("git", "started", "host", "config")}, indent=2
+    )
+    baseline = report.get("baseline")
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>API load test {report['git']['commit']}</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; }}
+table {{ border-collapse: collapse; }}
+th, td {{ border: 1px solid #ccc; padding: 4px 10px; text-align: right; }}
+tr.regression td {{ background: #fdd; }}
+</style></head><body>
+<h1>API load test</h1>
+<p>Commit {report['git']['commit']}{' (dirty)' if report['git']['dirty'] else ''},
+{report['started']}{f", compared with {html.escape(baseline)}" if baseline else ""}</p>
+<table><tr>{header}</tr>
+{chr(10).join(rows)}
+</table>
+<h2>Configuration</h2><pre>{html.escape(meta)}</pre>
+</body></html>
+"""
+
+
+async def run_all(args: argparse.Namespace, base_url: str) -> list[dict]:
+    """Run every scenario at every concurrency level."""
+    results = []
+    for scenario in args.scenarios.split(","):
+        request = make_request(scenario, args)
+        for concurrency in (int(c) for c in args.concurrency.split(",")):
+            summary = await run_level(
+                base_url,
+                request,
+                concurrency,
+                args.duration,
+                args.max_requests,
+                args.warmup,
+                args.timeout,
+            )
+            results.append(
+                {"scenario": scenario, "concurrency": concurrency, **summary}
+            )
+            print(
+                f"{scenario:<18}{concurrency:>5}{summary['rps']:>10}"
+                f"{summary['p50_ms']!s:>10}{summary['p99_ms']!s:>10}"
+                f"{summary['errors']:>8}"
+            )
+    return results
+
+
+def main() -> None:
+    """Parse arguments, start the stubs and app, run the load and write reports."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds per run")
+    parser.add_argument("--max-requests", type=int, default=0, help="0 = no limit")
+    parser.add_argument("--warmup", type=int, default=3, help="Unrecorded requests")
+    parser.add_argument("--timeout", type=float, default=120, help="Request timeout")
+    parser.add_argument("--batch-texts", type=int, default=100)
+    parser.add_argument("--audio-kb", type=int, default=256)
+    parser.add_argument("--url", help="Test a running server instead of booting one")
+    parser.add_argument("--app", default="app.API_main:app")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers")
+    parser.add_argument("--env", action="append", default=[], help="KEY=VALUE")
+    parser.add_argument("--scoring-delay-ms", type=float, default=40)
+    parser.add_argument("--scoring-per-text-ms", type=float, default=2)
+    parser.add_argument("--upload-ms", type=float, default=50)
+    parser.add_argument("--transcribe-seconds", type=float, default=2.0)
+    parser.add_argument("--sentences", type=int, default=20)
+    parser.add_argument("--output", default="load_test", help="Report path prefix")
+    parser.add_argument("--baseline", help="Earlier JSON report to compare with")
+    parser.add_argument("--threshold", type=float, default=10, help="Percent")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    report = {
+        "git": git_revision(),
+        "started": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "host": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "config": {
+            key: value
+            for key, value in vars(args).items()
+            if key not in ("output", "baseline", "fail_on_regression", "threshold")
+        },
+    }
+    print(
+        f"{'scenario':<18}{'conc':>5}{'req/s':>10}"
+        f"{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}"
+    )
+
+    if args.url:
+        report["results"] = asyncio.run(run_all(args, args.url.rstrip("/")))
+    else:
+        scoring = ScoringStub(args.scoring_delay_ms, args.scoring_per_text_ms).start()
+        assemblyai = AssemblyAIStub(
+            args.upload_ms, args.transcribe_seconds, args.sentences
+        ).start()
+        env = {
+            "AZURE_ENDPOINT_URL": f"{scoring.url}/score",
+            "AZURE_API_KEY": "load-test",
+            "ASSEMBLYAI_API_KEY": "load-test",
+            "ASSEMBLYAI_BASE_URL": assemblyai.url,
+            "PREDICTION_CACHE_SIZE": "0",
+            "TRANSCRIPT_CACHE_MB": "0",
+        }
+        env.update(item.split("=", 1) for item in args.env)
+        report["config"]["app_env"] = env
+        base_url = f"http://127.0.0.1:{args.port}"
+        with tempfile.TemporaryDirectory() as workdir:
+            process = start_app(args, env, workdir)
+            try:
+                report["ready"] = wait_ready(base_url, process, timeout=300)
+                report["results"] = asyncio.run(run_all(args, base_url))
+            except RuntimeError:
+                print((Path(workdir) / "app.log").read_text()[-4000:])
+                raise
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+                scoring.stop()
+                assemblyai.stop()
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        report["baseline"] = args.baseline
+        report["comparison"] = compare(report, baseline, args.threshold)
+
+    Path(f"{args.output}.json").write_text(json.dumps(report, indent=2))
+    Path(f"{args.output}.html").write_text(render_html(report))
+    print(f"Wrote {args.output}.json and {args.output}.html")
+
+    regressions = [row for row in report.get("comparison", []) if row["regression"]]
+    for row in regressions:
+        print(
+            f"Regression: {row['scenario']} x{row['concurrency']} "
+            f"rps {row['rps_change_pct']}%, p99 {row['p99_change_pct']}%"
+        )
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
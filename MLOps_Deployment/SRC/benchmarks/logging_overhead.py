@@ -0,0 +1,167 @@
+"""Measure how much time request handlers spend logging in each logging mode.
+
+Worker threads play the role of request handlers. Each simulated request
+logs what a ``/predict`` or media request logs: an INFO line on arrival, the
+input text at DEBUG, a few per-sentence DEBUG lines and an INFO line on
+completion. The benchmark reports the time each request spent inside logging
+calls (p50/p99) and the records written, for:
+
+- ``sync``: handlers write from the calling thread (the previous behaviour)
+- ``queue``: records go through a ``QueueHandler`` to a background writer
+- ``queue-sampled``: queue mode keeping 1 in 10 DEBUG records per call site
+- ``queue-json``: queue mode with JSON lines
+
+``--disk-latency-ms`` adds a delay to every file write to emulate a slow or
+contended disk, where the difference between the modes is largest. Records
+that do not fit in the queue (``--queue-size``) are dropped and reported. For the
+end-to-end effect on the API run ``benchmarks.load_test`` with
+``--env LOG_MODE=sync`` and ``--env LOG_MODE=queue``.
+
+Usage:
+    python -m benchmarks.logging_overhead --requests 2000 --threads 8
+    python -m benchmarks.logging_overhead --disk-latency-ms 1
+"""
+
+import argparse
+import contextlib
+import json
+import logging
+import logging.handlers
+import os
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from utils.logger import setup_logging, stop_logging
+
+MODES = {
+    "sync": {"LOG_MODE": "sync"},
+    "queue": {"LOG_MODE": "queue"},
+    "queue-sampled": {"LOG_MODE": "queue", "LOG_DEBUG_SAMPLE_RATE": "0.1"},
+    "queue-json": {"LOG_MODE": "queue", "LOG_FORMAT": "json"},
+}
+TEXT = "I can't believe we finally made it to the final round of the contest. " * 4
+
+
+def simulate_request(logger: logging.Logger, i: int, sentences: int) -> float:
+    """Log like one request and return the seconds spent in logging calls."""
+    start = time.perf_counter()
+    logger.info(f"Received /predict request ({len(TEXT)} chars)")
+    logger.debug(f"/predict text: {TEXT}")
+    for n in range(sentences):
+        logger.debug(f"Original sentence: {TEXT[:80]} #{i}.{n}")
+        logger.debug(f"Predicted Emotion: happiness ({90 + n % 10}.0%)")
+    logger.info(f"Request {i} done")
+    return time.perf_counter() - start
+
+
+def run_mode(env: dict, args: argparse.Namespace) -> dict:
+    """Configure logging for one mode and log from ``args.threads`` threads."""
+    env = {**env, "LOG_QUEUE_SIZE": str(args.queue_size)}
+    saved = {key: os.environ.get(key) for key in env}
+    os.environ.update(env)
+    with tempfile.TemporaryDirectory() as log_dir:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            setup_logging(log_dir=log_dir, log_filename="bench.log")
+            logger = logging.getLogger("benchmark")
+            per_thread = args.requests // args.threads
+            timings: list[float] = []
+            lock = threading.Lock()
+
+            def worker(offset: int) -> None:
+                local = [
+                    simulate_request(logger, offset + i, args.sentences)
+                    for i in range(per_thread)
+                ]
+                with lock:
+                    timings.extend(local)
+
+            start = time.perf_counter()
+            threads = [
+                threading.Thread(target=worker, args=(t * per_thread,))
+                for t in range(args.threads)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+            dropped = sum(
+                getattr(handler, "dropped", 0)
+                for handler in logging.getLogger().handlers
+            )
+            stop_logging()  # flushes the queue
+            drained = time.perf_counter() - start
+        log_bytes = sum(p.stat().st_size for p in Path(log_dir).iterdir())
+        with open(Path(log_dir) / "bench.log", "rb") as f:
+            lines = sum(1 for _ in f)
+
+    for key, value in saved.items():
+        if value is None:
+            os.environ.pop(key, None)
+        else:
+            os.environ[key] = value
+    timings.sort()
+    return {
+        "requests": len(timings),
+        "p50_us": round(statistics.median(timings) * 1e6, 1),
+        "p99_us": round(timings[int(0.99 * (len(timings) - 1))] * 1e6, 1),
+        "handler_seconds": round(elapsed, 3),
+        "written_seconds": round(drained, 3),
+        "log_lines": lines,
+        "dropped": dropped,
+        "log_bytes": log_bytes,
+    }
+
+
+def main() -> None:
+    """Parse arguments, run every mode and print the comparison."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--sentences", type=int, default=3, help="DEBUG pairs")
+    parser.add_argument("--disk-latency-ms", type=float, default=0.0)
+    parser.add_argument(
+        "--queue-size", type=int, default=10000, help="LOG_QUEUE_SIZE, 0 unbounded"
+    )
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--json", action="store_true", help="Print JSON output")
+    args = parser.parse_args()
+
+    if args.disk_latency_ms:
+        delay = args.disk_latency_ms / 1000
+        emit = logging.handlers.RotatingFileHandler.emit
+
+        def slow_emit(self, record):
+            time.sleep(delay)
+            emit(self, record)
+
+        logging.handlers.RotatingFileHandler.emit = slow_emit
+
+    report = {mode: run_mode(MODES[mode], args) for mode in args.modes.split(",")}
+    logging.shutdown()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(
+        f"{args.requests} requests from {args.threads} threads, "
+        f"disk latency {args.disk_latency_ms} ms per record"
+    )
+    print(
+        f"{'mode':<15}{'p50 us':>10}{'p99 us':>11}{'handlers s':>12}"
+        f"{'written s':>11}{'lines':>8}{'dropped':>9}"
+    )
+    for mode, row in report.items():
+        print(
+            f"{mode:<15}{row['p50_us']:>10}{row['p99_us']:>11}"
+            f"{row['handler_seconds']:>12}{row['written_seconds']:>11}"
+            f"{row['log_lines']:>8}{row['dropped']:>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""Compare ONNX Runtime backends with the eager PyTorch classifier on CPU.
+
+For every backend (``torch``, ``onnx``, ``onnx-int8``) the script classifies
+the sentences of a labelled CSV and reports:
+
+- accuracy parity: agreement with the eager model's predictions, maximum
+  probability difference, and accuracy against the label column (if present)
+- latency: p50/p95 of single-sentence requests
+- throughput: sentences per second with length-bucketed batches
+
+Usage:
+    python -m benchmarks.onnx_parity --csv data/processed/final_output.csv
+"""
+
+import argparse
+import json
+import os
+import pickle
+import statistics
+import time
+
+import numpy as np
+import pandas as pd
+import torch
+from transformers import RobertaForSequenceClassification, RobertaTokenizer
+
+from models.backends import BACKENDS, load_backend
+from utils.batching import batch_features, length_bucketed_batches
+
+SRC_DIR = os.path.join(os.path.dirname(__file__), "..")
+DEFAULT_CSV = os.path.join(SRC_DIR, "data", "processed", "final_output.csv")
+DEFAULT_MODEL_DIR = os.path.join(SRC_DIR, "checkpoint-3906")
+DEFAULT_LABEL_ENCODER = os.path.join(SRC_DIR, "models", "label_encoder.pkl")
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Return the ``pct`` percentile of ``values`` (nearest-rank)."""
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def run_backend(backend, tokenizer, sentences, batch_size, max_tokens, samples):
+    """Classify all sentences and time single and batched requests.
+
+    Returns:
+        tuple[np.ndarray, dict]: Probabilities per sentence and timing stats.
+    """
+    encodings = tokenizer(sentences, truncation=True, max_length=512)
+    lengths = [len(ids) for ids in encodings["input_ids"]]
+
+    # Warm-up so lazy initialisation does not count towards latency
+    backend.logits(tokenizer(sentences[:1], return_tensors="pt"))
+
+    probs = np.zeros((len(sentences), 0), dtype=np.float32)
+    start = time.perf_counter()
+    for batch in length_bucketed_batches(lengths, max_tokens, batch_size):
+        inputs = tokenizer.pad(
+            batch_features(encodings, batch), padding="longest", return_tensors="pt"
+        )
+        batch_probs = torch.softmax(backend.logits(inputs), dim=1).numpy()
+        if probs.shape[1] == 0:
+            probs = np.zeros((len(sentences), batch_probs.shape[1]), np.float32)
+        probs[batch] = batch_probs
+    elapsed = time.perf_counter() - start
+
+    latencies = []
+    for text in sentences[:samples]:
+        inputs = tokenizer([text], return_tensors="pt", truncation=True)
+        t0 = time.perf_counter()
+        backend.logits(inputs)
+        latencies.append((time.perf_counter() - t0) * 1000)
+
+    timing = {
+        "throughput_sents_per_s": round(len(sentences) / elapsed, 1),
+        "batched_total_s": round(elapsed, 3),
+        "latency_p50_ms": round(statistics.median(latencies), 2),
+        "latency_p95_ms": round(percentile(latencies, 95), 2),
+    }
+    return probs, timing
+
+
+def main() -> None:
+    """Parse arguments, run every backend and print the comparison."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--csv", default=DEFAULT_CSV, help="Labelled test CSV")
+    parser.add_argument("--text-column", default="Sentence")
+    parser.add_argument("--label-column", default="Emotion")
+    parser.add_argument("--model-dir", default=DEFAULT_MODEL_DIR)
+    parser.add_argument("--label-encoder", default=DEFAULT_LABEL_ENCODER)
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS))
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--max-tokens", type=int, default=8192)
+    parser.add_argument(
+        "--samples", type=int, default=100, help="Single-sentence latency samples"
+    )
+    parser.add_argument("--threads", type=int, default=0, help="CPU threads (0=all)")
+    parser.add_argument("--json", action="store_true", help="Print JSON output")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+        os.environ["ONNX_NUM_THREADS"] = str(args.threads)
+
+    df = pd.read_csv(args.csv).dropna(subset=[args.text_column])
+    sentences = df[args.text_column].astype(str).tolist()
+    with open(args.label_encoder, "rb") as f:
+        label_encoder = pickle.load(f)
+
+    tokenizer = RobertaTokenizer.from_pretrained(args.model_dir)
+    model = RobertaForSequenceClassification.from_pretrained(args.model_dir).eval()
+
+    reference = None
+    report = {"csv": os.path.abspath(args.csv), "sentences": len(sentences)}
+    rows = []
+    for kind in args.backends:
+        backend = load_backend(args.model_dir, model=model, kind=kind)
+        probs, timing = run_backend(
+            backend,
+            tokenizer,
+            sentences,
+            args.batch_size,
+            args.max_tokens,
+            args.samples,
+        )
+        preds = probs.argmax(axis=1)
+        if reference is None:
+            reference = probs
+        row = {"backend": kind, **timing}
+        row["agreement_pct"] = round(
+            100 * float((preds == reference.argmax(axis=1)).mean()), 2
+        )
+        row["max_prob_diff"] = round(float(np.abs(probs - reference).max()), 5)
+        if args.label_column in df.columns:
+            labels = label_encoder.inverse_transform(preds)
+            row["accuracy_pct"] = round(
+                100 * float((labels == df[args.label_column].to_numpy()).mean()), 2
+            )
+        rows.append(row)
+    report["results"] = rows
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{report['sentences']} sentences from {report['csv']}")
+    print(f"(agreement and prob diff are relative to '{args.backends[0]}')")
+    columns = [
+        "backend",
+        "agreement_pct",
+        "max_prob_diff",
+        "accuracy_pct",
+        "latency_p50_ms",
+        "latency_p95_ms",
+        "throughput_sents_per_s",
+    ]
+    print("".join(f"{c:>24}" for c in columns))
+    for row in rows:
+        print("".join(f"{str(row.get(c, '-')):>24}" for c in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Report padded-token waste for transcript inference with and without bucketing.
+
+Tokenizes the sentences of a transcript CSV and compares how many token
+positions the classifier processes under three batching strategies:
+
+- fixed-size batches in transcript order (the classic ``padding=True`` loop)
+- token-budget batches in transcript order
+- length-bucketed batches (sorted by token length, then token-budget batches)
+
+Usage:
+    python -m benchmarks.padding_waste --csv data/processed/final_output.csv
+"""
+
+import argparse
+import json
+import os
+
+import pandas as pd
+from transformers import RobertaTokenizer
+
+from utils.batching import (
+    length_bucketed_batches,
+    padded_tokens,
+    token_budget_batches,
+)
+
+DEFAULT_CSV = os.path.join(
+    os.path.dirname(__file__), "..", "data", "processed", "final_output.csv"
+)
+DEFAULT_TOKENIZER = os.path.join(os.path.dirname(__file__), "..", "checkpoint-3906")
+
+
+def summarize(name: str, lengths: list[int], batches: list[list[int]]) -> dict:
+    """Compute padding statistics for one batching strategy.
+
+    Args:
+        name: Label of the strategy.
+        lengths: Token count of each sentence.
+        batches: Sentence indices for each batch.
+
+    Returns:
+        dict: Batch count, processed tokens, padding tokens and waste percentage.
+    """
+    real = sum(lengths)
+    total = padded_tokens(lengths, batches)
+    return {
+        "strategy": name,
+        "batches": len(batches),
+        "processed_tokens": total,
+        "padding_tokens": total - real,
+        "waste_pct": round(100 * (total - real) / total, 2) if total else 0.0,
+    }
+
+
+def main() -> None:
+    """Parse arguments, tokenize the transcript and print the comparison."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--csv", default=DEFAULT_CSV, help="Transcript CSV file")
+    parser.add_argument("--column", default="Sentence", help="Sentence column name")
+    parser.add_argument(
+        "--tokenizer", default=DEFAULT_TOKENIZER, help="Tokenizer name or path"
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=32,
+        help="Size of fixed-size batches and cap on sentences per budgeted batch",
+    )
+    parser.add_argument(
+        "--max-tokens", type=int, default=8192, help="Padded-token budget per batch"
+    )
+    parser.add_argument("--json", action="store_true", help="Print JSON output")
+    args = parser.parse_args()
+
+    sentences = pd.read_csv(args.csv)[args.column].dropna().astype(str).tolist()
+    tokenizer = RobertaTokenizer.from_pretrained(args.tokenizer)
+    encodings = tokenizer(sentences, truncation=True, max_length=512)
+    lengths = [len(ids) for ids in encodings["input_ids"]]
+
+    fixed = [
+        list(range(i, min(i + args.batch_size, len(lengths))))
+        for i in range(0, len(lengths), args.batch_size)
+    ]
+    report = {
+        "csv": os.path.abspath(args.csv),
+        "sentences": len(lengths),
+        "real_tokens": sum(lengths),
+        "min_tokens": min(lengths, default=0),
+        "max_tokens": max(lengths, default=0),
+        "results": [
+            summarize(f"fixed batch size {args.batch_size}", lengths, fixed),
+            summarize(
+                "token budget, transcript order",
+                lengths,
+                token_budget_batches(
+                    lengths, args.max_tokens, max_batch_size=args.batch_size
+                ),
+            ),
+            summarize(
+                "token budget, length-bucketed",
+                lengths,
+                length_bucketed_batches(lengths, args.max_tokens, args.batch_size),
+            ),
+        ],
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(
+        f"{report['sentences']} sentences, {report['real_tokens']} real tokens "
+        f"({report['min_tokens']}-{report['max_tokens']} per sentence)"
+    )
+    print(f"{'strategy':<34}{'batches':>9}{'processed':>12}{'padding':>10}{'waste':>9}")
+    for row in report["results"]:
+        print(
+            f"{row['strategy']:<34}{row['batches']:>9}{row['processed_tokens']:>12}"
+            f"{row['padding_tokens']:>10}{row['waste_pct']:>8}%"
+        )
+
+
+if __name__ == "__main__":
+    main()
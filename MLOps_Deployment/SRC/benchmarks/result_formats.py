@@ -0,0 +1,110 @@
+"""Compare CSV, Parquet and Arrow for storing prediction results.
+
+Builds a large prediction table (the rows of a result CSV repeated, or
+synthetic rows shaped like ``final_predictions.csv``), writes it with every
+format of ``utils.result_io`` and reports file size, write time, full load
+time, and the load time of two columns (``Emotion`` and ``Confidence (%)``),
+as an analytics query or the training loaders would read them.
+
+Usage:
+    python -m benchmarks.result_formats --rows 1000000
+    python -m benchmarks.result_formats --csv output/predictions_<id>.csv
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+import pandas as pd
+
+from utils.helpers import format_time
+from utils.result_io import FORMATS, read_table, write_table
+
+EMOTIONS = ["anger", "disgust", "fear", "happiness", "neutral", "sadness", "surprise"]
+WORDS = "the we it was so this really never think what a about now good".split()
+PROJECTED_COLUMNS = ["Emotion", "Confidence (%)"]
+
+
+def synthetic_predictions(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Return ``rows`` random prediction rows with the pipeline's columns."""
+    rng = random.Random(seed)
+
+    def sentence() -> str:
+        return " ".join(rng.choices(WORDS, k=rng.randint(4, 20))).capitalize() + "."
+
+    start = [i * 2500 for i in range(rows)]
+    sentences = [sentence() for _ in range(rows)]
+    return pd.DataFrame(
+        {
+            "Start Time": [format_time(ms) for ms in start],
+            "End Time": [format_time(ms + 2000) for ms in start],
+            "Sentence": sentences,
+            "Translation": sentences,
+            "Emotion": rng.choices(EMOTIONS, k=rows),
+            "Confidence (%)": [round(rng.uniform(20, 100), 2) for _ in range(rows)],
+        }
+    )
+
+
+def best_of(runs: int, fn) -> float:
+    """Return the fastest of ``runs`` timings of ``fn()`` in seconds."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    """Parse arguments, write and read every format, and print the comparison."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--csv", help="Result CSV to repeat instead of random rows")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Rows to store")
+    parser.add_argument("--runs", type=int, default=3, help="Timing repetitions")
+    parser.add_argument("--json", action="store_true", help="Print JSON output")
+    args = parser.parse_args()
+
+    if args.csv:
+        base = pd.read_csv(args.csv)
+        df = pd.concat([base] * -(-args.rows // len(base)), ignore_index=True)
+        df = df.head(args.rows)
+    else:
+        df = synthetic_predictions(args.rows)
+    columns = [c for c in PROJECTED_COLUMNS if c in df]
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, result_format in FORMATS.items():
+            path = os.path.join(tmp, f"predictions{result_format.suffix}")
+            write_seconds = best_of(args.runs, lambda: write_table(df, path, name))
+            rows.append(
+                {
+                    "format": name,
+                    "size_mb": round(os.path.getsize(path) / 1e6, 2),
+                    "write_s": round(write_seconds, 3),
+                    "load_s": round(best_of(args.runs, lambda: read_table(path)), 3),
+                    "load_2_cols_s": round(
+                        best_of(args.runs, lambda: read_table(path, columns)), 3
+                    ),
+                }
+            )
+
+    if args.json:
+        print(json.dumps({"rows": len(df), "results": rows}, indent=2))
+        return
+
+    print(f"{len(df)} rows, columns: {', '.join(df.columns)}")
+    print(f"{'format':<10}{'MB':>10}{'write s':>10}{'load s':>10}{'2 cols s':>10}")
+    for row in rows:
+        print(
+            f"{row['format']:<10}{row['size_mb']:>10}{row['write_s']:>10}"
+            f"{row['load_s']:>10}{row['load_2_cols_s']:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
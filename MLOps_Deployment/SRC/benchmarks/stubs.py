@@ -0,0 +1,260 @@
+"""Local stand-ins for the Azure ML scoring endpoint and the AssemblyAI API.
+
+Both servers answer with the same shapes as the real services after
+artificial delays, so the API can be load-tested without network access or
+credentials (``benchmarks/load_test.py``). Point the app at them with
+``AZURE_ENDPOINT_URL`` and ``ASSEMBLYAI_BASE_URL``.
+
+- :class:`ScoringStub` implements the single (``{"text": ...}``) and batched
+  (``{"texts": [...]}``) contracts of ``deployment/score.py``. A request takes
+  ``delay_ms`` plus ``per_text_ms`` per text.
+- :class:`AssemblyAIStub` implements ``/upload``, ``/transcript`` and
+  ``/transcript/<id>/sentences``. A transcript completes ``transcribe_seconds``
+  after it was submitted, and returns ``sentences`` English sentences.
+
+Usage (serves both until interrupted):
+    python -m benchmarks.stubs --scoring-port 8101 --assemblyai-port 8102
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+LABELS = ["anger", "disgust", "fear", "happiness", "neutral", "sadness", "surprise"]
+
+SENTENCES = [
+    "I can't believe we finally made it to the final round.",
+    "The weather ruined our plans for the whole weekend.",
+    "Honestly, I expected a lot more from this update.",
+    "She smiled when she saw the letter on the table.",
+    "Nobody told me the meeting had been moved to Monday.",
+    "That noise in the basement kept me awake all night.",
+    "We are going to the cinema after dinner.",
+    "The results were surprisingly good this quarter.",
+]
+
+
+def _jitter(seconds: float) -> float:
+    """Randomize a delay by +-20% so requests do not move in lockstep."""
+    return seconds * random.uniform(0.8, 1.2)
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256  # accept bursts of new connections under load
+
+
+class _StubServer:
+    """A threaded HTTP server running in a daemon thread."""
+
+    handler_class: type = BaseHTTPRequestHandler
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self._server = _HTTPServer((host, port), self._make_handler())
+        self._thread: Optional[threading.Thread] = None
+        self.requests = 0
+
+    @property
+    def url(self) -> str:
+        """Base URL of the server."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _make_handler(self) -> type:
+        stub = self
+
+        class Handler(self.handler_class):
+            protocol_version = "HTTP/1.1"
+            server_stub = stub
+
+            def log_message(self, *args):
+                pass
+
+            def send_json(self, payload: dict, status: int = 200) -> None:
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def read_body(self) -> bytes:
+                if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+                    chunks = []
+                    while size := int(self.rfile.readline().strip() or b"0", 16):
+                        chunks.append(self.rfile.read(size))
+                        self.rfile.readline()
+                    self.rfile.readline()
+                    return b"".join(chunks)
+                return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+        return Handler
+
+    def start(self) -> "_StubServer":
+        """Serve in a background thread and return the stub."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving."""
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class _ScoringHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        stub = self.server_stub
+        stub.requests += 1
+        data = json.loads(self.read_body() or b"{}")
+        texts = data["texts"] if "texts" in data else [data.get("text", "")]
+        time.sleep(_jitter(stub.delay + stub.per_text * len(texts)))
+        results = [stub.predict(text) for text in texts]
+        self.send_json({"results": results} if "texts" in data else results[0])
+
+
+class ScoringStub(_StubServer):
+    """Azure ML scoring endpoint stand-in with a fixed label per text."""
+
+    handler_class = _ScoringHandler
+
+    def __init__(self, delay_ms: float = 40, per_text_ms: float = 2, **kwargs):
+        """Create the stub (call :meth:`start` to serve).
+
+        Args:
+            delay_ms: Fixed latency of a request.
+            per_text_ms: Extra latency per text in the request.
+            **kwargs: ``host`` and ``port`` (0 picks a free port).
+        """
+        super().__init__(**kwargs)
+        self.delay = delay_ms / 1000
+        self.per_text = per_text_ms / 1000
+
+    @staticmethod
+    def predict(text: str) -> dict:
+        """Return the deterministic prediction of one text."""
+        if not text.strip():
+            return {"text": text, "error": "Empty input"}
+        digest = hashlib.sha256(text.encode()).digest()
+        return {
+            "text": text,
+            "predicted_label": LABELS[digest[0] % len(LABELS)],
+            "confidence": round(0.5 + digest[1] / 512, 4),
+        }
+
+
+class _AssemblyAIHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        stub = self.server_stub
+        stub.requests += 1
+        body = self.read_body()
+        if self.path == "/upload":
+            time.sleep(_jitter(stub.upload_delay))
+            self.send_json({"upload_url": f"{stub.url}/audio/{uuid.uuid4().hex}"})
+        elif self.path == "/transcript":
+            transcript_id = uuid.uuid4().hex
+            stub.submitted[transcript_id] = time.monotonic()
+            self.send_json(
+                {"id": transcript_id, "status": "queued", **json.loads(body)}
+            )
+        else:
+            self.send_json({"error": "not found"}, status=404)
+
+    def do_GET(self):
+        stub = self.server_stub
+        stub.requests += 1
+        parts = self.path.strip("/").split("/")
+        if len(parts) < 2 or parts[0] != "transcript" or parts[1] not in stub.submitted:
+            self.send_json({"error": "not found"}, status=404)
+            return
+        transcript_id = parts[1]
+        if len(parts) == 3 and parts[2] == "sentences":
+            self.send_json({"id": transcript_id, "sentences": stub.sentences_of()})
+            return
+        done = time.monotonic() - stub.submitted[transcript_id] >= stub.transcribe
+        self.send_json(
+            {
+                "id": transcript_id,
+                "status": "completed" if done else "processing",
+                "language_code": "en",
+            }
+        )
+
+
+class AssemblyAIStub(_StubServer):
+    """AssemblyAI stand-in that "transcribes" every upload to fixed sentences."""
+
+    handler_class = _AssemblyAIHandler
+
+    def __init__(
+        self,
+        upload_ms: float = 50,
+        transcribe_seconds: float = 2.0,
+        sentences: int = 20,
+        **kwargs,
+    ):
+        """Create the stub (call :meth:`start` to serve).
+
+        Args:
+            upload_ms: Latency of an upload after its body was received.
+            transcribe_seconds: Time from submission until a transcript is
+                reported as completed.
+            sentences: Number of sentences per transcript.
+            **kwargs: ``host`` and ``port`` (0 picks a free port).
+        """
+        super().__init__(**kwargs)
+        self.upload_delay = upload_ms / 1000
+        self.transcribe = transcribe_seconds
+        self.sentence_count = sentences
+        self.submitted: dict[str, float] = {}
+
+    def sentences_of(self) -> list[dict]:
+        """Return the sentences of a transcript, 3 s apart."""
+        return [
+            {
+                "text": SENTENCES[i % len(SENTENCES)],
+                "start": 3000 * i,
+                "end": 3000 * i + 2500,
+            }
+            for i in range(self.sentence_count)
+        ]
+
+
+def main() -> None:
+    """Serve both stubs until interrupted."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scoring-port", type=int, default=8101)
+    parser.add_argument("--assemblyai-port", type=int, default=8102)
+    parser.add_argument("--scoring-delay-ms", type=float, default=40)
+    parser.add_argument("--scoring-per-text-ms", type=float, default=2)
+    parser.add_argument("--upload-ms", type=float, default=50)
+    parser.add_argument("--transcribe-seconds", type=float, default=2.0)
+    parser.add_argument("--sentences", type=int, default=20)
+    args = parser.parse_args()
+
+    scoring = ScoringStub(
+        args.scoring_delay_ms, args.scoring_per_text_ms, port=args.scoring_port
+    ).start()
+    assemblyai = AssemblyAIStub(
+        args.upload_ms,
+        args.transcribe_seconds,
+        args.sentences,
+        port=args.assemblyai_port,
+    ).start()
+    print(f"AZURE_ENDPOINT_URL={scoring.url}/score")
+    print(f"ASSEMBLYAI_BASE_URL={assemblyai.url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        scoring.stop()
+        assemblyai.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Measure Polish → English translation throughput in sentences per second.
+
+Translates the sentences of a CSV column with:
+
+- the previous approach: a ``transformers`` translation pipeline called once
+  per sentence
+- the shared ``models.translation.TranslationEngine`` with batched,
+  length-bucketed ``generate``, for each requested beam size (``1`` = greedy)
+
+and reports sentences/sec and agreement with the per-sentence outputs. The
+engine cache is disabled so every run measures the model itself.
+
+Usage:
+    python -m benchmarks.translation_throughput --csv data/processed/polish.csv
+"""
+
+import argparse
+import json
+import os
+import time
+
+import pandas as pd
+from transformers import pipeline
+
+from models.translation import TRANSLATION_MODEL, TranslationEngine
+
+DEFAULT_CSV = os.path.join(
+    os.path.dirname(__file__), "..", "data", "processed", "final_output.csv"
+)
+
+
+def measure(name: str, translate, sentences: list[str], reference=None) -> dict:
+    """Time one translation strategy over all sentences.
+
+    Args:
+        name: Label of the strategy.
+        translate: Callable mapping the sentence list to translations.
+        sentences: Source sentences.
+        reference: Translations to compare against, if any.
+
+    Returns:
+        dict: Wall time, sentences/sec, agreement and the translations.
+    """
+    start = time.perf_counter()
+    outputs = translate(sentences)
+    seconds = time.perf_counter() - start
+    row = {
+        "strategy": name,
+        "seconds": round(seconds, 3),
+        "sentences_per_sec": round(len(sentences) / seconds, 2) if seconds else 0.0,
+        "outputs": outputs,
+    }
+    if reference is not None:
+        same = sum(a == b for a, b in zip(outputs, reference))
+        row["agreement_pct"] = round(100 * same / len(sentences), 2)
+    return row
+
+
+def main() -> None:
+    """Parse arguments, run each strategy and print the comparison."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--csv", default=DEFAULT_CSV, help="CSV with sentences")
+    parser.add_argument("--column", default="Sentence", help="Sentence column name")
+    parser.add_argument("--model", default=TRANSLATION_MODEL, help="MarianMT model")
+    parser.add_argument("--limit", type=int, default=0, help="Use the first N rows")
+    parser.add_argument(
+        "--beams",
+        default="default,1",
+        help="Comma-separated beam sizes for the engine ('default' = model config)",
+    )
+    parser.add_argument(
+        "--max-tokens", type=int, default=4096, help="Padded-token budget per batch"
+    )
+    parser.add_argument("--json", action="store_true", help="Print JSON output")
+    args = parser.parse_args()
+
+    sentences = pd.read_csv(args.csv)[args.column].dropna().astype(str).tolist()
+    if args.limit:
+        sentences = sentences[: args.limit]
+
+    translator = pipeline("translation", model=args.model, tokenizer=args.model)
+    rows = [
+        measure(
+            "per-sentence pipeline",
+            lambda texts: [translator(t)[0]["translation_text"] for t in texts],
+            sentences,
+        )
+    ]
+    reference = rows[0]["outputs"]
+    for beams in args.beams.split(","):
+        num_beams = None if beams == "default" else int(beams)
+        engine = TranslationEngine(
+            args.model, num_beams=num_beams, max_batch_tokens=args.max_tokens
+        )
+        label = "greedy" if num_beams == 1 else f"beams={beams}"
+        rows.append(measure(f"engine {label}", engine.translate, sentences, reference))
+
+    for row in rows:
+        row.pop("outputs")
+    if args.json:
+        print(json.dumps({"sentences": len(sentences), "results": rows}, indent=2))
+        return
+
+    print(f"{len(sentences)} sentences, model {args.model}")
+    print(f"{'strategy':<24}{'seconds':>10}{'sent/s':>10}{'agree %':>10}")
+    for row in rows:
+        print(
+            f"{row['strategy']:<24}{row['seconds']:>10}"
+            f"{row['sentences_per_sec']:>10}{row.get('agreement_pct', '-'):>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
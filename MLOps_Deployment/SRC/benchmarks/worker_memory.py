@@ -0,0 +1,133 @@
+"""Measure resident memory per worker for different model loading strategies.
+
+Starts ``--workers`` forked processes that each hold the classifier and run
+one forward pass, then reports the memory of every worker while all of them
+are alive:
+
+- ``from_pretrained``: each worker loads the checkpoint into private memory
+  (the previous behaviour).
+- ``mmap``: each worker memory-maps ``model.safetensors`` (``models/weights``).
+- ``mmap-preload``: the parent memory-maps the model before forking, as the
+  gunicorn master does with ``--preload`` and ``PRELOAD_MODELS``.
+
+RSS counts shared pages in full for every process, so the per-worker cost is
+better read from PSS (shared pages split between the processes) and private
+dirty memory (pages no other process can share).
+
+Usage:
+    python -m benchmarks.worker_memory --model-dir checkpoint-3906 --workers 4
+    python -m benchmarks.worker_memory --random --workers 4
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import tempfile
+
+import torch
+from transformers import RobertaConfig, RobertaForSequenceClassification
+
+from models.weights import load_pretrained
+from utils.memory import process_memory
+
+MODES = ("from_pretrained", "mmap", "mmap-preload")
+DEFAULT_MODEL_DIR = os.path.join(os.path.dirname(__file__), "..", "checkpoint-3906")
+
+
+def save_random_checkpoint(model_dir: str) -> None:
+    """Save a randomly initialized roberta-base-sized classifier."""
+    config = RobertaConfig(num_labels=7)
+    RobertaForSequenceClassification(config).save_pretrained(model_dir)
+
+
+def _load(model_dir: str, mode: str) -> torch.nn.Module:
+    """Load the classifier the way ``mode`` does."""
+    return load_pretrained(
+        model_dir,
+        RobertaForSequenceClassification,
+        mmap_weights=mode != "from_pretrained",
+    )
+
+
+def _worker(model_dir, mode, model, results, done) -> None:
+    """Load (unless inherited) and use the model, report memory, then wait."""
+    torch.set_num_threads(1)
+    before = process_memory()
+    if model is None:
+        model = _load(model_dir, mode)
+    ids = torch.ones((1, 16), dtype=torch.long)
+    with torch.no_grad():
+        model(input_ids=ids, attention_mask=torch.ones_like(ids))
+    results.put({"pid": os.getpid(), "before": before, "after": process_memory()})
+    done.wait()
+
+
+def measure(model_dir: str, mode: str, workers: int) -> list[dict]:
+    """Run ``workers`` forked workers with one loading mode.
+
+    Returns:
+        list[dict]: Memory of each worker before and after it loaded the model.
+    """
+    ctx = mp.get_context("fork")
+    results, done = ctx.Queue(), ctx.Event()
+    model = _load(model_dir, mode) if mode == "mmap-preload" else None
+    processes = [
+        ctx.Process(target=_worker, args=(model_dir, mode, model, results, done))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    rows = [results.get() for _ in processes]
+    done.set()
+    for process in processes:
+        process.join()
+    return rows
+
+
+def mean(rows: list[dict], phase: str, key: str) -> float:
+    """Average one memory figure over the workers."""
+    return sum(row[phase].get(key, 0.0) for row in rows) / len(rows)
+
+
+def main() -> None:
+    """Parse arguments, run every mode and print per-worker memory."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model-dir", default=DEFAULT_MODEL_DIR)
+    parser.add_argument(
+        "--random",
+        action="store_true",
+        help="Use a randomly initialized roberta-base-sized checkpoint",
+    )
+    parser.add_argument("--workers", type=int, default=4, help="Forked workers")
+    parser.add_argument("--modes", default=",".join(MODES), help="Modes to run")
+    parser.add_argument("--json", action="store_true", help="Print JSON output")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_dir = args.model_dir
+        if args.random:
+            model_dir = tmp
+            save_random_checkpoint(model_dir)
+
+        report = {}
+        for mode in args.modes.split(","):
+            report[mode] = measure(model_dir, mode, args.workers)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    columns = ("rss_mb", "pss_mb", "private_dirty_mb")
+    print(f"{args.workers} workers; mean MB per worker after loading (before)")
+    print(f"{'mode':<18}{'RSS':>14}{'PSS':>14}{'private dirty':>16}")
+    for mode, rows in report.items():
+        cells = [
+            f"{mean(rows, 'after', key):.0f} ({mean(rows, 'before', key):.0f})"
+            for key in columns
+        ]
+        print(f"{mode:<18}{cells[0]:>14}{cells[1]:>14}{cells[2]:>16}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,15 @@
 
 import os
 import pickle
-from typing import List
+from typing import List, NamedTuple
 
 import torch
 from transformers import AutoModelForSequenceClassification, AutoTokenizer
 
+from models.backends import load_backend
+from models.registry import registry
+from models.weights import load_pretrained
+from utils.batching import batch_features, length_bucketed_batches
 from utils.logger import get_logger
 
 # module-scoped logger
@@ -15,34 +19,62 @@ logger = get_logger(__name__)
 # Set MOCK_MODE for Sphinx or lightweight environments
 MOCK_MODE = os.getenv("SPHINX_MOCK_MODE") == "1"
 
-# Load the model and tokenizer
-if not MOCK_MODE:
-    # Setup paths
-    checkpoint_path = os.path.abspath(
-        os.path.join(os.path.dirname(__file__), "..", "checkpoint-3906")
-    )
-    label_encoder_path = os.path.join(
-        os.path.dirname(__file__), "..", "models", "label_encoder.pkl"
-    )
+# Upper bound on padded tokens (batch size x longest sentence) per forward pass
+MAX_BATCH_TOKENS = int(os.getenv("MAX_BATCH_TOKENS", "8192"))
 
+# Upper bound on sentences per forward pass
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "32"))
+
+# Setup paths
+checkpoint_path = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "checkpoint-3906")
+)
+label_encoder_path = os.path.join(
+    os.path.dirname(__file__), "..", "models", "label_encoder.pkl"
+)
+
+
+class EmotionClassifier(NamedTuple):
+    """Loaded classifier components."""
+
+    tokenizer: object
+    label_encoder: object
+    backend: object
+
+
+def load_emotion_classifier() -> EmotionClassifier:
+    """Load the label encoder, tokenizer and model of the checkpoint.
+
+    The tokenizer is read from the checkpoint directory, so nothing is
+    downloaded from the Hugging Face Hub.
+    """
     # Load label encoder
     with open(label_encoder_path, "rb") as f:
         label_encoder = pickle.load(f)
 
     # Load tokenizer and model
-    tokenizer = AutoTokenizer.from_pretrained("roberta-base")
-    model = AutoModelForSequenceClassification.from_pretrained(checkpoint_path)
+    tokenizer = AutoTokenizer.from_pretrained(checkpoint_path)
+    model = load_pretrained(checkpoint_path, AutoModelForSequenceClassification)
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
     model.to(device)
     model.eval()
-else:
-    # Dummy values for Sphinx compatibility
-    model = tokenizer = label_encoder = device = None
+
+    # Eager PyTorch or ONNX Runtime, selected by INFERENCE_BACKEND
+    backend = load_backend(checkpoint_path, model, device)
+    return EmotionClassifier(tokenizer, label_encoder, backend)
+
+
+# Loaded on the first classification, not at import
+registry.register("emotion_classifier", load_emotion_classifier)
 
 
 def classify_emotions(texts: List[str]) -> List[str]:
     """Classify the emotion of each sentence using a pretrained transformer model.
 
+    Sentences are sorted by token length and run in buckets of similar length,
+    so each forward pass pads only to its own longest sentence. Labels are
+    returned in the original order.
+
     Args:
         texts (list of str): A list of input sentences to classify.
 
@@ -51,19 +83,30 @@ def classify_emotions(texts: List[str]) -> List[str]:
     """
     if MOCK_MODE:
         return ["neutral"] * len(texts)  # Stub response
+    if not texts:
+        return []
 
-    emotions = []
+    emotions: List[str] = [""] * len(texts)
     try:
-        for text in texts:
-            inputs = tokenizer(
-                text, return_tensors="pt", truncation=True, padding=True
-            ).to(device)
-            with torch.no_grad():
-                logits = model(**inputs).logits
-                pred = torch.argmax(logits, dim=1).item()
-                label = label_encoder.inverse_transform([pred])[0]
-            emotions.append(label)
-        logger.info("Emotion classification completed for %d sentences.", len(texts))
+        tokenizer, label_encoder, backend = registry.get("emotion_classifier")
+        encodings = tokenizer(list(texts), truncation=True, max_length=512)
+        lengths = [len(ids) for ids in encodings["input_ids"]]
+        batches = length_bucketed_batches(lengths, MAX_BATCH_TOKENS, MAX_BATCH_SIZE)
+        for batch in batches:
+            inputs = tokenizer.pad(
+                batch_features(encodings, batch),
+                padding="longest",
+                return_tensors="pt",
+            )
+            logits = backend.logits(inputs)
+            preds = torch.argmax(logits, dim=1).cpu().numpy()
+            for idx, label in zip(batch, label_encoder.inverse_transform(preds)):
+                emotions[idx] = label
+        logger.info(
+            "Emotion classification completed for %d sentences in %d batches.",
+            len(texts),
+            len(batches),
+        )
         return emotions
     except Exception as e:
         logger.error("Error during emotion classification: %s", e)
@@ -1,7 +1,7 @@
 """Evaluate a fine-tuned transformer model on test data for emotion classification.
 
 This script:
-- Loads the most recent test CSV file
+- Loads the most recent test data file (CSV, Parquet or Arrow)
 - Encodes labels using the same label encoder from training
 - Performs predictions
 - Computes evaluation metrics (accuracy and F1-score)
@@ -36,28 +36,56 @@ parser.add_argument(
 )
 args = parser.parse_args()
 
+# Data file types written by the prediction pipeline (see utils/result_io.py)
+DATA_SUFFIXES = (".csv", ".parquet", ".arrow")
 
-def find_latest_csv(folder_path):
-    """Finds the most recently modified CSV file in the given folder.
+
+def find_latest_data(folder_path):
+    """Finds the most recently modified data file in the given folder.
 
     Args:
-        folder_path (str): Path to the folder containing CSV files.
+        folder_path (str): Path to a folder containing .csv, .parquet or
+            .arrow files.
 
     Returns:
-        str: Full path to the latest CSV file.
+        str: Full path to the latest data file.
 
     Raises:
-        FileNotFoundError: If no CSV files are found in the folder.
+        FileNotFoundError: If no data files are found in the folder.
+    """
+    files = [
+        path
+        for suffix in DATA_SUFFIXES
+        for path in glob.glob(os.path.join(folder_path, f"*{suffix}"))
+    ]
+    if not files:
+        raise FileNotFoundError(f"No CSV/Parquet/Arrow files found in {folder_path}")
+    return max(files, key=os.path.getmtime)
+
+
+def load_data(path, columns):
+    """Loads only the given columns of a CSV, Parquet or Arrow file.
+
+    Parquet and Arrow files are read column by column, so the other columns
+    of a wide prediction file are never loaded.
+
+    Args:
+        path (str): Data file path.
+        columns (list[str]): Columns to load.
+
+    Returns:
+        pd.DataFrame: The selected columns.
     """
-    csv_files = glob.glob(os.path.join(folder_path, "*.csv"))
-    if not csv_files:
-        raise FileNotFoundError(f"No CSV files found in {folder_path}")
-    return max(csv_files, key=os.path.getmtime)
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path, columns=columns)
+    if path.endswith(".arrow"):
+        return pd.read_feather(path, columns=columns)
+    return pd.read_csv(path, usecols=columns)
 
 
 # Load test data
-test_csv_path = find_latest_csv(args.test_data_path)
-df = pd.read_csv(test_csv_path)
+test_data_path = find_latest_data(args.test_data_path)
+df = load_data(test_data_path, ["Sentence", "Emotion"])
 df = df.rename(columns={"Emotion": "label"})  # Normalize column name
 sentences = list(df["Sentence"])
 
@@ -1,12 +1,13 @@
 """Train a transformer-based model for emotion classification.
 
 This script:
-- Loads training and validation datasets from CSV files
+- Loads training and validation datasets from CSV, Parquet or Arrow files
 - Fine-tunes a Hugging Face model using PyTorch
 - Saves the model, tokenizer, label encoder, and training metadata
 
 Args (via CLI):
-    --train_data_path (str): Path to training data folder (with .csv files)
+    --train_data_path (str): Path to training data folder (.csv, .parquet or
+                             .arrow files)
     --val_data_path (str): Path to validation data folder
     --base_model_path (str): Path to base model checkpoint (e.g., from MLFlow or
                              Hugging Face)
@@ -58,23 +59,51 @@ parser.add_argument(
 )
 args = parser.parse_args()
 
+# Data file types written by the prediction pipeline (see utils/result_io.py)
+DATA_SUFFIXES = (".csv", ".parquet", ".arrow")
 
-def find_latest_csv(folder_path):
-    """Finds the most recently modified CSV file in a given directory.
+
+def find_latest_data(folder_path):
+    """Finds the most recently modified data file in the given folder.
 
     Args:
-        folder_path (str): Path to a directory containing .csv files.
+        folder_path (str): Path to a folder containing .csv, .parquet or
+            .arrow files.
 
     Returns:
-        str: Full path to the latest .csv file.
+        str: Full path to the latest data file.
 
     Raises:
-        FileNotFoundError: If no .csv files are found in the directory.
+        FileNotFoundError: If no data files are found in the folder.
+    """
+    files = [
+        path
+        for suffix in DATA_SUFFIXES
+        for path in glob.glob(os.path.join(folder_path, f"*{suffix}"))
+    ]
+    if not files:
+        raise FileNotFoundError(f"No CSV/Parquet/Arrow files found in {folder_path}")
+    return max(files, key=os.path.getmtime)
+
+
+def load_data(path, columns):
+    """Loads only the given columns of a CSV, Parquet or Arrow file.
+
+    Parquet and Arrow files are read column by column, so the other columns
+    of a wide prediction file are never loaded.
+
+    Args:
+        path (str): Data file path.
+        columns (list[str]): Columns to load.
+
+    Returns:
+        pd.DataFrame: The selected columns.
     """
-    csv_files = glob.glob(os.path.join(folder_path, "*.csv"))
-    if not csv_files:
-        raise FileNotFoundError(f"No CSV files found in {folder_path}")
-    return max(csv_files, key=os.path.getmtime)
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path, columns=columns)
+    if path.endswith(".arrow"):
+        return pd.read_feather(path, columns=columns)
+    return pd.read_csv(path, usecols=columns)
 
 
 class EmotionDataset(Dataset):
@@ -135,12 +164,13 @@ device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 model.to(device)
 
 # Load CSV files
-train_csv = find_latest_csv(args.train_data_path)
-val_csv = find_latest_csv(args.val_data_path)
+train_path = find_latest_data(args.train_data_path)
+val_path = find_latest_data(args.val_data_path)
 
-# Load and rename columns
-train_df = pd.read_csv(train_csv).rename(columns={"Emotion": "label"})
-val_df = pd.read_csv(val_csv).rename(columns={"Emotion": "label"})
+# Load only the needed columns and rename them
+columns = ["Sentence", "Emotion"]
+train_df = load_data(train_path, columns).rename(columns={"Emotion": "label"})
+val_df = load_data(val_path, columns).rename(columns={"Emotion": "label"})
 
 # Fit label encoder
 label_encoder = LabelEncoder()
@@ -1,3 +1,4 @@
+import json
 import logging
 import os
 from logging.handlers import RotatingFileHandler
@@ -28,23 +29,24 @@ def log_event(event: str):
     logger.info(event)
 
 
-def classify_text(text: str) -> str:
+def classify_text(text: str) -> tuple:
     """Classify emotion from text using FastAPI.
 
     Args:
         text (str): Input sentence.
 
     Returns:
-        str: Predicted emotion and confidence.
+        tuple: Predicted emotion and confidence, and the CSV download path.
     """
     log_event("Text input submitted")
     try:
         response = requests.post(f"{API_URL}/predict", json={"text": text})
         response.raise_for_status()
         data = response.json()
-        return f"{data['predicted_label']} | {data['confidence']:.2f}%"
+        csv_paths = data.get("csv_paths") or [None]
+        return f"{data['predicted_label']} | {data['confidence']:.2f}%", csv_paths[0]
     except Exception as e:
-        return f"Error: {str(e)}"
+        return f"Error: {str(e)}", None
 
 
 def classify_audio(file_path: str):
@@ -121,3 +123,34 @@ def classify_url(media_url: str, language: str = "auto"):
         error_df = pd.DataFrame(columns=["Error"])
         error_df.loc[0] = str(e)
         return error_df, None
+
+
+def stream_url(media_url: str, language: str = "auto"):
+    """Stream per-sentence predictions for a media URL as they are classified.
+
+    Reads the Server-Sent Events of ``/predict_from_url/stream``.
+
+    Args:
+        media_url (str): Media link (YouTube, MP3, MP4).
+        language (str): Optional transcription language.
+
+    Yields:
+        tuple[str, dict]: Event name ("status", "sentence", "done" or "error")
+        and its payload.
+    """
+    log_event(f"URL submitted for streaming: {media_url}")
+    payload = {"url": media_url, "language": language}
+    with requests.post(
+        f"{API_URL}/predict_from_url/stream",
+        json=payload,
+        stream=True,
+        timeout=(10, None),
+    ) as response:
+        response.raise_for_status()
+        event = "message"
+        for line in response.iter_lines(decode_unicode=True):
+            if line.startswith("event:"):
+                event = line.removeprefix("event:").strip()
+            elif line.startswith("data:"):
+                yield event, json.loads(line.removeprefix("data:"))
+                event = "message"
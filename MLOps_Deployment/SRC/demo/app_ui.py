@@ -5,11 +5,18 @@ prediction results and allows CSV download.
 """
 
 import re
+import time
 from pathlib import Path
 
 import gradio as gr
 import pandas as pd
-from api_client import classify_audio, classify_text, classify_url, classify_video
+from api_client import classify_audio, classify_text, classify_video, stream_url
+
+# Columns shown in the results table (same as the non-streaming endpoints)
+RESULT_COLUMNS = ["Start Time", "Translation", "Emotion", "Confidence (%)"]
+
+# Minimum seconds between table refreshes while results are streaming in
+STREAM_REFRESH_SECONDS = 0.5
 
 
 def is_valid_url(url):
@@ -101,7 +108,7 @@ def main():
                             gr.update(visible=False),
                         )
 
-                    result = classify_text(text)
+                    result, csv_path = classify_text(text)
                     print("Received result from backend:", result)
 
                     if not isinstance(result, str):
@@ -152,7 +159,7 @@ def main():
                             gr.update(visible=False),
                         )
 
-                    download_html = "<a href='http://localhost:3126/download_text_csv' target='_blank'><button class='predict-button'>Download CSV</button></a>"
+                    download_html = f"<a href='http://localhost:3126{csv_path}' target='_blank'><button class='predict-button'>Download CSV</button></a>"
 
                     return (
                         emotion.strip(),
@@ -364,68 +371,79 @@ def main():
                 )
                 url_btn = gr.Button("Predict from URL", elem_classes="predict-button")
                 with gr.Row():
-                    url_output = gr.Dataframe(label="Top 10 Predictions")
+                    url_output = gr.Dataframe(label="Predictions")
                 url_plot = gr.Plot(visible=False)
                 url_error = gr.Markdown(visible=False)
                 download_url_btn = gr.HTML(visible=False)
 
                 def handle_url_input(url, lang):
                     if not is_valid_url(url):
-                        return (
+                        yield (
                             None,
-                            None,
-                            gr.update(visible=True, value="Invalid URL format."),
                             gr.update(visible=False),
+                            gr.update(visible=True, value="Invalid URL format."),
                             gr.update(visible=False),
                         )
+                        return
 
                     print(f"Received URL: {url}, language: {lang}")
-                    df, csv_path = classify_url(url, lang)
-                    print("Backend classify_url returned:", type(df), df)
-
-                    if isinstance(df, str) and df.startswith("Error"):
-                        return (
-                            None,
-                            None,
-                            gr.update(visible=True, value=df),
-                            gr.update(visible=False),
-                            gr.update(visible=False),
-                        )
-
-                    if isinstance(df, pd.DataFrame) and df.columns.tolist() == [
-                        "Error"
-                    ]:
-                        error_msg = (
-                            df["Error"].iloc[0]
-                            if not df.empty
-                            else "Unknown error occurred."
-                        )
-                        return (
-                            None,
-                            None,
-                            gr.update(visible=True, value=error_msg),
+                    rows, last_refresh = [], 0.0
+                    try:
+                        # Render rows as the backend classifies them
+                        for event, data in stream_url(url, lang):
+                            if event == "status":
+                                yield (
+                                    gr.update(),
+                                    gr.update(visible=False),
+                                    gr.update(
+                                        visible=True,
+                                        value=f"\u231b {data['stage'].capitalize()}...",
+                                    ),
+                                    gr.update(visible=False),
+                                )
+                            elif event == "sentence":
+                                rows.append(
+                                    {col: data.get(col) for col in RESULT_COLUMNS}
+                                )
+                                if (
+                                    time.monotonic() - last_refresh
+                                    >= STREAM_REFRESH_SECONDS
+                                ):
+                                    last_refresh = time.monotonic()
+                                    yield (
+                                        pd.DataFrame(rows, columns=RESULT_COLUMNS),
+                                        gr.update(visible=False),
+                                        gr.update(
+                                            visible=True,
+                                            value=f"\u231b {len(rows)} sentences classified...",
+                                        ),
+                                        gr.update(visible=False),
+                                    )
+                            elif event == "error":
+                                raise RuntimeError(data.get("detail", "Unknown error"))
+                            elif event == "done":
+                                csv_paths = data.get("csv_paths") or [""]
+                                filename = Path(csv_paths[0]).name
+                                print("Final filename used in download link:", filename)
+                                download_html = f"<a href='http://localhost:3126/download_csv_file?filename={filename}' target='_blank'><button class='predict-button'>Download CSV</button></a>"
+                                yield (
+                                    pd.DataFrame(rows, columns=RESULT_COLUMNS),
+                                    gr.update(visible=False),
+                                    gr.update(visible=False),
+                                    gr.update(value=download_html, visible=True),
+                                )
+                    except Exception as e:
+                        yield (
+                            (
+                                pd.DataFrame(rows, columns=RESULT_COLUMNS)
+                                if rows
+                                else None
+                            ),
                             gr.update(visible=False),
+                            gr.update(visible=True, value=f"Error: {e}"),
                             gr.update(visible=False),
                         )
 
-                    if isinstance(csv_path, str):
-                        filename = Path(csv_path).name
-                    elif isinstance(csv_path, list) and csv_path:
-                        filename = Path(csv_path[0]).name
-                    else:
-                        filename = ""
-
-                    print("Final filename used in download link:", filename)
-
-                    download_html = f"<a href='http://localhost:3126/download_csv_file?filename={filename}' target='_blank'><button class='predict-button'>Download CSV</button></a>"
-
-                    return (
-                        df,
-                        gr.update(visible=False),
-                        gr.update(visible=True),
-                        gr.update(value=download_html, visible=True),
-                    )
-
                 url_btn.click(lambda: gr.update(visible=True), inputs=[], queue=False)
                 url_btn.click(
                     fn=handle_url_input,
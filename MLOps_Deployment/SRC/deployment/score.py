@@ -1,24 +1,204 @@
 import json
 import logging
+import mmap
 import os
+import resource
+import struct
+import tempfile
+from contextlib import contextmanager
 
 import joblib
 import numpy as np
 import torch
-from safetensors.torch import load_file
-from transformers import RobertaForSequenceClassification, RobertaTokenizer
+from transformers import (
+    RobertaConfig,
+    RobertaForSequenceClassification,
+    RobertaTokenizer,
+)
+from transformers.modeling_utils import no_init_weights
 
 # Enable logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# "torch" (eager), "onnx" (ONNX Runtime FP32) or "onnx-int8" (dynamic INT8)
+INFERENCE_BACKEND = os.environ.get("INFERENCE_BACKEND", "torch").lower()
+
+# Texts per forward pass, texts accepted per request, and tokens per text
+MAX_BATCH_SIZE = int(os.environ.get("MAX_BATCH_SIZE", "32"))
+MAX_TEXTS_PER_REQUEST = int(os.environ.get("MAX_TEXTS_PER_REQUEST", "256"))
+MAX_LENGTH = 512
+
+
+_SAFETENSORS_DTYPES = {
+    "F32": torch.float32,
+    "F16": torch.float16,
+    "BF16": torch.bfloat16,
+    "I64": torch.int64,
+}
+
+
+def _rss_mb():
+    """Return the resident memory of this process in MB."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _load_safetensors_mmap(path):
+    """Return the tensors of a safetensors file as views of a private mmap.
+
+    Pages are read lazily and stay shared with every other process mapping
+    the file (copy-on-write), instead of being copied into private memory.
+    """
+    with open(path, "rb") as f:
+        (header_size,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(header_size))
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    tensors = {}
+    for name, info in header.items():
+        if name == "__metadata__":
+            continue
+        dtype = _SAFETENSORS_DTYPES[info["dtype"]]
+        begin, end = info["data_offsets"]
+        tensors[name] = torch.frombuffer(
+            buffer,
+            dtype=dtype,
+            count=(end - begin) // dtype.itemsize,
+            offset=8 + header_size + begin,
+        ).view(info["shape"])
+    return tensors
+
+
+def _load_tokenizer(artifact_dir):
+    """Load the tokenizer saved next to the model by ``comp/train.py``.
+
+    Models registered before the tokenizer files were part of the artifact
+    fall back to the ``roberta-base`` tokenizer from the Hugging Face Hub.
+    """
+    if os.path.exists(os.path.join(artifact_dir, "vocab.json")):
+        return RobertaTokenizer.from_pretrained(artifact_dir)
+    logger.warning(f"No tokenizer files in {artifact_dir}; using roberta-base")
+    return RobertaTokenizer.from_pretrained("roberta-base")
+
+
+def _load_model(artifact_dir, model_path):
+    """Build the classifier with its weights memory-mapped from ``model_path``.
+
+    Parameters are created on the ``meta`` device, so the model is neither
+    allocated nor randomly initialized before the checkpoint replaces it.
+    """
+    config_path = os.path.join(artifact_dir, "config.json")
+    if os.path.exists(config_path):
+        config = RobertaConfig.from_pretrained(artifact_dir)
+    else:
+        config = RobertaConfig.from_pretrained("roberta-base", num_labels=7)
+
+    register_parameter = torch.nn.Module.register_parameter
+
+    def register_on_meta(module, name, param):
+        if param is not None:
+            param = torch.nn.Parameter(param.to("meta"), requires_grad=False)
+        register_parameter(module, name, param)
+
+    torch.nn.Module.register_parameter = register_on_meta
+    try:
+        with no_init_weights():
+            model = RobertaForSequenceClassification(config)
+    finally:
+        torch.nn.Module.register_parameter = register_parameter
+
+    model.load_state_dict(_load_safetensors_mmap(model_path), strict=False, assign=True)
+    missing = [name for name, param in model.named_parameters() if param.is_meta]
+    if missing:
+        raise RuntimeError(f"{model_path} has no weights for: {', '.join(missing)}")
+    model.requires_grad_(False)
+    return model
+
+
+@contextmanager
+def _replace_atomically(path):
+    """Yield a temporary path next to ``path`` and move it into place on success.
+
+    A crashed export leaves no truncated graph behind for later starts to reuse.
+    """
+    tmp = os.path.join(
+        os.path.dirname(path), f".{os.path.basename(path)}.{os.getpid()}.tmp"
+    )
+    try:
+        yield tmp
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def _load_onnx_session(artifact_dir, quantize):
+    """Create an ONNX Runtime session for the loaded model.
+
+    Uses ``model.onnx`` / ``model.int8.onnx`` from the artifact directory when
+    they were registered with the model; otherwise exports the eager model to a
+    writable directory (``ONNX_MODEL_DIR``, default: system temp dir).
+    """
+    import onnxruntime as ort
+
+    filename = "model.int8.onnx" if quantize else "model.onnx"
+    onnx_path = os.path.join(artifact_dir, filename)
+    if not os.path.exists(onnx_path):
+        onnx_dir = os.environ.get("ONNX_MODEL_DIR", tempfile.gettempdir())
+        fp32_path = os.path.join(onnx_dir, "model.onnx")
+        onnx_path = os.path.join(onnx_dir, filename)
+        if not os.path.exists(fp32_path):
+            os.makedirs(onnx_dir, exist_ok=True)
+            logger.info(f"Exporting model to ONNX: {fp32_path}")
+            dummy = torch.ones((1, 8), dtype=torch.long)
+            axes = {0: "batch", 1: "sequence"}
+            with torch.no_grad(), _replace_atomically(fp32_path) as tmp:
+                torch.onnx.export(
+                    model,
+                    (dummy, torch.ones_like(dummy)),
+                    tmp,
+                    input_names=["input_ids", "attention_mask"],
+                    output_names=["logits"],
+                    dynamic_axes={
+                        "input_ids": axes,
+                        "attention_mask": axes,
+                        "logits": {0: "batch"},
+                    },
+                    opset_version=14,
+                    dynamo=False,
+                )
+        if quantize and not os.path.exists(onnx_path):
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            logger.info(f"Quantizing ONNX model to INT8: {onnx_path}")
+            with _replace_atomically(onnx_path) as tmp:
+                quantize_dynamic(fp32_path, tmp, weight_type=QuantType.QInt8)
+
+    logger.info(f"Using {INFERENCE_BACKEND} backend: {onnx_path}")
+    return ort.InferenceSession(onnx_path, providers=["CPUExecutionProvider"])
+
+
+def _logits(inputs):
+    """Return classification logits for tokenized inputs on the active backend."""
+    if onnx_session is None:
+        with torch.no_grad():
+            return model(**inputs).logits
+    feeds = {
+        "input_ids": inputs["input_ids"].numpy().astype(np.int64),
+        "attention_mask": inputs["attention_mask"].numpy().astype(np.int64),
+    }
+    return torch.from_numpy(onnx_session.run(["logits"], feeds)[0])
+
 
 def init():
     """Initialize the model, tokenizer, and label encoder for emotion classification.
 
     Loads all necessary components from the Azure ML model mount directory.
     """
-    global model, tokenizer, label_encoder
+    global model, tokenizer, label_encoder, onnx_session
 
     # Get model directory path
     base_path = os.environ.get("AZUREML_MODEL_DIR", ".")
@@ -36,48 +216,108 @@ def init():
     encoder_path = os.path.join(artifact_dir, "label_encoder.pkl")
 
     logger.info(f"Loading tokenizer and model from {artifact_dir}")
-    tokenizer = RobertaTokenizer.from_pretrained("roberta-base")
-    model = RobertaForSequenceClassification.from_pretrained(
-        "roberta-base", num_labels=7
-    )
-    model.load_state_dict(load_file(model_path))
+    rss_before = _rss_mb()
+    tokenizer = _load_tokenizer(artifact_dir)
+    model = _load_model(artifact_dir, model_path)
     model.eval()
+    logger.info(f"Resident memory: {rss_before:.0f} MB -> {_rss_mb():.0f} MB")
+
+    onnx_session = None
+    if INFERENCE_BACKEND in ("onnx", "onnx-int8"):
+        onnx_session = _load_onnx_session(
+            artifact_dir, quantize=INFERENCE_BACKEND == "onnx-int8"
+        )
 
     logger.info(f"Loading label encoder from {encoder_path}")
     label_encoder = joblib.load(encoder_path)
     logger.info("Model, tokenizer, and label encoder loaded successfully.")
 
 
+def _classify(texts):
+    """Classify non-empty texts in padded minibatches.
+
+    Texts are sorted by length so each batch pads to a similar length, and
+    results are returned in input order.
+
+    Returns:
+        list[tuple[str, float]]: Label and probability for each text.
+    """
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    results = [None] * len(texts)
+    for start in range(0, len(order), MAX_BATCH_SIZE):
+        end = start + MAX_BATCH_SIZE
+        batch = order[start:end]
+        inputs = tokenizer(
+            [texts[i] for i in batch],
+            return_tensors="pt",
+            truncation=True,
+            max_length=MAX_LENGTH,
+            padding=True,
+        )
+        probs = torch.nn.functional.softmax(_logits(inputs), dim=1).numpy()
+        idx = probs.argmax(axis=1)
+        labels = label_encoder.inverse_transform(idx)
+        for i, label, j, row in zip(batch, labels, idx, probs):
+            results[i] = (str(label), float(row[j]))
+    return results
+
+
+def _prediction(text, label, confidence):
+    """Build the response item of one classified text."""
+    return {"text": text, "predicted_label": label, "confidence": confidence}
+
+
 def run(raw_data):
     """Perform emotion prediction from a JSON input string.
 
+    Accepts a single text (``{"text": "..."}``) or a batch
+    (``{"texts": ["...", ...]}``, at most ``MAX_TEXTS_PER_REQUEST``), which is
+    classified with padded minibatch forward passes of ``MAX_BATCH_SIZE``.
+
     Args:
-        raw_data (str): A JSON-formatted string containing a "text" field.
+        raw_data (str): A JSON-formatted string with a "text" or "texts" field.
 
     Returns:
-        dict: Dictionary with keys:
+        dict: For a single text, a dictionary with keys:
             - "text" (str): The input text.
             - "predicted_label" (str): Predicted emotion label.
             - "confidence" (float): Confidence score of the prediction.
             - or "error" (str): Error message if input is invalid.
+        For a batch, ``{"results": [...]}`` with one such dictionary per
+        input text, in order; empty texts get an "error" item.
     """
-    logger.info(f"Received request data: {raw_data}")
     data = json.loads(raw_data)
+
+    if "texts" in data:
+        texts = data["texts"]
+        if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+            return {"error": "'texts' must be a list of strings"}
+        if len(texts) > MAX_TEXTS_PER_REQUEST:
+            return {"error": f"At most {MAX_TEXTS_PER_REQUEST} texts per request"}
+        texts = [t.strip() for t in texts]
+        logger.info(f"Received batch of {len(texts)} texts")
+        valid = [i for i, t in enumerate(texts) if t]
+        predictions = dict(zip(valid, _classify([texts[i] for i in valid])))
+        if logger.isEnabledFor(logging.DEBUG):
+            for i, (label, confidence) in predictions.items():
+                logger.debug(f"Prediction {i}: {label} (confidence {confidence:.4f})")
+        return {
+            "results": [
+                (
+                    _prediction(text, *predictions[i])
+                    if i in predictions
+                    else {"text": text, "error": "Empty input"}
+                )
+                for i, text in enumerate(texts)
+            ]
+        }
+
     text = data.get("text", "").strip()
+    logger.debug("Received single text")
     if not text:
         logger.warning("Empty input received.")
         return {"error": "Empty input"}
 
-    inputs = tokenizer(text, return_tensors="pt", truncation=True, padding=True)
-    with torch.no_grad():
-        logits = model(**inputs).logits
-        probs = torch.nn.functional.softmax(logits, dim=1).numpy().flatten()
-        idx = int(np.argmax(probs))
-        pred = label_encoder.inverse_transform([idx])[0]
-
-    logger.info(f"Prediction: {pred} (confidence {probs[idx]:.4f})")
-    return {
-        "text": text,
-        "predicted_label": pred,
-        "confidence": float(probs[idx]),
-    }
+    label, confidence = _classify([text])[0]
+    logger.debug(f"Prediction: {label} (confidence {confidence:.4f})")
+    return _prediction(text, label, confidence)
@@ -0,0 +1,242 @@
+"""Pluggable inference backends for the RoBERTa emotion classifier.
+
+The backend is chosen with the ``INFERENCE_BACKEND`` environment variable:
+
+- ``torch`` (default): eager PyTorch model.
+- ``onnx``: ONNX Runtime session on an exported FP32 graph.
+- ``onnx-int8``: ONNX Runtime session on a dynamically INT8-quantized graph.
+
+ONNX graphs are exported from the checkpoint on first use and cached next to
+it (or in ``ONNX_MODEL_DIR``). ``onnxruntime`` is only needed for the ONNX
+backends.
+"""
+
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+import torch
+from transformers import RobertaForSequenceClassification
+
+from models.weights import load_pretrained
+from utils.logger import get_logger
+from utils.process_local import ProcessLocal
+
+logger = get_logger(__name__)
+
+BACKENDS = ("torch", "onnx", "onnx-int8")
+INPUT_NAMES = ["input_ids", "attention_mask"]
+ONNX_OPSET = 14
+
+
+class TorchBackend:
+    """Run the eager PyTorch model."""
+
+    name = "torch"
+
+    def __init__(self, model: torch.nn.Module, device: torch.device):
+        """Wrap an already loaded model.
+
+        Args:
+            model: Fine-tuned sequence classification model.
+            device: Device the model lives on.
+        """
+        self.model = model
+        self.device = device
+
+    def logits(self, inputs: dict) -> torch.Tensor:
+        """Return classification logits for a padded batch.
+
+        Args:
+            inputs: Tokenizer output with ``input_ids`` and ``attention_mask``.
+
+        Returns:
+            torch.Tensor: Logits of shape ``(batch, num_labels)``.
+        """
+        inputs = {key: value.to(self.device) for key, value in inputs.items()}
+        with torch.no_grad():
+            return self.model(**inputs).logits
+
+
+class OnnxBackend:
+    """Run an exported ONNX graph with ONNX Runtime on CPU.
+
+    The session is created on first use in each process. Its thread pools do
+    not survive ``fork()``, so a backend loaded in a ``gunicorn --preload``
+    master gives every worker its own session.
+    """
+
+    def __init__(
+        self, onnx_path: Union[str, Path], name: str = "onnx", num_threads: int = 0
+    ):
+        """Prepare an inference session.
+
+        Args:
+            onnx_path: Path to the ``.onnx`` file.
+            name: Backend name reported in logs and benchmarks.
+            num_threads: Intra-op threads (0 lets ONNX Runtime decide).
+        """
+        self.name = name
+        self.onnx_path = str(onnx_path)
+        self.num_threads = num_threads
+        self._session = ProcessLocal(self._create_session)
+
+    def _create_session(self):
+        """Create an ONNX Runtime session for the current process."""
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if self.num_threads:
+            options.intra_op_num_threads = self.num_threads
+        return ort.InferenceSession(
+            self.onnx_path, options, providers=["CPUExecutionProvider"]
+        )
+
+    @property
+    def session(self):
+        """ONNX Runtime session of the current process."""
+        return self._session.get()
+
+    @property
+    def input_names(self) -> set[str]:
+        """Names of the graph inputs."""
+        return {i.name for i in self.session.get_inputs()}
+
+    def logits(self, inputs: dict) -> torch.Tensor:
+        """Return classification logits for a padded batch.
+
+        Args:
+            inputs: Tokenizer output with ``input_ids`` and ``attention_mask``.
+
+        Returns:
+            torch.Tensor: Logits of shape ``(batch, num_labels)`` on CPU.
+        """
+        feeds = {
+            name: value.cpu().numpy().astype("int64")
+            for name, value in inputs.items()
+            if name in self.input_names
+        }
+        (logits,) = self.session.run(["logits"], feeds)
+        return torch.from_numpy(logits)
+
+
+def onnx_paths(model_dir: Union[str, Path]) -> tuple[Path, Path]:
+    """Return the FP32 and INT8 ONNX file locations for a checkpoint.
+
+    Args:
+        model_dir: Checkpoint directory.
+
+    Returns:
+        tuple[Path, Path]: ``(model.onnx, model.int8.onnx)`` paths.
+    """
+    onnx_dir = Path(os.getenv("ONNX_MODEL_DIR", Path(model_dir) / "onnx"))
+    return onnx_dir / "model.onnx", onnx_dir / "model.int8.onnx"
+
+
+@contextmanager
+def _replace_atomically(path: Path) -> Iterator[Path]:
+    """Yield a temporary path next to ``path`` and move it into place on success.
+
+    Readers never see a partially written graph, and a crash leaves only the
+    temporary file behind instead of a truncated ``path`` that would be reused.
+    """
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        yield tmp
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def export_onnx(
+    model_dir: Union[str, Path],
+    quantize: bool = False,
+    model: Optional[torch.nn.Module] = None,
+) -> Path:
+    """Export the checkpoint to ONNX and optionally quantize it to INT8.
+
+    Existing files are reused, so this is cheap after the first call. Each
+    graph is written to a temporary file and renamed into place, so concurrent
+    exports from several workers never read or reuse a partial file.
+
+    Args:
+        model_dir: Checkpoint directory.
+        quantize: Also produce (and return) a dynamically quantized INT8 graph.
+        model: Already loaded model to export; loaded from ``model_dir`` if omitted.
+
+    Returns:
+        Path: The FP32 graph, or the INT8 graph when ``quantize`` is set.
+    """
+    fp32_path, int8_path = onnx_paths(model_dir)
+
+    if not fp32_path.exists():
+        fp32_path.parent.mkdir(parents=True, exist_ok=True)
+        if model is None:
+            model = RobertaForSequenceClassification.from_pretrained(model_dir)
+        model = model.to("cpu").eval()
+
+        logger.info("Exporting %s to ONNX: %s", model_dir, fp32_path)
+        dummy = torch.ones((1, 8), dtype=torch.long)
+        dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in INPUT_NAMES}
+        dynamic_axes["logits"] = {0: "batch"}
+        with torch.no_grad(), _replace_atomically(fp32_path) as tmp:
+            torch.onnx.export(
+                model,
+                (dummy, torch.ones_like(dummy)),
+                str(tmp),
+                input_names=INPUT_NAMES,
+                output_names=["logits"],
+                dynamic_axes=dynamic_axes,
+                opset_version=ONNX_OPSET,
+                dynamo=False,
+            )
+
+    if not quantize:
+        return fp32_path
+
+    if not int8_path.exists():
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        logger.info("Quantizing %s to INT8: %s", fp32_path, int8_path)
+        with _replace_atomically(int8_path) as tmp:
+            quantize_dynamic(str(fp32_path), str(tmp), weight_type=QuantType.QInt8)
+    return int8_path
+
+
+def load_backend(
+    model_dir: Union[str, Path],
+    model: Optional[torch.nn.Module] = None,
+    device: Optional[torch.device] = None,
+    kind: Optional[str] = None,
+):
+    """Create the inference backend selected by ``INFERENCE_BACKEND``.
+
+    Args:
+        model_dir: Checkpoint directory (used to export/locate ONNX graphs).
+        model: Loaded PyTorch model; loaded from ``model_dir`` if omitted.
+        device: Device of ``model`` for the ``torch`` backend.
+        kind: Backend name overriding the environment variable.
+
+    Returns:
+        TorchBackend | OnnxBackend: Object exposing ``logits(inputs)``.
+
+    Raises:
+        ValueError: If the backend name is unknown.
+    """
+    kind = (kind or os.getenv("INFERENCE_BACKEND", "torch")).lower()
+    if kind not in BACKENDS:
+        raise ValueError(
+            f"Unknown INFERENCE_BACKEND {kind!r}; expected one of {BACKENDS}"
+        )
+
+    if kind == "torch":
+        if model is None:
+            model = load_pretrained(model_dir, RobertaForSequenceClassification)
+        return TorchBackend(model, device or torch.device("cpu"))
+
+    onnx_path = export_onnx(model_dir, quantize=kind == "onnx-int8", model=model)
+    num_threads = int(os.getenv("ONNX_NUM_THREADS", "0"))
+    logger.info("Using %s backend: %s", kind, onnx_path)
+    return OnnxBackend(onnx_path, name=kind, num_threads=num_threads)
@@ -0,0 +1,143 @@
+"""Lazy, process-wide registry of model components.
+
+Modules register a loader per component (e.g. the emotion classifier or the
+translation engine) when they are imported, which is cheap. A component is
+loaded the first time it is requested with :meth:`ModelRegistry.get`, once per
+process even when several threads ask for it at the same time. Servers can
+preload components in the background with :meth:`ModelRegistry.warmup` and
+report readiness from :meth:`ModelRegistry.status`.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Iterable, Optional
+
+from utils.logger import get_logger
+from utils.memory import format_memory, process_memory
+
+logger = get_logger(__name__)
+
+
+class ModelRegistry:
+    """Named model components, each loaded on first use."""
+
+    def __init__(self):
+        """Create an empty registry."""
+        self._loaders: dict[str, Callable[[], Any]] = {}
+        self._components: dict[str, Any] = {}
+        self._locks: dict[str, threading.Lock] = {}
+        self._loading: set[str] = set()
+        self._errors: dict[str, str] = {}
+        self._load_seconds: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, loader: Callable[[], Any]) -> None:
+        """Register the loader of a component, replacing any previous one.
+
+        Args:
+            name: Component name, e.g. "classifier".
+            loader: Called without arguments to load the component.
+        """
+        with self._lock:
+            self._loaders[name] = loader
+            self._locks.setdefault(name, threading.Lock())
+            self._components.pop(name, None)
+            self._errors.pop(name, None)
+
+    def get(self, name: str) -> Any:
+        """Return a component, loading it first if needed.
+
+        Raises:
+            KeyError: If no loader is registered under ``name``.
+            Exception: Whatever the loader raised; the next call retries.
+        """
+        try:
+            return self._components[name]
+        except KeyError:
+            pass
+        if name not in self._loaders:
+            raise KeyError(f"No model component registered as {name!r}")
+
+        with self._locks[name]:
+            if name in self._components:
+                return self._components[name]
+            before = process_memory()
+            logger.info("Loading model component %s (%s)", name, format_memory(before))
+            self._loading.add(name)
+            start = time.perf_counter()
+            try:
+                component = self._loaders[name]()
+            except Exception as e:
+                self._errors[name] = str(e)
+                logger.error("Failed to load model component %s: %s", name, e)
+                raise
+            finally:
+                self._loading.discard(name)
+            self._load_seconds[name] = time.perf_counter() - start
+            self._errors.pop(name, None)
+            self._components[name] = component
+            logger.info(
+                "Loaded model component %s in %.1f s (%s)",
+                name,
+                self._load_seconds[name],
+                format_memory(process_memory()),
+            )
+            return component
+
+    def is_loaded(self, name: str) -> bool:
+        """Whether a component has been loaded."""
+        return name in self._components
+
+    def warmup(self, names: Optional[Iterable[str]] = None) -> bool:
+        """Load components ahead of their first use.
+
+        Failures are logged and recorded in :meth:`status` instead of raised.
+
+        Args:
+            names: Components to load; defaults to all registered ones.
+
+        Returns:
+            bool: Whether every requested component is loaded.
+        """
+        names = list(self._loaders) if names is None else list(names)
+        for name in names:
+            try:
+                self.get(name)
+            except Exception:
+                pass
+        return self.ready(names)
+
+    def ready(self, names: Iterable[str]) -> bool:
+        """Whether all of ``names`` are loaded."""
+        return all(self.is_loaded(name) for name in names)
+
+    def status(self) -> dict[str, dict]:
+        """Return the state of every registered component.
+
+        Returns:
+            dict: ``{name: {"state": ..., "load_seconds": ..., "error": ...}}``
+            with state "ready", "loading", "failed" or "not_loaded".
+        """
+        status = {}
+        for name in list(self._loaders):
+            if name in self._components:
+                state = "ready"
+            elif name in self._loading:
+                state = "loading"
+            elif name in self._errors:
+                state = "failed"
+            else:
+                state = "not_loaded"
+            status[name] = {
+                "state": state,
+                "load_seconds": (
+                    round(self._load_seconds[name], 3)
+                    if name in self._load_seconds
+                    else None
+                ),
+                "error": self._errors.get(name),
+            }
+        return status
+
+
+registry = ModelRegistry()
@@ -0,0 +1,164 @@
+"""Shared Polish → English MarianMT translation engine.
+
+The model and tokenizer are loaded once per process and set of engine
+settings, and reused by the API (``app.inference``) and the data
+preprocessing CLI. Sentences are translated
+with batched ``generate`` calls: they are sorted by token length and cut into
+batches under a padded-token budget, so each batch is padded only to its own
+longest sentence. Results can be cached per sentence.
+
+Decoding is configured with ``TRANSLATION_NUM_BEAMS``: ``1`` is greedy
+decoding (fastest), larger values use beam search, and leaving it unset keeps
+the model's own generation config (beam search with 4 beams for the
+Helsinki-NLP models).
+"""
+
+import os
+import threading
+from typing import Optional, Sequence
+
+import torch
+from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+
+from utils.batching import batch_features, length_bucketed_batches
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+TRANSLATION_MODEL = os.getenv("TRANSLATION_MODEL", "Helsinki-NLP/opus-mt-pl-en")
+TRANSLATION_NUM_BEAMS = os.getenv("TRANSLATION_NUM_BEAMS")
+TRANSLATION_MAX_BATCH_TOKENS = int(os.getenv("TRANSLATION_MAX_BATCH_TOKENS", "4096"))
+TRANSLATION_MAX_BATCH_SIZE = int(os.getenv("TRANSLATION_MAX_BATCH_SIZE", "32"))
+
+# MarianMT models are trained on sentences of up to 512 tokens
+MAX_LENGTH = 512
+
+
+class TranslationEngine:
+    """Batched MarianMT translation with an optional per-sentence cache."""
+
+    def __init__(
+        self,
+        model_name: str = TRANSLATION_MODEL,
+        device: Optional[torch.device] = None,
+        num_beams: Optional[int] = None,
+        max_batch_tokens: int = TRANSLATION_MAX_BATCH_TOKENS,
+        max_batch_size: int = TRANSLATION_MAX_BATCH_SIZE,
+        cache=None,
+    ):
+        """Load the translation model and tokenizer.
+
+        Args:
+            model_name: Hugging Face model name or local directory.
+            device: Device to run on. Defaults to CUDA when available.
+            num_beams: Beam size; 1 is greedy decoding. None keeps the model's
+                generation config.
+            max_batch_tokens: Padded source tokens allowed per ``generate`` call.
+            max_batch_size: Maximum sentences per ``generate`` call.
+            cache: Optional object with ``get(text)``, ``put_many(items)`` and
+                ``set_version(version)``, e.g. an ``app.prediction_cache``
+                ``PredictionCache``.
+        """
+        self.model_name = model_name
+        self.device = device or torch.device(
+            "cuda" if torch.cuda.is_available() else "cpu"
+        )
+        self.num_beams = num_beams
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_size = max_batch_size
+
+        logger.info("Loading translation model %s on %s", model_name, self.device)
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
+        self.model.to(self.device).eval()
+
+        self.cache = cache
+        if cache is not None:
+            # Beam size changes the output, so it is part of the cache version
+            cache.set_version(f"{model_name}|beams={num_beams or 'default'}")
+
+    def translate(self, texts: Sequence[str]) -> list[str]:
+        """Translate sentences, returning them in input order.
+
+        Cached and repeated sentences are translated only once.
+
+        Args:
+            texts: Source sentences.
+
+        Returns:
+            list[str]: One translation per input sentence.
+        """
+        results: list[Optional[str]] = [None] * len(texts)
+        pending: dict[str, list[int]] = {}
+        for i, text in enumerate(texts):
+            cached = self.cache.get(text) if self.cache is not None else None
+            if cached is not None:
+                results[i] = cached
+            else:
+                pending.setdefault(text, []).append(i)
+
+        if pending:
+            unique = list(pending)
+            translations = self._generate(unique)
+            if self.cache is not None:
+                self.cache.put_many(zip(unique, translations))
+            for text, translation in zip(unique, translations):
+                for i in pending[text]:
+                    results[i] = translation
+        return results
+
+    def translate_one(self, text: str) -> str:
+        """Translate a single sentence."""
+        return self.translate([text])[0]
+
+    def _generate(self, texts: list[str]) -> list[str]:
+        """Run batched ``generate`` over length-bucketed batches."""
+        encodings = self.tokenizer(texts, truncation=True, max_length=MAX_LENGTH)
+        lengths = [len(ids) for ids in encodings["input_ids"]]
+        generate_kwargs = {"num_beams": self.num_beams} if self.num_beams else {}
+
+        results: list[Optional[str]] = [None] * len(texts)
+        for batch in length_bucketed_batches(
+            lengths, self.max_batch_tokens, self.max_batch_size
+        ):
+            inputs = self.tokenizer.pad(
+                batch_features(encodings, batch),
+                padding="longest",
+                return_tensors="pt",
+            ).to(self.device)
+            with torch.no_grad():
+                generated = self.model.generate(**inputs, **generate_kwargs)
+            decoded = self.tokenizer.batch_decode(generated, skip_special_tokens=True)
+            for idx, translation in zip(batch, decoded):
+                results[idx] = translation
+        return results
+
+
+_engines: dict[tuple, TranslationEngine] = {}
+_engines_lock = threading.Lock()
+
+
+def get_translation_engine(
+    model_name: str = TRANSLATION_MODEL, **kwargs
+) -> TranslationEngine:
+    """Return the process-wide engine for ``model_name``, loading it on first use.
+
+    Engines are shared per model name and settings: callers passing different
+    ``kwargs`` (e.g. another ``device``, ``cache`` or ``num_beams``) get their
+    own engine instead of silently reusing one configured by another caller.
+
+    Args:
+        model_name: Hugging Face model name or local directory.
+        **kwargs: Passed to :class:`TranslationEngine` when it is created;
+            ``num_beams`` defaults to ``TRANSLATION_NUM_BEAMS``.
+
+    Returns:
+        TranslationEngine: The shared engine.
+    """
+    if TRANSLATION_NUM_BEAMS:
+        kwargs.setdefault("num_beams", int(TRANSLATION_NUM_BEAMS))
+    key = (model_name, *sorted(kwargs.items()))
+    with _engines_lock:
+        if key not in _engines:
+            _engines[key] = TranslationEngine(model_name, **kwargs)
+        return _engines[key]
@@ -0,0 +1,167 @@
+"""Memory-mapped loading of safetensors checkpoints.
+
+``from_pretrained`` reads the weights into private memory of every process,
+after first allocating and randomly initializing the whole model. Here the
+model is built with its parameters on the ``meta`` device (no allocation, no
+initialization) and each parameter is then pointed at its bytes in a
+copy-on-write ``mmap`` of ``model.safetensors``. Weights are only read, so
+their pages stay in the page cache and are shared by every worker that maps
+the same file, and by workers forked from a process that loaded the model
+(``gunicorn --preload``).
+
+Set ``MODEL_MMAP=0`` to fall back to ``from_pretrained``.
+"""
+
+import json
+import mmap
+import os
+import struct
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional, Union
+
+import torch
+from transformers import AutoConfig, PreTrainedModel
+from transformers.modeling_utils import no_init_weights
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+MODEL_MMAP = os.getenv("MODEL_MMAP", "1") != "0"
+SAFETENSORS_FILE = "model.safetensors"
+
+_DTYPES = {
+    "F64": torch.float64,
+    "F32": torch.float32,
+    "F16": torch.float16,
+    "BF16": torch.bfloat16,
+    "I64": torch.int64,
+    "I32": torch.int32,
+    "I16": torch.int16,
+    "I8": torch.int8,
+    "U8": torch.uint8,
+    "BOOL": torch.bool,
+}
+
+
+def load_safetensors_mmap(path: Union[str, Path]) -> dict[str, torch.Tensor]:
+    """Return the tensors of a safetensors file as views of a private mmap.
+
+    No tensor data is read until it is used. The mapping is copy-on-write, so
+    writing to a tensor only copies the touched pages into this process.
+
+    Args:
+        path: ``.safetensors`` file.
+
+    Returns:
+        dict: Tensor name to CPU tensor backed by the file.
+    """
+    with open(path, "rb") as f:
+        (header_size,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(header_size))
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    data_start = 8 + header_size
+    tensors = {}
+    for name, info in header.items():
+        if name == "__metadata__":
+            continue
+        dtype = _DTYPES[info["dtype"]]
+        begin, end = info["data_offsets"]
+        if end == begin:
+            tensors[name] = torch.empty(info["shape"], dtype=dtype)
+            continue
+        tensors[name] = torch.frombuffer(
+            buffer,
+            dtype=dtype,
+            count=(end - begin) // dtype.itemsize,
+            offset=data_start + begin,
+        ).view(info["shape"])
+    return tensors
+
+
+_meta_parameters = threading.local()
+_register_parameter = torch.nn.Module.register_parameter
+
+
+def _register_parameter_maybe_on_meta(module, name, param):
+    """``Module.register_parameter`` that honours :func:`_parameters_on_meta`."""
+    if param is not None and getattr(_meta_parameters, "active", False):
+        param = torch.nn.Parameter(param.to("meta"), requires_grad=param.requires_grad)
+    _register_parameter(module, name, param)
+
+
+@contextmanager
+def _parameters_on_meta():
+    """Create module parameters on the ``meta`` device; buffers stay on CPU.
+
+    Only modules built by the calling thread are affected, so a model loaded
+    concurrently in another thread (e.g. the translator while the classifier
+    warms up) still gets real parameters.
+    """
+    torch.nn.Module.register_parameter = _register_parameter_maybe_on_meta
+    previous = getattr(_meta_parameters, "active", False)
+    _meta_parameters.active = True
+    try:
+        yield
+    finally:
+        _meta_parameters.active = previous
+
+
+def load_pretrained_mmap(
+    model_dir: Union[str, Path], model_cls: type[PreTrainedModel], config=None
+) -> PreTrainedModel:
+    """Build a model whose weights are memory-mapped from ``model.safetensors``.
+
+    Args:
+        model_dir: Checkpoint directory with ``model.safetensors`` (and
+            ``config.json`` unless ``config`` is given).
+        model_cls: Model class, e.g. ``RobertaForSequenceClassification``.
+        config: Model config; read from ``model_dir`` if omitted.
+
+    Returns:
+        PreTrainedModel: The model in eval mode, without gradients.
+
+    Raises:
+        ValueError: If the file lacks weights for some parameters.
+    """
+    config = config or AutoConfig.from_pretrained(model_dir)
+    with no_init_weights(), _parameters_on_meta():
+        model = model_cls(config)
+
+    state_dict = load_safetensors_mmap(Path(model_dir) / SAFETENSORS_FILE)
+    model.load_state_dict(state_dict, strict=False, assign=True)
+    model.tie_weights()
+
+    missing = [name for name, param in model.named_parameters() if param.is_meta]
+    if missing:
+        raise ValueError(f"{model_dir} has no weights for: {', '.join(missing)}")
+    model.requires_grad_(False)
+    return model.eval()
+
+
+def load_pretrained(
+    model_dir: Union[str, Path],
+    model_cls: type[PreTrainedModel],
+    mmap_weights: Optional[bool] = None,
+) -> PreTrainedModel:
+    """Load a checkpoint, memory-mapping it when it is a safetensors file.
+
+    Args:
+        model_dir: Checkpoint directory.
+        model_cls: Model class, e.g. ``RobertaForSequenceClassification``.
+        mmap_weights: Use :func:`load_pretrained_mmap`; defaults to
+            ``MODEL_MMAP``. Checkpoints without ``model.safetensors`` always
+            go through ``from_pretrained``.
+
+    Returns:
+        PreTrainedModel: The model in eval mode.
+    """
+    if mmap_weights is None:
+        mmap_weights = MODEL_MMAP
+    if mmap_weights and (Path(model_dir) / SAFETENSORS_FILE).exists():
+        logger.info("Memory-mapping weights from %s", model_dir)
+        return load_pretrained_mmap(model_dir, model_cls)
+    return model_cls.from_pretrained(model_dir).eval()
@@ -0,0 +1,392 @@
+"""Asynchronous AssemblyAI client with a shared connection pool.
+
+All HTTP traffic goes through one pooled ``httpx.AsyncClient`` that lives on a
+dedicated background event loop. Async callers (FastAPI endpoints) await the
+client without blocking their loop, and sync callers (background jobs, CLI
+scripts) use :meth:`AssemblyAIClient.run_sync`; both share the same
+keep-alive connections.
+
+Transcripts are polled with exponential backoff. When ``webhook_url`` is set,
+AssemblyAI also calls the webhook on completion and :meth:`notify` wakes up
+the waiting poller immediately.
+
+Configuration (environment variables):
+
+- ``ASSEMBLYAI_API_KEY``: API key (default: the key in ``config/config.py``).
+- ``ASSEMBLYAI_BASE_URL``: API root, e.g. a local stub server for tests.
+- ``ASSEMBLYAI_POLL_INTERVAL`` / ``ASSEMBLYAI_POLL_MAX_INTERVAL`` /
+  ``ASSEMBLYAI_POLL_BACKOFF``: first delay, delay cap (seconds) and growth
+  factor between status polls.
+- ``ASSEMBLYAI_TRANSCRIBE_TIMEOUT``: give up waiting after this many seconds.
+- ``ASSEMBLYAI_WEBHOOK_URL``: public URL AssemblyAI should call on completion.
+- ``ASSEMBLYAI_WEBHOOK_SECRET``: value AssemblyAI sends in the
+  ``X-Webhook-Secret`` header so the webhook can be authenticated.
+- ``ASSEMBLYAI_MAX_CONNECTIONS``: size of the connection pool.
+"""
+
+import asyncio
+import contextlib
+import inspect
+import os
+import threading
+from pathlib import Path
+from typing import Any, AsyncIterable, Awaitable, Callable, Optional, Union
+
+import httpx
+
+from config.config import get_api_key
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_BASE_URL = "https://api.assemblyai.com/v2"
+WEBHOOK_SECRET_HEADER = "X-Webhook-Secret"
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+UPLOAD_QUEUE_CHUNKS = 4
+
+CompletionCallback = Callable[[dict], Union[None, Awaitable[None]]]
+
+
+class TranscriptionError(RuntimeError):
+    """Raised when AssemblyAI reports an error or a transcript times out."""
+
+
+class AssemblyAIClient:
+    """Pooled, non-blocking client for the AssemblyAI REST API."""
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        poll_interval: Optional[float] = None,
+        poll_max_interval: Optional[float] = None,
+        poll_backoff: Optional[float] = None,
+        transcribe_timeout: Optional[float] = None,
+        webhook_url: Optional[str] = None,
+        webhook_secret: Optional[str] = None,
+        max_connections: Optional[int] = None,
+        request_timeout: float = 30.0,
+    ):
+        """Create a client; unset arguments fall back to environment variables.
+
+        Args:
+            api_key: AssemblyAI API key.
+            base_url: API root URL (point it at a stub server in tests).
+            poll_interval: Delay before the first status poll, in seconds.
+            poll_max_interval: Upper bound for the poll delay, in seconds.
+            poll_backoff: Factor the poll delay grows by after each poll.
+            transcribe_timeout: Seconds to wait for a transcript to finish.
+            webhook_url: URL AssemblyAI calls when a transcript is finished.
+            webhook_secret: Secret AssemblyAI sends along with the webhook.
+            max_connections: Maximum pooled connections.
+            request_timeout: Timeout of a single HTTP request, in seconds.
+        """
+        env = os.getenv
+        self.api_key = api_key or env("ASSEMBLYAI_API_KEY") or get_api_key()
+        self.base_url = (
+            base_url or env("ASSEMBLYAI_BASE_URL", DEFAULT_BASE_URL)
+        ).rstrip("/")
+        self.poll_interval = poll_interval or float(
+            env("ASSEMBLYAI_POLL_INTERVAL", "1")
+        )
+        self.poll_max_interval = poll_max_interval or float(
+            env("ASSEMBLYAI_POLL_MAX_INTERVAL", "10")
+        )
+        self.poll_backoff = poll_backoff or float(env("ASSEMBLYAI_POLL_BACKOFF", "1.5"))
+        self.transcribe_timeout = transcribe_timeout or float(
+            env("ASSEMBLYAI_TRANSCRIBE_TIMEOUT", "3600")
+        )
+        self.webhook_url = webhook_url or env("ASSEMBLYAI_WEBHOOK_URL") or None
+        self.webhook_secret = webhook_secret or env("ASSEMBLYAI_WEBHOOK_SECRET") or None
+        self.max_connections = max_connections or int(
+            env("ASSEMBLYAI_MAX_CONNECTIONS", "10")
+        )
+        self.request_timeout = request_timeout
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._http: Optional[httpx.AsyncClient] = None
+        self._waiters: dict[str, asyncio.Event] = {}
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the background event loop and HTTP pool on first use."""
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever, name="assemblyai-client", daemon=True
+                ).start()
+                self._loop = loop
+                self._http = None
+            return self._loop
+
+    async def _client(self) -> httpx.AsyncClient:
+        """Return the pooled HTTP client (runs on the background loop)."""
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={"authorization": self.api_key},
+                timeout=self.request_timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+        return self._http
+
+    async def _on_loop(self, coro: Awaitable) -> Any:
+        """Run ``coro`` on the background loop and await it from any loop."""
+        loop = self._ensure_loop()
+        if asyncio.get_running_loop() is loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+    def run_sync(self, coro: Awaitable) -> Any:
+        """Run a client coroutine from synchronous code and return its result.
+
+        Example:
+            ``transcript = client.run_sync(client.transcribe(audio_url))``
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop()).result()
+
+    def close(self) -> None:
+        """Close pooled connections and stop the background loop."""
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None or loop.is_closed():
+            return
+        if self._http is not None:
+            asyncio.run_coroutine_threadsafe(self._http.aclose(), loop).result()
+            self._http = None
+        loop.call_soon_threadsafe(loop.stop)
+
+    async def _request(self, method: str, path: str, **kwargs) -> dict:
+        client = await self._client()
+        response = await client.request(method, path, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    async def upload(self, file_path: Union[str, Path]) -> str:
+        """Stream a local audio file to AssemblyAI.
+
+        Args:
+            file_path: Path to the audio file.
+
+        Returns:
+            str: The ``upload_url`` to pass to :meth:`submit`.
+        """
+
+        async def chunks():
+            with open(file_path, "rb") as f:
+                while chunk := f.read(UPLOAD_CHUNK_SIZE):
+                    yield chunk
+
+        logger.debug("Uploading %s to AssemblyAI", file_path)
+        result = await self._on_loop(self._request("POST", "/upload", content=chunks()))
+        return result["upload_url"]
+
+    async def upload_stream(self, chunks: AsyncIterable[bytes]) -> str:
+        """Pipe an async stream of bytes into an AssemblyAI upload.
+
+        The chunks are produced on the caller's event loop and handed to the
+        upload request through a small bounded queue, so at most
+        ``UPLOAD_QUEUE_CHUNKS`` chunks are buffered at any time.
+
+        Args:
+            chunks: Async iterable of audio bytes (e.g. an uploaded file).
+
+        Returns:
+            str: The ``upload_url`` to pass to :meth:`submit`.
+
+        Raises:
+            Exception: Whatever ``chunks`` raised; the upload is aborted.
+        """
+        loop = self._ensure_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=UPLOAD_QUEUE_CHUNKS)
+
+        async def body():
+            while (item := await queue.get()) is not None:
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+
+        async def start() -> asyncio.Task:
+            return asyncio.ensure_future(
+                self._request("POST", "/upload", content=body())
+            )
+
+        async def feed(item, upload: asyncio.Task) -> bool:
+            # Stop feeding if the request already ended (e.g. HTTP error)
+            put = asyncio.ensure_future(queue.put(item))
+            await asyncio.wait({put, upload}, return_when=asyncio.FIRST_COMPLETED)
+            if not put.done():
+                put.cancel()
+                return False
+            return True
+
+        async def finish(upload: asyncio.Task) -> dict:
+            return await upload
+
+        def on_loop(coro):
+            return asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+        upload = await on_loop(start())
+        try:
+            async for chunk in chunks:
+                if not await on_loop(feed(chunk, upload)):
+                    break
+            else:
+                await on_loop(feed(None, upload))
+        except BaseException as e:
+            await on_loop(feed(e, upload))
+            with contextlib.suppress(BaseException):
+                await on_loop(finish(upload))
+            raise
+        result = await on_loop(finish(upload))
+        return result["upload_url"]
+
+    async def submit(self, audio_url: str, language: str = "auto", **options) -> str:
+        """Create a transcription job.
+
+        Args:
+            audio_url: URL of the audio to transcribe.
+            language: ``"pl"``, ``"en"`` or ``"auto"`` for language detection.
+            **options: Extra transcript parameters passed to AssemblyAI.
+
+        Returns:
+            str: The transcript ID.
+        """
+        payload = {
+            "audio_url": audio_url,
+            "language_code": language if language in ["pl", "en"] else None,
+            "language_detection": language == "auto",
+            "punctuate": True,
+            "format_text": True,
+            **options,
+        }
+        if self.webhook_url:
+            payload.setdefault("webhook_url", self.webhook_url)
+            if self.webhook_secret:
+                payload.setdefault("webhook_auth_header_name", WEBHOOK_SECRET_HEADER)
+                payload.setdefault("webhook_auth_header_value", self.webhook_secret)
+        result = await self._on_loop(self._request("POST", "/transcript", json=payload))
+        logger.info("Submitted transcript %s", result["id"])
+        return result["id"]
+
+    async def _wait(self, transcript_id: str) -> dict:
+        event = self._waiters.setdefault(transcript_id, asyncio.Event())
+        deadline = asyncio.get_running_loop().time() + self.transcribe_timeout
+        delay = self.poll_interval
+        try:
+            while True:
+                result = await self._request("GET", f"/transcript/{transcript_id}")
+                if result["status"] == "completed":
+                    return result
+                if result["status"] == "error":
+                    raise TranscriptionError(result.get("error", "unknown error"))
+
+                remaining = deadline - asyncio.get_running_loop().time()
+                if remaining <= 0:
+                    raise TranscriptionError(
+                        f"Transcript {transcript_id} not finished after "
+                        f"{self.transcribe_timeout:.0f} s"
+                    )
+                # Sleep until the next poll, or until a webhook wakes us up
+                try:
+                    await asyncio.wait_for(event.wait(), min(delay, remaining))
+                except asyncio.TimeoutError:
+                    pass
+                event.clear()
+                delay = min(delay * self.poll_backoff, self.poll_max_interval)
+        finally:
+            self._waiters.pop(transcript_id, None)
+
+    async def wait(
+        self,
+        transcript_id: str,
+        on_complete: Optional[CompletionCallback] = None,
+    ) -> dict:
+        """Wait for a transcript to finish.
+
+        Args:
+            transcript_id: ID returned by :meth:`submit`.
+            on_complete: Optional (sync or async) callback receiving the
+                finished transcript.
+
+        Returns:
+            dict: The completed transcript.
+
+        Raises:
+            TranscriptionError: If transcription fails or times out.
+        """
+        transcript = await self._on_loop(self._wait(transcript_id))
+        logger.info("Transcript %s completed", transcript_id)
+        if on_complete is not None:
+            outcome = on_complete(transcript)
+            if inspect.isawaitable(outcome):
+                await outcome
+        return transcript
+
+    async def transcribe(
+        self,
+        audio_url: str,
+        language: str = "auto",
+        on_complete: Optional[CompletionCallback] = None,
+        **options,
+    ) -> dict:
+        """Submit a transcription job and wait for it to finish.
+
+        Args:
+            audio_url: URL of the audio to transcribe.
+            language: ``"pl"``, ``"en"`` or ``"auto"``.
+            on_complete: Optional callback receiving the finished transcript.
+            **options: Extra transcript parameters passed to AssemblyAI.
+
+        Returns:
+            dict: The completed transcript (``id``, ``language_code``, ...).
+        """
+        transcript_id = await self.submit(audio_url, language, **options)
+        return await self.wait(transcript_id, on_complete=on_complete)
+
+    async def sentences(self, transcript_id: str) -> list[dict]:
+        """Fetch the sentence-level results of a completed transcript.
+
+        Args:
+            transcript_id: ID of a completed transcript.
+
+        Returns:
+            list[dict]: Sentences with ``text``, ``start`` and ``end`` (ms).
+        """
+        result = await self._on_loop(
+            self._request("GET", f"/transcript/{transcript_id}/sentences")
+        )
+        return result.get("sentences", [])
+
+    def notify(self, transcript_id: str) -> bool:
+        """Wake up the poller of a transcript (call from a webhook handler).
+
+        Args:
+            transcript_id: ID sent in the webhook body.
+
+        Returns:
+            bool: True if a caller was waiting for this transcript.
+        """
+        loop = self._loop
+        event = self._waiters.get(transcript_id)
+        if loop is None or event is None:
+            return False
+        loop.call_soon_threadsafe(event.set)
+        return True
+
+
+_default_client: Optional[AssemblyAIClient] = None
+_default_lock = threading.Lock()
+
+
+def get_client() -> AssemblyAIClient:
+    """Return the process-wide client configured from the environment."""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = AssemblyAIClient()
+        return _default_client
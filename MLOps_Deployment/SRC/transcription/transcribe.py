@@ -1,13 +1,10 @@
 """Translate Polish sentences to English using a pretrained translation model."""
 
-import time
-from typing import Any
-
+import httpx
 import pandas as pd
-import requests
 
 from classification.emotion import classify_emotions
-from config.config import get_headers
+from transcription.assemblyai_client import TranscriptionError, get_client
 from utils.helpers import format_time
 from utils.logger import get_logger
 
@@ -17,8 +14,9 @@ logger = get_logger(__name__)
 def request_transcription(upload_url: str) -> str:
     """Submit a transcription job to AssemblyAI and wait until it completes.
 
-    This function polls the AssemblyAI API until the transcription status is
-    'completed' or 'error', and returns the transcript ID on success.
+    This function polls the AssemblyAI API (with exponential backoff, over a
+    pooled connection) until the transcription status is 'completed' or
+    'error', and returns the transcript ID on success.
 
     Args:
         upload_url: URL of the uploaded audio file to be transcribed.
@@ -29,33 +27,17 @@ def request_transcription(upload_url: str) -> str:
     Raises:
         Exception: If transcription fails or a request error occurs.
     """
-    endpoint = "https://api.assemblyai.com/v2/transcript"
-    payload: dict[str, Any] = {
-        "audio_url": upload_url,
-        "language_code": "en",
-        "punctuate": True,
-        "format_text": True,
-    }
-
+    client = get_client()
     try:
-        resp = requests.post(endpoint, json=payload, headers=get_headers())
-        resp.raise_for_status()
-        transcript_id = resp.json()["id"]
-        polling_url = f"{endpoint}/{transcript_id}"
-
-        while True:
-            poll = requests.get(polling_url, headers=get_headers()).json()
-            status = poll.get("status")
-            if status == "completed":
-                logger.info("Transcription complete.")
-                return transcript_id
-            if status == "error":
-                error_msg = poll.get("error", "unknown error")
-                logger.error("Transcription failed: %s", error_msg)
-                raise Exception(f"Transcription failed: {error_msg}")
-            time.sleep(5)
-
-    except requests.RequestException as exc:
+        transcript = client.run_sync(client.transcribe(upload_url, language="en"))
+        logger.info("Transcription complete.")
+        return transcript["id"]
+
+    except TranscriptionError as exc:
+        logger.error("Transcription failed: %s", exc)
+        raise Exception(f"Transcription failed: {exc}") from exc
+
+    except httpx.HTTPError as exc:
         logger.error("Error during transcription request: %s", exc)
         raise Exception(f"Request failed: {exc}") from exc
 
@@ -76,12 +58,9 @@ def get_transcript_df(transcript_id: str) -> pd.DataFrame:
     Raises:
         None—on error, returns an empty DataFrame.
     """
-    endpoint = f"https://api.assemblyai.com/v2/transcript/{transcript_id}/sentences"
-
+    client = get_client()
     try:
-        resp = requests.get(endpoint, headers=get_headers())
-        resp.raise_for_status()
-        sentences = resp.json().get("sentences", [])
+        sentences = client.run_sync(client.sentences(transcript_id))
 
         if not sentences:
             logger.warning("No sentences found for transcript ID: %s", transcript_id)
@@ -109,6 +88,6 @@ def get_transcript_df(transcript_id: str) -> pd.DataFrame:
         )
         return df
 
-    except requests.RequestException as exc:
+    except httpx.HTTPError as exc:
         logger.error("Error retrieving transcript: %s", exc)
         return pd.DataFrame()
@@ -0,0 +1,184 @@
+"""Append-only CSV storage with a newest-first read view.
+
+Each save appends its rows to the end of the CSV and flushes them with
+``fsync``, so a save costs O(new rows) however large the file is. A sidecar
+index (``<file>.idx``) records the byte offset at which every save starts;
+readers walk those offsets backwards to return the newest save first,
+without scanning or sorting the file. Quoted fields that span lines are
+safe, because batches are split at the recorded offsets rather than at line
+breaks.
+
+:func:`compact` rewrites a file in newest-first order for tools that need a
+physically sorted CSV::
+
+    python -m utils.append_csv compact src/data/processed/final_output.csv
+"""
+
+import argparse
+import csv
+import io
+import os
+from typing import Iterator
+
+import pandas as pd
+
+INDEX_SUFFIX = ".idx"
+
+
+def _index_path(path: str) -> str:
+    """Return the path of the offset index of a CSV file."""
+    return path + INDEX_SUFFIX
+
+
+def _fsync_append(path: str, data: bytes) -> None:
+    """Append bytes to a file and flush them to disk."""
+    with open(path, "ab") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _read_header(path: str) -> tuple[list[str], int]:
+    """Return the column names of a CSV file and the byte offset after them."""
+    with open(path, "rb") as f:
+        line = f.readline()
+    return next(csv.reader([line.decode("utf-8")]), []), len(line)
+
+
+def _read_offsets(path: str) -> list[int]:
+    """Return the start offset of every save, oldest first.
+
+    A CSV without an index (e.g. one written by the old prepending
+    ``save_to_csv``) is already newest-first, so it counts as one save.
+    """
+    try:
+        with open(_index_path(path)) as f:
+            return [int(line) for line in f if line.strip()]
+    except FileNotFoundError:
+        return [_read_header(path)[1]]
+
+
+def append_csv(df: pd.DataFrame, path: str) -> int:
+    """Append rows to a CSV file in constant time with respect to its size.
+
+    The offset of the new rows is recorded (and synced) before the rows are
+    written, so after a crash the index never points past the data.
+
+    Args:
+        df: Rows to append.
+        path: CSV file; created with a header row if missing or empty.
+
+    Returns:
+        Number of rows written.
+
+    Raises:
+        ValueError: If ``df`` has different columns than the existing file.
+    """
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        _fsync_append(path, df.iloc[:0].to_csv(index=False).encode("utf-8"))
+        with open(_index_path(path), "w"):
+            pass
+    else:
+        columns, _ = _read_header(path)
+        if set(columns) != set(map(str, df.columns)):
+            raise ValueError(
+                f"Columns {list(df.columns)} do not match {columns} in {path}"
+            )
+        df = df[columns]
+        if not os.path.exists(_index_path(path)):
+            _fsync_append(_index_path(path), f"{_read_offsets(path)[0]}\n".encode())
+
+    _fsync_append(_index_path(path), f"{os.path.getsize(path)}\n".encode())
+    _fsync_append(path, df.to_csv(index=False, header=False).encode("utf-8"))
+    return len(df)
+
+
+def iter_newest_first(path: str) -> Iterator[pd.DataFrame]:
+    """Yield the saves of an append-only CSV, most recent first.
+
+    Rows keep their original order within a save. Only one save is held in
+    memory at a time.
+
+    Args:
+        path: CSV file written by :func:`append_csv`.
+
+    Yields:
+        One DataFrame per save.
+    """
+    _, header_end = _read_header(path)
+    with open(path, "rb") as f:
+        header = f.read(header_end)
+        end = os.fstat(f.fileno()).st_size
+        for start in reversed(_read_offsets(path)):
+            if start < end:
+                f.seek(start)
+                yield pd.read_csv(io.BytesIO(header + f.read(end - start)))
+            end = start
+
+
+def read_newest_first(path: str) -> pd.DataFrame:
+    """Return the whole file with the most recent save on top.
+
+    This matches the file layout of the old prepending ``save_to_csv``.
+    """
+    frames = list(iter_newest_first(path))
+    if not frames:
+        return pd.read_csv(path)
+    return pd.concat(frames, ignore_index=True)
+
+
+def compact(path: str) -> int:
+    """Rewrite an append-only CSV in newest-first order, with one index entry.
+
+    The file is replaced atomically; run it while no process is appending.
+
+    Args:
+        path: CSV file written by :func:`append_csv`.
+
+    Returns:
+        Number of rows in the compacted file.
+    """
+    _, header_end = _read_header(path)
+    with open(path, "rb") as f:
+        header = f.read(header_end)
+    tmp = path + ".compact"
+    rows = 0
+    with open(tmp, "wb") as out:
+        out.write(header)
+        for frame in iter_newest_first(path):
+            out.write(frame.to_csv(index=False, header=False).encode("utf-8"))
+            rows += len(frame)
+        out.flush()
+        os.fsync(out.fileno())
+    os.replace(tmp, path)
+    with open(_index_path(path), "w") as f:
+        f.write(f"{header_end}\n")
+        f.flush()
+        os.fsync(f.fileno())
+    return rows
+
+
+def main() -> None:
+    """Command-line entry point: ``compact`` or ``show`` an append-only CSV."""
+    parser = argparse.ArgumentParser(description="Manage append-only CSV files.")
+    parser.add_argument("command", choices=["compact", "show"])
+    parser.add_argument("path", help="CSV file written by append_csv")
+    parser.add_argument("--rows", type=int, default=10, help="Rows to show")
+    args = parser.parse_args()
+
+    if args.command == "compact":
+        print(f"Compacted {args.path}: {compact(args.path)} rows, newest first")
+    else:
+        frames, rows = [], 0
+        for frame in iter_newest_first(args.path):
+            frames.append(frame)
+            rows += len(frame)
+            if rows >= args.rows:
+                break
+        if frames:
+            newest = pd.concat(frames, ignore_index=True).head(args.rows)
+            print(newest.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
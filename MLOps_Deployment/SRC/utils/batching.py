@@ -0,0 +1,100 @@
+"""Helpers for grouping sentences into padding-efficient inference batches."""
+
+from typing import Optional, Sequence
+
+
+def token_budget_batches(
+    lengths: Sequence[int],
+    max_tokens: int,
+    order: Optional[Sequence[int]] = None,
+    max_batch_size: Optional[int] = None,
+) -> list[list[int]]:
+    """Greedily group sentence indices so each padded batch fits a token budget.
+
+    A batch is padded to its longest sentence, so its cost is
+    ``len(batch) * max(lengths in batch)``. A single sentence longer than the
+    budget still gets a batch of its own.
+
+    Args:
+        lengths: Token count of each sentence.
+        max_tokens: Maximum padded tokens allowed per batch.
+        order: Order in which to visit the indices. Defaults to input order.
+        max_batch_size: Optional cap on the number of sentences per batch.
+
+    Returns:
+        Sentence indices for each batch.
+    """
+    if order is None:
+        order = range(len(lengths))
+
+    batches: list[list[int]] = []
+    current: list[int] = []
+    longest = 0
+    for idx in order:
+        length = lengths[idx]
+        new_longest = max(longest, length)
+        full = max_batch_size is not None and len(current) >= max_batch_size
+        if current and (full or new_longest * (len(current) + 1) > max_tokens):
+            batches.append(current)
+            current, new_longest = [], length
+        current.append(idx)
+        longest = new_longest
+    if current:
+        batches.append(current)
+    return batches
+
+
+def length_bucketed_batches(
+    lengths: Sequence[int], max_tokens: int, max_batch_size: Optional[int] = None
+) -> list[list[int]]:
+    """Sort sentences by token length and cut the sorted list into batches.
+
+    Neighbouring sentences in the sorted order have similar lengths, so each
+    batch needs very little padding. Callers scatter the batch outputs back to
+    the returned indices to restore the original order.
+
+    Args:
+        lengths: Token count of each sentence.
+        max_tokens: Maximum padded tokens allowed per batch.
+        max_batch_size: Optional cap on the number of sentences per batch.
+
+    Returns:
+        Sentence indices for each batch, shortest sentences first.
+    """
+    order = sorted(range(len(lengths)), key=lengths.__getitem__)
+    return token_budget_batches(lengths, max_tokens, order, max_batch_size)
+
+
+def batch_features(encodings, indices: Sequence[int]) -> list[dict]:
+    """Select the unpadded tokenizer features of the given sentences.
+
+    The result can be passed to ``tokenizer.pad(..., padding="longest")`` to
+    build a tensor batch padded only to its own longest sentence.
+
+    Args:
+        encodings: Output of an unpadded tokenizer call on the full sentence list.
+        indices: Sentence indices belonging to the batch.
+
+    Returns:
+        One ``{"input_ids", "attention_mask"}`` dict per selected sentence.
+    """
+    return [
+        {
+            "input_ids": encodings["input_ids"][i],
+            "attention_mask": encodings["attention_mask"][i],
+        }
+        for i in indices
+    ]
+
+
+def padded_tokens(lengths: Sequence[int], batches: list[list[int]]) -> int:
+    """Count the tokens processed when each batch is padded to its longest item.
+
+    Args:
+        lengths: Token count of each sentence.
+        batches: Sentence indices for each batch.
+
+    Returns:
+        Total number of (real + padding) token positions.
+    """
+    return sum(len(batch) * max(lengths[i] for i in batch) for batch in batches)
@@ -1,4 +1,4 @@
-"""Utility functions for logging, time formatting, and CSV handling."""
+"""Utility functions for logging, time formatting, and result file handling."""
 
 import logging
 import os
@@ -6,6 +6,9 @@ from typing import Optional
 
 import pandas as pd
 
+from utils.append_csv import append_csv
+from utils.result_io import format_for_path, read_table, write_table
+
 # Module‐scoped logger
 logger = logging.getLogger(__name__)
 
@@ -64,18 +67,26 @@ def save_to_csv(
     df: pd.DataFrame,
     filename: str = "final_output.csv",
     output_dir: Optional[str] = None,
+    append: bool = True,
 ) -> None:
-    """Save a DataFrame to CSV, prepending new rows above existing ones.
-
-    If the file already exists:
+    """Save a DataFrame to a result file, keeping the newest rows first.
+
+    The format follows the file suffix (``.csv``, ``.parquet`` or ``.arrow``,
+    see :mod:`utils.result_io`). CSV files are append-only by default: the new
+    rows are appended and fsynced in time independent of the file size, and
+    newest-first order is a read-time view (``utils.append_csv.
+    read_newest_first``, or ``python -m utils.append_csv compact`` to rewrite
+    the file sorted). Otherwise, if the file already exists:
       - read it in
       - new rows go on top
       - old rows get pushed down
 
     Args:
       df: DataFrame of new rows
-      filename: CSV filename
+      filename: Result filename; its suffix selects the format
       output_dir: base directory (defaults to 'src/data/processed')
+      append: append to CSV files instead of rewriting them with the new rows
+        on top
     """
     if output_dir is None:
         output_dir = os.path.join("src", "data", "processed")
@@ -83,9 +94,14 @@ def save_to_csv(
 
     file_path = os.path.join(output_dir, filename)
 
+    if append and format_for_path(file_path) == "csv":
+        append_csv(df, file_path)
+        logger.info("Appended %d rows to %s", len(df), file_path)
+        return
+
     if os.path.exists(file_path):
         try:
-            old_df = pd.read_csv(file_path)
+            old_df = read_table(file_path)
             combined = pd.concat([df, old_df], ignore_index=True)
             logger.debug(
                 "Prepending %d new rows to existing %d rows in %s",
@@ -95,10 +111,10 @@ def save_to_csv(
             )
         except Exception as e:
             logger.error(
-                "Failed to read existing CSV %s: %s; overwriting", file_path, e
+                "Failed to read existing file %s: %s; overwriting", file_path, e
             )
             combined = df
     else:
         combined = df
-    combined.to_csv(file_path, index=False)
+    write_table(combined, file_path)
     logger.info("Saved output to %s (total %d rows)", file_path, len(combined))
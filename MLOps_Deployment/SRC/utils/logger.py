@@ -1,47 +1,243 @@
-"""Logging utility for the application."""
+"""Logging utility for the application.
 
+Configuration (environment variables, read by :func:`setup_logging`):
+
+- ``LOG_MODE``: ``queue`` (default) hands records to a background thread
+  through a ``QueueHandler``, so request handlers never wait for disk or
+  console I/O; ``sync`` writes from the calling thread.
+- ``LOG_FORMAT``: ``text`` (default) or ``json`` (one JSON object per line).
+- ``LOG_FILE_MAX_MB`` / ``LOG_FILE_BACKUPS``: rotate the log file at this size
+  and keep this many old files (default 50 MB and 5; 0 MB disables rotation).
+- ``LOG_DEBUG_SAMPLE_RATE``: fraction of DEBUG records kept per call site
+  (default 1, all); the first record of each call site is always kept.
+- ``LOG_QUEUE_SIZE``: records buffered in queue mode before new ones are
+  dropped instead of blocking (default 10000).
+
+Threads do not survive ``fork()``. A process forked after :func:`setup_logging`
+(e.g. a ``gunicorn --preload`` worker) starts its own writer thread with an
+empty queue. It also writes and rotates its own log file, ``<name>.<pid>.log``
+next to the configured one: ``RotatingFileHandler`` cannot rotate one file
+shared by several processes.
+"""
+
+import atexit
+import json
 import logging
 import logging.config
+import logging.handlers
+import os
+import queue
+import threading
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import Optional
+
+_listener: Optional["DrainingQueueListener"] = None
+_queue_handler: Optional["DroppingQueueHandler"] = None
+_file_handler: Optional[logging.handlers.RotatingFileHandler] = None
+
+
+class DebugSampler(logging.Filter):
+    """Keep one in every ``1 / rate`` DEBUG records per call site.
+
+    Records above DEBUG always pass. Counting per ``(logger, line)`` keeps the
+    first record of rare debug messages while thinning out the ones logged on
+    every request.
+    """
+
+    def __init__(self, rate: float = 1.0):
+        """Create a sampler.
+
+        Args:
+            rate: Fraction of DEBUG records to keep, between 0 and 1.
+        """
+        super().__init__()
+        self.every = max(1, round(1 / rate)) if rate > 0 else 0
+        self._counts: dict[tuple[str, int], int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.every == 1:
+            return True
+        if self.every == 0:
+            return False
+        key = (record.name, record.lineno)
+        with self._lock:
+            count = self._counts.get(key, 0)
+            self._counts[key] = count + 1
+        return count % self.every == 0
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as single-line JSON objects."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "line": record.lineno,
+            "thread": record.threadName,
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records when the queue is full instead of blocking."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class DrainingQueueListener(logging.handlers.QueueListener):
+    """QueueListener whose stop waits for room in a full queue."""
 
+    def enqueue_sentinel(self) -> None:
+        # The writer thread keeps draining, so a blocking put cannot deadlock
+        self.queue.put(self._sentinel)
 
-def setup_logging(log_dir: str = "src/logs", log_filename: str = "app.log") -> None:
+
+def stop_logging() -> None:
+    """Flush queued records and stop the background writer, if running."""
+    global _listener, _queue_handler
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+        _queue_handler = None
+
+
+def _process_file_handler(
+    handler: logging.handlers.RotatingFileHandler,
+) -> logging.handlers.RotatingFileHandler:
+    """Return a copy of ``handler`` that writes ``<name>.<pid>.log`` instead."""
+    path = Path(handler.baseFilename)
+    process_handler = logging.handlers.RotatingFileHandler(
+        path.with_name(f"{path.stem}.{os.getpid()}{path.suffix}"),
+        maxBytes=handler.maxBytes,
+        backupCount=handler.backupCount,
+        encoding=handler.encoding,
+    )
+    process_handler.name = handler.name
+    process_handler.setLevel(handler.level)
+    process_handler.setFormatter(handler.formatter)
+    for log_filter in handler.filters:
+        process_handler.addFilter(log_filter)
+    return process_handler
+
+
+def _restart_after_fork() -> None:
+    """Give a forked child its own log file, queue and writer thread.
+
+    The parent's listener thread does not exist in the child, so without this
+    the child's records would fill a queue nothing drains and then be dropped.
+    Records the parent had queued but not written yet are left to the parent.
+    The inherited file handler is swapped for one on a per-process file, so
+    that parent and children never rotate the same file.
+    """
+    global _listener, _file_handler
+    root = logging.getLogger()
+    listener_handlers = list(_listener.handlers) if _listener is not None else []
+    inherited = _file_handler
+    if inherited is not None and (
+        inherited in root.handlers or inherited in listener_handlers
+    ):
+        _file_handler = _process_file_handler(inherited)
+        if inherited in root.handlers:  # sync mode
+            root.removeHandler(inherited)
+            root.addHandler(_file_handler)
+        listener_handlers = [
+            _file_handler if handler is inherited else handler
+            for handler in listener_handlers
+        ]
+        inherited.close()
+
+    if _listener is None or _queue_handler is None:
+        return
+    log_queue = queue.Queue(_queue_handler.queue.maxsize)
+    _queue_handler.queue = log_queue
+    _queue_handler.dropped = 0
+    _listener = DrainingQueueListener(
+        log_queue,
+        *listener_handlers,
+        respect_handler_level=_listener.respect_handler_level,
+    )
+    _listener.start()
+
+
+def setup_logging(
+    log_dir: str = "src/logs",
+    log_filename: str = "app.log",
+    mode: Optional[str] = None,
+) -> None:
     """Configure application-wide logging.
 
     • Console handler at INFO+
-    • File handler capturing DEBUG+
-    • Root logger at DEBUG
+    • Rotating file handler capturing DEBUG+ (per process after a fork)
+    • Root logger at DEBUG, DEBUG records sampled per ``LOG_DEBUG_SAMPLE_RATE``
     • urllib3 logger elevated to INFO to suppress its DEBUGs
+    • In queue mode both handlers run on a ``QueueListener`` thread
 
     Args:
         log_dir: Directory under which to write the log file.
         log_filename: Name of the log file.
+        mode: "queue" or "sync"; defaults to ``LOG_MODE``.
     """
+    global _listener, _queue_handler, _file_handler
+    env = os.getenv
+    mode = (mode or env("LOG_MODE", "queue")).lower()
+    max_bytes = int(float(env("LOG_FILE_MAX_MB", "50")) * 1024 * 1024)
+
     # Ensure the log directory exists
     Path(log_dir).mkdir(parents=True, exist_ok=True)
     logfile_path = Path(log_dir) / log_filename
 
+    stop_logging()
     config = {
         "version": 1,
         "disable_existing_loggers": False,
         "formatters": {
             "standard": {
                 "format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+            },
+            "json": {"()": JsonFormatter},
+        },
+        "filters": {
+            "debug_sampler": {
+                "()": DebugSampler,
+                "rate": float(env("LOG_DEBUG_SAMPLE_RATE", "1")),
             }
         },
         "handlers": {
             "console": {
                 "class": "logging.StreamHandler",
                 "level": "INFO",
-                "formatter": "standard",
+                "formatter": "json" if env("LOG_FORMAT") == "json" else "standard",
+                "filters": ["debug_sampler"],
                 "stream": "ext://sys.stdout",
             },
             "file": {
-                "class": "logging.FileHandler",
+                "class": "logging.handlers.RotatingFileHandler",
                 "level": "DEBUG",
-                "formatter": "standard",
+                "formatter": "json" if env("LOG_FORMAT") == "json" else "standard",
                 "filename": str(logfile_path),
                 "mode": "a",
+                "maxBytes": max_bytes,
+                "backupCount": int(env("LOG_FILE_BACKUPS", "5")),
+                "encoding": "utf-8",
+                "filters": ["debug_sampler"],
             },
         },
         "loggers": {
@@ -50,15 +246,38 @@ def setup_logging(log_dir: str = "src/logs", log_filename: str = "app.log") -> N
                 "level": "DEBUG",
                 "propagate": False,
             },
-            "urllib3": {
-                "handlers": ["console", "file"],
-                "level": "INFO",
-                "propagate": False,
-            },
+            "urllib3": {"level": "INFO"},
         },
     }
 
     logging.config.dictConfig(config)
+    root = logging.getLogger()
+    _file_handler = next(h for h in root.handlers if h.name == "file")
+    if mode != "queue":
+        return
+
+    # Move the handlers behind a queue: the calling thread only samples and
+    # enqueues the record, and the listener thread formats and writes it.
+    handlers = list(root.handlers)
+    queue_handler = DroppingQueueHandler(
+        queue.Queue(int(env("LOG_QUEUE_SIZE", "10000")))
+    )
+    for handler in handlers:
+        root.removeHandler(handler)
+        for sampler in handler.filters[:]:
+            handler.removeFilter(sampler)
+            queue_handler.addFilter(sampler)
+    root.addHandler(queue_handler)
+    _listener = DrainingQueueListener(
+        queue_handler.queue, *handlers, respect_handler_level=True
+    )
+    _listener.start()
+    _queue_handler = queue_handler
+
+
+atexit.register(stop_logging)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_after_fork)
 
 
 def get_logger(name: str) -> logging.Logger:
@@ -0,0 +1,52 @@
+"""Resident memory of the current process."""
+
+import resource
+import sys
+
+_SMAPS_FIELDS = {
+    "Rss": "rss_mb",
+    "Pss": "pss_mb",
+    "Shared_Clean": "shared_clean_mb",
+    "Private_Clean": "private_clean_mb",
+    "Private_Dirty": "private_dirty_mb",
+}
+
+
+def process_memory(pid: str = "self") -> dict[str, float]:
+    """Return the memory of a process in MB.
+
+    On Linux this reads ``/proc/<pid>/smaps_rollup``: ``rss_mb`` counts every
+    resident page, ``pss_mb`` splits shared pages between the processes that
+    map them, and ``private_dirty_mb`` is memory no other process can share.
+    Elsewhere only the peak RSS of the current process is available.
+
+    Args:
+        pid: Process ID, or "self".
+
+    Returns:
+        dict: Memory figures in MB, keyed as described above.
+    """
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            lines = f.readlines()
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and in kB elsewhere
+        return {"rss_mb": peak / (2**20 if sys.platform == "darwin" else 2**10)}
+
+    memory = {}
+    for line in lines:
+        name, _, value = line.partition(":")
+        if name in _SMAPS_FIELDS:
+            memory[_SMAPS_FIELDS[name]] = round(int(value.split()[0]) / 1024, 1)
+    return memory
+
+
+def format_memory(memory: dict[str, float]) -> str:
+    """Format the RSS, PSS and private dirty memory for a log line."""
+    labels = {"rss_mb": "RSS", "pss_mb": "PSS", "private_dirty_mb": "private"}
+    return ", ".join(
+        f"{label} {memory[key]:.0f} MB"
+        for key, label in labels.items()
+        if key in memory
+    )
@@ -0,0 +1,67 @@
+"""Objects that belong to a single process.
+
+SQLite connections and ONNX Runtime sessions must not be used across
+``fork()``: a forked child inherits the parent's file locks and journal state,
+or thread pools whose threads no longer exist. Under ``gunicorn --preload``
+everything created at import time lives in the master and is forked into the
+workers, so such objects are created per process with :class:`ProcessLocal`.
+"""
+
+import os
+import threading
+import weakref
+from typing import Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+_instances: "weakref.WeakSet[ProcessLocal]" = weakref.WeakSet()
+
+
+class ProcessLocal(Generic[T]):
+    """Create an object lazily, once per process.
+
+    :meth:`get` calls ``factory`` on its first call in each process. An object
+    created by a parent process is kept referenced but never used again by a
+    forked child, and never closed there, since closing it could act on state
+    the parent still shares (e.g. roll back a SQLite transaction).
+    """
+
+    def __init__(self, factory: Callable[[], T]):
+        """Wrap a factory.
+
+        Args:
+            factory: Called without arguments to create the object.
+        """
+        self._factory = factory
+        self._value: Optional[T] = None
+        self._pid: Optional[int] = None
+        self._inherited: list[T] = []
+        self._lock = threading.Lock()
+        _instances.add(self)
+
+    def get(self) -> T:
+        """Return the object of the current process, creating it if needed."""
+        pid = os.getpid()
+        if self._pid != pid:
+            with self._lock:
+                if self._pid != pid:
+                    if self._value is not None:
+                        self._inherited.append(self._value)
+                    self._value = self._factory()
+                    self._pid = pid
+        return self._value
+
+    @property
+    def created(self) -> bool:
+        """Whether the current process has created its object."""
+        return self._pid == os.getpid()
+
+
+def _after_fork_in_child() -> None:
+    # A lock held by another thread at fork time would never be released
+    for instance in list(_instances):
+        instance._lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
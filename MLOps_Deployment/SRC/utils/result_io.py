@@ -0,0 +1,163 @@
+"""Pluggable writers and readers for prediction result tables.
+
+Results can be stored as CSV, Parquet or Arrow IPC (Feather v2). Emotion label
+columns are dictionary-encoded in the columnar formats, so each distinct label
+is stored once. Readers pick the format from the file suffix and accept a
+column list, which Parquet and Arrow read without touching the other columns.
+"""
+
+import glob
+import io
+import os
+from dataclasses import dataclass
+from typing import BinaryIO, Callable, Optional, Sequence, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+# Low-cardinality label columns written as dictionary (categorical) columns
+LABEL_COLUMNS = ("Emotion", "Predicted Emotion", "predicted_label", "label")
+
+Destination = Union[str, os.PathLike, BinaryIO]
+
+
+@dataclass(frozen=True)
+class ResultFormat:
+    """How to write and read one result file format."""
+
+    suffix: str
+    media_type: str
+    write: Callable[[pd.DataFrame, Destination], None]
+    read: Callable[[Destination, Optional[Sequence[str]]], pd.DataFrame]
+
+
+def _to_arrow(df: pd.DataFrame) -> pa.Table:
+    """Convert a DataFrame to Arrow with label columns dictionary-encoded."""
+    labels = {c: df[c].astype("category") for c in LABEL_COLUMNS if c in df}
+    return pa.Table.from_pandas(df.assign(**labels), preserve_index=False)
+
+
+def _write_csv(df: pd.DataFrame, dest: Destination) -> None:
+    """Write CSV to a path or binary buffer."""
+    if isinstance(dest, (str, os.PathLike)):
+        df.to_csv(dest, index=False)
+    else:
+        dest.write(df.to_csv(index=False).encode("utf-8"))
+
+
+def _read_csv(src: Destination, columns: Optional[Sequence[str]]) -> pd.DataFrame:
+    """Read CSV, keeping only ``columns`` when given."""
+    return pd.read_csv(src, usecols=columns)
+
+
+def _write_parquet(df: pd.DataFrame, dest: Destination) -> None:
+    """Write zstd-compressed Parquet."""
+    pq.write_table(_to_arrow(df), dest, compression="zstd")
+
+
+def _read_parquet(src: Destination, columns: Optional[Sequence[str]]) -> pd.DataFrame:
+    """Read Parquet with column projection."""
+    return pq.read_table(src, columns=columns).to_pandas()
+
+
+def _write_arrow(df: pd.DataFrame, dest: Destination) -> None:
+    """Write an Arrow IPC file."""
+    # Uncompressed, so readers can memory-map the file without decoding it
+    feather.write_feather(_to_arrow(df), dest, compression="uncompressed")
+
+
+def _read_arrow(src: Destination, columns: Optional[Sequence[str]]) -> pd.DataFrame:
+    """Read a memory-mapped Arrow IPC file with column projection."""
+    return feather.read_table(src, columns=columns, memory_map=True).to_pandas()
+
+
+FORMATS: dict[str, ResultFormat] = {
+    "csv": ResultFormat(".csv", "text/csv", _write_csv, _read_csv),
+    "parquet": ResultFormat(
+        ".parquet", "application/vnd.apache.parquet", _write_parquet, _read_parquet
+    ),
+    "arrow": ResultFormat(
+        ".arrow", "application/vnd.apache.arrow.file", _write_arrow, _read_arrow
+    ),
+}
+
+
+def register_format(name: str, result_format: ResultFormat) -> None:
+    """Add or replace a result format.
+
+    Args:
+        name: Format name, e.g. "parquet".
+        result_format: Its suffix, media type, writer and reader.
+    """
+    FORMATS[name] = result_format
+
+
+def format_for_path(path: Union[str, os.PathLike]) -> str:
+    """Return the name of the format whose suffix matches ``path``.
+
+    Raises:
+        ValueError: If no registered format uses the suffix.
+    """
+    suffix = os.path.splitext(os.fspath(path))[1].lower()
+    for name, result_format in FORMATS.items():
+        if result_format.suffix == suffix:
+            return name
+    raise ValueError(f"Unsupported result file type: {path}")
+
+
+def write_table(df: pd.DataFrame, dest: Destination, fmt: Optional[str] = None) -> None:
+    """Write a result table.
+
+    Args:
+        df: Result rows.
+        dest: File path or binary buffer.
+        fmt: Format name. Defaults to the one matching the path suffix.
+    """
+    FORMATS[fmt or format_for_path(dest)].write(df, dest)
+
+
+def to_bytes(df: pd.DataFrame, fmt: str) -> bytes:
+    """Serialize a result table in memory, e.g. for a blob upload."""
+    buffer = io.BytesIO()
+    FORMATS[fmt].write(df, buffer)
+    return buffer.getvalue()
+
+
+def read_table(
+    src: Union[str, os.PathLike],
+    columns: Optional[Sequence[str]] = None,
+    fmt: Optional[str] = None,
+) -> pd.DataFrame:
+    """Read a result table, optionally only some of its columns.
+
+    Args:
+        src: File path.
+        columns: Columns to load; others are not read from Parquet/Arrow files.
+        fmt: Format name. Defaults to the one matching the path suffix.
+
+    Returns:
+        The table; label columns of columnar files come back as categoricals.
+    """
+    columns = list(columns) if columns is not None else None
+    return FORMATS[fmt or format_for_path(src)].read(src, columns)
+
+
+def find_latest_table(folder_path: str) -> str:
+    """Return the most recently modified result file of any registered format.
+
+    Args:
+        folder_path: Directory to search.
+
+    Raises:
+        FileNotFoundError: If the directory holds no result files.
+    """
+    files = [
+        path
+        for result_format in FORMATS.values()
+        for path in glob.glob(os.path.join(folder_path, f"*{result_format.suffix}"))
+    ]
+    if not files:
+        raise FileNotFoundError(f"No result files found in {folder_path}")
+    return max(files, key=os.path.getmtime)
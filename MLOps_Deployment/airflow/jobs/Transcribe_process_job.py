@@ -1,6 +1,6 @@
 import os
 import time
-from io import StringIO
+from io import BytesIO
 
 import nltk
 import pandas as pd
@@ -8,9 +8,22 @@ import requests
 from azure.storage.blob import BlobServiceClient
 from azureml.core import Datastore, Workspace
 from nltk.corpus import stopwords
+from requests.adapters import HTTPAdapter
 
 nltk.download("stopwords")
 
+# Polling backoff: first delay, growth factor and cap (seconds)
+POLL_INTERVAL = float(os.getenv("ASSEMBLYAI_POLL_INTERVAL", "1"))
+POLL_BACKOFF = float(os.getenv("ASSEMBLYAI_POLL_BACKOFF", "1.5"))
+POLL_MAX_INTERVAL = float(os.getenv("ASSEMBLYAI_POLL_MAX_INTERVAL", "10"))
+
+# Output file format: "csv", or "parquet" for columnar, compressed output
+OUTPUT_FORMAT = os.getenv("TRANSCRIPT_OUTPUT_FORMAT", "csv").lower()
+
+# One keep-alive connection pool for every AssemblyAI call of this job
+session = requests.Session()
+session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+
 
 def remove_stopwords(input_text):
     """Remove English stopwords from a given input text."""
@@ -24,7 +37,7 @@ def remove_stopwords(input_text):
 def upload_file(filepath: str, headers: dict) -> str:
     """Upload a file to AssemblyAI and return the upload URL."""
     with open(filepath, "rb") as f:
-        response = requests.post(
+        response = session.post(
             "https://api.assemblyai.com/v2/upload", headers=headers, files={"file": f}
         )
     response.raise_for_status()
@@ -40,18 +53,20 @@ def request_transcription(upload_url: str, headers: dict) -> str:
         "punctuate": True,
         "format_text": True,
     }
-    response = requests.post(endpoint, json=payload, headers=headers)
+    response = session.post(endpoint, json=payload, headers=headers)
     response.raise_for_status()
     transcript_id = response.json()["id"]
 
     polling_endpoint = f"{endpoint}/{transcript_id}"
+    delay = POLL_INTERVAL
     while True:
-        poll = requests.get(polling_endpoint, headers=headers).json()
+        poll = session.get(polling_endpoint, headers=headers).json()
         if poll["status"] == "completed":
             break
         elif poll["status"] == "error":
             raise Exception(f"Transcription failed: {poll['error']}")
-        time.sleep(5)
+        time.sleep(delay)
+        delay = min(delay * POLL_BACKOFF, POLL_MAX_INTERVAL)
 
     return transcript_id
 
@@ -69,7 +84,7 @@ def format_time(ms: int) -> str:
 def get_transcript_df(transcript_id: str, headers: dict) -> pd.DataFrame:
     """Retrieve sentence-level transcript from AssemblyAI and return a DataFrame."""
     url = f"https://api.assemblyai.com/v2/transcript/{transcript_id}/sentences"
-    response = requests.get(url, headers=headers)
+    response = session.get(url, headers=headers)
     response.raise_for_status()
     sentences = response.json()["sentences"]
 
@@ -114,7 +129,9 @@ def main():
     blob_input_path = (
         "UI/2025-06-23_144945_UTC/raw_data/Inside Polands Communist City  NOWA HUTA.mp3"
     )
-    blob_output_path = "UI/2025-06-19_123719_UTC/processed_data/transcribed_output.csv"
+    blob_output_path = (
+        f"UI/2025-06-19_123719_UTC/processed_data/transcribed_output.{OUTPUT_FORMAT}"
+    )
     local_audio_file = "input_audio.mp3"
 
     # Download input
@@ -129,8 +146,11 @@ def main():
     df["Clean Sentence"] = df["Sentence"].apply(remove_stopwords)
 
     # Upload output
-    buffer = StringIO()
-    df.to_csv(buffer, index=False)
+    buffer = BytesIO()
+    if OUTPUT_FORMAT == "parquet":
+        df.to_parquet(buffer, index=False, compression="zstd")
+    else:
+        df.to_csv(buffer, index=False)
     buffer.seek(0)
 
     output_client = blob_service_client.get_blob_client(